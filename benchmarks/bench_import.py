@@ -0,0 +1,50 @@
+# Times what the add-on costs at Blender start up, against what is put off until the first export.  Run in Blender, from
+# the root of the repo:
+#     blender --background --factory-startup --python benchmarks/bench_import.py -- [nRepeats]
+# Each repeat drops the modules of the package, so each import is from the start.  Reported is the best time of importing
+# & registering the add-on, & of then importing the exporter, with the number of the package's modules each loads.
+import bpy
+
+import sys
+from importlib import import_module
+from os import path
+from time import perf_counter
+
+PACKAGE = 'babylon_js'
+sys.path.insert(0, path.join(path.dirname(path.dirname(path.abspath(__file__))), 'src'))
+
+def package_modules():
+    return [name for name in sys.modules if name == PACKAGE or name.startswith(PACKAGE + '.')]
+
+def drop_package():
+    for name in package_modules():
+        del sys.modules[name]
+
+def main():
+    args = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    nRepeats = int(args[0]) if len(args) > 0 else 10
+
+    bestStartUp = bestExport = None
+    for idx in range(nRepeats):
+        drop_package()
+
+        start = perf_counter()
+        addon = import_module(PACKAGE)
+        addon.register()
+        startUp = perf_counter() - start
+        nStartUp = len(package_modules())
+
+        start = perf_counter()
+        import_module(PACKAGE + '.json_exporter')
+        export = perf_counter() - start
+        nExport = len(package_modules()) - nStartUp
+
+        addon.unregister()
+        bestStartUp = startUp if bestStartUp is None else min(bestStartUp, startUp)
+        bestExport = export if bestExport is None else min(bestExport, export)
+
+    print('best of ' + str(nRepeats))
+    print('import & register:  ' + '%.1f' % (bestStartUp * 1000) + ' ms, ' + str(nStartUp) + ' modules')
+    print('first export import:  ' + '%.1f' % (bestExport * 1000) + ' ms, ' + str(nExport) + ' more modules')
+
+main()
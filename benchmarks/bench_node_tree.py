@@ -0,0 +1,87 @@
+# Times reading large material node trees, the way BJSMaterial does.  Run in Blender, from the root of the repo:
+#     blender --background --factory-startup --python benchmarks/bench_node_tree.py -- [nNodes] [nRepeats]
+# A material is built of mix shaders, each mixing two principled BSDFs with their image textures, mapping & coordinate nodes,
+# until it has at least nNodes (default 300).  Reported is the time of a read, & of only finding the wrapper class of each node.
+import bpy
+
+import sys
+from os import path
+from tempfile import mkdtemp
+from time import perf_counter
+
+sys.path.insert(0, path.join(path.dirname(path.dirname(path.abspath(__file__))), 'src'))
+from babylon_js.logging import Logger
+from babylon_js.materials.nodes.abstract import AbstractBJSNode
+from babylon_js.materials.nodes.registry import get_node_wrapper
+
+def build_material(nNodes):
+    material = bpy.data.materials.new('bench_node_tree')
+    material.use_nodes = True
+    tree = material.node_tree
+    tree.nodes.clear()
+
+    image = bpy.data.images.new('bench_node_tree', 64, 64)
+    texCoord = tree.nodes.new('ShaderNodeTexCoord')
+
+    def principled():
+        bsdf = tree.nodes.new('ShaderNodeBsdfPrincipled')
+        mapping = tree.nodes.new('ShaderNodeMapping')
+        tree.links.new(texCoord.outputs['UV'], mapping.inputs['Vector'])
+        for socket in ['Base Color', 'Roughness']:
+            texture = tree.nodes.new('ShaderNodeTexImage')
+            texture.image = image
+            tree.links.new(mapping.outputs['Vector'], texture.inputs['Vector'])
+            tree.links.new(texture.outputs['Color'], bsdf.inputs[socket])
+        return bsdf
+
+    # pairs of shaders mixed, then the mixes mixed, until one remains
+    shaders = []
+    while len(tree.nodes) < nNodes:
+        shaders.append(principled())
+
+    while len(shaders) > 1:
+        mixed = []
+        for idx in range(0, len(shaders) - 1, 2):
+            mix = tree.nodes.new('ShaderNodeMixShader')
+            tree.links.new(shaders[idx    ].outputs[0], mix.inputs[1])
+            tree.links.new(shaders[idx + 1].outputs[0], mix.inputs[2])
+            mixed.append(mix)
+        if len(shaders) % 2 == 1:
+            mixed.append(shaders[-1])
+        shaders = mixed
+
+    output = tree.nodes.new('ShaderNodeOutputMaterial')
+    tree.links.new(shaders[0].outputs[0], output.inputs['Surface'])
+    return material
+
+def time_it(function, nRepeats):
+    best = None
+    for idx in range(nRepeats):
+        start = perf_counter()
+        function()
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    args = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    nNodes   = int(args[0]) if len(args) > 0 else 300
+    nRepeats = int(args[1]) if len(args) > 1 else 20
+
+    material = build_material(nNodes)
+    tree = material.node_tree
+    nodes = list(tree.nodes)
+
+    # wrappers log, which needs somewhere to go
+    log = Logger(path.join(mkdtemp(prefix = 'bjs_bench_'), 'bench.log'))
+    try:
+        read = time_it(lambda: AbstractBJSNode.readMaterialNodeTree(tree, False), nRepeats)
+        dispatch = time_it(lambda: [get_node_wrapper(node) for node in nodes], nRepeats)
+    finally:
+        log.close()
+
+    print('nodes:  ' + str(len(nodes)) + ', links:  ' + str(len(tree.links)) + ', best of ' + str(nRepeats))
+    print('read of tree:  ' + '%.3f' % (read * 1000) + ' ms, ' + '%.1f' % (read * 1000000 / len(nodes)) + ' us / node')
+    print('dispatch only:  ' + '%.3f' % (dispatch * 1000) + ' ms, ' + '%.2f' % (dispatch * 1000000 / len(nodes)) + ' us / node')
+
+main()
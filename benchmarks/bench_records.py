@@ -0,0 +1,72 @@
+# Measures the memory of the records the exporter keeps per item, on a scene of one mesh with many linked duplicates & empties,
+# each exported as a MeshInstance or a Node.  Runs in Blender, or with the stand-in of bpy & mathutils.  From the root of the repo:
+#     blender --background --factory-startup --python benchmarks/bench_records.py -- [nInstances]
+#     python benchmarks/bench_records.py [nInstances]
+# nInstances defaults to 50000, of each of duplicates & empties.  Reported is the peak Python memory of the export, what
+# is still held by the exporter after it, & the size of the records alone, with their instance dictionaries when they have
+# them;  values they reference, like vectors, are not counted.  Only Python allocations are traced, not those in Blender.
+import sys
+import tracemalloc
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import perf_counter
+
+BENCHMARKS = path.dirname(path.abspath(__file__))
+sys.path.insert(0, BENCHMARKS)
+from synthetic_scene import SceneSpec, build_scene, export_scene, import_addon, use_stand_in
+
+def add_items(bpy, nInstances):
+    scene = bpy.context.scene
+    source = [obj for obj in scene.objects if obj.type == 'MESH'][0]
+    for idx in range(nInstances):
+        duplicate = bpy.data.objects.new('dup_' + str(idx), source.data)
+        duplicate.location = (idx % 100 * 2.5, idx // 100 * 2.5, 0.0)
+        scene.collection.objects.link(duplicate)
+
+        empty = bpy.data.objects.new('empty_' + str(idx), None)
+        empty.location = (idx % 100 * 2.5, idx // 100 * 2.5, 1.0)
+        scene.collection.objects.link(empty)
+
+def record_size(record):
+    size = sys.getsizeof(record)
+    if hasattr(record, '__dict__'):
+        size += sys.getsizeof(record.__dict__)
+    return size
+
+def main():
+    args = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    nInstances = int(args[0]) if len(args) > 0 else 50000
+
+    standIn = use_stand_in()
+    import bpy
+    import_addon()
+
+    workDir = mkdtemp(prefix = 'bjs_bench_')
+    try:
+        build_scene(SceneSpec(meshes = 1, triangles = 200, uvLayers = 1, bones = 0, shapeKeys = 0, actions = 0, textureSize = 0))
+        add_items(bpy, nInstances)
+        nItems = nInstances * 2
+
+        tracemalloc.start()
+        start = perf_counter()
+        exporter = export_scene(path.join(workDir, 'records.babylon'))
+        elapsed = perf_counter() - start
+        held, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        rmtree(workDir, ignore_errors = True)
+
+    records = []
+    for mesh in exporter.meshesAndNodes:
+        records.extend(mesh.instances if hasattr(mesh, 'instances') else [mesh])
+    nRecords = len(records)
+    recordBytes = sum([record_size(record) for record in records])
+    print(('stand-in' if standIn else 'Blender') + ', ' + str(nInstances) + ' duplicates & ' + str(nInstances) + ' empties, ' +
+          str(nRecords) + ' records, exported in ' + '%.2f' % elapsed + ' secs')
+    print('peak ' + '%.1f' % (peak / 1048576) + ' MB, held after export ' + '%.1f' % (held / 1048576) + ' MB, ' +
+          '%.0f' % (held / nItems) + ' bytes per item')
+    print('records ' + '%.1f' % (recordBytes / 1048576) + ' MB, ' + '%.0f' % (recordBytes / max(nRecords, 1)) + ' bytes each')
+
+if __name__ == '__main__':
+    main()
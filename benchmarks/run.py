@@ -0,0 +1,422 @@
+# Times the hot paths of the exporter on synthetic scenes, comparing the throughput & peak memory of each against a stored
+# baseline, so a regression fails the run.  Runs in Blender, or on a machine without, using the stand-in of bpy & mathutils
+# in benchmarks/stand_in.  From the root of the repo:
+#     blender --background --factory-startup --python-exit-code 1 --python benchmarks/run.py -- [options]
+#     python benchmarks/run.py [options]
+# options:
+#     --sizes small,medium      scenes to run, of small, medium & huge;  huge is meant for Blender
+#     --cases mesh,export       cases to run, default all;  see CASES
+#     --repeats 3               best of, each repeat running a case until at least --min-time secs have passed
+#     --out results.json        where the results are written, as JSON
+#     --baseline file.json      default benchmarks/baseline.json
+#     --tolerance 0.25          fraction a case may be slower than its baseline, instead of that of the baseline file
+#     --update-baseline         record the results as the baseline of this environment, instead of comparing
+#
+# Throughput is units / sec, of triangles, vertices, keys, nodes or bytes, depending on the case.  Peak memory is from a
+# separate run of the case under tracemalloc, so only Python allocations are measured, not those inside Blender.  Baselines
+# are kept by environment, 'blender' or 'stand-in', since their numbers have nothing to do with each other.  A case fails
+# when its throughput drops, or its peak memory grows, by more than the tolerance of the baseline.
+#
+# Throughputs are compared relative to a calibration loop of plain Python, timed in the same run & stored with the baseline,
+# so a machine slower or faster than the one that recorded it does not fail, or pass, every case.  This only evens out the
+# speed of the CPU;  the baseline is still best re-recorded with --update-baseline on the machine that checks against it.
+import sys
+import tracemalloc
+from os import path
+from platform import platform, python_version
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import perf_counter
+
+BENCHMARKS = path.dirname(path.abspath(__file__))
+sys.path.insert(0, BENCHMARKS)
+from synthetic_scene import SceneSpec, build_scene, export_scene, import_addon, use_stand_in
+
+BASELINE = path.join(BENCHMARKS, 'baseline.json')
+DEFAULT_TOLERANCE = 0.25
+MEMORY_SLACK_MB = 1.0 # peak memory growth always allowed, so cases of tiny peaks do not fail on noise
+
+# scenes are built twice:  'plain' meshes, with no armature, shape keys or actions, for reading geometry & materials alone;
+# & 'full', with everything, for the cases of skinning, animation & whole exports
+SIZES = {
+    'small' : SceneSpec(meshes =  2, triangles =   2000, uvLayers = 2, bones =  8, influences = 4, shapeKeys = 2, actions = 2,
+                        keysPerAction =  5, frameStep = 10, textureSize =   64),
+    'medium': SceneSpec(meshes =  4, triangles =  20000, uvLayers = 2, bones = 32, influences = 6, shapeKeys = 4, actions = 3,
+                        keysPerAction =  8, frameStep =  5, textureSize =  256),
+    'huge'  : SceneSpec(meshes = 10, triangles = 200000, uvLayers = 2, bones = 64, influences = 8, shapeKeys = 8, actions = 4,
+                        keysPerAction = 12, frameStep =  5, textureSize = 2048),
+}
+
+def plain(spec):
+    values = spec.to_dict()
+    values.update(bones = 0, shapeKeys = 0, actions = 0)
+    return SceneSpec(**values)
+
+#===============================================================================
+# The state a case works from:  the scene built, & an exporter which has already exported it once, so it has the skeletons,
+# materials & settings that constructors of meshes expect.  A case is a function of this, returning a function to time,
+# which returns the number of units it processed.
+class Bench:
+    def __init__(self, bpy, spec, workDir):
+        self.bpy = bpy
+        self.spec = spec
+        self.workDir = workDir
+        self.counts = build_scene(spec, path.join(workDir, 'textures'))
+        self.context = bpy.context
+        self.scene = bpy.context.scene # a new one, once built
+        self.filepath = path.join(workDir, 'bench.json')
+        self.exporter = export_scene(self.filepath)
+
+    def meshObjects(self):
+        return [obj for obj in self.scene.objects if obj.type == 'MESH']
+
+    # each once, however many slots use it
+    def materials(self):
+        materials = [slot.material for obj in self.meshObjects() for slot in obj.material_slots if slot.material is not None]
+        return list({material.name: material for material in materials}.values())
+
+    def armatureObjects(self):
+        return [obj for obj in self.scene.objects if obj.type == 'ARMATURE']
+
+    # meshes constructed over again, need to be the source meshes of instances, not instances
+    def newMeshes(self):
+        from babylon_js.mesh import Mesh
+
+        self.exporter.sourceMeshes = {}
+        return [Mesh(obj, self.scene, self.exporter) for obj in self.meshObjects()]
+
+#===============================================================================
+# cases, each with the unit of its throughput & the scene it needs
+#===============================================================================
+def case_mesh(bench):
+    # extraction of geometry, welding of vertices & sub-meshes
+    def run():
+        return sum([len(mesh.indices) // 3 for mesh in bench.newMeshes()])
+    return run
+
+def case_skin_weights(bench):
+    from babylon_js.mesh import Mesh
+
+    # weights of each vertex, as the Mesh constructor gathers them;  copied each time, since they may be sorted in place
+    work = []
+    for obj in bench.meshObjects():
+        weights = [[group.weight for group in vertex.groups] for vertex in obj.data.vertices]
+        indices = [[group.group  for group in vertex.groups] for vertex in obj.data.vertices]
+        work.append((weights, indices, obj.data.maxInfluencers, max([len(vertex) for vertex in weights])))
+
+    def run():
+        nVertices = 0
+        for weights, indices, maxInfluencers, highestObserved in work:
+            mesh = Mesh.__new__(Mesh)
+            mesh.toFixedInfluencers([list(vertex) for vertex in weights], [list(vertex) for vertex in indices], maxInfluencers, highestObserved)
+            Mesh.packSkeletonIndices(mesh.skeletonIndices)
+            nVertices += len(weights)
+        return nVertices
+    return run
+
+def case_shape_keys(bench):
+    from babylon_js.shape_key_group import RawShapeKey
+
+    precision = bench.scene.world.positionsPrecision
+    work = []
+    for obj in bench.meshObjects():
+        keys = obj.data.shape_keys
+        if keys is None: continue
+
+        orderMap = [[idx, idx] for idx in range(len(obj.data.vertices))]
+        action = keys.animation_data.action if keys.animation_data else None
+        work.append((obj.name, keys.key_blocks[1:], orderMap, action))
+
+    # shape key positions copied, & the influence of each sampled over the actions
+    def run():
+        nVertices = 0
+        for name, blocks, orderMap, action in work:
+            for block in blocks:
+                RawShapeKey(block, block.name, orderMap, precision, action, name)
+                nVertices += len(orderMap)
+        return nVertices
+    return run
+
+def case_format(bench):
+    from babylon_js.package_level import format_array, format_indice_array, format_vector_buffer
+
+    world = bench.scene.world
+    meshes = bench.newMeshes()
+
+    # the arrays of each mesh, formatted as write_array & friends do;  bytes are of the text made
+    def run():
+        nBytes = 0
+        for mesh in meshes:
+            nBytes += len(format_vector_buffer(mesh.positions, world.positionsPrecision))
+            nBytes += len(format_vector_buffer(mesh.normals, world.normalsPrecision))
+            nBytes += len(format_array(mesh.uvs, world.UVsPrecision))
+            if len(mesh.uvs2) > 0:
+                nBytes += len(format_array(mesh.uvs2, world.UVsPrecision))
+            nBytes += len(format_indice_array(mesh.indices, 0))
+        return nBytes
+    return run
+
+def case_object_animation(bench):
+    from babylon_js.f_curve_animatable import FCurveAnimatable
+
+    objects = [obj for obj in bench.meshObjects() if obj.animation_data and obj.animation_data.action]
+
+    # every action sampled for each object;  keys are those kept
+    def run():
+        nKeys = 0
+        for obj in objects:
+            animatable = FCurveAnimatable()
+            animatable.define_animations(obj, True, True, True)
+            nKeys += sum([len(animation.frames) for animation in animatable.animations])
+        return nKeys
+    return run
+
+def case_bone_animation(bench):
+    from babylon_js.armature import Skeleton
+
+    armatures = bench.armatureObjects()
+
+    # skeletons sampled frame by frame;  keys are those of every bone
+    def run():
+        nKeys = 0
+        for idx, obj in enumerate(armatures):
+            skeleton = Skeleton(obj, bench.context, idx, bench.scene.world.ignoreIKBones)
+            nKeys += sum([len(bone.animation.frames) for bone in skeleton.bones if hasattr(bone, 'animation')])
+        return nKeys
+    return run
+
+def case_material_graph(bench):
+    from babylon_js.materials.material import BJSMaterial
+
+    materials = bench.materials()
+
+    # node trees read without the cache of the exporter;  shaders are connected, as they are after an export
+    def run():
+        nNodes = 0
+        for material in materials:
+            BJSMaterial(material, bench.exporter)
+            nNodes += len(material.node_tree.nodes) if material.use_nodes else 1
+        return nNodes
+    return run
+
+def case_textures(bench):
+    from copy import copy
+    from babylon_js.materials.material import BJSMaterial
+
+    # read again, since the shaders of the export were disconnected when it read them
+    materials = [BJSMaterial(material, bench.exporter) for material in bench.materials() if material.use_nodes]
+    textures = [tex for material in materials for tex in material.bjsNodeTree.bjsTextures.values()]
+    sizes = [path.getsize(bench.bpy.path.abspath(tex.image.filepath)) for tex in textures]
+
+    # images copied to the texture directory, as processImageTextures does, never in-lined
+    def run():
+        for tex in textures:
+            copy(tex).process(bench.exporter, False)
+        return sum(sizes)
+    return run
+
+def case_export(bench):
+    # the whole thing, reported in triangles;  bytes / sec of the .json written is also kept
+    def run():
+        export_scene(bench.filepath)
+        bench.outputBytes = path.getsize(bench.filepath)
+        return bench.counts['triangles']
+    return run
+
+# name: (function, unit, scene)
+CASES = {
+    'mesh'            : (case_mesh            , 'triangles', 'plain'),
+    'format'          : (case_format          , 'bytes'    , 'plain'),
+    'material_graph'  : (case_material_graph  , 'nodes'    , 'plain'),
+    'textures'        : (case_textures        , 'bytes'    , 'plain'),
+    'skin_weights'    : (case_skin_weights    , 'vertices' , 'full' ),
+    'shape_keys'      : (case_shape_keys      , 'vertices' , 'full' ),
+    'object_animation': (case_object_animation, 'keys'     , 'full' ),
+    'bone_animation'  : (case_bone_animation  , 'keys'     , 'full' ),
+    'export'          : (case_export          , 'triangles', 'full' ),
+}
+
+#===============================================================================
+# best of the repeats;  within a repeat the case runs until minTime has passed, so quick ones are not timer noise
+def time_case(run, repeats, minTime):
+    best = None
+    for idx in range(repeats):
+        units = 0
+        start = perf_counter()
+        while True:
+            units += run()
+            elapsed = perf_counter() - start
+            if elapsed >= minTime: break
+
+        if best is None or units / elapsed > best[0] / best[1]:
+            best = (units, elapsed)
+    return best
+
+# loops / sec of float math, list building & number formatting, like most of what the cases do
+def calibrate(repeats, minTime):
+    def run():
+        values = []
+        for idx in range(20000):
+            x = idx * 0.5
+            values.append(x * x + 1.0)
+        ','.join(['%.4f' % value for value in values[::4]])
+        return 1
+
+    units, seconds = time_case(run, repeats, minTime)
+    return round(units / seconds, 2)
+
+def peak_memory(run):
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+def run_size(bpy, name, caseNames, repeats, minTime):
+    from babylon_js.logging import Logger, NEVER, WARNING
+
+    spec = SIZES[name]
+    result = {'scene': spec.to_dict(), 'cases': {}}
+    for sceneName, sceneSpec in [('plain', plain(spec)), ('full', spec)]:
+        names = [caseName for caseName in caseNames if CASES[caseName][2] == sceneName]
+        if len(names) == 0: continue
+
+        workDir = mkdtemp(prefix = 'bjs_bench_')
+        try:
+            bench = Bench(bpy, sceneSpec, workDir)
+            result[sceneName] = bench.counts
+
+            # the constructors log, which needs somewhere to go;  an export opens its own, so closes this one
+            for caseName in names:
+                function, unit, ignored = CASES[caseName]
+                log = Logger(path.join(workDir, 'bench.log'), WARNING, NEVER)
+                try:
+                    run = function(bench)
+                    units, seconds = time_case(run, repeats, minTime)
+                    peakMB = peak_memory(run)
+                finally:
+                    if Logger.instance is log: log.close()
+
+                case = {'unit': unit, 'units': units, 'seconds': round(seconds, 4), 'throughput': round(units / seconds, 2),
+                        'peakMB': round(peakMB, 2)}
+                if caseName == 'export':
+                    case['bytesPerSec'] = round(bench.outputBytes * units / bench.counts['triangles'] / seconds, 2)
+
+                result['cases'][caseName] = case
+                print('%-6s %-17s %14.1f %s/s  %8.2f MB peak' % (name, caseName, case['throughput'], unit, peakMB))
+        finally:
+            rmtree(workDir, ignore_errors = True)
+
+    return result
+
+#===============================================================================
+# list of failures of the results against the baseline of the environment
+def compare(results, baseline, tolerance = None):
+    failures = []
+    environment = baseline.get('environments', {}).get(results['environment'])
+    if environment is None:
+        print('no baseline for ' + results['environment'] + ', nothing compared')
+        return failures
+
+    # how much faster this machine is than that of the baseline
+    speed = 1.0
+    if 'calibration' in environment:
+        speed = results['calibration'] / environment['calibration']
+        print('machine speed against the baseline:  ' + '%.2f' % speed)
+    else:
+        print('baseline of ' + results['environment'] + ' has no calibration, throughputs compared as they are')
+
+    tolerances = baseline.get('tolerances', {})
+    for sizeName, size in results['sizes'].items():
+        for caseName, case in size['cases'].items():
+            base = environment.get(sizeName, {}).get(caseName)
+            if base is None:
+                print('no baseline for ' + sizeName + ' ' + caseName)
+                continue
+
+            allowed = tolerance if tolerance is not None else tolerances.get(caseName, baseline.get('tolerance', DEFAULT_TOLERANCE))
+            slower = 1 - case['throughput'] / (base['throughput'] * speed)
+            grown = case['peakMB'] - base['peakMB']
+            status = 'ok'
+            if slower > allowed:
+                status = 'FAIL'
+                failures.append(sizeName + ' ' + caseName + ':  ' + '%.0f' % (slower * 100) + '% slower')
+            if grown > base['peakMB'] * allowed + MEMORY_SLACK_MB:
+                status = 'FAIL'
+                failures.append(sizeName + ' ' + caseName + ':  peak memory ' + '%.2f' % grown + ' MB more')
+
+            print('%-4s %-6s %-17s %+6.1f%% throughput  %+8.2f MB peak' % (status, sizeName, caseName, -slower * 100, grown))
+
+    return failures
+
+def update_baseline(results, baseline):
+    baseline.setdefault('tolerance', DEFAULT_TOLERANCE)
+    baseline.setdefault('tolerances', {})
+    environment = baseline.setdefault('environments', {}).setdefault(results['environment'], {})
+    environment['calibration'] = results['calibration']
+    for sizeName, size in results['sizes'].items():
+        cases = environment.setdefault(sizeName, {})
+        for caseName, case in size['cases'].items():
+            cases[caseName] = {'unit': case['unit'], 'throughput': case['throughput'], 'peakMB': case['peakMB']}
+
+def main():
+    import argparse
+    import json
+
+    standIn = use_stand_in()
+    import bpy
+
+    args = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    parser = argparse.ArgumentParser(description = 'Benchmark the exporter, against a baseline.')
+    parser.add_argument('--sizes', default = 'small,medium')
+    parser.add_argument('--cases', default = ','.join(CASES.keys()))
+    parser.add_argument('--repeats', type = int, default = 3)
+    parser.add_argument('--min-time', type = float, default = 0.2)
+    parser.add_argument('--out', default = None)
+    parser.add_argument('--baseline', default = BASELINE)
+    parser.add_argument('--tolerance', type = float, default = None)
+    parser.add_argument('--update-baseline', action = 'store_true')
+    args = parser.parse_args(args)
+
+    sizeNames = args.sizes.split(',')
+    caseNames = args.cases.split(',')
+    for name in sizeNames:
+        if name not in SIZES: parser.error('unknown size: ' + name)
+    for name in caseNames:
+        if name not in CASES: parser.error('unknown case: ' + name)
+
+    import_addon()
+    results = {'environment': 'stand-in' if standIn else 'blender',
+               'blender': bpy.app.version_string,
+               'python': python_version(),
+               'platform': platform(),
+               'repeats': args.repeats,
+               'calibration': calibrate(args.repeats, args.min_time),
+               'sizes': {}}
+    for name in sizeNames:
+        results['sizes'][name] = run_size(bpy, name, caseNames, args.repeats, args.min_time)
+
+    if args.out is not None:
+        with open(args.out, 'w') as file:
+            json.dump(results, file, indent = 2)
+
+    baseline = {}
+    if path.isfile(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    if args.update_baseline:
+        update_baseline(results, baseline)
+        with open(args.baseline, 'w') as file:
+            json.dump(baseline, file, indent = 2, sort_keys = True)
+        print('baseline of ' + results['environment'] + ' updated:  ' + args.baseline)
+        return
+
+    failures = compare(results, baseline, args.tolerance)
+    if len(failures) > 0:
+        print('\nREGRESSIONS:\n\t' + '\n\t'.join(failures))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# The part of bmesh the exporter uses, triangulating a mesh before it is read.  Polygons of more than 3 sides are split in
+# fans, as the loop triangles of the stand-in are, copying the data of their loops.
+from bpy.types import MeshLoop, MeshLoopColor, MeshPolygon, MeshUVLoop, PropList
+
+#===============================================================================
+class BMesh:
+    def __init__(self):
+        self.mesh = None
+        self.triangulated = False
+
+    faces = property(lambda self: [] if self.mesh is None else self.mesh.polygons)
+
+    def from_mesh(self, mesh, face_normals = True, use_shape_key = False, shape_key_index = 0):
+        self.mesh = mesh
+
+    def to_mesh(self, mesh):
+        if not self.triangulated or all([polygon.loop_total == 3 for polygon in mesh.polygons]): return
+
+        loops = []
+        polygons = []
+        uvs = [[] for layer in mesh.uv_layers]
+        colors = [[] for layer in mesh.vertex_colors]
+        for polygon in mesh.polygons:
+            for idx in range(1, polygon.loop_total - 1):
+                corners = (polygon.loop_start, polygon.loop_start + idx, polygon.loop_start + idx + 1)
+                triangle = MeshPolygon(len(polygons), [mesh.loops[corner].vertex_index for corner in corners], len(loops), polygon.use_smooth)
+                triangle.material_index = polygon.material_index
+                polygons.append(triangle)
+
+                for corner in corners:
+                    loops.append(MeshLoop(len(loops), mesh.loops[corner].vertex_index))
+                    for layer, data in zip(mesh.uv_layers, uvs):
+                        data.append(MeshUVLoop(layer.data[corner].uv))
+                    for layer, data in zip(mesh.vertex_colors, colors):
+                        color = MeshLoopColor()
+                        color.color = list(layer.data[corner].color)
+                        data.append(color)
+
+        mesh.loops[:] = loops
+        mesh.polygons[:] = polygons
+        for layer, data in zip(mesh.uv_layers, uvs):
+            layer.data = PropList(data)
+        for layer, data in zip(mesh.vertex_colors, colors):
+            layer.data = data
+        mesh.update()
+
+    def free(self):
+        self.mesh = None
+#===============================================================================
+def new():
+    return BMesh()
+#===============================================================================
+class ops:
+    @staticmethod
+    def triangulate(bm, faces = None, quad_method = 'BEAUTY', ngon_method = 'BEAUTY'):
+        bm.triangulated = True
+        return {'faces': faces, 'edges': [], 'face_map': {}}
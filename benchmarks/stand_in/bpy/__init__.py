@@ -0,0 +1,5 @@
+# A stand-in for the bpy module of Blender, in plain Python, so the exporter can be run, & benchmarked, on a machine
+# without Blender.  It is only as much of bpy as the exporter reads & benchmarks/synthetic_scene.py builds a scene with.
+# Put the folder of this, benchmarks/stand_in, first on sys.path, before importing the add-on;  numpy is still needed.
+from . import app, ops, path, props, types, utils
+from .types import _context as context, _data as data
@@ -0,0 +1,14 @@
+# bpy.app, as when Blender is run with --background
+from . import handlers, timers
+
+version = (4, 2, 0)
+version_string = '4.2.0 (stand-in)'
+version_file = version
+binary_path = ''
+background = True
+factory_startup = True
+build_platform = b'Linux'
+tempdir = ''
+debug = False
+
+def translations(): pass
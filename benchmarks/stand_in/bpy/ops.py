@@ -0,0 +1,48 @@
+# The operators the exporter calls.  Those changing mode or selection only set what they would;  baking needs Blender, so
+# it fails as a bake does when there is nothing to bake with.
+from .types import _context, _data
+
+#===============================================================================
+class Operator_:
+    def __init__(self, function, poll = None):
+        self.function = function
+        self.pollFunction = poll
+
+    def __call__(self, *args, **keywords):
+        if not self.poll():
+            raise RuntimeError('Operator bpy.ops.' + self.function.__name__ + '.poll() failed, context is incorrect')
+        return self.function(**keywords) or {'FINISHED'}
+
+    def poll(self, *args):
+        return True if self.pollFunction is None else self.pollFunction()
+
+class Namespace:
+    def __init__(self, **operators):
+        self.__dict__.update(operators)
+#===============================================================================
+def mode_set(mode = 'OBJECT', toggle = False):
+    _context.view_layer.objects.active.mode = mode
+
+def select_all(action = 'TOGGLE'):
+    for obj in _context.view_layer.objects:
+        obj.select_set(action == 'SELECT' or (action in ('TOGGLE', 'INVERT') and not obj.select_get()))
+
+def bake(**keywords):
+    raise RuntimeError('Error: Baking is not possible without Blender')
+
+def read_factory_settings(use_empty = False, **keywords):
+    _data.reset()
+
+def save_as_mainfile(filepath = '', copy = False, **keywords):
+    if not copy: _data.filepath = filepath
+
+def nothing(**keywords): pass
+#===============================================================================
+object = Namespace(mode_set = Operator_(mode_set, poll = lambda: _context.view_layer.objects.active is not None),
+                   select_all = Operator_(select_all),
+                   bake = Operator_(bake))
+mesh = Namespace(select_all = Operator_(nothing))
+uv = Namespace(smart_project = Operator_(nothing))
+screen = Namespace(animation_cancel = Operator_(nothing, poll = lambda: False))
+wm = Namespace(read_factory_settings = Operator_(read_factory_settings),
+               save_as_mainfile = Operator_(save_as_mainfile))
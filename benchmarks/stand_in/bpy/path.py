@@ -0,0 +1,17 @@
+# the parts of bpy.path the exporter uses
+from .types import abspath
+
+import os
+import re
+
+def basename(filepath):
+    return os.path.basename(filepath[2:] if filepath.startswith('//') else filepath)
+
+def clean_name(name, replace = '_'):
+    return re.sub(r'[^A-Za-z0-9_.-]', replace, name)
+
+def ensure_ext(filepath, ext, case_sensitive = False):
+    return filepath if filepath.lower().endswith(ext.lower()) else filepath + ext
+
+def relpath(filepath, start = None):
+    return filepath
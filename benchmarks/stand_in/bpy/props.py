@@ -0,0 +1,61 @@
+# Properties added to the types, like bpy.types.Mesh.castShadows = BoolProperty(...), as descriptors.  As in Blender, a
+# value is only stored once assigned, as a custom property of the ID, so it is also in items();  until then the default is
+# returned.  An enum is stored as the index of its item.
+
+#===============================================================================
+class Property:
+    def __init__(self, default, keywords):
+        self.default = keywords.get('default', default)
+        self.keywords = keywords
+        self.name = None
+
+    # assigned to the class after it was made, so __set_name__ was never called
+    def getName(self, instance):
+        if self.name is None:
+            for cls in type(instance).__mro__:
+                for name, value in vars(cls).items():
+                    if value is self:
+                        self.name = name
+                        return name
+        return self.name
+
+    def __get__(self, instance, owner):
+        if instance is None: return self
+        values = instance.customProps
+        name = self.getName(instance)
+        return self.fromStored(values[name]) if name in values else self.getDefault()
+
+    def __set__(self, instance, value):
+        instance.customProps[self.getName(instance)] = self.toStored(value)
+
+    def getDefault(self): return self.default
+    def fromStored(self, value): return value
+    def toStored(self, value): return value
+#===============================================================================
+class EnumProperty(Property):
+    def __init__(self, **keywords):
+        super().__init__(None, keywords)
+        self.identifiers = [item[0] for item in keywords.get('items', [])]
+        if self.default is None and len(self.identifiers) > 0:
+            self.default = self.identifiers[0]
+
+    def fromStored(self, value): return self.identifiers[value]
+
+    def toStored(self, value):
+        if value not in self.identifiers:
+            raise TypeError('enum "' + str(value) + '" not found in ' + str(self.identifiers))
+        return self.identifiers.index(value)
+#===============================================================================
+class FloatVectorProperty(Property):
+    def __init__(self, **keywords):
+        super().__init__((0.0,) * keywords.get('size', 3), keywords)
+
+    def getDefault(self): return list(self.default)
+    def toStored(self, value): return [float(item) for item in value]
+#===============================================================================
+def BoolProperty(**keywords): return Property(False, keywords)
+def IntProperty(**keywords): return Property(0, keywords)
+def FloatProperty(**keywords): return Property(0.0, keywords)
+def StringProperty(**keywords): return Property('', keywords)
+def PointerProperty(**keywords): return Property(None, keywords)
+def CollectionProperty(**keywords): return Property(None, keywords)
@@ -0,0 +1,1556 @@
+# The data of the stand-in:  plain classes with the attributes & methods of the Blender types which the exporter reads, &
+# those the synthetic scene generator builds a scene with.  Nothing is evaluated beyond animation, so modifiers do nothing,
+# & Object.to_mesh() returns the data of the object.
+#
+# Animation is evaluated when read, not by frame_set(), which only moves the frame.  An ID with an action evaluates all of
+# its fcurves the first time an animated attribute is read at a frame;  keys are interpolated linearly.
+from mathutils import Color, Euler, Matrix, Quaternion, Vector
+
+from math import acos, cos, sqrt
+from array import array
+import os
+import re
+import struct
+import zlib
+
+# bumped whenever what animation evaluates to may have changed
+_evaluation = {'frame': 1, 'stamp': 0}
+
+def invalidate_animation(frame = None):
+    if frame is not None: _evaluation['frame'] = frame
+    _evaluation['stamp'] += 1
+
+# a vector attribute, which is assigned into, keeping its type
+def vector_property(attr):
+    return property(lambda self: getattr(self, attr), lambda self, value: getattr(self, attr).__setitem__(slice(None), value))
+
+#===============================================================================
+class bpy_struct:
+    # as in Blender, what is not a bpy.types.ID is still a pointer
+    def as_pointer(self): return id(self)
+#===============================================================================
+class ID(bpy_struct):
+    def __init__(self, name):
+        self.owner_ = None # the DataCollection, which finds it by name
+        self.name = name
+        self.customProps = {}
+        self.animation_data = None
+        self.evaluatedStamp = -1
+        self.users = 1
+        self.use_fake_user = False
+        self.is_embedded_data = False
+        self.library = None
+
+    original = property(lambda self: self)
+    name_full = property(lambda self: self.name)
+
+    @property
+    def name(self): return self.name_
+
+    @name.setter
+    def name(self, name):
+        if self.owner_ is not None: self.owner_.rename_(self, name)
+        self.name_ = name
+
+    def __repr__(self): return 'bpy.data.' + type(self).__name__.lower() + "s['" + self.name + "']"
+
+    # custom properties
+    def __getitem__(self, key): return self.customProps[key]
+    def __setitem__(self, key, value): self.customProps[key] = value
+    def __delitem__(self, key): del self.customProps[key]
+    def __contains__(self, key): return key in self.customProps
+    def get(self, key, default = None): return self.customProps.get(key, default)
+    def keys(self): return list(self.customProps.keys())
+    def values(self): return list(self.customProps.values())
+    def items(self): return list(self.customProps.items())
+
+    def animation_data_create(self):
+        if self.animation_data is None:
+            self.animation_data = AnimData()
+        return self.animation_data
+
+    def animation_data_clear(self):
+        self.animation_data = None
+        invalidate_animation()
+
+    def user_clear(self): self.users = 0
+    def evaluated_get(self, depsgraph): return self
+    def copy(self): raise NotImplementedError('copying is not in the stand-in')
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # the action at the current frame, once a frame
+    def ensure_evaluated(self):
+        if self.evaluatedStamp == _evaluation['stamp']: return
+        self.evaluatedStamp = _evaluation['stamp']
+
+        if self.animation_data is None or self.animation_data.action is None: return
+        frame = _evaluation['frame']
+        for fcurve in self.animation_data.action.fcurves:
+            set_path(self, fcurve.data_path, fcurve.array_index, fcurve.evaluate(frame))
+#===============================================================================
+# path tokens, like pose, .bones, ["Bone"], [0]
+PATH_TOKEN = re.compile(r'\.?([A-Za-z_][A-Za-z_0-9]*)|\["((?:[^"\\]|\\.)*)"\]|\[(\d+)\]')
+_parsedPaths = {}
+
+def parse_path(dataPath):
+    tokens = _parsedPaths.get(dataPath)
+    if tokens is None:
+        tokens = []
+        for match in PATH_TOKEN.finditer(dataPath):
+            attr, key, index = match.groups()
+            tokens.append((0, attr) if attr is not None else (1, key) if key is not None else (1, int(index)))
+        _parsedPaths[dataPath] = tokens
+    return tokens
+
+# the same as an fcurve assigning its value;  a path which does not resolve is skipped, as in Blender
+def set_path(owner, dataPath, arrayIndex, value):
+    tokens = parse_path(dataPath)
+    try:
+        for kind, token in tokens[:-1]:
+            owner = getattr(owner, token) if kind == 0 else owner[token]
+
+        kind, token = tokens[-1]
+        if kind == 1:
+            owner[token] = value
+            return
+
+        current = getattr(owner, token)
+        if hasattr(current, '__setitem__'):
+            current[arrayIndex] = value
+        else:
+            setattr(owner, token, value)
+    except (AttributeError, KeyError, IndexError, TypeError):
+        pass
+#===============================================================================
+# a collection of the data, like bpy.data.meshes, or of a part of some data;  items are found by name or index
+class Collection_(bpy_struct):
+    def __init__(self, items = None):
+        self.items_ = [] if items is None else items
+
+    def __len__(self): return len(self.items_)
+    def __iter__(self): return iter(self.items_)
+    def __bool__(self): return True
+    def __contains__(self, key): return key in self.items_ or self.get(key) is not None
+
+    def __getitem__(self, key):
+        if type(key) is not str: return self.items_[key]
+        item = self.get(key)
+        if item is None: raise KeyError('bpy_prop_collection[key]: key "' + str(key) + '" not found')
+        return item
+
+    def get(self, key, default = None):
+        for item in self.items_:
+            if item.name == key: return item
+        return default
+
+    def find(self, key):
+        for idx, item in enumerate(self.items_):
+            if item.name == key: return idx
+        return -1
+
+    def keys(self): return [item.name for item in self.items_]
+    def values(self): return list(self.items_)
+    def items(self): return [(item.name, item) for item in self.items_]
+
+    def unique_name(self, name):
+        if self.get(name) is None: return name
+        base = name[:-4] if re.search(r'\.\d{3}$', name) else name
+        count = 1
+        while self.get(base + '.%03d' % count) is not None:
+            count += 1
+        return base + '.%03d' % count
+
+    def append_(self, item):
+        self.items_.append(item)
+        return item
+#===============================================================================
+class DataCollection(Collection_):
+    def __init__(self, make):
+        super().__init__()
+        self.make = make
+        self.byName_ = {}
+
+    # names are unique, so kept in a dictionary, or building scenes of many objects would be quadratic
+    def get(self, key, default = None): return self.byName_.get(key, default)
+
+    def new(self, name, *args, **keywords):
+        return self.append_(self.make(self.unique_name(name), *args, **keywords))
+
+    def append_(self, item):
+        self.byName_[item.name] = item
+        item.owner_ = self
+        return super().append_(item)
+
+    def rename_(self, item, name):
+        del self.byName_[item.name]
+        self.byName_[name] = item
+
+    def remove(self, item, do_unlink = True, **keywords):
+        self.items_.remove(item)
+        del self.byName_[item.name]
+        item.owner_ = None
+        if isinstance(item, Object):
+            for collection in list(item.users_collection):
+                collection.objects.unlink(item)
+        invalidate_animation()
+
+    def clear(self):
+        for item in self.items_:
+            item.owner_ = None
+        self.items_.clear()
+        self.byName_ = {}
+#===============================================================================
+class ImageCollection(DataCollection):
+    def __init__(self):
+        super().__init__(Image)
+
+    def load(self, filepath, check_existing = False):
+        if check_existing:
+            for image in self.items_:
+                if image.filepath == filepath: return image
+
+        image = self.new(os.path.basename(filepath))
+        image.source = 'FILE'
+        image.filepath = filepath
+        image.size = read_png_size(abspath(filepath))
+        return image
+#===============================================================================
+class BlendData:
+    def __init__(self):
+        self.reset()
+
+    # what read_factory_settings(use_empty = True) leaves
+    def reset(self):
+        self.filepath = ''
+        self.is_dirty = False
+        self.actions     = DataCollection(Action)
+        self.armatures   = DataCollection(Armature)
+        self.cameras     = DataCollection(Camera)
+        self.collections = DataCollection(Collection)
+        self.images      = ImageCollection()
+        self.lights      = DataCollection(Light)
+        self.materials   = DataCollection(Material)
+        self.meshes      = DataCollection(Mesh)
+        self.node_groups = DataCollection(NodeTree)
+        self.objects     = DataCollection(Object)
+        self.scenes      = DataCollection(Scene)
+        self.shape_keys  = DataCollection(Key)
+        self.sounds      = DataCollection(ID)
+        self.textures    = DataCollection(ID)
+        self.worlds      = DataCollection(World)
+
+        scene = self.scenes.new('Scene')
+        scene.world = self.worlds.new('World')
+        invalidate_animation(scene.frame_current)
+#===============================================================================
+class Context:
+    def __init__(self, data):
+        self.data = data
+
+    scene = property(lambda self: self.data.scenes[0])
+    view_layer = property(lambda self: self.scene.view_layers[0])
+    collection = property(lambda self: self.scene.collection)
+    active_object = property(lambda self: self.view_layer.objects.active)
+    object = active_object
+    selected_objects = property(lambda self: [obj for obj in self.view_layer.objects if obj.select_get()])
+    mode = 'OBJECT'
+    window = None
+    screen = None
+    area = None
+    preferences = None
+
+    def evaluated_depsgraph_get(self): return Depsgraph(self.scene, self.view_layer)
+#===============================================================================
+class Depsgraph(bpy_struct):
+    def __init__(self, scene, view_layer):
+        self.scene = scene
+        self.view_layer = view_layer
+        self.updates = ()
+        self.mode = 'VIEWPORT'
+
+    objects = property(lambda self: list(self.view_layer.objects))
+
+    @property
+    def object_instances(self):
+        for obj in self.view_layer.objects:
+            yield DepsgraphObjectInstance(obj)
+
+    def id_eval_get(self, id): return id
+    def update(self): pass
+
+class DepsgraphObjectInstance:
+    def __init__(self, obj):
+        self.object = obj
+        self.is_instance = False
+        self.instance_object = obj
+        self.parent = None
+        self.random_id = 0
+
+    matrix_world = property(lambda self: self.object.matrix_world)
+#===============================================================================
+class RenderSettings:
+    def __init__(self):
+        self.fps = 24
+        self.fps_base = 1.0
+        self.engine = 'BLENDER_EEVEE_NEXT'
+        self.resolution_x = 1920
+        self.resolution_y = 1080
+        self.resolution_percentage = 100
+        self.bake = Settings(use_pass_direct = True, use_pass_indirect = True, use_pass_color = True, margin = 16, margin_type = 'EXTEND',
+                             use_selected_to_active = False, use_clear = True, target = 'IMAGE_TEXTURES')
+        self.image_settings = Settings(file_format = 'PNG', color_mode = 'RGBA', color_depth = '8', quality = 90, compression = 15)
+
+class Settings:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+#===============================================================================
+class Scene(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.collection = Collection('Scene Collection')
+        self.world = None
+        self.camera = None
+        self.frame_start = 1
+        self.frame_end = 250
+        self.frame_step = 1
+        self.frame_current_ = 1
+        self.render = RenderSettings()
+        self.cycles = Settings(device = 'CPU', samples = 4096, bake_type = 'COMBINED')
+        self.gravity = Vector((0.0, 0.0, -9.81))
+        self.use_gravity = True
+        self.unit_settings = Settings(system = 'METRIC', scale_length = 1.0)
+        self.view_layers = Collection_([ViewLayer('ViewLayer', self)])
+
+    objects = property(lambda self: Collection_(self.collection.all_objects))
+
+    @property
+    def frame_current(self): return self.frame_current_
+
+    @frame_current.setter
+    def frame_current(self, frame):
+        self.frame_current_ = int(frame)
+        invalidate_animation(self.frame_current_)
+
+    def frame_set(self, frame, subframe = 0.0):
+        self.frame_current_ = int(frame)
+        invalidate_animation(self.frame_current_ + subframe)
+#===============================================================================
+class ViewLayer(bpy_struct):
+    def __init__(self, name, scene):
+        self.name = name
+        self.scene = scene
+        self.objects = LayerObjects(scene)
+        self.excluded = set() # names of the collections excluded
+        self.use = True
+
+    @property
+    def layer_collection(self):
+        return LayerCollection(self.scene.collection, self)
+
+    def update(self): pass
+
+class LayerObjects(Collection_):
+    def __init__(self, scene):
+        self.scene = scene
+        self.active = None
+
+    items_ = property(lambda self: self.scene.collection.all_objects)
+
+class LayerCollection(bpy_struct):
+    def __init__(self, collection, viewLayer):
+        self.collection = collection
+        self.viewLayer = viewLayer
+
+    name = property(lambda self: self.collection.name)
+    children = property(lambda self: Collection_([LayerCollection(child, self.viewLayer) for child in self.collection.children]))
+    hide_viewport = False
+    holdout = False
+    indirect_only = False
+
+    @property
+    def exclude(self): return self.collection.name in self.viewLayer.excluded
+
+    @exclude.setter
+    def exclude(self, value):
+        if value: self.viewLayer.excluded.add(self.collection.name)
+        else: self.viewLayer.excluded.discard(self.collection.name)
+#===============================================================================
+class Collection(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.objects = CollectionObjects(self)
+        self.children = CollectionChildren()
+        self.hide_render = False
+        self.hide_viewport = False
+
+    # of this & the collections in it, each once
+    @property
+    def all_objects(self):
+        found = list(self.objects)
+        seen = set(id(obj) for obj in found)
+        for child in self.children:
+            for obj in child.all_objects:
+                if id(obj) not in seen:
+                    seen.add(id(obj))
+                    found.append(obj)
+        return found
+
+class CollectionObjects(Collection_):
+    def __init__(self, collection):
+        super().__init__()
+        self.collection = collection
+
+    def link(self, obj):
+        if self.collection in obj.users_collection: raise RuntimeError('Object \'' + obj.name + '\' already in collection \'' + self.collection.name + '\'')
+        self.items_.append(obj)
+        obj.users_collection.append(self.collection)
+
+    def unlink(self, obj):
+        self.items_.remove(obj)
+        obj.users_collection.remove(self.collection)
+
+class CollectionChildren(Collection_):
+    def link(self, child): self.items_.append(child)
+    def unlink(self, child): self.items_.remove(child)
+#===============================================================================
+# an attribute of vectors, like location, which keeps its type when assigned, & is animated
+class AnimatedVector:
+    def __init__(self, make):
+        self.make = make
+
+    def __set_name__(self, owner, name):
+        self.attr = name + '_'
+
+    def __get__(self, instance, owner):
+        if instance is None: return self
+        instance.animated().ensure_evaluated()
+        return instance.__dict__[self.attr]
+
+    def __set__(self, instance, value):
+        current = instance.__dict__.get(self.attr)
+        if current is None:
+            instance.__dict__[self.attr] = self.make(value)
+        else:
+            for idx, item in zip(range(len(current)), value):
+                current[idx] = item
+#===============================================================================
+class Transformable:
+    location = AnimatedVector(Vector)
+    rotation_euler = AnimatedVector(Euler)
+    rotation_quaternion = AnimatedVector(Quaternion)
+    rotation_axis_angle = AnimatedVector(list)
+    scale = AnimatedVector(Vector)
+
+    def init_transform(self, rotation_mode):
+        self.location = (0.0, 0.0, 0.0)
+        self.rotation_euler = (0.0, 0.0, 0.0)
+        self.rotation_quaternion = (1.0, 0.0, 0.0, 0.0)
+        self.rotation_axis_angle = [0.0, 0.0, 1.0, 0.0]
+        self.scale = (1.0, 1.0, 1.0)
+        self.rotation_mode = rotation_mode
+
+    @property
+    def matrix_basis(self):
+        if self.rotation_mode == 'QUATERNION':
+            rotation = self.rotation_quaternion.normalized().to_matrix()
+        elif self.rotation_mode == 'AXIS_ANGLE':
+            axisAngle = self.rotation_axis_angle
+            rotation = Matrix.Rotation(axisAngle[0], 3, Vector(axisAngle[1:4]))
+        else:
+            rotation = Euler(self.rotation_euler, self.rotation_mode).to_matrix()
+
+        location = self.location
+        scale = self.scale
+        return Matrix([[rotation[row][col] * scale[col] for col in range(3)] + [location[row]] for row in range(3)] + [[0.0, 0.0, 0.0, 1.0]])
+
+    @matrix_basis.setter
+    def matrix_basis(self, matrix):
+        location, rotation, scale = matrix.decompose()
+        self.location = location
+        self.scale = scale
+        if self.rotation_mode == 'QUATERNION':
+            self.rotation_quaternion = rotation
+        else:
+            self.rotation_euler = rotation.to_euler(self.rotation_mode if self.rotation_mode != 'AXIS_ANGLE' else 'XYZ')
+#===============================================================================
+OBJECT_TYPES = {'Mesh': 'MESH', 'Armature': 'ARMATURE', 'Camera': 'CAMERA', 'Light': 'LIGHT'}
+
+class Object(ID, Transformable):
+    def __init__(self, name, object_data = None):
+        super().__init__(name)
+        self.data = object_data
+        self.type = 'EMPTY' if object_data is None else OBJECT_TYPES[type(object_data).__name__]
+        self.init_transform('XYZ')
+        self.parent = None
+        self.parent_type = 'OBJECT'
+        self.parent_bone = ''
+        self.matrix_parent_inverse = Matrix.Identity(4)
+        self.users_collection = []
+        self.constraints = Constraints()
+        self.modifiers = Modifiers()
+        self.vertex_groups = VertexGroups(self)
+        self.particle_systems = Collection_()
+        self.rigid_body = None
+        self.color = [1.0, 1.0, 1.0, 1.0]
+        self.hide_render = False
+        self.hide_viewport = False
+        self.hidden = False
+        self.selected = False
+        self.mode = 'OBJECT'
+        self.instance_type = 'NONE'
+        self.instance_collection = None
+        self.empty_display_type = 'PLAIN_AXES'
+        self.empty_display_size = 1.0
+        self.pose = Pose(self) if self.type == 'ARMATURE' else None
+
+    def animated(self): return self
+
+    @property
+    def matrix_local(self):
+        if self.parent is None: return self.matrix_basis
+        return self.matrix_parent_inverse @ self.matrix_basis
+
+    @property
+    def matrix_world(self):
+        if self.parent is None: return self.matrix_basis
+        return self.parent.matrix_world @ self.matrix_parent_inverse @ self.matrix_basis
+
+    @matrix_world.setter
+    def matrix_world(self, matrix):
+        if self.parent is not None:
+            matrix = (self.parent.matrix_world @ self.matrix_parent_inverse).inverted() @ matrix
+        self.matrix_basis = matrix
+
+    children = property(lambda self: [obj for obj in _data.objects if obj.parent is self])
+
+    @property
+    def material_slots(self):
+        materials = getattr(self.data, 'materials', None)
+        return Collection_([] if materials is None else [MaterialSlot(material) for material in materials])
+
+    active_material = property(lambda self: self.material_slots[0].material if len(self.material_slots) > 0 else None)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def select_get(self): return self.selected
+    def select_set(self, state): self.selected = state
+    def hide_get(self): return self.hidden
+    def hide_set(self, state): self.hidden = state
+
+    def visible_get(self, view_layer = None):
+        if self.hidden or self.hide_viewport: return False
+        viewLayer = view_layer or _context.view_layer
+        return all([collection.name not in viewLayer.excluded for collection in self.users_collection])
+
+    def find_armature(self):
+        for modifier in self.modifiers:
+            if modifier.type == 'ARMATURE' and modifier.object is not None:
+                return modifier.object
+        if self.parent is not None and self.parent.type == 'ARMATURE' and self.parent_type == 'ARMATURE':
+            return self.parent
+        return None
+
+    # nothing is evaluated, so the mesh is the data as it is
+    def to_mesh(self, preserve_all_data_layers = False, depsgraph = None): return self.data
+    def to_mesh_clear(self): pass
+
+    def shape_key_add(self, name = 'Key', from_mix = True):
+        mesh = self.data
+        if mesh.shape_keys is None:
+            mesh.shape_keys = _data.shape_keys.new('Key')
+            mesh.shape_keys.user = mesh
+
+        key = mesh.shape_keys
+        block = ShapeKey(key, key.key_blocks.unique_name(name), [vertex.co for vertex in mesh.vertices])
+        if len(key.key_blocks) > 0:
+            block.relative_key = key.key_blocks[0]
+        else:
+            block.relative_key = block
+        return key.key_blocks.append_(block)
+
+class MaterialSlot(bpy_struct):
+    def __init__(self, material):
+        self.material = material
+        self.link = 'DATA'
+
+    name = property(lambda self: self.material.name if self.material is not None else '')
+#===============================================================================
+class Constraint(bpy_struct):
+    def __init__(self, type):
+        self.type = type
+        self.name = type.title()
+        self.target = None
+        self.subtarget = ''
+        self.mute = False
+        self.influence = 1.0
+
+class Constraints(Collection_):
+    def new(self, type): return self.append_(Constraint(type))
+    def remove(self, constraint): self.items_.remove(constraint)
+
+class Modifier(bpy_struct):
+    def __init__(self, name, type):
+        self.name = name
+        self.type = type
+        self.object = None
+        self.show_viewport = True
+        self.show_render = True
+
+class Modifiers(Collection_):
+    def new(self, name, type): return self.append_(Modifier(self.unique_name(name), type))
+    def remove(self, modifier): self.items_.remove(modifier)
+#===============================================================================
+class VertexGroup(bpy_struct):
+    def __init__(self, obj, name, index):
+        self.obj = obj
+        self.name = name
+        self.index = index
+        self.lock_weight = False
+
+    def add(self, index, weight, type):
+        vertices = self.obj.data.vertices
+        for idx in index:
+            groups = vertices[idx].groups
+            for element in groups:
+                if element.group == self.index:
+                    element.weight = weight if type == 'REPLACE' else element.weight + weight if type == 'ADD' else element.weight - weight
+                    break
+            else:
+                if type != 'SUBTRACT':
+                    groups.append(VertexGroupElement(self.index, weight))
+
+    def remove(self, index):
+        vertices = self.obj.data.vertices
+        for idx in index:
+            vertices[idx].groups[:] = [element for element in vertices[idx].groups if element.group != self.index]
+
+    def weight(self, index):
+        for element in self.obj.data.vertices[index].groups:
+            if element.group == self.index: return element.weight
+        raise RuntimeError('Error: Vertex not in group')
+
+class VertexGroups(Collection_):
+    def __init__(self, obj):
+        super().__init__()
+        self.obj = obj
+        self.active_index = 0
+
+    def new(self, name = 'Group'):
+        return self.append_(VertexGroup(self.obj, self.unique_name(name), len(self.items_)))
+
+class VertexGroupElement(bpy_struct):
+    __slots__ = ('group', 'weight')
+
+    def __init__(self, group, weight):
+        self.group = group
+        self.weight = weight
+#===============================================================================
+class Mesh(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.vertices = MeshVertices()
+        self.edges = []
+        self.loops = MeshLoops()
+        self.polygons = MeshPolygons()
+        self.loop_triangles = Collection_()
+        self.loopTrianglesValid = False
+        self.uv_layers = UVLoopLayers(self)
+        self.vertex_colors = LoopColors(self)
+        self.materials = IDMaterials()
+        self.shape_keys = None
+        self.has_custom_normals = False
+
+    color_attributes = property(lambda self: self.vertex_colors)
+
+    # each face as a polygon of its own loops, as in Blender
+    def from_pydata(self, vertices, edges, faces, shade_flat = True):
+        self.vertices.extend([MeshVertex(idx, co) for idx, co in enumerate(vertices)])
+        self.edges = [tuple(edge) for edge in edges]
+
+        loopStart = len(self.loops)
+        for idx, face in enumerate(faces):
+            self.polygons.append(MeshPolygon(idx, list(face), loopStart, not shade_flat))
+            for vertexIndex in face:
+                self.loops.append(MeshLoop(len(self.loops), vertexIndex))
+            loopStart += len(face)
+
+        for layer in self.uv_layers:
+            layer.resize(len(self.loops))
+        for layer in self.vertex_colors:
+            layer.resize(len(self.loops))
+        self.update()
+
+    def shade_smooth(self):
+        for polygon in self.polygons:
+            polygon.use_smooth = True
+
+    def shade_flat(self):
+        for polygon in self.polygons:
+            polygon.use_smooth = False
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # normals of the polygons, & of the vertices as the mean of those around them, weighted by area
+    def update(self, calc_edges = False, calc_edges_loose = False):
+        vertices = self.vertices
+        sums = [[0.0, 0.0, 0.0] for vertex in vertices]
+        for polygon in self.polygons:
+            # Newell's method, which is twice the area in length
+            nx = ny = nz = 0.0
+            indices = polygon.vertices
+            for idx in range(len(indices)):
+                a = vertices[indices[idx]].co.values
+                b = vertices[indices[(idx + 1) % len(indices)]].co.values
+                nx += (a[1] - b[1]) * (a[2] + b[2])
+                ny += (a[2] - b[2]) * (a[0] + b[0])
+                nz += (a[0] - b[0]) * (a[1] + b[1])
+
+            for vertexIndex in indices:
+                total = sums[vertexIndex]
+                total[0] += nx; total[1] += ny; total[2] += nz
+
+            length = sqrt(nx * nx + ny * ny + nz * nz) or 1.0
+            polygon.normal = Vector((nx / length, ny / length, nz / length))
+
+        for vertex, total in zip(vertices, sums):
+            length = sqrt(total[0] * total[0] + total[1] * total[1] + total[2] * total[2]) or 1.0
+            vertex.normal = Vector((total[0] / length, total[1] / length, total[2] / length))
+
+        for loop in self.loops:
+            loop.normal = None
+        self.loopTrianglesValid = False
+
+    # fans of each polygon, as convex ones are split in Blender
+    def calc_loop_triangles(self):
+        if self.loopTrianglesValid: return
+        triangles = []
+        for polygon in self.polygons:
+            loopStart = polygon.loop_start
+            for idx in range(1, polygon.loop_total - 1):
+                loops = (loopStart, loopStart + idx, loopStart + idx + 1)
+                triangles.append(MeshLoopTriangle(len(triangles), self, polygon, loops))
+        self.loop_triangles = Collection_(triangles)
+        self.loopTrianglesValid = True
+
+    def calc_normals_split(self): pass
+
+    # of the triangle, in the direction of the first uv, for each loop
+    def calc_tangents(self, uvmap = ''):
+        self.calc_loop_triangles()
+        layer = self.uv_layers.get(uvmap) or self.uv_layers.active
+        for triangle in self.loop_triangles:
+            points = [self.vertices[idx].co for idx in triangle.vertices]
+            uvs = [layer.data[idx].uv for idx in triangle.loops]
+            edge1 = points[1] - points[0]
+            edge2 = points[2] - points[0]
+            du1, dv1 = uvs[1][0] - uvs[0][0], uvs[1][1] - uvs[0][1]
+            du2, dv2 = uvs[2][0] - uvs[0][0], uvs[2][1] - uvs[0][1]
+            det = du1 * dv2 - du2 * dv1
+            tangent = ((edge1 * dv2 - edge2 * dv1) * (1.0 / det) if det != 0 else edge1).normalized()
+            for idx in triangle.loops:
+                loop = self.loops[idx]
+                loop.tangent = tangent.copy()
+                loop.bitangent_sign = -1.0 if det < 0 else 1.0
+
+    def free_tangents(self): pass
+    def free_normals_split(self): pass
+#===============================================================================
+class MeshVertex(bpy_struct):
+    __slots__ = ('index', 'co_', 'normal', 'groups', 'select', 'hide')
+
+    def __init__(self, index, co):
+        self.index = index
+        self.co_ = Vector(co)
+        self.normal = Vector((0.0, 0.0, 1.0))
+        self.groups = []
+        self.select = False
+        self.hide = False
+
+    co = vector_property('co_')
+
+# items of a part of some data, with the bulk access of Blender;  seq is flat, of every item of a vector attribute in turn
+class PropList(list):
+    def foreach_get(self, attr, seq):
+        values = [value for item in self for value in getattr(item, attr)]
+        seq[:] = array(seq.typecode, values) if isinstance(seq, array) else values
+
+    def foreach_set(self, attr, seq):
+        size = len(seq) // max(len(self), 1)
+        for idx, item in enumerate(self):
+            getattr(item, attr)[:] = seq[idx * size:idx * size + size]
+
+class MeshVertices(PropList):
+    def add(self, count):
+        self.extend([MeshVertex(len(self) + idx, (0.0, 0.0, 0.0)) for idx in range(count)])
+
+class MeshLoop(bpy_struct):
+    __slots__ = ('index', 'vertex_index', 'normal', 'tangent', 'bitangent_sign')
+
+    def __init__(self, index, vertex_index):
+        self.index = index
+        self.vertex_index = vertex_index
+        self.normal = None # without custom normals, set with the loop triangles
+        self.tangent = Vector()
+        self.bitangent_sign = 1.0
+
+class MeshLoops(list):
+    pass
+
+class MeshPolygon(bpy_struct):
+    __slots__ = ('index', 'vertices', 'loop_start', 'loop_total', 'use_smooth', 'material_index', 'normal', 'select', 'hide')
+
+    def __init__(self, index, vertices, loop_start, use_smooth):
+        self.index = index
+        self.vertices = vertices
+        self.loop_start = loop_start
+        self.loop_total = len(vertices)
+        self.use_smooth = use_smooth
+        self.material_index = 0
+        self.normal = Vector((0.0, 0.0, 1.0))
+        self.select = False
+        self.hide = False
+
+    loop_indices = property(lambda self: range(self.loop_start, self.loop_start + self.loop_total))
+
+class MeshPolygons(list):
+    def foreach_set(self, attr, seq):
+        for polygon, value in zip(self, seq):
+            setattr(polygon, attr, value)
+
+class MeshLoopTriangle(bpy_struct):
+    __slots__ = ('index', 'polygon_index', 'vertices', 'loops', 'material_index', 'use_smooth', 'normal', 'split_normals')
+
+    def __init__(self, index, mesh, polygon, loops):
+        self.index = index
+        self.polygon_index = polygon.index
+        self.loops = loops
+        self.vertices = tuple([mesh.loops[loop].vertex_index for loop in loops])
+        self.material_index = polygon.material_index
+        self.use_smooth = polygon.use_smooth
+        self.normal = polygon.normal
+
+        # as in Blender, the vertex normals when smooth, without custom normals
+        if polygon.use_smooth:
+            self.split_normals = tuple([tuple(mesh.vertices[idx].normal) for idx in self.vertices])
+        else:
+            self.split_normals = (tuple(polygon.normal),) * 3
+        for loop, normal in zip(loops, self.split_normals):
+            if mesh.loops[loop].normal is None:
+                mesh.loops[loop].normal = Vector(normal)
+#===============================================================================
+class MeshUVLoop(bpy_struct):
+    __slots__ = ('uv_', 'select', 'pin_uv')
+
+    def __init__(self, uv = (0.0, 0.0)):
+        self.uv_ = Vector(uv)
+        self.select = False
+        self.pin_uv = False
+
+    uv = vector_property('uv_')
+
+class MeshUVLoopLayer(bpy_struct):
+    def __init__(self, name, nLoops):
+        self.name = name
+        self.data = PropList([MeshUVLoop() for idx in range(nLoops)])
+        self.active_render = False
+
+    def resize(self, nLoops):
+        self.data += [MeshUVLoop() for idx in range(nLoops - len(self.data))]
+
+    def foreach_set(self, attr, seq):
+        for idx, loop in enumerate(self.data):
+            loop.uv[:] = seq[idx * 2:idx * 2 + 2]
+
+class UVLoopLayers(Collection_):
+    def __init__(self, mesh):
+        super().__init__()
+        self.mesh = mesh
+        self.active_index = 0
+
+    @property
+    def active(self):
+        return self.items_[self.active_index] if self.active_index < len(self.items_) else None
+
+    @active.setter
+    def active(self, layer):
+        self.active_index = self.items_.index(layer)
+
+    def new(self, name = 'UVMap', do_init = True):
+        layer = self.append_(MeshUVLoopLayer(self.unique_name(name), len(self.mesh.loops)))
+        if len(self.items_) == 1: layer.active_render = True
+        return layer
+
+    def remove(self, layer):
+        self.items_.remove(layer)
+        self.active_index = min(self.active_index, max(len(self.items_) - 1, 0))
+
+class MeshLoopColor(bpy_struct):
+    __slots__ = ('color',)
+
+    def __init__(self):
+        self.color = [1.0, 1.0, 1.0, 1.0]
+
+class MeshLoopColorLayer(bpy_struct):
+    def __init__(self, name, nLoops):
+        self.name = name
+        self.data = [MeshLoopColor() for idx in range(nLoops)]
+
+    def resize(self, nLoops):
+        self.data += [MeshLoopColor() for idx in range(nLoops - len(self.data))]
+
+class LoopColors(UVLoopLayers):
+    def new(self, name = 'Col', do_init = True):
+        return self.append_(MeshLoopColorLayer(self.unique_name(name), len(self.mesh.loops)))
+
+class IDMaterials(Collection_):
+    def append(self, material): self.items_.append(material)
+    def pop(self, index = -1): return self.items_.pop(index)
+    def clear(self): self.items_.clear()
+#===============================================================================
+class Key(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.key_blocks = Collection_()
+        self.use_relative = True
+        self.user = None
+
+    reference_key = property(lambda self: self.key_blocks[0])
+
+class ShapeKey(bpy_struct):
+    def __init__(self, key, name, points):
+        self.key = key
+        self.name = name
+        self.value_ = 0.0
+        self.data = PropList([ShapeKeyPoint(co) for co in points])
+        self.relative_key = None
+        self.slider_min = 0.0
+        self.slider_max = 1.0
+        self.mute = False
+        self.vertex_group = ''
+        self.interpolation = 'KEY_LINEAR'
+
+    @property
+    def value(self):
+        self.key.ensure_evaluated()
+        return self.value_
+
+    @value.setter
+    def value(self, value): self.value_ = float(value)
+
+class ShapeKeyPoint(bpy_struct):
+    __slots__ = ('co_',)
+
+    def __init__(self, co):
+        self.co_ = Vector(co)
+
+    co = vector_property('co_')
+#===============================================================================
+class Armature(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.edit_bones = EditBones()
+        self.display_type = 'OCTAHEDRAL'
+        self.pose_position = 'POSE'
+        self.show_names = False
+
+    # the bones at rest are also the edit bones, whether in edit mode or not
+    bones = property(lambda self: self.edit_bones)
+
+class EditBone(bpy_struct):
+    def __init__(self, name):
+        self.name = name
+        self.head_ = Vector((0.0, 0.0, 0.0))
+        self.tail_ = Vector((0.0, 1.0, 0.0))
+        self.roll = 0.0
+        self.parent = None
+        self.use_connect = False
+        self.use_deform = True
+        self.restKey = None
+        self.restMatrix = None
+
+    head = vector_property('head_')
+    tail = vector_property('tail_')
+    head_local = property(lambda self: self.head)
+    tail_local = property(lambda self: self.tail)
+    length = property(lambda self: (self.tail - self.head).length)
+    children = property(lambda self: [bone for bone in self.collection if bone.parent is self])
+
+    # in armature space, with y along the bone, as vec_roll_to_mat3 in Blender
+    @property
+    def matrix(self):
+        key = (tuple(self.head), tuple(self.tail), self.roll)
+        if key != self.restKey:
+            direction = (self.tail - self.head).normalized()
+            if direction.y < -0.99999:
+                rotation = Matrix(((-1.0, 0.0, 0.0), (0.0, -1.0, 0.0), (0.0, 0.0, 1.0)))
+            else:
+                axis = Vector((0.0, 1.0, 0.0)).cross(direction)
+                angle = acos(max(-1.0, min(1.0, direction.y)))
+                rotation = Matrix.Rotation(angle, 3, axis) if axis.length > 1e-9 else Matrix.Identity(3)
+            if self.roll != 0.0:
+                rotation = Matrix.Rotation(self.roll, 3, direction) @ rotation
+
+            matrix = rotation.to_4x4()
+            matrix.translation = self.head
+            self.restKey = key
+            self.restMatrix = matrix
+        return self.restMatrix.copy()
+
+    matrix_local = matrix
+
+class EditBones(Collection_):
+    version = 0
+
+    def new(self, name):
+        bone = self.append_(EditBone(self.unique_name(name)))
+        bone.collection = self.items_
+        self.version += 1
+        return bone
+
+    def remove(self, bone):
+        self.items_.remove(bone)
+        self.version += 1
+        for other in self.items_:
+            if other.parent is bone: other.parent = bone.parent
+#===============================================================================
+class Pose(bpy_struct):
+    def __init__(self, obj):
+        self.obj = obj
+        self.bonesByName = {}
+        self.boneList = Collection_()
+        self.bonesVersion = -1
+
+    # made for the bones of the armature, keeping what is set for those already there;  again only when bones are added or
+    # removed, not renamed
+    @property
+    def bones(self):
+        restBones = self.obj.data.edit_bones
+        if restBones.version != self.bonesVersion:
+            self.bonesVersion = restBones.version
+            bonesByName = {}
+            for restBone in restBones:
+                bonesByName[restBone.name] = self.bonesByName.get(restBone.name) or PoseBone(self, restBone)
+            for poseBone in bonesByName.values():
+                poseBone.bone = restBones[poseBone.name]
+            self.bonesByName = bonesByName
+            self.boneList = Collection_(list(bonesByName.values()))
+        return self.boneList
+
+class PoseBone(bpy_struct, Transformable):
+    def __init__(self, pose, bone):
+        self.pose = pose
+        self.name = bone.name
+        self.bone = bone
+        self.init_transform('QUATERNION')
+        self.constraints = Constraints()
+        self.customProps = {}
+
+    def animated(self): return self.pose.obj
+    def __getitem__(self, key): return self.customProps[key]
+    def __setitem__(self, key, value): self.customProps[key] = value
+
+    length = property(lambda self: self.bone.length)
+    parent = property(lambda self: None if self.bone.parent is None else self.pose.bonesByName[self.bone.parent.name])
+
+    # in armature space;  the rest of the bone relative to its parent's, posed, under the parent's pose
+    @property
+    def matrix(self):
+        rest = self.bone.matrix
+        if self.parent is None:
+            return rest @ self.matrix_basis
+        return self.parent.matrix @ self.bone.parent.matrix.inverted() @ rest @ self.matrix_basis
+
+    head = property(lambda self: self.matrix.translation)
+    tail = property(lambda self: self.matrix @ Vector((0.0, self.length, 0.0)))
+#===============================================================================
+class AnimData(bpy_struct):
+    def __init__(self):
+        self.action_ = None
+        self.nla_tracks = Collection_()
+        self.use_nla = True
+
+    @property
+    def action(self): return self.action_
+
+    @action.setter
+    def action(self, action):
+        self.action_ = action
+        invalidate_animation()
+
+class Action(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.fcurves = FCurves()
+        self.id_root = 'OBJECT'
+        self.use_frame_range = False
+        self.frame_start = 0.0
+        self.frame_end = 0.0
+        self.pose_markers = Collection_()
+
+    # of the keys, unless set
+    @property
+    def frame_range(self):
+        if self.use_frame_range: return Vector((self.frame_start, self.frame_end))
+        frames = [point.co[0] for fcurve in self.fcurves for point in fcurve.keyframe_points]
+        if len(frames) == 0: return Vector((0.0, 1.0))
+        return Vector((min(frames), max(frames) if max(frames) > min(frames) else min(frames) + 1))
+
+class FCurves(Collection_):
+    def new(self, data_path, index = 0, action_group = ''):
+        if self.find(data_path, index) is not None:
+            raise RuntimeError('Error: F-Curve \'' + data_path + '[' + str(index) + ']\' already exists in action')
+        return self.append_(FCurve(data_path, index, action_group))
+
+    def find(self, data_path, index = 0):
+        for fcurve in self.items_:
+            if fcurve.data_path == data_path and fcurve.array_index == index: return fcurve
+        return None
+
+    def remove(self, fcurve): self.items_.remove(fcurve)
+
+class FCurve(bpy_struct):
+    def __init__(self, data_path, index, group):
+        self.data_path = data_path
+        self.array_index = index
+        self.group = group
+        self.keyframe_points = Keyframes()
+        self.extrapolation = 'CONSTANT'
+        self.modifiers = Collection_()
+        self.mute = False
+
+    # linear between keys, constant outside them
+    def evaluate(self, frame):
+        points = self.keyframe_points.items_
+        if len(points) == 0: return 0.0
+        if frame <= points[0].co[0]: return points[0].co[1]
+
+        previous = points[0]
+        for point in points:
+            if point.co[0] >= frame:
+                if point.interpolation == 'CONSTANT' or previous.interpolation == 'CONSTANT':
+                    return previous.co[1] if point.co[0] > frame else point.co[1]
+                span = point.co[0] - previous.co[0]
+                fraction = (frame - previous.co[0]) / span if span > 0 else 1.0
+                return previous.co[1] + (point.co[1] - previous.co[1]) * fraction
+            previous = point
+        return previous.co[1]
+
+    def update(self):
+        self.keyframe_points.items_.sort(key = lambda point: point.co[0])
+
+class Keyframe(bpy_struct):
+    __slots__ = ('co', 'interpolation', 'handle_left', 'handle_right', 'type', 'easing')
+
+    def __init__(self, frame, value):
+        self.co = Vector((frame, value))
+        self.interpolation = 'BEZIER'
+        self.handle_left = Vector((frame - 1.0, value))
+        self.handle_right = Vector((frame + 1.0, value))
+        self.type = 'KEYFRAME'
+        self.easing = 'AUTO'
+
+class Keyframes(Collection_):
+    def insert(self, frame, value, options = set(), keyframe_type = 'KEYFRAME'):
+        for point in self.items_:
+            if point.co[0] == frame:
+                point.co[1] = value
+                return point
+
+        point = Keyframe(frame, value)
+        self.items_.append(point)
+        self.items_.sort(key = lambda point: point.co[0])
+        invalidate_animation()
+        return point
+
+    def add(self, count = 1):
+        self.items_.extend([Keyframe(0.0, 0.0) for idx in range(count)])
+
+    def remove(self, point, fast = False): self.items_.remove(point)
+#===============================================================================
+class Camera(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.type = 'PERSP'
+        self.lens = 50.0
+        self.angle = 0.6911112070083618
+        self.sensor_width = 36.0
+        self.sensor_fit = 'AUTO'
+        self.ortho_scale = 6.0
+        self.clip_start = 0.1
+        self.clip_end = 100.0
+        self.shift_x = 0.0
+        self.shift_y = 0.0
+        self.dof = Settings(use_dof = False, focus_distance = 10.0, aperture_fstop = 2.8)
+#===============================================================================
+class Light(ID):
+    def __init__(self, name, type = 'POINT'):
+        super().__init__(name)
+        self.type = type
+        self.color = Color((1.0, 1.0, 1.0))
+        self.energy = 1.0 if type == 'SUN' else 1000.0
+        self.specular_factor = 1.0
+        self.shadow_soft_size = 0.25
+        self.cutoff_distance = 40.0
+        self.use_custom_distance = False
+        self.use_shadow = True
+        self.spot_size = 0.785398
+        self.spot_blend = 0.15
+        self.size = 0.25
+        self.size_y = 0.25
+        self.shape = 'SQUARE'
+        self.angle = 0.00918043
+#===============================================================================
+class World(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.color = Color((0.050876, 0.050876, 0.050876))
+        self.mist_settings = Settings(use_mist = False, start = 5.0, depth = 25.0, intensity = 0.0, falloff = 'INVERSE_QUADRATIC')
+        self.node_tree = None
+        self.use_nodes_ = False
+
+    @property
+    def use_nodes(self): return self.use_nodes_
+
+    @use_nodes.setter
+    def use_nodes(self, value):
+        self.use_nodes_ = value
+        if value and self.node_tree is None:
+            self.node_tree = NodeTree('Shader Nodetree', embedded = True)
+            output = self.node_tree.nodes.new('ShaderNodeOutputWorld')
+            background = self.node_tree.nodes.new('ShaderNodeBackground')
+            background.inputs['Color'].default_value = list(self.color) + [1.0]
+            self.node_tree.links.new(background.outputs['Background'], output.inputs['Surface'])
+#===============================================================================
+class Material(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.diffuse_color = [0.8, 0.8, 0.8, 1.0]
+        self.specular_color = Color((1.0, 1.0, 1.0))
+        self.specular_intensity = 0.5
+        self.metallic = 0.0
+        self.roughness = 0.4
+        self.blend_method = 'OPAQUE'
+        self.surface_render_method = 'DITHERED'
+        self.use_backface_culling = False
+        self.show_transparent_back = True
+        self.alpha_threshold = 0.5
+        self.node_tree = None
+        self.use_nodes_ = False
+
+    @property
+    def use_nodes(self): return self.use_nodes_
+
+    # the tree of a new material, when first used
+    @use_nodes.setter
+    def use_nodes(self, value):
+        self.use_nodes_ = value
+        if value and self.node_tree is None:
+            self.node_tree = NodeTree('Shader Nodetree', embedded = True)
+            output = self.node_tree.nodes.new('ShaderNodeOutputMaterial')
+            principled = self.node_tree.nodes.new('ShaderNodeBsdfPrincipled')
+            principled.inputs['Base Color'].default_value = list(self.diffuse_color)
+            self.node_tree.links.new(principled.outputs['BSDF'], output.inputs['Surface'])
+#===============================================================================
+COLOR  = 'RGBA'
+FLOAT  = 'VALUE'
+VECTOR = 'VECTOR'
+EULER  = 'EULER'
+SHADER = 'SHADER'
+
+WHITE = (1.0, 1.0, 1.0, 1.0)
+ZERO  = (0.0, 0.0, 0.0)
+
+# type, inputs as (name, kind, default), & outputs as (name, kind), of each node type made;  names of sockets are those of
+# Blender 4.x
+NODE_TYPES = {
+    'ShaderNodeOutputMaterial': ('OUTPUT_MATERIAL', [('Surface', SHADER, None), ('Volume', SHADER, None), ('Displacement', VECTOR, ZERO),
+                                                     ('Thickness', FLOAT, 0.0)], []),
+    'ShaderNodeOutputWorld': ('OUTPUT_WORLD', [('Surface', SHADER, None), ('Volume', SHADER, None)], []),
+    'ShaderNodeBackground': ('BACKGROUND', [('Color', COLOR, (0.8, 0.8, 0.8, 1.0)), ('Strength', FLOAT, 1.0), ('Weight', FLOAT, 0.0)],
+                             [('Background', SHADER)]),
+    'ShaderNodeBsdfPrincipled': ('BSDF_PRINCIPLED', [
+        ('Base Color', COLOR, (0.8, 0.8, 0.8, 1.0)), ('Metallic', FLOAT, 0.0), ('Roughness', FLOAT, 0.5), ('IOR', FLOAT, 1.5),
+        ('Alpha', FLOAT, 1.0), ('Normal', VECTOR, ZERO), ('Weight', FLOAT, 0.0), ('Subsurface Weight', FLOAT, 0.0),
+        ('Subsurface Radius', VECTOR, (1.0, 0.2, 0.1)), ('Subsurface Scale', FLOAT, 0.05), ('Subsurface IOR', FLOAT, 1.4),
+        ('Subsurface Anisotropy', FLOAT, 0.0), ('Specular IOR Level', FLOAT, 0.5), ('Specular Tint', COLOR, WHITE),
+        ('Anisotropic', FLOAT, 0.0), ('Anisotropic Rotation', FLOAT, 0.0), ('Tangent', VECTOR, ZERO), ('Transmission Weight', FLOAT, 0.0),
+        ('Coat Weight', FLOAT, 0.0), ('Coat Roughness', FLOAT, 0.03), ('Coat IOR', FLOAT, 1.5), ('Coat Tint', COLOR, WHITE),
+        ('Coat Normal', VECTOR, ZERO), ('Sheen Weight', FLOAT, 0.0), ('Sheen Roughness', FLOAT, 0.5), ('Sheen Tint', COLOR, WHITE),
+        ('Emission Color', COLOR, WHITE), ('Emission Strength', FLOAT, 0.0), ('Thin Film Thickness', FLOAT, 0.0),
+        ('Thin Film IOR', FLOAT, 1.33)], [('BSDF', SHADER)]),
+    'ShaderNodeEmission': ('EMISSION', [('Color', COLOR, WHITE), ('Strength', FLOAT, 1.0), ('Weight', FLOAT, 0.0)], [('Emission', SHADER)]),
+    'ShaderNodeMixShader': ('MIX_SHADER', [('Fac', FLOAT, 0.5), ('Shader', SHADER, None), ('Shader', SHADER, None)], [('Shader', SHADER)]),
+    'ShaderNodeTexImage': ('TEX_IMAGE', [('Vector', VECTOR, ZERO)], [('Color', COLOR), ('Alpha', FLOAT)]),
+    'ShaderNodeTexCoord': ('TEX_COORD', [], [('Generated', VECTOR), ('Normal', VECTOR), ('UV', VECTOR), ('Object', VECTOR),
+                                             ('Camera', VECTOR), ('Window', VECTOR), ('Reflection', VECTOR)]),
+    'ShaderNodeUVMap': ('UVMAP', [], [('UV', VECTOR)]),
+    'ShaderNodeMapping': ('MAPPING', [('Vector', VECTOR, ZERO), ('Location', VECTOR, ZERO), ('Rotation', EULER, ZERO),
+                                      ('Scale', VECTOR, (1.0, 1.0, 1.0))], [('Vector', VECTOR)]),
+    'ShaderNodeNormalMap': ('NORMAL_MAP', [('Strength', FLOAT, 1.0), ('Color', COLOR, (0.5, 0.5, 1.0, 1.0))], [('Normal', VECTOR)]),
+    'ShaderNodeBump': ('BUMP', [('Strength', FLOAT, 1.0), ('Distance', FLOAT, 1.0), ('Height', FLOAT, 1.0), ('Normal', VECTOR, ZERO)],
+                       [('Normal', VECTOR)]),
+    'ShaderNodeVertexColor': ('VERTEX_COLOR', [], [('Color', COLOR), ('Alpha', FLOAT)]),
+    'ShaderNodeSeparateColor': ('SEPARATE_COLOR', [('Color', COLOR, WHITE)], [('Red', FLOAT), ('Green', FLOAT), ('Blue', FLOAT)]),
+    'ShaderNodeGroup': ('GROUP', [], []),
+    'NodeGroupInput': ('GROUP_INPUT', [], []),
+    'NodeGroupOutput': ('GROUP_OUTPUT', [], []),
+}
+
+NODE_NAMES = {'ShaderNodeOutputMaterial': 'Material Output', 'ShaderNodeOutputWorld': 'World Output', 'ShaderNodeBsdfPrincipled': 'Principled BSDF',
+              'ShaderNodeTexImage': 'Image Texture', 'ShaderNodeTexCoord': 'Texture Coordinate', 'ShaderNodeMixShader': 'Mix Shader',
+              'ShaderNodeNormalMap': 'Normal Map', 'ShaderNodeSeparateColor': 'Separate Color', 'ShaderNodeVertexColor': 'Color Attribute',
+              'ShaderNodeUVMap': 'UV Map', 'NodeGroupInput': 'Group Input', 'NodeGroupOutput': 'Group Output'}
+
+class NodeTree(ID):
+    def __init__(self, name, type = 'ShaderNodeTree', embedded = False):
+        super().__init__(name)
+        self.bl_idname = type
+        self.type = 'SHADER'
+        self.nodes = Nodes(self)
+        self.links = NodeLinks(self)
+        self.is_embedded_data = embedded
+
+class NodeSocket(bpy_struct):
+    def __init__(self, node, name, identifier, kind, default, isOutput):
+        self.node = node
+        self.name = name
+        self.identifier = identifier
+        self.type = 'VECTOR' if kind == EULER else kind
+        self.is_output = isOutput
+        self.links = []
+        self.enabled = True
+        self.hide = False
+        # as in Blender, a shader has no value, & vectors are mathutils ones
+        if default is not None:
+            self.default_value = Euler(default) if kind == EULER else Vector(default) if kind == VECTOR else list(default) if kind == COLOR else default
+
+    is_linked = property(lambda self: len(self.links) > 0)
+
+class NodeSockets(Collection_):
+    def get(self, key, default = None):
+        for socket in self.items_:
+            if socket.name == key or socket.identifier == key: return socket
+        return default
+
+    # sockets of a group node, for those of its tree
+    def new(self, type, name, identifier = None):
+        kind = COLOR if 'Color' in type else VECTOR if 'Vector' in type else SHADER if 'Shader' in type else FLOAT
+        default = WHITE if kind == COLOR else ZERO if kind == VECTOR else None if kind == SHADER else 0.0
+        return self.append_(NodeSocket(self.node, name, identifier or name, kind, default, self.isOutput))
+
+class Node(bpy_struct):
+    def __init__(self, tree, bl_idname, name):
+        type, inputs, outputs = NODE_TYPES[bl_idname]
+        self.id_data = tree
+        self.bl_idname = bl_idname
+        self.type = type
+        self.name = name
+        self.label = ''
+        self.location = Vector((0.0, 0.0))
+        self.width = 140.0
+        self.parent = None
+        self.select = False
+        self.hide = False
+        self.mute = False
+        self.inputs = NodeSockets()
+        self.outputs = NodeSockets()
+        self.inputs.node = self.outputs.node = self
+        self.inputs.isOutput, self.outputs.isOutput = False, True
+
+        for idx, (socketName, kind, default) in enumerate(inputs):
+            identifier = socketName if idx == 0 or inputs[idx - 1][0] != socketName else socketName + '_001'
+            self.inputs.append_(NodeSocket(self, socketName, identifier, kind, default, False))
+        for socketName, kind in outputs:
+            self.outputs.append_(NodeSocket(self, socketName, socketName, kind, None, True))
+
+        if type in ('OUTPUT_MATERIAL', 'OUTPUT_WORLD'):
+            self.is_active_output = True
+            self.target = 'ALL'
+        elif type == 'TEX_IMAGE':
+            self.image = None
+            self.interpolation = 'Linear'
+            self.extension = 'REPEAT'
+            self.projection = 'FLAT'
+        elif type == 'MAPPING':
+            self.vector_type = 'POINT'
+        elif type == 'NORMAL_MAP':
+            self.space = 'TANGENT'
+            self.uv_map = ''
+        elif type == 'UVMAP':
+            self.uv_map = ''
+            self.from_instancer = False
+        elif type == 'VERTEX_COLOR':
+            self.layer_name = ''
+        elif type == 'SEPARATE_COLOR':
+            self.mode = 'RGB'
+        elif type == 'GROUP':
+            self.node_tree = None
+
+class Nodes(Collection_):
+    def __init__(self, tree):
+        super().__init__()
+        self.tree = tree
+        self.active = None
+
+    def new(self, type):
+        return self.append_(Node(self.tree, type, self.unique_name(NODE_NAMES.get(type, NODE_TYPES[type][0].replace('_', ' ').title()))))
+
+    def remove(self, node):
+        for socket in list(node.inputs) + list(node.outputs):
+            for link in list(socket.links):
+                self.tree.links.remove(link)
+        self.items_.remove(node)
+
+    def clear(self):
+        for node in list(self.items_):
+            self.remove(node)
+
+class NodeLink(bpy_struct):
+    def __init__(self, from_socket, to_socket):
+        self.from_socket = from_socket
+        self.to_socket = to_socket
+        self.is_valid = True
+        self.is_muted = False
+
+    from_node = property(lambda self: self.from_socket.node)
+    to_node = property(lambda self: self.to_socket.node)
+
+class NodeLinks(Collection_):
+    def __init__(self, tree):
+        super().__init__()
+        self.tree = tree
+
+    # an input takes only one link, so one already there is replaced
+    def new(self, input, output, verify_limits = True):
+        if input.is_output is False and output.is_output is True:
+            input, output = output, input
+        for link in list(output.links):
+            self.remove(link)
+
+        link = NodeLink(input, output)
+        input.links.append(link)
+        output.links.append(link)
+        return self.append_(link)
+
+    def remove(self, link):
+        self.items_.remove(link)
+        link.from_socket.links.remove(link)
+        link.to_socket.links.remove(link)
+
+    def clear(self):
+        for link in list(self.items_):
+            self.remove(link)
+#===============================================================================
+class Image(ID):
+    def __init__(self, name, width = 1024, height = 1024, alpha = False, float_buffer = False, **keywords):
+        super().__init__(name)
+        self.size = [width, height]
+        self.source = 'GENERATED'
+        self.filepath_ = ''
+        self.filepath_raw = ''
+        self.file_format = 'PNG'
+        self.packed_file = None
+        self.alpha_mode = 'STRAIGHT' if alpha else 'NONE'
+        self.use_float = float_buffer
+        self.generated_color = [0.0, 0.0, 0.0, 1.0]
+        self.colorspace_settings = Settings(name = 'sRGB', is_data = False)
+        self.pixels = None
+        self.has_data = True
+
+    @property
+    def filepath(self): return self.filepath_
+
+    @filepath.setter
+    def filepath(self, value):
+        self.filepath_ = self.filepath_raw = value
+
+    def save(self, filepath = None, quality = None):
+        write_png(abspath(filepath or self.filepath_raw), self.size[0], self.size[1], self.pixels, self.generated_color)
+        self.source = 'FILE'
+
+    def save_render(self, filepath, scene = None, quality = None):
+        write_png(abspath(filepath), self.size[0], self.size[1], self.pixels, self.generated_color)
+
+    def scale(self, width, height, frame = 0):
+        self.size = [width, height]
+        self.pixels = None
+
+    def pack(self, data = None, data_len = 0): self.packed_file = Settings(size = data_len, data = data)
+    def unpack(self, method = 'USE_LOCAL'): self.packed_file = None
+    def reload(self): pass
+    def update(self): pass
+    def gl_load(self, frame = 0): return 0
+    def buffers_free(self): pass
+
+# of floats, like Image.pixels, or when none a single color;  rows as Blender stores them, bottom first
+def write_png(filepath, width, height, pixels, color):
+    if pixels is None:
+        row = b'\x00' + bytes([round(max(0.0, min(1.0, value)) * 255) for value in color]) * width
+        raw = row * height
+    else:
+        values = bytes([round(max(0.0, min(1.0, value)) * 255) for value in pixels])
+        stride = width * 4
+        raw = b''.join([b'\x00' + values[row * stride:(row + 1) * stride] for row in range(height - 1, -1, -1)])
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+    with open(filepath, 'wb') as file:
+        file.write(b'\x89PNG\r\n\x1a\n')
+        file.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)))
+        file.write(chunk(b'IDAT', zlib.compress(raw, 6)))
+        file.write(chunk(b'IEND', b''))
+
+def read_png_size(filepath):
+    try:
+        with open(filepath, 'rb') as file:
+            header = file.read(24)
+        if header[0:8] == b'\x89PNG\r\n\x1a\n':
+            return list(struct.unpack('>II', header[16:24]))
+    except OSError:
+        pass
+    return [0, 0]
+
+# as bpy.path.abspath, relative to the folder of the .blend
+def abspath(filepath, start = None, library = None):
+    if filepath.startswith('//'):
+        base = start if start is not None else os.path.dirname(_data.filepath) or os.getcwd()
+        return os.path.normpath(os.path.join(base, filepath[2:]))
+    return filepath
+#===============================================================================
+# the user interface, which is only registered
+class Operator(bpy_struct):
+    bl_idname = ''
+    bl_label = ''
+    bl_options = set()
+
+    def report(self, type, message):
+        print(', '.join(sorted(type)) + ':  ' + message)
+
+class Panel(bpy_struct):
+    bl_space_type = ''
+    bl_region_type = ''
+    bl_context = ''
+
+class Menu(bpy_struct):
+    drawFunctions = []
+
+    @classmethod
+    def append(cls, draw_function): cls.drawFunctions.append(draw_function)
+
+    @classmethod
+    def prepend(cls, draw_function): cls.drawFunctions.insert(0, draw_function)
+
+    @classmethod
+    def remove(cls, draw_function):
+        if draw_function in cls.drawFunctions: cls.drawFunctions.remove(draw_function)
+
+class TOPBAR_MT_file_export(Menu):
+    drawFunctions = []
+
+class TOPBAR_MT_file_import(Menu):
+    drawFunctions = []
+
+class PropertyGroup(bpy_struct):
+    pass
+
+class AddonPreferences(bpy_struct):
+    pass
+#===============================================================================
+_data = BlendData()
+_context = Context(_data)
@@ -0,0 +1,11 @@
+# registration, which only notes the classes
+_registered = []
+
+def register_class(cls):
+    _registered.append(cls)
+
+def unregister_class(cls):
+    if cls in _registered: _registered.remove(cls)
+
+def script_paths(subdir = None, user_pref = True, check_all = False):
+    return []
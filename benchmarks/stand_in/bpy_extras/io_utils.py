@@ -0,0 +1,11 @@
+# the mixins of the file operators, which are only registered
+class ExportHelper:
+    filename_ext = ''
+    check_extension = True
+
+    def invoke(self, context, event): return {'RUNNING_MODAL'}
+    def check(self, context): return False
+
+class ImportHelper:
+    def invoke(self, context, event): return {'RUNNING_MODAL'}
+    def check(self, context): return False
@@ -0,0 +1,413 @@
+# The part of mathutils the exporter uses, in plain Python, for running it without Blender.  Matrices are row major, as
+# indexed in mathutils, so matrix[row][col];  the rows are Vectors, which are views that can be assigned into.  Eulers are
+# converted to & from matrices as Blender does, for each of the 6 orders.
+from math import atan2, cos, hypot, sin, sqrt
+
+# axes & parity of each euler order, as in Blender's rotation code
+EULER_ORDERS = {'XYZ': ((0, 1, 2), False), 'XZY': ((0, 2, 1), True), 'YXZ': ((1, 0, 2), True),
+                'YZX': ((1, 2, 0), False), 'ZXY': ((2, 0, 1), False), 'ZYX': ((2, 1, 0), True)}
+
+AXIS_NAMES = {'X': 0, 'Y': 1, 'Z': 2}
+
+#===============================================================================
+class Vector:
+    __slots__ = ('values',)
+
+    def __init__(self, values = (0.0, 0.0, 0.0)):
+        self.values = [float(value) for value in values]
+
+    x = property(lambda self: self.values[0], lambda self, value: self.values.__setitem__(0, float(value)))
+    y = property(lambda self: self.values[1], lambda self, value: self.values.__setitem__(1, float(value)))
+    z = property(lambda self: self.values[2], lambda self, value: self.values.__setitem__(2, float(value)))
+    w = property(lambda self: self.values[3], lambda self, value: self.values.__setitem__(3, float(value)))
+    xy  = property(lambda self: Vector(self.values[0:2]))
+    xyz = property(lambda self: Vector(self.values[0:3]))
+
+    def __len__(self): return len(self.values)
+    def __iter__(self): return iter(self.values)
+    def __getitem__(self, idx): return self.values[idx]
+
+    def __setitem__(self, idx, value):
+        if isinstance(idx, slice):
+            self.values[idx] = [float(item) for item in value]
+        else:
+            self.values[idx] = float(value)
+
+    def __repr__(self):
+        return 'Vector((' + ', '.join(['%.4f' % value for value in self.values]) + '))'
+
+    def __eq__(self, other):
+        return isinstance(other, Vector) and self.values == other.values
+
+    __hash__ = None
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def __add__(self, other): return Vector([a + b for a, b in zip(self.values, other)])
+    def __sub__(self, other): return Vector([a - b for a, b in zip(self.values, other)])
+    def __neg__(self): return Vector([-a for a in self.values])
+
+    # a number scales, another vector multiplies per element
+    def __mul__(self, other):
+        if isinstance(other, (int, float)):
+            return Vector([a * other for a in self.values])
+        return Vector([a * b for a, b in zip(self.values, other)])
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, number): return Vector([a / number for a in self.values])
+
+    # with a vector the dot product;  with a matrix, this as a row vector
+    def __matmul__(self, other):
+        if isinstance(other, Matrix):
+            return Vector([sum([self.values[row] * other.rows[row][col] for row in range(len(self.values))]) for col in range(other.nCols)])
+        return self.dot(other)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def copy(self):
+        vector = Vector.__new__(Vector)
+        vector.values = self.values[:]
+        return vector
+
+    def to_tuple(self, precision = -1): return tuple(self.values if precision < 0 else [round(a, precision) for a in self.values])
+    def to_2d(self): return Vector((self.values + [0.0, 0.0])[0:2])
+    def to_3d(self): return Vector((self.values + [0.0, 0.0, 0.0])[0:3])
+    def to_4d(self): return Vector((self.values + [0.0, 0.0, 0.0])[0:3] + [self.values[3] if len(self.values) > 3 else 1.0])
+
+    def dot(self, other): return sum([a * b for a, b in zip(self.values, other)])
+
+    def cross(self, other):
+        a, b = self.values, list(other)
+        return Vector((a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0]))
+
+    @property
+    def length_squared(self): return sum([a * a for a in self.values])
+
+    @property
+    def length(self): return sqrt(self.length_squared)
+
+    def normalized(self):
+        length = self.length
+        return Vector([a / length for a in self.values]) if length > 0 else self.copy()
+
+    def normalize(self):
+        self.values = self.normalized().values
+
+    def zero(self):
+        self.values = [0.0] * len(self.values)
+#===============================================================================
+class Color:
+    __slots__ = ('values',)
+
+    def __init__(self, values = (0.0, 0.0, 0.0)):
+        self.values = [float(value) for value in values][0:3]
+
+    r = property(lambda self: self.values[0], lambda self, value: self.values.__setitem__(0, float(value)))
+    g = property(lambda self: self.values[1], lambda self, value: self.values.__setitem__(1, float(value)))
+    b = property(lambda self: self.values[2], lambda self, value: self.values.__setitem__(2, float(value)))
+
+    def __len__(self): return 3
+    def __iter__(self): return iter(self.values)
+    def __getitem__(self, idx): return self.values[idx]
+    def __setitem__(self, idx, value): self.values[idx] = float(value)
+    def __repr__(self): return 'Color((' + ', '.join(['%.4f' % value for value in self.values]) + '))'
+    def __eq__(self, other): return isinstance(other, Color) and self.values == other.values
+
+    __hash__ = None
+
+    def __add__(self, other): return Color([a + b for a, b in zip(self.values, other)])
+    def __sub__(self, other): return Color([a - b for a, b in zip(self.values, other)])
+    def __mul__(self, number): return Color([a * number for a in self.values])
+
+    __rmul__ = __mul__
+
+    def copy(self): return Color(self.values)
+#===============================================================================
+class Euler:
+    __slots__ = ('values', 'order')
+
+    def __init__(self, angles = (0.0, 0.0, 0.0), order = 'XYZ'):
+        self.values = [float(angle) for angle in angles]
+        self.order = order
+
+    x = property(lambda self: self.values[0], lambda self, value: self.values.__setitem__(0, float(value)))
+    y = property(lambda self: self.values[1], lambda self, value: self.values.__setitem__(1, float(value)))
+    z = property(lambda self: self.values[2], lambda self, value: self.values.__setitem__(2, float(value)))
+
+    def __len__(self): return 3
+    def __iter__(self): return iter(self.values)
+    def __getitem__(self, idx): return self.values[idx]
+    def __setitem__(self, idx, value): self.values[idx] = float(value)
+    def __repr__(self): return 'Euler((' + ', '.join(['%.4f' % value for value in self.values]) + "), '" + self.order + "')"
+
+    def copy(self): return Euler(self.values, self.order)
+
+    # eulO_to_mat3 of Blender, which indexes [column][row]
+    def to_matrix(self):
+        (i, j, k), parity = EULER_ORDERS[self.order]
+        ti, tj, th = self.values[i], self.values[j], self.values[k]
+        if parity:
+            ti, tj, th = -ti, -tj, -th
+
+        ci, cj, ch = cos(ti), cos(tj), cos(th)
+        si, sj, sh = sin(ti), sin(tj), sin(th)
+        cc, cs, sc, ss = ci * ch, ci * sh, si * ch, si * sh
+
+        m = [[0.0] * 3 for idx in range(3)]
+        m[i][i] = cj * ch
+        m[j][i] = sj * sc - cs
+        m[k][i] = sj * cc + ss
+        m[i][j] = cj * sh
+        m[j][j] = sj * ss + cc
+        m[k][j] = sj * cs - sc
+        m[i][k] = -sj
+        m[j][k] = cj * si
+        m[k][k] = cj * ci
+        return Matrix([[m[col][row] for col in range(3)] for row in range(3)])
+
+    def to_quaternion(self):
+        return self.to_matrix().to_quaternion()
+#===============================================================================
+class Quaternion:
+    __slots__ = ('values',)
+
+    def __init__(self, values = (1.0, 0.0, 0.0, 0.0), angle = None):
+        # axis & angle, when given an angle
+        if angle is not None:
+            axis = Vector(values).normalized() * sin(angle / 2)
+            values = (cos(angle / 2), axis.x, axis.y, axis.z)
+        self.values = [float(value) for value in values]
+
+    w = property(lambda self: self.values[0], lambda self, value: self.values.__setitem__(0, float(value)))
+    x = property(lambda self: self.values[1], lambda self, value: self.values.__setitem__(1, float(value)))
+    y = property(lambda self: self.values[2], lambda self, value: self.values.__setitem__(2, float(value)))
+    z = property(lambda self: self.values[3], lambda self, value: self.values.__setitem__(3, float(value)))
+
+    def __len__(self): return 4
+    def __iter__(self): return iter(self.values)
+    def __getitem__(self, idx): return self.values[idx]
+    def __setitem__(self, idx, value): self.values[idx] = float(value)
+    def __repr__(self): return 'Quaternion((' + ', '.join(['%.4f' % value for value in self.values]) + '))'
+    def __eq__(self, other): return isinstance(other, Quaternion) and self.values == other.values
+
+    __hash__ = None
+
+    def __matmul__(self, other):
+        if isinstance(other, Vector):
+            return self.to_matrix() @ other
+
+        aw, ax, ay, az = self.values
+        bw, bx, by, bz = other.values
+        return Quaternion((aw * bw - ax * bx - ay * by - az * bz,
+                           aw * bx + ax * bw + ay * bz - az * by,
+                           aw * by - ax * bz + ay * bw + az * bx,
+                           aw * bz + ax * by - ay * bx + az * bw))
+
+    def copy(self): return Quaternion(self.values)
+
+    def normalized(self):
+        length = sqrt(sum([a * a for a in self.values]))
+        return Quaternion([a / length for a in self.values]) if length > 0 else self.copy()
+
+    def inverted(self):
+        lengthSquared = sum([a * a for a in self.values])
+        w, x, y, z = self.values
+        return Quaternion((w / lengthSquared, -x / lengthSquared, -y / lengthSquared, -z / lengthSquared))
+
+    def to_matrix(self):
+        w, x, y, z = self.normalized().values
+        return Matrix(((1 - 2 * (y * y + z * z),     2 * (x * y - z * w),     2 * (x * z + y * w)),
+                       (    2 * (x * y + z * w), 1 - 2 * (x * x + z * z),     2 * (y * z - x * w)),
+                       (    2 * (x * z - y * w),     2 * (y * z + x * w), 1 - 2 * (x * x + y * y))))
+
+    def to_euler(self, order = 'XYZ'):
+        return self.to_matrix().to_euler(order)
+#===============================================================================
+class Matrix:
+    __slots__ = ('rows',)
+
+    def __init__(self, rows = ((1, 0, 0, 0), (0, 1, 0, 0), (0, 0, 1, 0), (0, 0, 0, 1))):
+        self.rows = [Vector(row) for row in rows]
+
+    nRows = property(lambda self: len(self.rows))
+    nCols = property(lambda self: len(self.rows[0]))
+
+    def __len__(self): return len(self.rows)
+    def __iter__(self): return iter(self.rows)
+    def __getitem__(self, idx): return self.rows[idx]
+    def __setitem__(self, idx, value): self.rows[idx] = Vector(value)
+    def __repr__(self): return 'Matrix((' + ', '.join([repr(tuple(row.values)) for row in self.rows]) + '))'
+    def __eq__(self, other): return isinstance(other, Matrix) and [row.values for row in self.rows] == [row.values for row in other.rows]
+
+    __hash__ = None
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    @staticmethod
+    def Identity(size):
+        return Matrix([[1.0 if row == col else 0.0 for col in range(size)] for row in range(size)])
+
+    @staticmethod
+    def Translation(vector):
+        matrix = Matrix.Identity(4)
+        matrix.translation = vector
+        return matrix
+
+    # axis is 'X', 'Y', 'Z' or a vector
+    @staticmethod
+    def Rotation(angle, size, axis):
+        if isinstance(axis, str):
+            values = [0.0, 0.0, 0.0]
+            values[AXIS_NAMES[axis]] = 1.0
+            axis = Vector(values)
+        rotation = Quaternion(axis, angle).to_matrix()
+        return rotation if size == 3 else rotation.to_4x4()
+
+    # along an axis, or the same in all directions
+    @staticmethod
+    def Scale(factor, size, axis = None):
+        matrix = Matrix.Identity(size)
+        for row in range(min(size, 3)):
+            for col in range(min(size, 3)):
+                if axis is None:
+                    matrix.rows[row][col] = factor if row == col else 0.0
+                else:
+                    unit = Vector(axis).normalized()
+                    matrix.rows[row][col] = (1.0 if row == col else 0.0) + (factor - 1) * unit[row] * unit[col]
+        return matrix
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # with a matrix, the product;  with a vector, the vector transformed, a 3D one by a 4x4 as a point
+    def __matmul__(self, other):
+        if isinstance(other, Matrix):
+            columns = list(zip(*[row.values for row in other.rows]))
+            return Matrix([[sum([a * b for a, b in zip(row.values, column)]) for column in columns] for row in self.rows])
+
+        values = list(other)
+        if len(values) == 3 and self.nCols == 4:
+            point = [sum([row.values[col] * values[col] for col in range(3)]) + row.values[3] for row in self.rows]
+            return Vector(point[0:3])
+        return Vector([sum([a * b for a, b in zip(row.values, values)]) for row in self.rows])
+
+    # per element, as mathutils since 2.80
+    def __mul__(self, other):
+        if isinstance(other, (int, float)):
+            return Matrix([[a * other for a in row.values] for row in self.rows])
+        return Matrix([[a * b for a, b in zip(rowA.values, rowB.values)] for rowA, rowB in zip(self.rows, other.rows)])
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def copy(self): return Matrix([row.values for row in self.rows])
+
+    def transposed(self): return Matrix(list(zip(*[row.values for row in self.rows])))
+
+    def transpose(self):
+        self.rows = self.transposed().rows
+
+    def to_3x3(self): return Matrix([row.values[0:3] for row in self.rows[0:3]])
+
+    def to_4x4(self):
+        matrix = Matrix.Identity(4)
+        for row in range(min(self.nRows, 4)):
+            for col in range(min(self.nCols, 4)):
+                matrix.rows[row][col] = self.rows[row][col]
+        return matrix
+
+    @property
+    def translation(self):
+        return Vector([row.values[3] for row in self.rows[0:3]])
+
+    @translation.setter
+    def translation(self, vector):
+        for row in range(3):
+            self.rows[row][3] = vector[row]
+
+    def determinant(self):
+        m = [row.values for row in self.rows]
+        if len(m) == 3:
+            return (m[0][0] * (m[1][1] * m[2][2] - m[1][2] * m[2][1]) - m[0][1] * (m[1][0] * m[2][2] - m[1][2] * m[2][0]) +
+                    m[0][2] * (m[1][0] * m[2][1] - m[1][1] * m[2][0]))
+
+        # expansion along the first row
+        total = 0.0
+        for col in range(len(m)):
+            minor = Matrix([row[0:col] + row[col + 1:] for row in m[1:]])
+            total += (-1 if col % 2 else 1) * m[0][col] * minor.determinant()
+        return total
+
+    # Gauss-Jordan, with partial pivoting
+    def inverted(self, fallback = None):
+        size = self.nRows
+        m = [self.rows[row].values[:] + [1.0 if row == col else 0.0 for col in range(size)] for row in range(size)]
+        for col in range(size):
+            pivot = max(range(col, size), key = lambda row: abs(m[row][col]))
+            if abs(m[pivot][col]) < 1e-12:
+                if fallback is not None: return fallback
+                raise ValueError('Matrix.inverted(): matrix does not have an inverse')
+
+            m[col], m[pivot] = m[pivot], m[col]
+            scale = m[col][col]
+            m[col] = [value / scale for value in m[col]]
+            for row in range(size):
+                if row != col and m[row][col] != 0:
+                    factor = m[row][col]
+                    m[row] = [a - factor * b for a, b in zip(m[row], m[col])]
+
+        return Matrix([row[size:] for row in m])
+
+    def inverted_safe(self):
+        return self.inverted(Matrix.Identity(self.nRows))
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # location, rotation & scale;  the scale is negative when the matrix mirrors, as in Blender
+    def decompose(self):
+        rotation = self.to_3x3()
+        scale = Vector([Vector([rotation.rows[row][col] for row in range(3)]).length for col in range(3)])
+        if rotation.determinant() < 0:
+            scale = -scale
+
+        for row in range(3):
+            for col in range(3):
+                if scale[col] != 0:
+                    rotation.rows[row][col] /= scale[col]
+
+        return self.translation, rotation.to_quaternion(), scale
+
+    def to_quaternion(self):
+        m = [row.values for row in self.to_3x3().rows]
+        trace = m[0][0] + m[1][1] + m[2][2]
+        if trace > 0:
+            s = 0.5 / sqrt(trace + 1.0)
+            values = (0.25 / s, (m[2][1] - m[1][2]) * s, (m[0][2] - m[2][0]) * s, (m[1][0] - m[0][1]) * s)
+        elif m[0][0] > m[1][1] and m[0][0] > m[2][2]:
+            s = 2.0 * sqrt(1.0 + m[0][0] - m[1][1] - m[2][2])
+            values = ((m[2][1] - m[1][2]) / s, 0.25 * s, (m[0][1] + m[1][0]) / s, (m[0][2] + m[2][0]) / s)
+        elif m[1][1] > m[2][2]:
+            s = 2.0 * sqrt(1.0 + m[1][1] - m[0][0] - m[2][2])
+            values = ((m[0][2] - m[2][0]) / s, (m[0][1] + m[1][0]) / s, 0.25 * s, (m[1][2] + m[2][1]) / s)
+        else:
+            s = 2.0 * sqrt(1.0 + m[2][2] - m[0][0] - m[1][1])
+            values = ((m[1][0] - m[0][1]) / s, (m[0][2] + m[2][0]) / s, (m[1][2] + m[2][1]) / s, 0.25 * s)
+
+        quaternion = Quaternion(values).normalized()
+        return quaternion if quaternion.w >= 0 else Quaternion([-a for a in quaternion.values])
+
+    # mat3_normalized_to_eulO of Blender, the one of the 2 solutions with the smallest angles
+    def to_euler(self, order = 'XYZ'):
+        (i, j, k), parity = EULER_ORDERS[order]
+        rows = self.to_3x3().rows
+        columns = [Vector([rows[row][col] for row in range(3)]).normalized() for col in range(3)]
+        mat = lambda col, row: columns[col][row]
+
+        cy = hypot(mat(i, i), mat(i, j))
+        first = [0.0, 0.0, 0.0]
+        second = [0.0, 0.0, 0.0]
+        if cy > 16 * 1.192092896e-07:
+            first[i] = atan2(mat(j, k), mat(k, k))
+            first[j] = atan2(-mat(i, k), cy)
+            first[k] = atan2(mat(i, j), mat(i, i))
+
+            second[i] = atan2(-mat(j, k), -mat(k, k))
+            second[j] = atan2(-mat(i, k), -cy)
+            second[k] = atan2(-mat(i, j), -mat(i, i))
+        else:
+            first[i] = second[i] = atan2(-mat(k, j), mat(j, j))
+            first[j] = second[j] = atan2(-mat(i, k), cy)
+
+        if parity:
+            first = [-a for a in first]
+            second = [-a for a in second]
+
+        best = first if sum([abs(a) for a in first]) <= sum([abs(a) for a in second]) else second
+        return Euler(best, order)
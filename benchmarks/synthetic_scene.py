@@ -0,0 +1,300 @@
+# Builds a synthetic scene to benchmark the exporter with:  meshes of a given number of triangles, each with uv layers,
+# skinned to one armature, with shape keys, & actions for the meshes, the bones & the shape keys;  plus a camera, a light &
+# optionally image textures.  It only uses the API of Blender, so runs the same in Blender, or on a machine without, using
+# the stand-in of bpy & mathutils in benchmarks/stand_in.  From the root of the repo:
+#     blender --background --factory-startup --python benchmarks/synthetic_scene.py -- [options] out.json
+#     python benchmarks/synthetic_scene.py [options] out.json
+# builds the scene, then exports it to out.json, reporting the time of each.  See --help for the options.
+#
+# Meshes are wavy grids, smooth shaded, so that vertices are shared as in a real model.  Actions are named object-action,
+# so each is only exported for its object, except those of the shape keys, which are shared.
+import sys
+from math import ceil, cos, sin, sqrt
+from os import makedirs, path
+
+BENCHMARKS = path.dirname(path.abspath(__file__))
+STAND_IN = path.join(BENCHMARKS, 'stand_in')
+PACKAGE = 'babylon_js'
+
+# in Blender bpy is there already;  elsewhere the stand-in is used.  Either way the add-on is importable after
+def use_stand_in():
+    try:
+        import bpy
+    except ImportError:
+        sys.path.insert(0, STAND_IN)
+        import bpy
+
+    src = path.join(path.dirname(BENCHMARKS), 'src')
+    if src not in sys.path:
+        sys.path.insert(0, src)
+    return bpy.app.version_string.endswith('(stand-in)')
+
+#===============================================================================
+class SceneSpec:
+    def __init__(self, meshes = 4, triangles = 2000, uvLayers = 2, bones = 8, influences = 4, shapeKeys = 2, actions = 2,
+                 keysPerAction = 5, frameStep = 10, textureSize = 0):
+        self.meshes = meshes
+        self.triangles = triangles         # of each mesh
+        self.uvLayers = uvLayers
+        self.bones = bones                 # of the one armature, none when 0
+        self.influences = influences       # most bones weighting a vertex
+        self.shapeKeys = shapeKeys         # of each mesh, besides the Basis
+        self.actions = actions             # of each mesh, of the armature, & shared by the shape keys
+        self.keysPerAction = keysPerAction
+        self.frameStep = frameStep         # between keys
+        self.textureSize = textureSize     # of the base color image of each material, none when 0
+
+    def to_dict(self): return dict(vars(self))
+
+    @staticmethod
+    def add_arguments(parser):
+        for name, value in vars(SceneSpec()).items():
+            parser.add_argument('--' + name, type = int, default = value)
+
+    @staticmethod
+    def from_arguments(args):
+        return SceneSpec(**{name: getattr(args, name) for name in vars(SceneSpec())})
+
+#===============================================================================
+# a grid of rows * cols quads, each 2 triangles, trimmed to nTriangles;  the faces are triangles
+def grid(nTriangles, offset):
+    cols = max(1, ceil(sqrt(nTriangles / 2)))
+    rows = max(1, ceil(nTriangles / 2 / cols))
+
+    vertices = []
+    for row in range(rows + 1):
+        for col in range(cols + 1):
+            x = col / cols * 2 - 1
+            y = row / rows * 2 - 1
+            vertices.append((x + offset, y, 0.1 * sin(3 * x + offset) * cos(3 * y)))
+
+    faces = []
+    for row in range(rows):
+        for col in range(cols):
+            a = row * (cols + 1) + col
+            b, c, d = a + 1, a + cols + 2, a + cols + 1
+            faces.append((a, b, c))
+            faces.append((a, c, d))
+    return vertices, faces[0:nTriangles]
+
+def build_mesh(bpy, spec, idx, material):
+    vertices, faces = grid(spec.triangles, idx * 2.5)
+    mesh = bpy.data.meshes.new('mesh_' + str(idx))
+    mesh.from_pydata(vertices, [], faces)
+    mesh.update()
+    for polygon in mesh.polygons:
+        polygon.use_smooth = True
+
+    # each layer the grid coordinates, moved & scaled a little differently
+    for layerIdx in range(spec.uvLayers):
+        layer = mesh.uv_layers.new(name = 'UVMap' + ('' if layerIdx == 0 else '.' + str(layerIdx)))
+        scale = 1.0 / (layerIdx + 1)
+        for loop in mesh.loops:
+            co = vertices[loop.vertex_index]
+            layer.data[loop.index].uv = ((co[0] - idx * 2.5 + 1) / 2 * scale, (co[1] + 1) / 2 * scale)
+
+    mesh.materials.append(material)
+    obj = bpy.data.objects.new(mesh.name, mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    return obj
+
+# weights by distance along x to the bones, evenly spaced across the grid, quantized so vertices are added in groups
+def skin(bpy, spec, obj, armature):
+    modifier = obj.modifiers.new('Armature', 'ARMATURE')
+    modifier.object = armature
+
+    names = [bone.name for bone in armature.data.bones]
+    groups = [obj.vertex_groups.new(name = name) for name in names]
+    nBones = len(names)
+    influences = min(spec.influences, nBones)
+
+    batches = {}
+    for vertex in obj.data.vertices:
+        position = (vertex.co[0] - obj.data.vertices[0].co[0]) / 2 * (nBones - 1)
+        nearest = min(max(int(round(position)) - influences // 2, 0), nBones - influences)
+        weights = [1.0 / (1.0 + abs(position - boneIdx)) for boneIdx in range(nearest, nearest + influences)]
+        total = sum(weights)
+        for boneIdx, weight in zip(range(nearest, nearest + influences), weights):
+            key = (boneIdx, round(weight / total * 16) / 16)
+            if key[1] > 0: batches.setdefault(key, []).append(vertex.index)
+
+    for (boneIdx, weight), indices in batches.items():
+        groups[boneIdx].add(indices, weight, 'REPLACE')
+
+# each key a wave of its own across the grid
+def add_shape_keys(spec, obj):
+    obj.shape_key_add(name = 'Basis')
+    for keyIdx in range(spec.shapeKeys):
+        block = obj.shape_key_add(name = 'key_' + str(keyIdx), from_mix = False)
+        for idx, point in enumerate(block.data):
+            co = point.co
+            point.co = (co[0], co[1], co[2] + 0.2 * sin((keyIdx + 1) * co[0] + idx % 7))
+#===============================================================================
+def build_armature(bpy, spec):
+    armature = bpy.data.armatures.new('rig')
+    obj = bpy.data.objects.new('rig', armature)
+    bpy.context.scene.collection.objects.link(obj)
+
+    # a binary tree of bones, heads along x
+    bpy.context.view_layer.objects.active = obj
+    bpy.ops.object.mode_set(mode = 'EDIT')
+    bones = []
+    for idx in range(spec.bones):
+        bone = armature.edit_bones.new('bone_' + str(idx))
+        x = -1 + 2 * idx / max(spec.bones - 1, 1)
+        bone.head = (x, 0.0, 0.0)
+        bone.tail = (x, 0.0, 0.5)
+        if idx > 0: bone.parent = bones[(idx - 1) // 2]
+        bones.append(bone)
+    bpy.ops.object.mode_set(mode = 'OBJECT')
+    return obj
+
+def add_keys(action, dataPath, nChannels, spec, value, actionIdx):
+    for channel in range(nChannels):
+        fcurve = action.fcurves.new(dataPath, index = channel)
+        for keyIdx in range(spec.keysPerAction):
+            fcurve.keyframe_points.insert(1 + keyIdx * spec.frameStep, value(channel, keyIdx + actionIdx))
+
+def animate_object(bpy, spec, obj):
+    obj.animation_data_create()
+    location = obj.location.copy()
+    for actionIdx in range(spec.actions):
+        action = bpy.data.actions.new(obj.name + '-action_' + str(actionIdx))
+        add_keys(action, 'location', 3, spec, lambda channel, key: location[channel] + 0.1 * sin(key + channel), actionIdx)
+        add_keys(action, 'rotation_euler', 3, spec, lambda channel, key: 0.2 * sin(key * (channel + 1)), actionIdx)
+        if actionIdx == 0: obj.animation_data.action = action
+
+def animate_bones(bpy, spec, obj):
+    obj.animation_data_create()
+    for actionIdx in range(spec.actions):
+        action = bpy.data.actions.new(obj.name + '-action_' + str(actionIdx))
+        for bone in obj.pose.bones:
+            angle = lambda key: 0.3 * sin(key + len(bone.name))
+            add_keys(action, 'pose.bones["' + bone.name + '"].rotation_quaternion', 4, spec,
+                     lambda channel, key: [cos(angle(key) / 2), sin(angle(key) / 2), 0.0, 0.0][channel], actionIdx)
+        if actionIdx == 0: obj.animation_data.action = action
+
+# one set of actions for the keys of all meshes, as their names are the same
+def shape_key_actions(bpy, spec):
+    actions = []
+    for actionIdx in range(spec.actions):
+        action = bpy.data.actions.new('keys-action_' + str(actionIdx))
+        for keyIdx in range(spec.shapeKeys):
+            add_keys(action, 'key_blocks["key_' + str(keyIdx) + '"].value', 1, spec,
+                     lambda channel, key: 0.5 + 0.5 * sin(key + keyIdx), actionIdx)
+        actions.append(action)
+    return actions
+#===============================================================================
+def build_material(bpy, spec, idx, textureDir):
+    material = bpy.data.materials.new('material_' + str(idx))
+    material.use_nodes = True
+    tree = material.node_tree
+    principled = [node for node in tree.nodes if node.bl_idname == 'ShaderNodeBsdfPrincipled'][0]
+    principled.inputs['Base Color'].default_value = (0.2 + 0.6 * (idx % 5) / 4, 0.5, 0.8, 1.0)
+    principled.inputs['Roughness'].default_value = 0.3 + 0.1 * (idx % 4)
+
+    if spec.textureSize > 0:
+        image = bpy.data.images.new('texture_' + str(idx), spec.textureSize, spec.textureSize)
+        image.generated_color = ((idx % 3) / 2, 0.5, 1 - (idx % 3) / 2, 1.0)
+        image.filepath_raw = path.join(textureDir, image.name + '.png')
+        image.file_format = 'PNG'
+        image.save()
+        image.filepath = image.filepath_raw
+
+        texCoord = tree.nodes.new('ShaderNodeTexCoord')
+        mapping = tree.nodes.new('ShaderNodeMapping')
+        texture = tree.nodes.new('ShaderNodeTexImage')
+        texture.image = image
+        tree.links.new(texCoord.outputs['UV'], mapping.inputs['Vector'])
+        tree.links.new(mapping.outputs['Vector'], texture.inputs['Vector'])
+        tree.links.new(texture.outputs['Color'], principled.inputs['Base Color'])
+    return material
+#===============================================================================
+# the scene built into an empty file, with counts of what it has
+def build_scene(spec, textureDir = None):
+    import bpy
+    bpy.ops.wm.read_factory_settings(use_empty = True)
+    scene = bpy.context.scene
+    if scene.world is None:
+        scene.world = bpy.data.worlds.new('World')
+    scene.world.currentActionOnly = False # all actions are exported, not only those assigned
+
+    if spec.textureSize > 0:
+        makedirs(textureDir, exist_ok = True)
+
+    armature = build_armature(bpy, spec) if spec.bones > 0 else None
+    keyActions = shape_key_actions(bpy, spec) if spec.shapeKeys > 0 else []
+    for idx in range(spec.meshes):
+        obj = build_mesh(bpy, spec, idx, build_material(bpy, spec, idx, textureDir))
+        if armature is not None:
+            skin(bpy, spec, obj, armature)
+        if spec.shapeKeys > 0:
+            add_shape_keys(spec, obj)
+            if len(keyActions) > 0:
+                obj.data.shape_keys.animation_data_create().action = keyActions[0]
+        if spec.actions > 0:
+            animate_object(bpy, spec, obj)
+
+    if armature is not None and spec.actions > 0:
+        animate_bones(bpy, spec, armature)
+
+    camera = bpy.data.objects.new('camera', bpy.data.cameras.new('camera'))
+    camera.location = (0.0, -6.0, 3.0)
+    camera.rotation_euler = (1.1, 0.0, 0.0)
+    scene.collection.objects.link(camera)
+    scene.camera = camera
+
+    light = bpy.data.objects.new('sun', bpy.data.lights.new('sun', 'SUN'))
+    light.location = (2.0, -2.0, 5.0)
+    light.rotation_euler = (0.6, 0.2, 0.0)
+    scene.collection.objects.link(light)
+
+    scene.frame_start = 1
+    scene.frame_end = 1 + max(spec.keysPerAction - 1, 0) * spec.frameStep
+    scene.frame_set(1)
+
+    return {'triangles': spec.meshes * spec.triangles,
+            'vertices': sum([len(obj.data.vertices) for obj in scene.objects if obj.type == 'MESH']),
+            'keys': sum([len(fcurve.keyframe_points) for action in bpy.data.actions for fcurve in action.fcurves])}
+#===============================================================================
+# the export of the scene, as the operator does it
+def export_scene(filepath):
+    import bpy
+    from babylon_js.json_exporter import JsonExporter
+
+    exporter = JsonExporter()
+    exporter.execute(bpy.context, filepath, bpy.context.scene.objects)
+    return exporter
+
+def main():
+    import argparse
+    from time import perf_counter
+
+    standIn = use_stand_in()
+    args = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    parser = argparse.ArgumentParser(description = 'Build a synthetic scene, & export it.')
+    SceneSpec.add_arguments(parser)
+    parser.add_argument('filepath', help = 'the .json to export to;  textures are written next to it')
+    args = parser.parse_args(args)
+
+    import_addon()
+    filepath = path.abspath(args.filepath)
+    start = perf_counter()
+    counts = build_scene(SceneSpec.from_arguments(args), path.join(path.dirname(filepath), 'synthetic_textures'))
+    built = perf_counter() - start
+
+    start = perf_counter()
+    exporter = export_scene(filepath)
+    exported = perf_counter() - start
+
+    print(('stand-in' if standIn else 'Blender') + ', ' + ', '.join([name + ': ' + str(value) for name, value in counts.items()]))
+    print('built in ' + '%.2f' % built + ' secs, exported in ' + '%.2f' % exported + ' secs, ' + str(exporter.nWarnings) + ' warnings, ' +
+          str(exporter.nErrors) + ' errors' + (', ' + exporter.fatalError if exporter.fatalError else ''))
+
+# importing the package registers its properties on the types
+def import_addon():
+    from importlib import import_module
+    return import_module(PACKAGE)
+
+if __name__ == '__main__':
+    main()
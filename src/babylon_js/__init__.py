@@ -11,37 +11,17 @@ bl_info = {
 
 import bpy
 from bpy_extras.io_utils import ExportHelper, ImportHelper
+from time import time
 
-# allow module to be changed during a session (dev purposes)
+STEP_SECS = 0.1 # of exporting between handling events, when run from the window
+
+# allow module to be changed during a session (dev purposes);  the modules of the package are dropped, so all are imported
+# again when next used, in the order they import each other, rather than each reloaded
 if "bpy" in locals():
     print('Reloading .json exporter')
-    import imp
-    if 'materials' in locals():
-        imp.reload(materials)  # directory
-    if 'animation' in locals():
-        imp.reload(animation)
-    if 'armature' in locals():
-        imp.reload(armature)
-    if 'camera' in locals():
-        imp.reload(camera)
-    if 'f_curve_animatable' in locals():
-        imp.reload(f_curve_animatable)
-    if 'js_exporter' in locals():
-        imp.reload(js_exporter)
-    if 'light_shadow' in locals():
-        imp.reload(light_shadow)
-    if 'logging' in locals():
-        imp.reload(logging)
-    if 'mesh' in locals():
-        imp.reload(mesh)
-    if 'package_level' in locals():
-        imp.reload(package_level)
-    if 'shape_key_group' in locals():
-        imp.reload(shape_key_group)
-    if 'sound' in locals():
-        imp.reload(sound)
-    if 'world' in locals():
-        imp.reload(world)
+    import sys
+    for name in [name for name in sys.modules if name.startswith(__name__ + '.')]:
+        del sys.modules[name]
 
 #===============================================================================
 class JsonMain(bpy.types.Operator, ExportHelper):
@@ -76,15 +56,18 @@ class JsonMain(bpy.types.Operator, ExportHelper):
     )
 
     def execute(self, context):
-        from .json_exporter import JsonExporter
+        from .json_exporter import JsonExporter, is_export_in_progress
         from .package_level import get_title, verify_min_blender_version
-        from .shader_disconnect import disconnect_all_shaders, reconnect_all_shaders
         import os
 
         if not verify_min_blender_version():
             self.report({'ERROR'}, 'version of Blender too old.')
             return {'FINISHED'}
 
+        if is_export_in_progress():
+            self.report({'ERROR'}, 'An export is already in progress.')
+            return {'CANCELLED'}
+
         # Determine the file extension based on user selection
         if self.file_extension_type == 'JSON':
             extension = '.json'
@@ -99,28 +82,57 @@ class JsonMain(bpy.types.Operator, ExportHelper):
         filepath_base = os.path.splitext(self.filepath)[0]
         self.filepath = filepath_base + extension
 
-        # Disconnect all shaders BEFORE any export processing
-        disconnect_count = disconnect_all_shaders()
-        print(f'Disconnected {disconnect_count} shader(s) from Material Output')
-
-        try:
-            exporter = JsonExporter()
-            objects = bpy.context.selected_objects if self.export_selected else bpy.context.scene.objects
-            exporter.execute(context, self.filepath, objects)
-
-            if (exporter.fatalError):
-                self.report({'ERROR'}, exporter.fatalError)
-
-            elif (exporter.nErrors > 0):
-                self.report({'ERROR'}, 'Output cancelled due to data error, See log file.')
-
-            elif (exporter.nWarnings > 0):
-                self.report({'WARNING'}, 'Processing completed, but ' + str(exporter.nWarnings) + ' WARNINGS were raised,  see log file.')
-
-        finally:
-            # Reconnect all shaders AFTER export is complete
-            reconnect_count = reconnect_all_shaders()
-            print(f'Reconnected {reconnect_count} shader(s) to Material Output')
+        # shaders of the exported materials are disconnected & reconnected inside, so the counts are in the log
+        exporter = JsonExporter()
+        objects = bpy.context.selected_objects if self.export_selected else bpy.context.scene.objects
+
+        # in a window, the export is stepped from a timer, so the progress is drawn & Esc can cancel it;  the live context is
+        # passed, since the one given to execute is not valid once it returns
+        if context.window is not None and not bpy.app.background:
+            self.exporter = exporter
+            self.steps = exporter.execute_steps(bpy.context, self.filepath, objects)
+            self.timer = context.window_manager.event_timer_add(0.01, window = context.window)
+            context.window_manager.modal_handler_add(self)
+            return {'RUNNING_MODAL'}
+
+        exporter.execute(context, self.filepath, objects)
+        return self.report_result(exporter)
+
+    def modal(self, context, event):
+        from .progress import Progress
+
+        if event.type == 'ESC':
+            Progress.request_cancel()
+
+        elif event.type == 'TIMER':
+            # a few steps each time, so events are still handled between them
+            start = time()
+            try:
+                while time() - start < STEP_SECS:
+                    next(self.steps)
+            except StopIteration:
+                context.window_manager.event_timer_remove(self.timer)
+                return self.report_result(self.exporter)
+            except:
+                context.window_manager.event_timer_remove(self.timer)
+                raise
+
+        # everything else is ignored while exporting, so the scene is not changed under it
+        return {'RUNNING_MODAL'}
+
+    def report_result(self, exporter):
+        if exporter.fatalError == 'Export cancelled':
+            self.report({'WARNING'}, exporter.fatalError)
+            return {'CANCELLED'}
+
+        elif (exporter.fatalError):
+            self.report({'ERROR'}, exporter.fatalError)
+
+        elif (exporter.nErrors > 0):
+            self.report({'ERROR'}, 'Output cancelled due to data error, See log file.')
+
+        elif (exporter.nWarnings > 0):
+            self.report({'WARNING'}, 'Processing completed, but ' + str(exporter.nWarnings) + ' WARNINGS were raised,  see log file.')
 
         return {'FINISHED'}
 
@@ -139,22 +151,54 @@ class JsonMain(bpy.types.Operator, ExportHelper):
         if self.file_extension_type == 'CUSTOM':
             self.layout.prop(self, 'custom_extension')
 #===============================================================================
-# The list of classes which sub-class a Blender class, which needs to be registered
-from . import camera
-from . import light_shadow
-from . import materials # directory
-from . import world # must be defined before mesh
-from . import mesh
+class BJS_OT_LiveSync(bpy.types.Operator):
+    bl_idname = 'bjs.live_sync'
+    bl_label = 'Live Sync'
+    bl_description = 'Start or stop serving this scene to a local viewer, pushing what changes as it is edited'
+
+    def execute(self, context):
+        from .live_sync import SCENE_FILE, is_running, start_server, stop_server
+
+        if is_running():
+            stop_server()
+            self.report({'INFO'}, 'Live sync stopped')
+            return {'FINISHED'}
+
+        try:
+            server = start_server(context, context.scene.world.liveSyncPort, context.scene.world.liveSyncOrigin)
+        except OSError as ex:
+            stop_server()
+            self.report({'ERROR'}, 'Live sync could not start:  ' + str(ex))
+            return {'CANCELLED'}
+
+        if server.lastError is not None:
+            self.report({'WARNING'}, 'Live sync started, but the export failed:  ' + server.lastError)
+        else:
+            self.report({'INFO'}, 'Live sync at http://127.0.0.1:' + str(server.port) + '/' + SCENE_FILE)
+        return {'FINISHED'}
+#===============================================================================
+# The list of classes which sub-class a Blender class, which needs to be registered.  Only the properties & panels are
+# imported at start up;  the export itself is imported by the operators, the first time one executes.
+from . import camera_props
+from . import chunking_props
+from . import light_props
+from .materials import material_props
+from . import world_props # must be defined before mesh
+from . import mesh_props
+from . import shader_disconnect
+from . import incremental
 classes = (
     # Operator sub-classes
     JsonMain,
+    BJS_OT_LiveSync,
 
     # Panel sub-classes
-    camera.BJS_PT_CameraPanel,
-    light_shadow.BJS_PT_LightPanel,
-    materials.material.BJS_PT_MaterialsPanel,
-    mesh.BJS_PT_MeshPanel,
-    world.BJS_PT_WorldPanel
+    camera_props.BJS_PT_CameraPanel,
+    chunking_props.BJS_PT_CollectionPanel,
+    light_props.BJS_PT_LightPanel,
+    material_props.BJS_PT_MaterialsPanel,
+    mesh_props.BJS_PT_MeshPanel,
+    world_props.BJS_PT_WorldPanel
 )
 
 def register():
@@ -163,6 +207,15 @@ def register():
         register_class(cls)
     bpy.types.TOPBAR_MT_file_export.append(menu_func)
 
+    # put back any shader links an export which never finished left in a saved file
+    bpy.app.handlers.load_post.append(shader_disconnect.recover_on_load)
+
+    # what changes between exports, for incremental export
+    bpy.app.handlers.depsgraph_update_post.append(incremental.track_updates)
+    bpy.app.handlers.load_post.append(incremental.forget_on_load)
+    bpy.app.handlers.undo_post.append(incremental.dirty_on_undo)
+    bpy.app.handlers.redo_post.append(incremental.dirty_on_undo)
+
 def unregister():
     from bpy.utils import unregister_class
     for cls in reversed(classes):
@@ -170,6 +223,21 @@ def unregister():
 
     bpy.types.TOPBAR_MT_file_export.remove(menu_func)
 
+    if shader_disconnect.recover_on_load in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(shader_disconnect.recover_on_load)
+
+    for handlers, handler in [(bpy.app.handlers.depsgraph_update_post, incremental.track_updates), (bpy.app.handlers.load_post, incremental.forget_on_load),
+                              (bpy.app.handlers.undo_post, incremental.dirty_on_undo), (bpy.app.handlers.redo_post, incremental.dirty_on_undo)]:
+        if handler in handlers:
+            handlers.remove(handler)
+    incremental.forget_previous()
+
+    # only running when it has been imported
+    import sys
+    live_sync = sys.modules.get(__name__ + '.live_sync')
+    if live_sync is not None:
+        live_sync.stop_server()
+
 # Registration the calling of the INFO_MT_file_export file selector
 def menu_func(self, context):
     from .package_level import get_title
@@ -1,5 +1,6 @@
 from .logging import *
 from .package_level import *
+from .progress import *
 import math
 
 import bpy
@@ -19,6 +20,8 @@ ANIMATIONLOOPMODE_CYCLE = 1
 #ANIMATIONLOOPMODE_CONSTANT = 2
 #===============================================================================
 class AnimationRange:
+    __slots__ = ('name', 'frames_in', 'frame_start', 'frames_out', 'highest_frame_in', 'frame_end')
+
     # constructor called by the static actionPrep method
     def __init__(self, name, frames, frameOffset):
         # process input args to members
@@ -88,7 +91,10 @@ class AnimationRange:
         return frameOffset + 10 - remainder
 
 #===============================================================================
+# one per animated property of every node, bone, & shape key, so slots instead of an instance dictionary
 class Animation:
+    __slots__ = ('dataType', 'framePerSecond', 'loopBehavior', 'name', 'propertyInBabylon', 'attrInBlender', 'mult', 'xOffset', 'frames', 'values')
+
     def __init__(self, dataType, loopBehavior, name, propertyInBabylon, attrInBlender = None, mult = 1, xOffset = 0):
         self.dataType = dataType
         self.framePerSecond = bpy.context.scene.render.fps
@@ -109,12 +115,13 @@ class Animation:
     def append_range(self, object, animationRange):
         # action already assigned, always using poses, not every frame, build up again filtering by attrInBlender
         for idx in range(len(animationRange.frames_in)):
-            print('idx: ' + str(idx) + ', value: ' + str(animationRange.frames_in[idx]))
+            Logger.debug('idx: ' + str(idx) + ', value: ' + str(animationRange.frames_in[idx]), 3)
             bpy.context.scene.frame_set(animationRange.frames_in[idx])
             bpy.context.view_layer.update() # insure localmatrices updated
 
             self.frames.append(animationRange.frames_out[idx])
             self.values.append(self.get_attr(object))
+            Progress.advance(WEIGHT_FRAME_CHANNEL)
 
         return len(animationRange.frames_in) > 0
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -158,6 +165,8 @@ class Animation:
         file_handler.write('}')
 #===============================================================================
 class VectorAnimation(Animation):
+    __slots__ = ()
+
     def __init__(self, object, propertyInBabylon, attrInBlender, mult = 1, xOffset = 0):
         super().__init__(ANIMATIONTYPE_VECTOR3, ANIMATIONLOOPMODE_CYCLE, propertyInBabylon + ' animation', propertyInBabylon, attrInBlender, mult, xOffset)
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -177,6 +186,8 @@ class VectorAnimation(Animation):
         return scale_vector(value, self.mult, self.xOffset)
 #===============================================================================
 class QuaternionAnimation(Animation):
+    __slots__ = ()
+
     def __init__(self, object, propertyInBabylon, attrInBlender, mult = 1, xOffset = 0):
         super().__init__(ANIMATIONTYPE_QUATERNION, ANIMATIONLOOPMODE_CYCLE, propertyInBabylon + ' animation', propertyInBabylon, attrInBlender, mult, xOffset)
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -184,6 +195,8 @@ class QuaternionAnimation(Animation):
         return post_rotate_quaternion(getattr(object, self.attrInBlender), self.xOffset)
 #===============================================================================
 class QuaternionToEulerAnimation(Animation):
+    __slots__ = ()
+
     def __init__(self, propertyInBabylon, attrInBlender, mult = 1, xOffset = 0):
         super().__init__(ANIMATIONTYPE_VECTOR3, ANIMATIONLOOPMODE_CYCLE, propertyInBabylon + ' animation', propertyInBabylon, attrInBlender, mult, Offset)
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -1,6 +1,7 @@
 from .animation import *
 from .logging import *
 from .package_level import *
+from .progress import *
 
 import bpy
 from math import radians
@@ -9,6 +10,9 @@ from mathutils import Vector, Matrix
 DEFAULT_LIB_NAME = 'Same as filename'
 #===============================================================================
 class Bone:
+    __slots__ = ('index', 'name', 'length', 'posedBone', 'parentBone', 'parentBoneIndex', 'matrix_world', 'matrix',
+                 'rest', 'restHead', 'restTail', 'animation', 'previousBoneMatrix')
+
     def __init__(self, bpyBone, bpySkeleton, bjsIndex):
         self.index = bjsIndex
         Logger.log('processing begun of bone:  ' + bpyBone.name + ', index:  '+ str(self.index), 2)
@@ -21,9 +25,10 @@ class Bone:
         self.matrix = self.get_bone_matrix()
 
         #animation
+        self.animation = None
+        self.previousBoneMatrix = None
         if (bpySkeleton.animation_data):
             self.animation = Animation(ANIMATIONTYPE_MATRIX, ANIMATIONLOOPMODE_CYCLE, 'anim', '_matrix')
-            self.previousBoneMatrix = None
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
    # not done in constructor, as some skeleton changes may cause parent to be proccessed before children
     def assignParentIndex(self, bjsBones):
@@ -68,7 +73,7 @@ class Bone:
         write_float(file_handler, 'length', self.length)
 
         #animation
-        if hasattr(self, 'animation'):
+        if self.animation is not None:
             file_handler.write('\n,"animation":')
             self.animation.to_json_file(file_handler)
 
@@ -80,6 +85,7 @@ class Skeleton:
         self.name = bpySkeleton.name
         self.id = id
         self.bones = []
+        self.ranges = None
 
         for idx, bone in enumerate(bpySkeleton.pose.bones):
             if ignoreIKBones and Skeleton.isIkName(bone.name):
@@ -97,27 +103,30 @@ class Skeleton:
             original_action = bpySkeleton.animation_data.action
             self.ranges = []
             frameOffset = 0
-            for action in bpy.data.actions:
-                # get the range / assigning the action to the object
-                animationRange = AnimationRange.actionPrep(bpySkeleton, action, FRAME_BASED_ANIMATION, frameOffset)
-                if animationRange is None:
-                    continue
-
-                Logger.log('processing action ' + animationRange.to_string(), 2)
-                self.ranges.append(animationRange)
-
-                nFrames = len(animationRange.frames_in)
-                for idx in range(nFrames):
-                    bpy.context.scene.frame_set(animationRange.frames_in[idx])
-                    firstOrLast = idx == 0 or idx == nFrames - 1
-
-                    for bone in self.bones:
-                        bone.append_animation_pose(animationRange.frames_out[idx], firstOrLast)
-
-                frameOffset = animationRange.frame_end
-                
-            bpySkeleton.animation_data.action = original_action
-            
+            try:
+                for action in bpy.data.actions:
+                    # get the range / assigning the action to the object
+                    animationRange = AnimationRange.actionPrep(bpySkeleton, action, FRAME_BASED_ANIMATION, frameOffset)
+                    if animationRange is None:
+                        continue
+
+                    Logger.log('processing action ' + animationRange.to_string(), 2)
+                    self.ranges.append(animationRange)
+
+                    nFrames = len(animationRange.frames_in)
+                    for idx in range(nFrames):
+                        bpy.context.scene.frame_set(animationRange.frames_in[idx])
+                        firstOrLast = idx == 0 or idx == nFrames - 1
+
+                        for bone in self.bones:
+                            bone.append_animation_pose(animationRange.frames_out[idx], firstOrLast)
+                        Progress.advance(len(self.bones) * WEIGHT_FRAME_CHANNEL)
+
+                    frameOffset = animationRange.frame_end
+
+            finally:
+                bpySkeleton.animation_data.action = original_action
+
         # mode_set's only work when there is an active object, switch bones to edit mode to rest position
         context.view_layer.objects.active = bpySkeleton
         bpy.ops.object.mode_set(mode='EDIT')
@@ -191,7 +200,7 @@ class Skeleton:
 
         file_handler.write(']')
 
-        if hasattr(self, 'ranges'):
+        if self.ranges is not None:
             file_handler.write('\n,"ranges":[')
             first = True
             for range in self.ranges:
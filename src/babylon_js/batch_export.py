@@ -0,0 +1,265 @@
+# Exports many .blend files from the command line, each in its own background Blender, a bounded number at a time:
+#     python batch_export.py --blender /path/to/blender --out exported --jobs 4 "scenes/**/*.blend"
+#     blender --background --python batch_export.py -- --out exported --jobs 4 scenes/a.blend scenes/b.blend
+#
+# Each file is exported to a .json of the same name under --out, in the same sub-directory it has below the directory all
+# the files are in, so scenes/a/x.blend & scenes/b/x.blend become exported/a/x.json & exported/b/x.json.
+#
+# --settings is a JSON file of World export settings, e.g. {"usePBRMaterials": true, "textureDir": "textures"}, which can
+# also have a "files" object of settings by that same path of a .blend, e.g. "a/x.blend", applied over the others.  Failed files are retried --retries
+# times.  A summary of each file, with its warnings, errors & time, is printed & written to --report.  The exit status is 0
+# when all files export, 1 when any does not, & 2 for bad arguments.
+#
+# Ctrl+C cancels:  the running workers, which get it too, stop their exports at the next checkpoint, leaving no half written
+# files, files not yet started are skipped, & the summary is still written.  A second Ctrl+C stops the launcher at once.
+#
+# The same script is the worker, run by the launcher as:
+#     blender --background --factory-startup file.blend --python batch_export.py -- --worker job.json
+# It only needs the add-on's package next to it, not for the add-on to be installed or enabled.
+import sys
+from os import makedirs, path
+
+# run as a script, its own directory is first on sys.path, where the package's logging.py would hide the standard library's
+if len(sys.path) > 0 and path.abspath(sys.path[0] or '.') == path.dirname(path.abspath(__file__)):
+    del sys.path[0]
+
+import argparse
+import glob
+import json
+import signal
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import mkdtemp
+from shutil import rmtree
+from threading import Event
+from time import time
+
+SCRIPT = path.abspath(__file__)
+PACKAGE_PARENT = path.dirname(path.dirname(SCRIPT))
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+interrupted = Event() # set by Ctrl+C in the launcher, so no more workers are started
+#===============================================================================
+#  worker, inside Blender
+#===============================================================================
+def run_worker(jobFile):
+    import bpy
+    sys.path.insert(0, PACKAGE_PARENT)
+    from babylon_js.json_exporter import JsonExporter
+    from babylon_js.progress import Progress
+
+    # Ctrl+C cancels the export where it is, so the result is still written;  outside of one, it interrupts as usual
+    def on_interrupt(signum, frame):
+        if not Progress.request_cancel():
+            raise KeyboardInterrupt
+    signal.signal(signal.SIGINT, on_interrupt)
+
+    with open(jobFile, 'r', encoding='utf8') as file_handler:
+        job = json.load(file_handler)
+
+    result = {'nWarnings': 0, 'nErrors': 0, 'fatalError': None, 'exception': None}
+    start_time = time()
+    try:
+        scene = bpy.context.scene
+        for key, value in job['settings'].items():
+            if not hasattr(scene.world, key):
+                raise ValueError('unknown export setting:  ' + key)
+            setattr(scene.world, key, value)
+
+        exporter = JsonExporter()
+        exporter.execute(bpy.context, job['output'], scene.objects)
+        result['nWarnings'] = exporter.nWarnings
+        result['nErrors'] = exporter.nErrors
+        result['fatalError'] = exporter.fatalError
+
+    except Exception as ex:
+        result['exception'] = str(ex)
+
+    result['seconds'] = time() - start_time
+    with open(job['result'], 'w', encoding='utf8') as file_handler:
+        json.dump(result, file_handler)
+
+    failed = result['exception'] is not None or result['fatalError'] is not None or result['nErrors'] > 0
+    sys.exit(EXIT_FAILED if failed else EXIT_OK)
+#===============================================================================
+#  launcher
+#===============================================================================
+class BatchJob:
+    def __init__(self, blendFile, output, settings):
+        self.blendFile = blendFile
+        self.output = output
+        self.settings = settings
+        self.attempts = 0
+        self.result = None
+        self.returnCode = None
+        self.workerOutput = ''
+
+    def succeeded(self):
+        return self.returnCode == EXIT_OK and self.result is not None
+
+    def getLogFile(self):
+        return self.output.rpartition('.')[0] + '.log'
+
+    # the warning & error lines of the exporter's log, which are what is worth reading in a summary
+    def getLogProblems(self):
+        if not path.isfile(self.getLogFile()): return []
+        with open(self.getLogFile(), 'r', encoding='utf8', errors='replace') as file_handler:
+            return [line.strip() for line in file_handler if 'WARNING:' in line or 'ERROR:' in line]
+
+    def getSummary(self):
+        summary = {'blend': self.blendFile, 'output': self.output, 'succeeded': self.succeeded(), 'attempts': self.attempts,
+                   'returnCode': self.returnCode, 'log': self.getLogFile(), 'problems': self.getLogProblems()}
+        if self.result is not None:
+            summary.update(self.result)
+        if not self.succeeded():
+            summary['workerOutput'] = self.workerOutput[-4000:] # the end, where Blender reports what went wrong
+        return summary
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+def run_job(blender, job, tempDir, idx, timeout):
+    if interrupted.is_set():
+        job.workerOutput = 'not started, interrupted'
+        return job
+
+    job.attempts += 1
+    jobFile = path.join(tempDir, 'job' + str(idx) + '_' + str(job.attempts) + '.json')
+    resultFile = jobFile.rpartition('.')[0] + '_result.json'
+    with open(jobFile, 'w', encoding='utf8') as file_handler:
+        json.dump({'output': job.output, 'settings': job.settings, 'result': resultFile}, file_handler)
+
+    args = [blender, '--background', '--factory-startup', job.blendFile, '--python-exit-code', str(EXIT_FAILED), '--python', SCRIPT, '--', '--worker', jobFile]
+    try:
+        completed = subprocess.run(args, stdout = subprocess.PIPE, stderr = subprocess.STDOUT, timeout = timeout)
+        job.returnCode = completed.returncode
+        job.workerOutput = completed.stdout.decode('utf8', errors='replace')
+    except subprocess.TimeoutExpired:
+        job.returnCode = None
+        job.workerOutput = 'timed out after ' + str(timeout) + ' secs'
+
+    job.result = None
+    if path.isfile(resultFile):
+        with open(resultFile, 'r', encoding='utf8') as file_handler:
+            job.result = json.load(file_handler)
+
+    print(('exported:  ' if job.succeeded() else 'FAILED:  ') + job.blendFile + ', attempt ' + str(job.attempts), flush = True)
+    return job
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+def get_jobs(args):
+    blendFiles = []
+    for pattern in args.files:
+        matches = sorted(glob.glob(pattern, recursive = True))
+        blendFiles += matches if len(matches) > 0 else [pattern]
+
+    settings = {}
+    if args.settings:
+        with open(args.settings, 'r', encoding='utf8') as file_handler:
+            settings = json.load(file_handler)
+    perFile = settings.pop('files', {})
+
+    blendFiles = list(dict.fromkeys([path.abspath(blendFile) for blendFile in blendFiles])) # in order, once each
+    for blendFile in blendFiles:
+        if not path.isfile(blendFile):
+            raise ValueError('not a file:  ' + blendFile)
+
+    # files of the same name in different directories get their own output, & settings, by their path below the directory
+    # all are in;  when that is one directory, it is just the name
+    baseDir = path.commonpath([path.dirname(blendFile) for blendFile in blendFiles]) if len(blendFiles) > 0 else ''
+
+    jobs = []
+    for blendFile in blendFiles:
+        relative = path.relpath(blendFile, baseDir).replace(path.sep, '/')
+        jobSettings = dict(settings)
+        jobSettings.update(perFile.get(relative, {}))
+        output = path.abspath(path.join(args.out, relative.rpartition('.')[0] + '.json'))
+        jobs.append(BatchJob(blendFile, output, jobSettings))
+
+    return jobs
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+def run_launcher(argv):
+    parser = argparse.ArgumentParser(prog = 'batch_export.py', description = 'Export .blend files to babylon.js JSON, in background Blender workers')
+    parser.add_argument('files', nargs = '+', help = '.blend files, or glob patterns of them')
+    parser.add_argument('--out', default = '.', help = 'directory of the exported files')
+    parser.add_argument('--settings', help = 'JSON file of World export settings, with optional per file ones under "files"')
+    parser.add_argument('--jobs', type = int, default = 2, help = 'number of Blender workers at a time')
+    parser.add_argument('--retries', type = int, default = 1, help = 'times a failed file is tried again')
+    parser.add_argument('--timeout', type = float, default = None, help = 'seconds before a worker is stopped')
+    parser.add_argument('--blender', default = None, help = 'Blender executable; the running one when inside Blender')
+    parser.add_argument('--report', default = None, help = 'where to write the JSON summary, default batch_report.json in --out')
+    args = parser.parse_args(argv)
+
+    blender = args.blender
+    if blender is None:
+        try:
+            import bpy
+            blender = bpy.app.binary_path
+        except ImportError:
+            blender = 'blender'
+
+    try:
+        jobs = get_jobs(args)
+    except (ValueError, OSError) as ex:
+        print('batch_export:  ' + str(ex), file = sys.stderr)
+        return EXIT_USAGE
+
+    for outDir in dict.fromkeys([args.out] + [path.dirname(job.output) for job in jobs]):
+        if not path.isdir(outDir):
+            makedirs(outDir)
+
+    # the first Ctrl+C lets the running workers cancel & report, any other is the default KeyboardInterrupt
+    def on_interrupt(signum, frame):
+        print('interrupted, cancelling running exports', flush = True)
+        interrupted.set()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+    signal.signal(signal.SIGINT, on_interrupt)
+
+    start_time = time()
+    tempDir = mkdtemp(prefix = 'bjs_batch_')
+    try:
+        pending = list(enumerate(jobs))
+        with ThreadPoolExecutor(max_workers = max(1, args.jobs)) as pool:
+            for attempt in range(args.retries + 1):
+                if len(pending) == 0 or interrupted.is_set(): break
+                if attempt > 0:
+                    print('retrying ' + str(len(pending)) + ' failed files', flush = True)
+
+                list(pool.map(lambda item: run_job(blender, item[1], tempDir, item[0], args.timeout), pending))
+                pending = [item for item in pending if not item[1].succeeded()]
+    finally:
+        rmtree(tempDir, ignore_errors = True)
+
+    summaries = [job.getSummary() for job in jobs]
+    nFailed = len([summary for summary in summaries if not summary['succeeded']])
+    report = {'files': summaries, 'nFiles': len(jobs), 'nFailed': nFailed,
+              'nWarnings': sum([summary.get('nWarnings', 0) for summary in summaries]),
+              'interrupted': interrupted.is_set(), 'seconds': time() - start_time}
+
+    reportFile = args.report or path.join(args.out, 'batch_report.json')
+    with open(reportFile, 'w', encoding='utf8') as file_handler:
+        json.dump(report, file_handler, indent = 2)
+
+    print('========= Batch export summary =========')
+    for summary in summaries:
+        status = 'ok    ' if summary['succeeded'] else 'FAILED'
+        seconds = summary.get('seconds')
+        print(status + '  ' + summary['blend'] + '  warnings: ' + str(summary.get('nWarnings', '-')) + ', errors: ' + str(summary.get('nErrors', '-')) +
+              ', attempts: ' + str(summary['attempts']) + ', ' + ('%.1f secs' % seconds if seconds is not None else 'no result'))
+        for problem in summary['problems']:
+            print('        ' + problem)
+        if summary.get('exception'):
+            print('        exception:  ' + summary['exception'])
+    print(str(len(jobs) - nFailed) + ' of ' + str(len(jobs)) + ' exported in ' + '%.1f secs' % report['seconds'] + ', report:  ' + reportFile)
+
+    return EXIT_FAILED if nFailed > 0 else EXIT_OK
+#===============================================================================
+def main():
+    # when run by Blender, the script's own arguments are after --
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    if len(argv) == 2 and argv[0] == '--worker':
+        run_worker(argv[1])
+    else:
+        sys.exit(run_launcher(argv))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+from .logging import *
+from .package_level import *
+
+from mathutils import Vector
+
+DEF_OCTREE_CAPACITY = 64
+DEF_OCTREE_MAX_DEPTH = 2
+#===============================================================================
+# axis aligned box & sphere of a range of positions, in the space of the positions.  Positions are a flat buffer of x, y, z,
+# like the array('f') of a mesh;  indexes are of whole positions, not floats
+class BoundingInfo:
+    def __init__(self, positions, beginIdx = 0, firstNotIncludedIdx = -1):
+        endIdx = len(positions) // 3 if firstNotIncludedIdx == -1 else firstNotIncludedIdx
+        xs = positions[beginIdx * 3     : endIdx * 3 : 3]
+        ys = positions[beginIdx * 3 + 1 : endIdx * 3 : 3]
+        zs = positions[beginIdx * 3 + 2 : endIdx * 3 : 3]
+        if endIdx <= beginIdx:
+            self.minimum = Vector((0, 0, 0))
+            self.maximum = Vector((0, 0, 0))
+        else:
+            self.minimum = Vector((min(xs), min(ys), min(zs)))
+            self.maximum = Vector((max(xs), max(ys), max(zs)))
+
+        # the sphere is around the box center, but only as large as the farthest position, not the corner of the box
+        self.center = (self.minimum + self.maximum) / 2
+        cx, cy, cz = self.center
+        radiusSquared = 0
+        for x, y, z in zip(xs, ys, zs):
+            radiusSquared = max(radiusSquared, (x - cx) ** 2 + (y - cy) ** 2 + (z - cz) ** 2)
+        self.radius = radiusSquared ** 0.5
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    @staticmethod
+    def fromBox(minimum, maximum):
+        ret = BoundingInfo([])
+        ret.minimum = minimum.copy()
+        ret.maximum = maximum.copy()
+        ret.center = (minimum + maximum) / 2
+        ret.radius = (maximum - minimum).length / 2
+        return ret
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # returns the axis aligned box around the 8 corners of this box, once transformed by matrix
+    def transformed(self, matrix):
+        minimum = Vector(( float('inf'),  float('inf'),  float('inf')))
+        maximum = Vector((-float('inf'), -float('inf'), -float('inf')))
+        for x in (self.minimum.x, self.maximum.x):
+            for y in (self.minimum.y, self.maximum.y):
+                for z in (self.minimum.z, self.maximum.z):
+                    corner = matrix @ Vector((x, y, z))
+                    for axis in range(3):
+                        if minimum[axis] > corner[axis]: minimum[axis] = corner[axis]
+                        if maximum[axis] < corner[axis]: maximum[axis] = corner[axis]
+        return minimum, maximum
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def to_json_file(self, file_handler, precision):
+        write_vector(file_handler, 'boundingBoxMinimum', self.minimum, precision)
+        write_vector(file_handler, 'boundingBoxMaximum', self.maximum, precision)
+        write_vector(file_handler, 'boundingSphereCenter', self.center, precision)
+        write_float(file_handler, 'boundingSphereRadius', self.radius, precision)
+#===============================================================================
+# grows minimum & maximum, by reference, to include another box
+def expand_bounds(minimum, maximum, otherMin, otherMax):
+    for axis in range(3):
+        if minimum[axis] > otherMin[axis]: minimum[axis] = otherMin[axis]
+        if maximum[axis] < otherMax[axis]: maximum[axis] = otherMax[axis]
+
+def bounds_intersect(minA, maxA, minB, maxB):
+    for axis in range(3):
+        if minA[axis] > maxB[axis] or maxA[axis] < minB[axis]: return False
+    return True
+#===============================================================================
+# Same partitioning as BABYLON.Octree:  a block with more entries than capacity is split in 8, until max depth.
+# Entries are only held by leaf blocks, & an entry is in every leaf block its box intersects.
+class OctreeBlock:
+    def __init__(self, minimum, maximum, entries, capacity, depth, maxDepth):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.blocks = []
+        self.entries = [entry for entry in entries if bounds_intersect(minimum, maximum, entry.minimum, entry.maximum)]
+
+        if len(self.entries) > capacity and depth < maxDepth:
+            half = (maximum - minimum) / 2
+            for x in range(2):
+                for y in range(2):
+                    for z in range(2):
+                        blockMin = minimum + Vector((half.x * x, half.y * y, half.z * z))
+                        self.blocks.append(OctreeBlock(blockMin, blockMin + half, self.entries, capacity, depth + 1, maxDepth))
+            self.entries = []
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # returns the entries of all leaf blocks intersecting the box, entries can be repeated
+    def query(self, minimum, maximum, results):
+        if not bounds_intersect(self.minimum, self.maximum, minimum, maximum): return
+
+        for block in self.blocks:
+            block.query(minimum, maximum, results)
+
+        for entry in self.entries:
+            if bounds_intersect(entry.minimum, entry.maximum, minimum, maximum):
+                results.append(entry)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def to_json_file(self, file_handler, precision):
+        file_handler.write('{')
+        file_handler.write('"minimum":[' + format_vector(self.minimum, precision) + ']')
+        write_vector(file_handler, 'maximum', self.maximum, precision)
+        if len(self.blocks) > 0:
+            file_handler.write(',"blocks":[')
+            first = True
+            for block in self.blocks:
+                if first != True:
+                    file_handler.write(',')
+                first = False
+                block.to_json_file(file_handler, precision)
+            file_handler.write(']')
+        else:
+            file_handler.write(',"meshes":[')
+            first = True
+            for entry in self.entries:
+                if first != True:
+                    file_handler.write(',')
+                first = False
+                file_handler.write('"' + entry.name + '"')
+            file_handler.write(']')
+        file_handler.write('}')
+#===============================================================================
+# a world space box of a mesh, instance, or anything with a name
+class OctreeEntry:
+    def __init__(self, name, minimum, maximum, item = None):
+        self.name = name
+        self.minimum = minimum
+        self.maximum = maximum
+        self.item = item
+#===============================================================================
+class Octree:
+    def __init__(self, entries, capacity = DEF_OCTREE_CAPACITY, maxDepth = DEF_OCTREE_MAX_DEPTH):
+        self.capacity = capacity
+        self.maxDepth = maxDepth
+        self.nEntries = len(entries)
+
+        minimum = Vector(( float('inf'),  float('inf'),  float('inf')))
+        maximum = Vector((-float('inf'), -float('inf'), -float('inf')))
+        for entry in entries:
+            expand_bounds(minimum, maximum, entry.minimum, entry.maximum)
+
+        if len(entries) == 0:
+            minimum = Vector((0, 0, 0))
+            maximum = Vector((0, 0, 0))
+
+        self.root = OctreeBlock(minimum, maximum, entries, capacity, 0, maxDepth)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # returns each entry intersecting the box once, in no particular order
+    def query(self, minimum, maximum):
+        results = []
+        self.root.query(minimum, maximum, results)
+
+        unique = {}
+        for entry in results:
+            unique[id(entry)] = entry
+        return list(unique.values())
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def to_json_file(self, file_handler, precision):
+        file_handler.write('"octree":{')
+        write_int(file_handler, 'capacity', self.capacity, True)
+        write_int(file_handler, 'maxDepth', self.maxDepth)
+        file_handler.write(',"root":')
+        self.root.to_json_file(file_handler, precision)
+        file_handler.write('}')
@@ -2,30 +2,12 @@ from .logging import *
 from .package_level import *
 
 from .f_curve_animatable import *
+from .camera_props import *
 
 import bpy
 import math
 import mathutils
 
-# camera class names, never formally defined in Babylon, but used in babylonFileLoader
-ARC_ROTATE_CAM = 'ArcRotateCamera'
-DEV_ORIENT_CAM = 'DeviceOrientationCamera'
-FOLLOW_CAM = 'FollowCamera'
-UNIVERSAL_CAM = 'UniversalCamera'
-GAMEPAD_CAM = 'GamepadCamera'
-TOUCH_CAM = 'TouchCamera'
-V_JOYSTICKS_CAM = 'VirtualJoysticksCamera'
-
-# 3D camera rigs, defined in BABYLON.Camera, must be strings to be in 'dropdown'
-RIG_MODE_NONE = '0'
-RIG_MODE_STEREOSCOPIC_ANAGLYPH = '10'
-RIG_MODE_STEREOSCOPIC_SIDEBYSIDE_PARALLEL = '11'
-RIG_MODE_STEREOSCOPIC_SIDEBYSIDE_CROSSEYED = '12'
-RIG_MODE_STEREOSCOPIC_OVERUNDER = '13'
-RIG_MODE_VR = '20'
-
-DEF_CHECK_COLLISIONS = False
-DEF_APPLY_GRAVITY = False
 #===============================================================================
 class Camera(FCurveAnimatable):
     def __init__(self, bpyCamera, exporter):
@@ -130,83 +112,3 @@ class Camera(FCurveAnimatable):
 
         super().to_json_file(file_handler) # Animations
         file_handler.write('}')
-#===============================================================================
-bpy.types.Camera.autoAnimate = bpy.props.BoolProperty(
-    name='Auto launch animations',
-    description='',
-    default = False
-)
-bpy.types.Camera.CameraType = bpy.props.EnumProperty(
-    name='Camera Type',
-    description='',
-    # ONLY Append, or existing .blends will have their camera changed
-    items = (
-             (V_JOYSTICKS_CAM        , 'Virtual Joysticks'       , 'Use Virtual Joysticks Camera'),
-             (TOUCH_CAM              , 'Touch'                   , 'Use Touch Camera'),
-             (GAMEPAD_CAM            , 'Gamepad'                 , 'Use Gamepad Camera'),
-             (UNIVERSAL_CAM          , 'Universal'               , 'Use Universal Camera'),
-             (FOLLOW_CAM             , 'Follow'                  , 'Use Follow Camera'),
-             (DEV_ORIENT_CAM         , 'Device Orientation'      , 'Use Device Orientation Camera'),
-             (ARC_ROTATE_CAM         , 'Arc Rotate'              , 'Use Arc Rotate Camera')
-            ),
-    default = UNIVERSAL_CAM
-)
-bpy.types.Camera.checkCollisions = bpy.props.BoolProperty(
-    name='Check Collisions',
-    description='',
-    default = DEF_CHECK_COLLISIONS
-)
-bpy.types.Camera.applyGravity = bpy.props.BoolProperty(
-    name='Apply Gravity',
-    description='',
-    default = DEF_APPLY_GRAVITY
-)
-bpy.types.Camera.ellipsoid = bpy.props.FloatVectorProperty(
-    name='Ellipsoid',
-    description='Not used except for a collision system.  Enter Coordinates in Y-UP terms',
-    default = mathutils.Vector((0.2, 0.9, 0.2))
-)
-bpy.types.Camera.Camera3DRig = bpy.props.EnumProperty(
-    name='Rig',
-    description='',
-    items = (
-             (RIG_MODE_NONE                             , 'None'                  , 'No 3D effects'),
-             (RIG_MODE_STEREOSCOPIC_ANAGLYPH            , 'Anaglyph'              , 'Stereoscopic Anagylph'),
-             (RIG_MODE_STEREOSCOPIC_SIDEBYSIDE_PARALLEL , 'side-by-side Parallel' , 'Stereoscopic side-by-side parallel'),
-             (RIG_MODE_STEREOSCOPIC_SIDEBYSIDE_CROSSEYED, 'side-by-side crosseyed', 'Stereoscopic side-by-side crosseyed'),
-             (RIG_MODE_STEREOSCOPIC_OVERUNDER           , 'over-under'            , 'Stereoscopic over-under'),
-             (RIG_MODE_VR                               , 'VR distortion'         , 'Use Web VR Free Camera')
-            ),
-    default = RIG_MODE_NONE
-)
-bpy.types.Camera.interaxialDistance = bpy.props.FloatProperty(
-    name='Interaxial Distance',
-    description='Distance between cameras.  Used by all but VR 3D rigs.',
-    default = 0.0637
-)
-#===============================================================================
-class BJS_PT_CameraPanel(bpy.types.Panel):
-    bl_label = get_title()
-    bl_space_type = 'PROPERTIES'
-    bl_region_type = 'WINDOW'
-    bl_context = 'data'
-
-    @classmethod
-    def poll(cls, context):
-        ob = context.object
-        return ob is not None and isinstance(ob.data, bpy.types.Camera)
-
-    def draw(self, context):
-        ob = context.object
-        layout = self.layout
-        layout.prop(ob.data, 'CameraType')
-        layout.prop(ob.data, 'checkCollisions')
-        layout.prop(ob.data, 'applyGravity')
-        layout.prop(ob.data, 'ellipsoid')
-
-        box = layout.box()
-        box.label(text="3D Camera Rigs")
-        box.prop(ob.data, 'Camera3DRig')
-        box.prop(ob.data, 'interaxialDistance')
-
-        layout.prop(ob.data, 'autoAnimate')
\ No newline at end of file
@@ -0,0 +1,279 @@
+from .logging import *
+from .package_level import *
+
+from .bounding import *
+from .chunking_props import *
+
+import bpy
+from io import open
+from os import path
+
+COMMON_CHUNK = 'common'
+
+#===============================================================================
+# Everything written to one separately loadable file.  The root chunk has no name.
+class SceneChunk:
+    def __init__(self, name, nameSpace):
+        self.name = name
+        if name is None:
+            self.fileName = nameSpace + '.json'
+        else:
+            self.fileName = nameSpace + '-' + legal_js_identifier(name) + '.json'
+
+        self.materials = []
+        self.multiMaterials = []
+        self.skeletons = []
+        self.meshesAndNodes = []
+        self.morphTargetMngrs = []
+        self.animationGroupers = []
+        self.sounds = []
+        self.dependencies = []
+        self.textures = []
+        self.nBytes = 0
+        self.nTextureBytes = 0
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def isEmpty(self):
+        return len(self.materials) + len(self.multiMaterials) + len(self.skeletons) + len(self.meshesAndNodes) == 0
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def addDependency(self, chunkName):
+        if chunkName is not None and chunkName != self.name and chunkName not in self.dependencies:
+            self.dependencies.append(chunkName)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # world space box of the meshes & their instances, nodes have no bounds
+    def getBounds(self):
+        minimum = None
+        for mesh in self.meshesAndNodes:
+            if not hasattr(mesh, 'boundingInfo'): continue
+
+            for entry in mesh.getOctreeEntries():
+                if minimum is None:
+                    minimum = entry.minimum.copy()
+                    maximum = entry.maximum.copy()
+                else:
+                    expand_bounds(minimum, maximum, entry.minimum, entry.maximum)
+
+        return (minimum, maximum) if minimum is not None else None
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def getMeshNames(self):
+        names = []
+        for mesh in self.meshesAndNodes:
+            names.append(mesh.name)
+            if hasattr(mesh, 'instances'):
+                for instance in mesh.instances:
+                    names.append(instance.name)
+        return names
+#===============================================================================
+# Splits the export by top level collection, or by the chunk name assigned to any collection.  Materials, multi-materials
+# & skeletons used by more than one chunk are written once, to a common chunk.  Cameras, lights, shadow generators & what is
+# directly in the scene collection stay in the root file.  Lights run on the root file, so which of their shadow casters &
+# included meshes are in a chunk is put in the manifest, for the viewer to assign after appending it.
+class SceneChunker:
+    def __init__(self, exporter):
+        self.exporter = exporter
+        nameSpace = exporter.nameSpace
+
+        self.root = SceneChunk(None, nameSpace)
+        self.common = SceneChunk(COMMON_CHUNK, nameSpace)
+        self.chunks = {} # by chunk name, in order of collections
+
+        collectionChunks = SceneChunker.getCollectionChunks(exporter.scene)
+
+        # assign meshes & nodes, then everything which follows a mesh
+        meshChunks = {} # chunk name of each mesh & instance name, None for the root
+        for mesh in exporter.meshesAndNodes:
+            chunk = self.getChunk(collectionChunks.get(SceneChunker.getCollectionName(mesh)))
+            chunk.meshesAndNodes.append(mesh)
+            meshChunks[mesh.name] = chunk.name
+            if hasattr(mesh, 'instances'):
+                for instance in mesh.instances:
+                    meshChunks[instance.name] = chunk.name
+
+        self.meshChunks = meshChunks
+
+        for mesh in exporter.morphTargetMngrs:
+            self.getChunk(meshChunks[mesh.name]).morphTargetMngrs.append(mesh)
+
+        for mesh in exporter.animationGroupers:
+            self.getChunk(meshChunks[mesh.name]).animationGroupers.append(mesh)
+
+        for sound in exporter.sounds:
+            chunkName = meshChunks.get(sound.connectedMeshId) if hasattr(sound, 'connectedMeshId') else None
+            self.getChunk(chunkName).sounds.append(sound)
+
+        # parents in other chunks need to be loaded first
+        for mesh in exporter.meshesAndNodes:
+            if getattr(mesh, 'parentId', None) is not None:
+                self.getChunk(meshChunks[mesh.name]).addDependency(meshChunks.get(mesh.parentId))
+
+        self.assignShared(meshChunks)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # top level collection of each collection, unless a collection was assigned its own chunk name
+    @staticmethod
+    def getCollectionChunks(scene):
+        collectionChunks = {}
+
+        def assign(collection, chunkName):
+            if len(collection.chunkName) > 0:
+                chunkName = collection.chunkName
+            collectionChunks[collection.name] = chunkName
+            for child in collection.children:
+                assign(child, chunkName)
+
+        for collection in scene.collection.children:
+            assign(collection, collection.name)
+
+        return collectionChunks
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # nodes do not record a collection name, see Light
+    @staticmethod
+    def getCollectionName(mesh):
+        if hasattr(mesh, 'collectionName'):
+            return mesh.collectionName
+
+        object = bpy.data.objects.get(mesh.name)
+        if object is None or len(object.users_collection) == 0: return None
+        return object.users_collection[0].name
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def getChunk(self, chunkName):
+        if chunkName is None:
+            return self.root
+        if chunkName == COMMON_CHUNK:
+            return self.common
+
+        if chunkName not in self.chunks:
+            self.chunks[chunkName] = SceneChunk(chunkName, self.exporter.nameSpace)
+        return self.chunks[chunkName]
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # a shared item goes to common, unless only the root uses it;  the root is always loaded first
+    def getOwner(self, users):
+        if len(users) == 1:
+            return self.getChunk(next(iter(users)))
+        if len(users) == 0 or None in users:
+            return self.root
+        return self.common
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def assignShared(self, meshChunks):
+        exporter = self.exporter
+        materialUsers = {} # chunk names using each material, or multi-material, by name
+        skeletonUsers = {}
+        for mesh in exporter.meshesAndNodes:
+            chunkName = meshChunks[mesh.name]
+            if hasattr(mesh, 'materialId'):
+                materialUsers.setdefault(mesh.materialId, set()).add(chunkName)
+            if hasattr(mesh, 'skeletonId'):
+                skeletonUsers.setdefault(mesh.skeletonId, set()).add(chunkName)
+
+        # the materials of a multi-material are used wherever it is
+        for multimaterial in exporter.multiMaterials:
+            users = materialUsers.get(multimaterial.name, set())
+            owner = self.getOwner(users)
+            owner.multiMaterials.append(multimaterial)
+            self.addSharedDependency(owner, users)
+
+            for material in multimaterial.material_slots:
+                materialUsers.setdefault(material.name, set()).update(users)
+
+        for material in exporter.materials:
+            users = materialUsers.get(material.name, set())
+            owner = self.getOwner(users)
+            owner.materials.append(material)
+            self.addSharedDependency(owner, users)
+
+            for texture in material.textures.values():
+                if texture.fileNoPath is not None and texture.inlineData is None and texture.fileNoPath not in owner.textures:
+                    owner.textures.append(texture.fileNoPath)
+
+        for skeleton in exporter.skeletons:
+            users = skeletonUsers.get(skeleton.id, set())
+            owner = self.getOwner(users)
+            owner.skeletons.append(skeleton)
+            self.addSharedDependency(owner, users)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def addSharedDependency(self, owner, users):
+        if owner is not self.common: return
+        for chunkName in users:
+            self.getChunk(chunkName).addDependency(COMMON_CHUNK)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def write(self):
+        exporter = self.exporter
+        dirName = path.dirname(exporter.filepathMinusExtension)
+
+        ordered = [self.common] + list(self.chunks.values())
+        for chunk in [self.root] + ordered:
+            if chunk is not self.root and chunk.isEmpty(): continue
+
+            filepath = path.join(dirName, chunk.fileName)
+            exporter.write_json_file(filepath, chunk.fileName, chunk.materials, chunk.multiMaterials, chunk.skeletons, chunk.meshesAndNodes,
+                                     chunk.morphTargetMngrs, chunk.animationGroupers, chunk.sounds, chunk is self.root)
+
+            chunk.nBytes = path.getsize(filepath)
+            # file names of textures already include the texture directory, relative to the .json
+            for texture in chunk.textures:
+                textureFile = path.join(dirName, texture)
+                if path.isfile(textureFile):
+                    chunk.nTextureBytes += path.getsize(textureFile)
+
+            Logger.log('chunk ' + (chunk.name if chunk.name else '(root)') + ':  ' + format_int(len(chunk.meshesAndNodes)) + ' meshes & nodes, ' +
+                       format_int(len(chunk.materials) + len(chunk.multiMaterials)) + ' materials, ' + format_int(chunk.nBytes) + ' bytes, textures ' +
+                       format_int(chunk.nTextureBytes) + ' bytes', 1)
+
+        self.write_manifest(path.join(dirName, exporter.nameSpace + '.chunks.json'), [chunk for chunk in ordered if not chunk.isEmpty()])
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def write_manifest(self, filepath, chunks):
+        precision = self.exporter.settings.positionsPrecision
+        file_handler = open(filepath, 'w', encoding='utf8')
+        file_handler.write('{')
+        write_string(file_handler, 'root', self.root.fileName, True)
+        write_int(file_handler, 'rootBytes', self.root.nBytes)
+
+        file_handler.write(',\n"chunks":[')
+        first = True
+        for chunk in chunks:
+            if first != True:
+                file_handler.write(',\n')
+            first = False
+
+            file_handler.write('{')
+            write_string(file_handler, 'name', chunk.name, True)
+            write_string(file_handler, 'file', chunk.fileName)
+            write_int(file_handler, 'bytes', chunk.nBytes)
+            write_int(file_handler, 'textureBytes', chunk.nTextureBytes)
+
+            bounds = chunk.getBounds()
+            if bounds is not None:
+                write_vector(file_handler, 'boundingBoxMinimum', bounds[0], precision)
+                write_vector(file_handler, 'boundingBoxMaximum', bounds[1], precision)
+
+            SceneChunker.write_names(file_handler, 'dependencies', chunk.dependencies)
+            SceneChunker.write_names(file_handler, 'meshes', chunk.getMeshNames())
+            SceneChunker.write_names(file_handler, 'textures', chunk.textures)
+
+            self.write_light_lists(file_handler, 'shadowCasters', chunk, [(shadowGen.lightId, shadowGen.shadowCasters) for shadowGen in self.exporter.shadowGenerators])
+            self.write_light_lists(file_handler, 'lightInclusions', chunk, [(light.name, light.includedOnlyMeshesIds) for light in self.exporter.lights if hasattr(light, 'includedOnlyMeshesIds')])
+            file_handler.write('}')
+
+        file_handler.write(']')
+        file_handler.write('\n}')
+        file_handler.close()
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # of the meshes listed by each light, those in this chunk, by light name
+    def write_light_lists(self, file_handler, name, chunk, lightLists):
+        file_handler.write(',"' + name + '":{')
+        first = True
+        for lightName, meshNames in lightLists:
+            inChunk = [meshName for meshName in meshNames if self.meshChunks.get(meshName) == chunk.name]
+            if len(inChunk) == 0: continue
+
+            if first != True:
+                file_handler.write(',')
+            first = False
+            file_handler.write('"' + lightName + '":[')
+            file_handler.write(','.join(['"' + meshName + '"' for meshName in inChunk]))
+            file_handler.write(']')
+        file_handler.write('}')
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    @staticmethod
+    def write_names(file_handler, name, names):
+        file_handler.write(',"' + name + '":[')
+        file_handler.write(','.join(['"' + value + '"' for value in names]))
+        file_handler.write(']')
@@ -0,0 +1,24 @@
+from .package_level import get_title
+
+import bpy
+
+#===============================================================================
+bpy.types.Collection.chunkName = bpy.props.StringProperty(
+    name='Chunk Name',
+    description='When exporting in chunks, put this collection & its children in a chunk of this name,\ninstead of the one of its top level collection.  Collections can share a name',
+    default = ''
+)
+#===============================================================================
+class BJS_PT_CollectionPanel(bpy.types.Panel):
+    bl_label = get_title()
+    bl_space_type = 'PROPERTIES'
+    bl_region_type = 'WINDOW'
+    bl_context = 'collection'
+
+    @classmethod
+    def poll(cls, context):
+        return context.collection is not None and context.collection is not context.scene.collection
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(context.collection, 'chunkName')
@@ -0,0 +1,277 @@
+from .logging import *
+from .package_level import *
+
+from .export_cache import *
+from .materials.bake_cache import hash_image
+from .texture_resize import TextureResizer
+
+import bpy
+import json
+import struct
+import zlib
+from hashlib import sha1
+from io import open
+from math import pi, sqrt
+from os import path
+from shutil import copy
+from time import time
+import numpy
+
+# Babylon.js .env layout:  these bytes, a JSON manifest ended by a 0, then a png of each face of each mip level
+ENV_MAGIC = bytes([0x86, 0x16, 0x87, 0x96, 0xf6, 0xd6, 0x96, 0x36])
+LOD_GENERATION_SCALE = 0.8
+RGBD_MAX_RANGE = 255.0
+GAMMA = 2.2
+
+# mips this size & smaller are convolved with GGX; the lobe of larger ones is about a texel, where box filtering is as good
+GGX_MAX_FACE_SIZE = 32
+GGX_SOURCE_SIZE = 64
+GGX_CHUNK = 256 # destination texels a matrix product, to bound memory
+
+# bump when a change would make previously cached .env files wrong
+ENV_CACHE_VERSION = '1'
+
+# in cube face order +X, -X, +Y, -Y, +Z, -Z:  the normal, then the directions of a column & of a row of the image
+FACES = (((1, 0, 0), (0, 0, -1), (0, -1, 0)),
+         ((-1, 0, 0), (0, 0, 1), (0, -1, 0)),
+         ((0, 1, 0), (1, 0, 0), (0, 0, 1)),
+         ((0, -1, 0), (1, 0, 0), (0, 0, -1)),
+         ((0, 0, 1), (1, 0, 0), (0, -1, 0)),
+         ((0, 0, -1), (-1, 0, 0), (0, -1, 0)))
+
+#===============================================================================
+# Does what HDRCubeTexture does on each client at load time, once at export:  projects the equirectangular image of the
+# world onto a cube, convolves it with GGX for each mip level of roughness, & gets the spherical polynomial of the diffuse
+# irradiance.  The result is a .env file, which is loaded as a pre-filtered CubeTexture.  The projection is the one of
+# HDRCubeTexture, so an environment looks the same either way.
+class EnvironmentPrefilter:
+    def __init__(self, exporter, image, size):
+        self.exporter = exporter
+        self.image = image
+        self.size = size
+        self.nMips = size.bit_length()
+
+        self.cache = None
+        if exporter.settings.useBakeCache:
+            self.cache = ExportCache(path.join(exporter.getBakeCacheDir(), 'environment'), exporter.settings.bakeCacheMaxMB * 1024 * 1024, 'environment cache')
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # returns the file written to the texture directory, or None when the image has no pixels
+    def write(self, fileName):
+        start_time = time()
+        filepath = path.join(self.exporter.textureFullPathDir, fileName)
+        Logger.log('pre-filtering environment ' + self.image.name + ' to ' + fileName + ', ' + format_int(self.size) + ' px / face', 3)
+
+        try:
+            cacheKey = None
+            if self.cache is not None:
+                hasher = sha1()
+                hasher.update((ENV_CACHE_VERSION + str(self.size)).encode())
+                hash_image(hasher, self.image)
+                cacheKey = hasher.hexdigest()
+
+                cachedFile = self.cache.lookup(cacheKey)
+                if cachedFile is not None:
+                    copy(cachedFile, filepath)
+                    Logger.log('pre-filtered environment from cache', 4)
+                    return fileName
+
+            width, height = self.image.size
+            if width == 0 or height == 0:
+                Logger.warn('environment image has no pixels, not pre-filtered:  ' + self.image.name, 4)
+                return None
+
+            equirect = self.readEquirect(width, height)
+            with open(filepath, 'wb') as file_handler:
+                self.writeEnv(file_handler, equirect)
+
+            if cacheKey is not None:
+                self.cache.store(cacheKey, '.env', lambda cacheFile: copy(filepath, cacheFile))
+        finally:
+            if self.cache is not None: self.cache.close()
+
+        Logger.log('pre-filter time:  ' + format_f(time() - start_time) + ' secs', 4)
+        return fileName
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # linear rgb, top row first, no larger than needed for the faces
+    def readEquirect(self, width, height):
+        pixels = numpy.empty(width * height * 4, dtype = numpy.float32)
+        self.image.pixels.foreach_get(pixels)
+        pixels = pixels.reshape((height, width, 4))[::-1, :, 0:3]
+
+        # 4 faces around the equator
+        return TextureResizer.downscale(pixels, min(width, self.size * 4), min(height, self.size * 2))
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def writeEnv(self, file_handler, equirect):
+        faces, solidAngles = EnvironmentPrefilter.getFaceDirections(self.size)
+        mips = [EnvironmentPrefilter.sampleEquirect(equirect, faces)]
+
+        # the GGX source & the irradiance are from a smaller cube, averaged from the first
+        sourceSize = min(GGX_SOURCE_SIZE, self.size)
+        source = EnvironmentPrefilter.boxDown(mips[0], self.size // sourceSize)
+        sourceDirs, sourceAngles = EnvironmentPrefilter.getFaceDirections(sourceSize)
+        sourceDirs = sourceDirs.reshape((-1, 3))
+        sourceAngles = numpy.broadcast_to(sourceAngles, (6, sourceSize, sourceSize)).reshape(-1)
+        source = source.reshape((-1, 3))
+
+        for mip in range(1, self.nMips):
+            faceSize = self.size >> mip
+            if faceSize > GGX_MAX_FACE_SIZE:
+                mips.append(EnvironmentPrefilter.boxDown(mips[-1], 2))
+            else:
+                alpha = min(1.0, 2 ** (mip / LOD_GENERATION_SCALE) / self.size)
+                dirs = EnvironmentPrefilter.getFaceDirections(faceSize)[0]
+                mips.append(EnvironmentPrefilter.convolveGGX(dirs, sourceDirs, source, sourceAngles, alpha))
+
+        images = []
+        for mipPixels in mips:
+            for face in range(6):
+                images.append(encode_png(EnvironmentPrefilter.toRGBD(mipPixels[face])))
+
+        mipmaps = []
+        position = 0
+        for image in images:
+            mipmaps.append({'length': len(image), 'position': position})
+            position += len(image)
+
+        manifest = {
+            'version': 1,
+            'width': self.size,
+            'irradiance': EnvironmentPrefilter.getSphericalPolynomial(sourceDirs, source, sourceAngles),
+            'specular': {'mipmaps': mipmaps, 'lodGenerationScale': LOD_GENERATION_SCALE},
+            'imageType': 'image/png'
+        }
+
+        file_handler.write(ENV_MAGIC)
+        file_handler.write(json.dumps(manifest).encode('utf8'))
+        file_handler.write(b'\0')
+        for image in images:
+            file_handler.write(image)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # unit direction of the center of each texel, & the solid angle of a texel, which is the same for each face
+    @staticmethod
+    def getFaceDirections(size):
+        coords = (numpy.arange(size, dtype = numpy.float32) + 0.5) / size * 2 - 1
+        u = coords[numpy.newaxis, :]
+        v = coords[:, numpy.newaxis]
+
+        dirs = numpy.empty((6, size, size, 3), dtype = numpy.float32)
+        for idx, (normal, xAxis, yAxis) in enumerate(FACES):
+            for c in range(3):
+                dirs[idx, :, :, c] = normal[c] + u * xAxis[c] + v * yAxis[c]
+
+        dirs /= numpy.linalg.norm(dirs, axis = 3, keepdims = True)
+        solidAngles = (2 / size) ** 2 / (1 + u * u + v * v) ** 1.5
+        return dirs, solidAngles
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # bilinear, with the same projection as HDRCubeTexture
+    @staticmethod
+    def sampleEquirect(equirect, dirs):
+        height, width = equirect.shape[0:2]
+        theta = numpy.arctan2(dirs[..., 2], dirs[..., 0])
+        phi = numpy.arccos(numpy.clip(dirs[..., 1], -1, 1))
+
+        fx = (theta / pi * 0.5 + 0.5) * width - 0.5
+        fy = phi / pi * height - 0.5
+        x0 = numpy.floor(fx)
+        y0 = numpy.floor(fy)
+        tx = (fx - x0)[..., numpy.newaxis]
+        ty = (fy - y0)[..., numpy.newaxis]
+
+        x0 = x0.astype(numpy.int64) % width
+        x1 = (x0 + 1) % width
+        y1 = numpy.clip(y0 + 1, 0, height - 1).astype(numpy.int64)
+        y0 = numpy.clip(y0, 0, height - 1).astype(numpy.int64)
+
+        top    = equirect[y0, x0] * (1 - tx) + equirect[y0, x1] * tx
+        bottom = equirect[y1, x0] * (1 - tx) + equirect[y1, x1] * tx
+        return (top * (1 - ty) + bottom * ty).astype(numpy.float32)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    @staticmethod
+    def boxDown(faces, factor):
+        if factor == 1: return faces
+
+        size = faces.shape[1] // factor
+        return faces.reshape((6, size, factor, size, factor, 3)).mean(axis = (2, 4))
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # each texel, as the normal, view & reflection, is the GGX weighted average of the source
+    @staticmethod
+    def convolveGGX(dirs, sourceDirs, source, sourceAngles, alpha):
+        size = dirs.shape[1]
+        dirs = dirs.reshape((-1, 3))
+        result = numpy.empty((len(dirs), 3), dtype = numpy.float32)
+        alpha2 = alpha * alpha
+
+        for start in range(0, len(dirs), GGX_CHUNK):
+            cosines = dirs[start : start + GGX_CHUNK] @ sourceDirs.T
+            NdotH2 = (1 + cosines) * 0.5 # of the half vector, from the angle to the light
+            denominator = NdotH2 * (alpha2 - 1) + 1
+            weights = alpha2 / (pi * denominator * denominator) * numpy.maximum(cosines, 0) * sourceAngles
+
+            # the texel's own direction always has weight, so the sum is never 0
+            result[start : start + GGX_CHUNK] = (weights @ source) / weights.sum(axis = 1, keepdims = True)
+
+        return result.reshape((6, size, size, 3))
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # projects onto the 9 spherical harmonics, converts radiance to irradiance, then to the polynomial Babylon evaluates
+    @staticmethod
+    def getSphericalPolynomial(dirs, colors, solidAngles):
+        x, y, z = dirs[:, 0], dirs[:, 1], dirs[:, 2]
+        c1 = sqrt(3 / (4 * pi))
+        c2 = sqrt(15 / (4 * pi))
+        basis = [numpy.full(len(dirs), sqrt(1 / (4 * pi))), # l00
+                 -c1 * y, # l1-1
+                  c1 * z, # l10
+                 -c1 * x, # l11
+                  c2 * x * y, # l2-2
+                 -c2 * y * z, # l2-1
+                  sqrt(5 / (16 * pi)) * (3 * z * z - 1), # l20
+                 -c2 * x * z, # l21
+                  sqrt(15 / (16 * pi)) * (x * x - y * y)] # l22
+
+        # solid angles of texels do not quite sum to the sphere
+        weights = solidAngles * (4 * pi / solidAngles.sum())
+        sh = [(b * weights) @ colors for b in basis]
+
+        # cosine lobe convolution, then / pi for lambertian radiance
+        bands = [pi, 2 * pi / 3, 2 * pi / 3, 2 * pi / 3, pi / 4, pi / 4, pi / 4, pi / 4, pi / 4]
+        sh = [coef * band / pi for coef, band in zip(sh, bands)]
+        l00, l1_1, l10, l11, l2_2, l2_1, l20, l21, l22 = sh
+
+        polynomial = {
+            'x' : -1.02333 * l11,
+            'y' : -1.02333 * l1_1,
+            'z' :  1.02333 * l10,
+            'xx': 0.886277 * l00 - 0.247708 * l20 + 0.429043 * l22,
+            'yy': 0.886277 * l00 - 0.247708 * l20 - 0.429043 * l22,
+            'zz': 0.886277 * l00 + 0.495417 * l20,
+            'yz': -0.858086 * l2_1,
+            'zx': -0.858086 * l21,
+            'xy':  0.858086 * l2_2
+        }
+        return {key: [float(value) / pi for value in rgb] for key, rgb in polynomial.items()}
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # rgb scaled into 0 - 1 by the divisor in alpha, then gamma encoded, as Babylon's toRGBD
+    @staticmethod
+    def toRGBD(pixels):
+        maxRGB = numpy.maximum(pixels.max(axis = 2, keepdims = True), 1e-7)
+        D = numpy.maximum(RGBD_MAX_RANGE / maxRGB, 1)
+        D = numpy.clip(numpy.floor(D) / 255, 0, 1)
+        rgb = numpy.clip((pixels * D) ** (1 / GAMMA), 0, 1)
+
+        rgbd = numpy.concatenate((rgb, D), axis = 2)
+        return numpy.round(rgbd * 255).astype(numpy.uint8)
+#===============================================================================
+# The values are encoded data, not colors, so the png is written directly rather than through a Blender image, which
+# could color manage them.  Rows are top first, of 8 bit rgba.
+def encode_png(rgba):
+    height, width = rgba.shape[0:2]
+    raw = numpy.zeros((height, width * 4 + 1), dtype = numpy.uint8) # a 0 filter byte at the start of each row
+    raw[:, 1:] = rgba.reshape((height, width * 4))
+
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+    return (b'\x89PNG\r\n\x1a\n' +
+            chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)) +
+            chunk(b'IDAT', zlib.compress(raw.tobytes(), 9)) +
+            chunk(b'IEND', b''))
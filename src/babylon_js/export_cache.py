@@ -0,0 +1,84 @@
+from .logging import *
+from .package_level import *
+
+import json
+from io import open
+from os import path, makedirs, remove
+from time import time
+
+INDEX_FILE = 'index.json'
+
+#===============================================================================
+# A directory of files from previous exports, each stored under the hash of everything which went into making it.
+# When over the size limit, the least recently used files are removed.  The index is only written in close().
+class ExportCache:
+    def __init__(self, directory, maxBytes, description):
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.description = description
+        self.nHits = 0
+        self.nMisses = 0
+        self.nEvicted = 0
+
+        if not path.isdir(directory):
+            makedirs(directory)
+
+        self.entries = {} # by key, of {'file', 'bytes', 'used'}
+        indexFile = path.join(directory, INDEX_FILE)
+        if path.isfile(indexFile):
+            try:
+                with open(indexFile, 'r', encoding='utf8') as file_handler:
+                    self.entries = json.load(file_handler)
+            except ValueError:
+                Logger.warn(description + ' index unreadable, starting empty:  ' + indexFile)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # returns the full path of the file stored for the key, or None
+    def lookup(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            filepath = path.join(self.directory, entry['file'])
+            if path.isfile(filepath):
+                entry['used'] = time()
+                self.nHits += 1
+                return filepath
+
+            del self.entries[key]
+
+        self.nMisses += 1
+        return None
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # writer is passed the full path to write to, returns that path
+    def store(self, key, extension, writer):
+        fileName = key + extension
+        filepath = path.join(self.directory, fileName)
+        writer(filepath)
+
+        self.entries[key] = {'file': fileName, 'bytes': path.getsize(filepath), 'used': time()}
+        self.evict()
+        return filepath
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def evict(self):
+        total = 0
+        for entry in self.entries.values():
+            total += entry['bytes']
+
+        if total <= self.maxBytes: return
+
+        for key, entry in sorted(self.entries.items(), key = lambda item: item[1]['used']):
+            if total <= self.maxBytes: break
+
+            try:
+                remove(path.join(self.directory, entry['file']))
+            except OSError:
+                pass
+
+            total -= entry['bytes']
+            del self.entries[key]
+            self.nEvicted += 1
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def close(self):
+        with open(path.join(self.directory, INDEX_FILE), 'w', encoding='utf8') as file_handler:
+            json.dump(self.entries, file_handler)
+
+        if self.nHits + self.nMisses > 0:
+            Logger.log(self.description + ' hits:  ' + format_int(self.nHits) + ', misses:  ' + format_int(self.nMisses) + ', evicted:  ' + format_int(self.nEvicted), 1)
@@ -5,9 +5,13 @@ from .package_level import *
 import bpy
 #===============================================================================
 class FCurveAnimatable:
+    # sub-classes without slots of their own, like Mesh, still get an instance dictionary
+    __slots__ = ('animationsPresent', 'animations', 'ranges', 'autoAnimate', 'autoAnimateFrom', 'autoAnimateTo', 'autoAnimateLoop')
+
     def define_animations(self, object, supportsRotation, supportsPosition, supportsScaling, xOffsetForRotation = 0):
         currentActionOnly = bpy.context.scene.world.currentActionOnly
         sceneLevelAutoAnimate = bpy.context.scene.world.autoAnimate
+        self.autoAnimate = False
 
         # just because a sub-class can be animatable does not mean it is
         self.animationsPresent = object.animation_data and object.animation_data.action
@@ -36,33 +40,37 @@ class FCurveAnimatable:
 
             currentAction = object.animation_data.action
             currentFrame = bpy.context.scene.frame_current
-            for action in bpy.data.actions:
+            # the action & frame are put back, even when cancelled part way through
+            try:
+                for action in bpy.data.actions:
+
+                    if currentActionOnly and currentAction.name != action.name:
+                        continue
 
-                if currentActionOnly and currentAction.name != action.name:
-                    continue
+                    # get the range / assigning the action to the object
+                    animationRange = AnimationRange.actionPrep(object, action, False, frameOffset)
+                    if animationRange is None:
+                        continue
 
-                # get the range / assigning the action to the object
-                animationRange = AnimationRange.actionPrep(object, action, False, frameOffset)
-                if animationRange is None:
-                    continue
+                    hasData = False
+                    if supportsRotation:
+                        hasData = rotAnimation.append_range(object, animationRange)
 
-                hasData = False
-                if supportsRotation:
-                    hasData = rotAnimation.append_range(object, animationRange)
+                    if supportsPosition:
+                        hasData |= posAnimation.append_range(object, animationRange)
 
-                if supportsPosition:
-                    hasData |= posAnimation.append_range(object, animationRange)
+                    if supportsScaling:
+                        hasData |= scaleAnimation.append_range(object, animationRange)
 
-                if supportsScaling:
-                    hasData |= scaleAnimation.append_range(object, animationRange)
+                    if hasData:
+                        Logger.log('processing action ' + animationRange.to_string(), 3)
+                        self.ranges.append(animationRange)
+                        frameOffset = animationRange.frame_end
 
-                if hasData:
-                    Logger.log('processing action ' + animationRange.to_string(), 3)
-                    self.ranges.append(animationRange)
-                    frameOffset = animationRange.frame_end
+            finally:
+                object.animation_data.action = currentAction
+                bpy.context.scene.frame_set(currentFrame)
 
-            object.animation_data.action = currentAction
-            bpy.context.scene.frame_set(currentFrame)
             #Set Animations
             self.animations = []
             if supportsRotation and len(rotAnimation.frames) > 0:
@@ -107,7 +115,7 @@ class FCurveAnimatable:
 
             file_handler.write(']')
 
-            if (hasattr(self, "autoAnimate") and self.autoAnimate):
+            if self.autoAnimate:
                 write_bool(file_handler, 'autoAnimate', self.autoAnimate)
                 write_int(file_handler, 'autoAnimateFrom', self.autoAnimateFrom)
                 write_int(file_handler, 'autoAnimateTo', self.autoAnimateTo)
@@ -0,0 +1,240 @@
+# Re-export of only what changed since the last export, within the same Blender session.  A depsgraph handler notes the
+# objects, mesh data, materials & actions changed after an export;  the next export of the same file makes Mesh objects
+# & materials again for only those, & re-uses those of the last export for everything else.  What each mesh & material
+# wrote is kept as text, so writing an unchanged one is only a copy.  Skeletons, cameras, lights & shadow generators are
+# always made again, since they are cheap & depend on the meshes.
+#
+# Anything not able to be followed per object does a whole export:  a change to the world, which holds the export
+# settings, an undo, an armature, or an image or node group;  or exporting with texture atlasing, resizing or variants,
+# static batching, or thin instances, since those change meshes & materials after they are made.
+from .logging import *
+from .package_level import *
+
+import bpy
+from bpy.app.handlers import persistent
+from io import StringIO
+
+# the state of the last export, when incremental
+_previous = None
+
+# what changed since the last export, by name
+_dirtyObjects = set()
+_dirtyData = set()
+_dirtyMaterials = set()
+_dirtyActions = set()
+_dirtyAll = False
+
+# updates made by the export itself, like changing frames, are not changes
+_exporting = False
+
+#===============================================================================
+@persistent
+def track_updates(scene, depsgraph):
+    global _dirtyAll
+    if _previous is None or _exporting: return
+
+    for update in depsgraph.updates:
+        id = update.id.original
+        if isinstance(id, bpy.types.Object):
+            if id.type == 'ARMATURE':
+                _dirtyAll = True
+            else:
+                _dirtyObjects.add(id.name)
+
+        elif isinstance(id, bpy.types.Mesh):
+            _dirtyData.add(id.name)
+
+        elif isinstance(id, bpy.types.Material):
+            _dirtyMaterials.add(id.name)
+
+        elif isinstance(id, bpy.types.Action):
+            _dirtyActions.add(id.name)
+
+        # the node tree of a material is reported with it, but a node group can be in any of them
+        elif isinstance(id, bpy.types.NodeTree):
+            if not id.is_embedded_data:
+                _dirtyAll = True
+
+        elif isinstance(id, (bpy.types.World, bpy.types.Image, bpy.types.Armature)):
+            _dirtyAll = True
+
+@persistent
+def forget_on_load(dummy):
+    forget_previous()
+
+@persistent
+def dirty_on_undo(dummy):
+    global _dirtyAll
+    _dirtyAll = True
+
+def forget_previous():
+    global _previous
+    _previous = None
+    _clear_dirty()
+
+def _clear_dirty():
+    global _dirtyAll
+    _dirtyObjects.clear()
+    _dirtyData.clear()
+    _dirtyMaterials.clear()
+    _dirtyActions.clear()
+    _dirtyAll = False
+#===============================================================================
+# what is kept of an export, to be re-used by the next
+class ExportState:
+    def __init__(self, exporter, filepath, objects, meshes):
+        self.filepath = filepath
+        self.meshes = meshes # by object name, including instances, which are in the instances of their source
+        self.materials = {material.name: material for material in exporter.materials}
+        self.multiMaterials = {multimat.name: multimat for multimat in exporter.multiMaterials}
+        self.skeletonNames = get_skeleton_names(objects)
+        self.meshGroups = get_mesh_groups(objects)
+        self.nextMultiMaterialIdx = exporter.nextMultiMaterialIdx
+
+        # what changes meshes or materials after they are made cannot be done again on ones re-used
+        self.reason = None
+        settings = exporter.settings
+        if settings.useTextureAtlas and not exporter.inlineTextures:
+            self.reason = 'texture atlasing'
+        elif settings.useStaticBatching:
+            self.reason = 'static batching'
+        elif settings.maxTextureSize > 0 or settings.writeTextureVariants or any([material.maxTextureSize > 0 for material in exporter.materials]):
+            self.reason = 'texture resizing'
+        elif any([hasattr(mesh, 'thinInstances') for mesh in meshes.values()]):
+            self.reason = 'thin instances'
+#===============================================================================
+class IncrementalExport:
+    def __init__(self, exporter, filepath, objects):
+        global _exporting
+        _exporting = True
+        self.exporter = exporter
+        self.filepath = filepath
+        self.meshes = {}
+        self.previous = None
+        self.rebuild = set()
+
+        reason = self.getFullExportReason(objects)
+        if reason is not None:
+            Logger.log('Incremental export  :  everything, due to ' + reason, 2)
+            return
+
+        self.previous = _previous
+        self.rebuild = self.getRebuild(objects)
+        exporter.nextMultiMaterialIdx = self.previous.nextMultiMaterialIdx
+        Logger.log('Incremental export  :  ' + format_int(len(self.rebuild)) + ' meshes changed of ' + format_int(len(self.previous.meshes)), 2)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def getFullExportReason(self, objects):
+        if _previous is None:
+            return 'no previous export'
+        if _previous.filepath != self.filepath:
+            return 'a different file last exported'
+        if _previous.reason is not None:
+            return _previous.reason
+        if _dirtyAll:
+            return 'a change to the world, an armature, an image, or an undo'
+        if _previous.skeletonNames != get_skeleton_names(objects):
+            return 'different skeletons'
+
+        return None
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # names of the mesh objects made again;  all the objects of any mesh data shared, since instances are in their source
+    def getRebuild(self, objects):
+        dirtyGroups = set(_dirtyData)
+        groups = get_mesh_groups(objects)
+        for dataName, names in groups.items():
+            if self.previous.meshGroups.get(dataName) != names:
+                dirtyGroups.add(dataName)
+
+        for object in objects:
+            if object.type != 'MESH' or object.data.name in dirtyGroups: continue
+
+            if object.name in _dirtyObjects or object.name not in self.previous.meshes:
+                dirtyGroups.add(object.data.name)
+
+            elif any([slot.material is not None and slot.material.name in _dirtyMaterials for slot in object.material_slots]):
+                dirtyGroups.add(object.data.name)
+
+            elif len(_dirtyActions) > 0 and uses_actions(object, _dirtyActions):
+                dirtyGroups.add(object.data.name)
+
+        rebuild = set()
+        for dataName in dirtyGroups:
+            rebuild.update(groups.get(dataName, []))
+
+        return rebuild
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # the Mesh of the last export, with its materials added to the exporter;  None when it must be made again
+    def getMesh(self, object):
+        if self.previous is None or object.name in self.rebuild: return None
+
+        mesh = self.previous.meshes.get(object.name)
+        if mesh is None: return None
+
+        Logger.log('re-used mesh:  ' + mesh.name, 1)
+        if hasattr(mesh, 'materialId'):
+            multimat = self.previous.multiMaterials.get(mesh.materialId)
+            if multimat is not None:
+                self.exporter.multiMaterials.append(multimat)
+                for material in multimat.material_slots:
+                    self.addMaterial(material.name)
+            else:
+                self.addMaterial(mesh.materialId)
+
+        return mesh
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def addMaterial(self, name):
+        material = self.previous.materials.get(name)
+        if material is not None and self.exporter.getMaterial(name) is None:
+            self.exporter.materials.append(material)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def add(self, object, mesh):
+        self.meshes[object.name] = mesh
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # what a mesh or material writes is kept on it, so when it is re-used writing is only a copy
+    def write(self, file_handler, entity):
+        fragment = getattr(entity, 'jsonFragment', None)
+        if fragment is None:
+            buffer = StringIO()
+            entity.to_json_file(buffer)
+            fragment = buffer.getvalue()
+            entity.jsonFragment = fragment
+
+        file_handler.write(fragment)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # the state kept for the next export;  after a failed export, the next is a whole one
+    def end(self, objects, succeeded):
+        global _previous, _exporting
+        # evaluate what the export changed, like the shaders reconnected, while updates are still ignored
+        bpy.context.evaluated_depsgraph_get()
+        _exporting = False
+
+        _previous = ExportState(self.exporter, self.filepath, objects, self.meshes) if succeeded else None
+        _clear_dirty()
+#===============================================================================
+def get_skeleton_names(objects):
+    return [object.name for object in objects if object.type == 'ARMATURE' and not shouldBeCulled(object) and object.visible_get()]
+
+# the names of the mesh objects using each mesh data, in order
+def get_mesh_groups(objects):
+    groups = {}
+    for object in objects:
+        if object.type == 'MESH' and not shouldBeCulled(object):
+            groups.setdefault(object.data.name, []).append(object.name)
+    return groups
+
+def uses_actions(object, actionNames):
+    animated = [object]
+    if object.data.shape_keys is not None:
+        animated.append(object.data.shape_keys)
+
+    for id in animated:
+        animData = id.animation_data
+        if animData is None: continue
+
+        if animData.action is not None and animData.action.name in actionNames:
+            return True
+        for track in animData.nla_tracks:
+            for strip in track.strips:
+                if strip.action is not None and strip.action.name in actionNames:
+                    return True
+    return False
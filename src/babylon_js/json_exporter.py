@@ -1,17 +1,27 @@
 from .animation import *
 from .armature import *
+from .bounding import *
 from .camera import *
+from .chunking import *
+from .export_cache import *
+from .incremental import IncrementalExport, forget_previous
 from .light_shadow import *
 from .logging import *
+from .materials.bake_farm import *
 from .materials.material import *
 from .mesh import *
 from .package_level import *
+from .progress import *
+from .shader_disconnect import disconnect_shaders, reconnect_shaders, recover_disconnected_shaders
 from .sound import *
+from .static_batch import *
 from .world import *
 
 import bpy
 from io import open
 from os import path, makedirs
+from shutil import rmtree
+from tempfile import mkdtemp
 
 # JSON specific, for manifest file
 import time
@@ -19,11 +29,32 @@ import calendar
 
 from .node import Node
 
+# an export from the window yields to the event loop between objects, where live sync could otherwise start another, which
+# would share the Logger, Progress & disconnected shaders of the first
+_exportInProgress = False
+
+def is_export_in_progress():
+    return _exportInProgress
 #===============================================================================
 class JsonExporter:
     nameSpace   = None  # assigned in execute
+    alwaysIncremental = False # live sync keeps what it exports, whatever the setting
+    reportProgress = True     # in the window, when there is one;  cancelling works regardless
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
     def execute(self, context, filepath, objects):
+        for step in self.execute_steps(context, filepath, objects):
+            pass
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # The export, yielding between objects, so a modal operator can handle events, like Esc to cancel, & redraw the progress.
+    # When cancelled, either by Progress.request_cancel() or closing the generator, the scene is left as it was.
+    def execute_steps(self, context, filepath, objects):
+        global _exportInProgress
+        if _exportInProgress:
+            self.fatalError = 'Another export is in progress'
+            self.nWarnings = 0
+            self.nErrors = 0
+            return
+
         scene = context.scene
         self.scene = scene # reference for passing
         self.settings = scene.world
@@ -35,18 +66,32 @@ class JsonExporter:
         self.skeletons = []
         skeletonId = 0
         self.meshesAndNodes = []
+        self.sourceMeshes = {} # by data name, for finding instances
         self.morphTargetMngrs = []
         self.animationGroupers = []
         self.materials = []
+        self.materialCache = {} # BJSMaterials by Blender material name, made once however many meshes use them
+        self.nMaterialLookups = 0
         self.multiMaterials = []
+        self.nextMultiMaterialIdx = 0
         self.sounds = []
         self.needPhysics = False
-
+        self.bakeCache = None
+        self.bakeFarm = None
+        self.inlineTempDir = None
+        self.incremental = None
+        self.bakedMeshes = [] # Blender meshes given a baking uv & image, which are cleaned up when an export does not finish
+        currentFrame = None
+        succeeded = False
+
+        progress = Progress(context, estimate_work(objects, self.settings.currentActionOnly), self.reportProgress)
+        _exportInProgress = True
         try:
             self.filepathMinusExtension = filepath.rpartition('.')[0]
             JsonExporter.nameSpace = getNameSpace(self.filepathMinusExtension)
 
-            log = Logger(self.filepathMinusExtension + '.log')
+            log = Logger(self.filepathMinusExtension + '.log', LEVELS[self.settings.logLevel], LEVELS[self.settings.logConsoleLevel],
+                         self.settings.logJsonLines, self.settings.logThreaded)
             if self.settings.writeCsvFile:
                 stats_handler = open(self.filepathMinusExtension + '-stats.csv', 'w', encoding='utf8')
                 Mesh.GetStatsColumns(stats_handler)
@@ -54,6 +99,12 @@ class JsonExporter:
             if bpy.ops.object.mode_set.poll():
                 bpy.ops.object.mode_set(mode = 'OBJECT')
 
+            # only colors / values of materials are exported, not what is linked to their outputs; put back in finally
+            nRecovered = recover_disconnected_shaders()
+            if nRecovered > 0:
+                Logger.warn('Reconnected shaders of ' + format_int(nRecovered) + ' materials, left disconnected by an unfinished export')
+            nDisconnected = disconnect_shaders(objects)
+
             self.inlineTextures = self.settings.inlineTextures
 
             # assign texture location, purely temporary if in-lining
@@ -74,11 +125,34 @@ class JsonExporter:
             Logger.log('Vert Color Precision:  ' + format_int(self.settings.vColorsPrecision), 2)
             Logger.log('Mat Weight Precision:  ' + format_int(self.settings.mWeightsPrecision), 2)
             Logger.log('Keep Z-up r-handed  :  ' + ( 'yes' if self.settings.preserveZUpRight else 'no' ), 2)
+            Logger.log('Max texture size    :  ' + (format_int(self.settings.maxTextureSize) if self.settings.maxTextureSize > 0 else 'none'), 2)
+            Logger.log('Texture variants    :  ' + ( 'yes' if self.settings.writeTextureVariants else 'no' ), 2)
+            Logger.log('Texture atlas       :  ' + ( 'yes' if self.settings.useTextureAtlas else 'no' ), 2)
+            Logger.log('Static batching     :  ' + ( 'yes' if self.settings.useStaticBatching else 'no' ), 2)
+            Logger.log('Cull shadow casters :  ' + ( 'yes' if self.settings.cullShadowCasters else 'no' ), 2)
+            Logger.log('Chunk by collection :  ' + ( 'yes' if self.settings.exportChunks else 'no' ), 2)
+            Logger.log('Pre-filter env      :  ' + ( 'yes' if self.settings.precomputeEnvironment else 'no' ), 2)
+            Logger.log('Log level           :  ' + self.settings.logLevel.lower() + ', console:  ' + self.settings.logConsoleLevel.lower() +
+                       (', JSON lines' if self.settings.logJsonLines else '') + (', threaded' if self.settings.logThreaded else ''), 2)
+            Logger.log('Shaders disconnected:  ' + format_int(nDisconnected) + ' materials', 2)
+            if self.settings.incrementalExport or self.alwaysIncremental:
+                self.incremental = IncrementalExport(self, filepath, objects)
+            else:
+                forget_previous()
             if not self.inlineTextures:
                 Logger.log('Texture directory   :  ' + self.textureFullPathDir, 2)
+            if self.settings.useBakeCache:
+                bakeCacheDir = self.getBakeCacheDir()
+                Logger.log('Bake cache          :  ' + bakeCacheDir, 2)
+                self.bakeCache = ExportCache(bakeCacheDir, self.settings.bakeCacheMaxMB * 1024 * 1024, 'bake cache')
+            if self.settings.bakeWorkers > 0:
+                Logger.log('Bake workers        :  ' + format_int(self.settings.bakeWorkers), 2)
+                self.bakeFarm = BakeFarm(self, self.settings.bakeWorkers)
             self.world = World(scene, self)
 
-            bpy.ops.screen.animation_cancel()
+            # there is no screen in the background
+            if bpy.ops.screen.animation_cancel.poll():
+                bpy.ops.screen.animation_cancel()
             currentFrame = bpy.context.scene.frame_current
 
             # Active camera
@@ -95,8 +169,10 @@ class JsonExporter:
             for object in objects:
                 if shouldBeCulled(object): continue
 
-                scene.frame_set(currentFrame)
                 if object.type == 'ARMATURE':
+                    yield
+                    Progress.advance(WEIGHT_OBJECT, object.name)
+                    scene.frame_set(currentFrame)
                     if object.visible_get():
                         self.skeletons.append(Skeleton(object, context, skeletonId, self.settings.ignoreIKBones))
                         skeletonId += 1
@@ -106,7 +182,10 @@ class JsonExporter:
             # exclude light in this pass, so ShadowGenerator constructor can be passed meshesAnNodes
             for object in objects:
                 if shouldBeCulled(object): continue
+                if object.type == 'LIGHT' or object.type == 'ARMATURE': continue
 
+                yield
+                Progress.advance(WEIGHT_OBJECT, object.name)
                 scene.frame_set(currentFrame)
                 if object.type == 'CAMERA':
                     if object.visible_get():
@@ -115,7 +194,12 @@ class JsonExporter:
                         Logger.warn('The following camera not visible in scene thus ignored: ' + object.name)
 
                 elif object.type == 'MESH':
-                    mesh = Mesh(object, scene, self)
+                    # unchanged since the last export, when incremental
+                    mesh = self.incremental.getMesh(object) if self.incremental is not None else None
+                    if mesh is None:
+                        mesh = Mesh(object, scene, self)
+                        if hasattr(mesh, 'indices'):
+                            Progress.advance(len(mesh.indices) // 3 * WEIGHT_TRIANGLE)
                     if mesh.hasUnappliedTransforms and hasattr(mesh, 'skeletonWeights'):
                         self.fatalError = 'Mesh: ' + mesh.name + ' has un-applied transformations.  This will never work for a mesh with an armature.  Export cancelled'
                         Logger.log(self.fatalError)
@@ -125,10 +209,12 @@ class JsonExporter:
                         Logger.warn('mesh, ' + mesh.name + ', has 0 vertices; ignored')
                         continue
 
+                    if self.incremental is not None: self.incremental.add(object, mesh)
                     if hasattr(mesh, 'physicsImpostor'): self.needPhysics = True
 
                     if hasattr(mesh, 'instances'):
                         self.meshesAndNodes.append(mesh)
+                        self.sourceMeshes[mesh.dataName] = mesh
                     if self.settings.writeCsvFile:
                             mesh.getMeshStats(stats_handler)
                     if hasattr(mesh, 'morphTargetManagerId'):
@@ -142,35 +228,102 @@ class JsonExporter:
                 elif object.type == 'EMPTY':
                     self.meshesAndNodes.append(Node(object))
 
-                elif object.type != 'LIGHT' and object.type != 'ARMATURE':
+                else:
                     Logger.warn('The following object (type - ' +  object.type + ') is not currently exportable thus ignored: ' + object.name)
 
+            # bakes queued while processing meshes, done all at once in other processes
+            if self.bakeFarm is not None:
+                yield from self.bakeFarm.run()
+
+            # merging of materials before batching, so more meshes share one
+            if self.settings.useTextureAtlas:
+                if self.inlineTextures:
+                    Logger.warn('Texture atlasing is not done when in-lining textures')
+                else:
+                    from .texture_atlas import TextureAtlaser
+                    TextureAtlaser(self).atlas(self.meshesAndNodes)
+
+            # after atlasing, so atlases are also limited in size
+            if self.settings.maxTextureSize > 0 or self.settings.writeTextureVariants or any([material.maxTextureSize > 0 for material in self.materials]):
+                if self.inlineTextures:
+                    Logger.warn('Texture resizing & variants are not done when in-lining textures')
+                else:
+                    from .texture_resize import TextureResizer
+                    TextureResizer(self).resize()
+
+            # collection instances & particles are only in the depsgraph, linked duplicates already added in Mesh constructor
+            self.gatherThinInstances(objects)
+
+            # batching before lights, so shadow casters & light inclusion lists refer to the batches
+            if self.settings.useStaticBatching:
+                self.meshesAndNodes = StaticBatcher(self, objects).batch(self.meshesAndNodes)
+
+            # spatial index of all the shadow casters built once; shallow, since entries spanning blocks are repeated in each
+            casterIndex = None
+            if self.settings.cullShadowCasters:
+                entries = []
+                for mesh in self.meshesAndNodes:
+                    if hasattr(mesh, 'castShadows') and mesh.castShadows:
+                        entries += mesh.getOctreeEntries()
+                casterIndex = Octree(entries, 16, 4)
+
             # Lamp / shadow Generator pass; meshesAnNodes complete & forceParents included
             for object in objects:
                 if shouldBeCulled(object): continue
 
                 if object.type == 'LIGHT':
+                    yield
+                    Progress.advance(WEIGHT_OBJECT, object.name)
                     bulb = Light(object, self, self.settings.usePBRMaterials)
                     self.lights.append(bulb)
                     if object.data.shadowMap != 'NONE':
                         if bulb.light_type != HEMI_LIGHT:
-                            self.shadowGenerators.append(ShadowGenerator(object, self.meshesAndNodes, scene))
+                            self.shadowGenerators.append(ShadowGenerator(object, self.meshesAndNodes, scene, casterIndex))
                         else:
                             Logger.warn('Area lights,which convert to HemisphericLight, do not support shadow, thus ignored: ' + object.name)
 
             bpy.context.scene.frame_set(currentFrame)
 
-            # output file
+            Logger.log('material node trees read:  ' + format_int(len(self.materialCache)) + ', for material slots:  ' + format_int(self.nMaterialLookups), 1)
+
+            # output file, which is not cancelled once started, so one is never left half written
             if log.nErrors == 0:
+                yield
+                Progress.check()
                 self.to_json_file()
+                succeeded = True
             else:
                 Logger.log('Output cancelled due to data error')
 
+        except ExportCancelled as ex:
+            self.fatalError = str(ex)
+            Logger.warn(self.fatalError, 0)
+
+        except GeneratorExit:
+            self.fatalError = 'Export cancelled'
+            Logger.warn(self.fatalError, 0)
+            raise
+
         except:# catch *all* exceptions
             log.log_error_stack()
             raise
 
         finally:
+            _exportInProgress = False
+
+            # put back what was part way through changing, when the export did not finish
+            if not succeeded:
+                if currentFrame is not None: scene.frame_set(currentFrame)
+                for bpyMesh in self.bakedMeshes:
+                    BJSMaterial.meshBakingClean(bpyMesh)
+                if bpy.ops.object.mode_set.poll():
+                    bpy.ops.object.mode_set(mode = 'OBJECT')
+
+            progress.close()
+            if self.bakeCache is not None: self.bakeCache.close()
+            if self.inlineTempDir is not None: rmtree(self.inlineTempDir, ignore_errors = True)
+            Logger.log('shaders reconnected:  ' + format_int(reconnect_shaders()) + ' materials', 1)
+            if self.incremental is not None: self.incremental.end(objects, succeeded)
             log.close()
             if self.settings.writeCsvFile: stats_handler.close()
 
@@ -179,28 +332,56 @@ class JsonExporter:
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
     def to_json_file(self):
         Logger.log('========= Writing of JSON file started =========', 0)
-        file_handler = open(self.filepathMinusExtension + '.json', 'w', encoding='utf8')
+        if self.settings.exportChunks:
+            SceneChunker(self).write()
+        else:
+            self.write_json_file(self.filepathMinusExtension + '.json', JsonExporter.nameSpace + '.json', self.materials, self.multiMaterials, self.skeletons,
+                                 self.meshesAndNodes, self.morphTargetMngrs, self.animationGroupers, self.sounds)
+
+        # Create or update .manifest file
+        if self.settings.writeManifestFile:
+            file_handler = open(self.filepathMinusExtension + '.json.manifest', 'w', encoding='utf8')
+            file_handler.write('{\n')
+            file_handler.write('\t"version" : ' + str(calendar.timegm(time.localtime())) + ',\n')
+            file_handler.write('\t"enableSceneOffline" : true,\n')
+            file_handler.write('\t"enableTexturesOffline" : true\n')
+            file_handler.write('}')
+            file_handler.close()
+
+        Logger.log('========= Writing of JSON file completed =========', 0)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # the whole scene, or a chunk of it;  the world, cameras, lights & shadow generators are only in the root file
+    def write_json_file(self, filepath, fileName, materials, multiMaterials, skeletons, meshesAndNodes, morphTargetMngrs, animationGroupers, sounds, isRoot = True):
+        file_handler = open(filepath, 'w', encoding='utf8')
         file_handler.write('{')
-        file_handler.write('"producer":{"name":"Blender","version":"' + bpy.app.version_string + '","exporter_version":"' + format_exporter_version() + '","file":"' + JsonExporter.nameSpace + '.json"},\n')
-        self.world.to_json_file(file_handler, self)
+        file_handler.write('"producer":{"name":"Blender","version":"' + bpy.app.version_string + '","exporter_version":"' + format_exporter_version() + '","file":"' + fileName + '"}')
+        if isRoot:
+            file_handler.write(',\n')
+            self.world.to_json_file(file_handler, self)
+
+            # Scene metadata
+            if self.settings.writeSceneOctree:
+                file_handler.write(',\n"metadata":{')
+                self.getOctree(self.settings.octreeCapacity, self.settings.octreeMaxDepth).to_json_file(file_handler, self.settings.positionsPrecision)
+                file_handler.write('}')
 
         # Materials
-        if len(self.materials) > 0:
+        if len(materials) > 0:
             file_handler.write(',\n"materials":[')
             first = True
-            for material in self.materials:
+            for material in materials:
                 if first != True:
                     file_handler.write(',\n')
 
                 first = False
-                material.to_json_file(file_handler)
+                self.writeEntity(file_handler, material)
             file_handler.write(']')
 
         # Multi-materials
-        if len(self.multiMaterials) > 0:
+        if len(multiMaterials) > 0:
             file_handler.write(',\n"multiMaterials":[')
             first = True
-            for multimaterial in self.multiMaterials:
+            for multimaterial in multiMaterials:
                 if first != True:
                     file_handler.write(',')
 
@@ -209,10 +390,10 @@ class JsonExporter:
             file_handler.write(']')
 
         # Armatures/Bones
-        if len(self.skeletons) > 0:
+        if len(skeletons) > 0:
             file_handler.write(',\n"skeletons":[')
             first = True
-            for skeleton in self.skeletons:
+            for skeleton in skeletons:
                 if first != True:
                     file_handler.write(',')
 
@@ -221,22 +402,24 @@ class JsonExporter:
             file_handler.write(']')
 
         # Meshes
-        if len(self.meshesAndNodes) > 0:
+        if len(meshesAndNodes) > 0:
             file_handler.write(',\n"meshes":[')
             first = True
-            for mesh in self.meshesAndNodes:
+            for mesh in meshesAndNodes:
                 if first != True:
                     file_handler.write(',')
 
                 first = False
-                mesh.to_json_file(file_handler)
+                self.writeEntity(file_handler, mesh)
+                if hasattr(mesh, 'indices'):
+                    Progress.advance(len(mesh.indices) // 3 * WEIGHT_TRIANGLE_WRITTEN, 'writing ' + mesh.name, False)
             file_handler.write(']')
 
         # Morph targets
-        if len(self.morphTargetMngrs) > 0:
+        if len(morphTargetMngrs) > 0:
             file_handler.write(',\n"morphTargetManagers":[')
             first = True
-            for mesh in self.morphTargetMngrs:
+            for mesh in morphTargetMngrs:
                 if first != True:
                     file_handler.write(',')
 
@@ -245,16 +428,16 @@ class JsonExporter:
             file_handler.write(']')
 
         # Animation Groups
-        if len(self.animationGroupers) > 0:
+        if len(animationGroupers) > 0:
             file_handler.write(',\n"animationGroups":[')
             first = True
-            for grouper in self.animationGroupers:
+            for grouper in animationGroupers:
                 grouper.write_animation_groups(file_handler, first)
                 first = False
             file_handler.write(']')
 
         # Cameras
-        if len(self.cameras) > 0:
+        if isRoot and len(self.cameras) > 0:
             file_handler.write(',\n"cameras":[')
             first = True
             for camera in self.cameras:
@@ -272,7 +455,7 @@ class JsonExporter:
                 write_string(file_handler, 'activeCameraID', self.activeCamera)
 
         # Lights
-        if len(self.lights) > 0:
+        if isRoot and len(self.lights) > 0:
             file_handler.write(',\n"lights":[')
             first = True
             for light in self.lights:
@@ -284,7 +467,7 @@ class JsonExporter:
             file_handler.write(']')
 
         # Shadow generators
-        if len(self.shadowGenerators) > 0:
+        if isRoot and len(self.shadowGenerators) > 0:
             file_handler.write(',\n"shadowGenerators":[')
             first = True
             for shadowGen in self.shadowGenerators:
@@ -296,10 +479,10 @@ class JsonExporter:
             file_handler.write(']')
 
         # Sounds
-        if len(self.sounds) > 0:
+        if len(sounds) > 0:
             file_handler.write('\n,"sounds":[')
             first = True
-            for sound in self.sounds:
+            for sound in sounds:
                 if first != True:
                     file_handler.write(',')
 
@@ -311,18 +494,49 @@ class JsonExporter:
         # Closing
         file_handler.write('\n}')
         file_handler.close()
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # when incremental, what is written is kept, for the next export to re-use
+    def writeEntity(self, file_handler, entity):
+        if self.incremental is not None:
+            self.incremental.write(file_handler, entity)
+        else:
+            entity.to_json_file(file_handler)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # relative to the .blend, or the temp directory when it has never been saved
+    def getBakeCacheDir(self):
+        cacheDir = self.settings.bakeCacheDir
+        if cacheDir.startswith('//') and len(bpy.data.filepath) == 0:
+            from tempfile import gettempdir
+            return path.join(gettempdir(), 'babylon_bake_cache')
+
+        return path.normpath(bpy.path.abspath(cacheDir))
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # for baked images to be in-lined, which need a file to be read from when the JSON is written;  removed after
+    def getInlineTempDir(self):
+        if self.inlineTempDir is None:
+            self.inlineTempDir = mkdtemp(prefix = 'bjs_inline_')
+        return self.inlineTempDir
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # nodes have no bounding info, so are not in it
+    def getOctree(self, capacity, maxDepth):
+        entries = []
+        for mesh in self.meshesAndNodes:
+            if hasattr(mesh, 'boundingInfo'):
+                entries += mesh.getOctreeEntries()
 
-        # Create or update .manifest file
-        if self.settings.writeManifestFile:
-            file_handler = open(self.filepathMinusExtension + '.json.manifest', 'w', encoding='utf8')
-            file_handler.write('{\n')
-            file_handler.write('\t"version" : ' + str(calendar.timegm(time.localtime())) + ',\n')
-            file_handler.write('\t"enableSceneOffline" : true,\n')
-            file_handler.write('\t"enableTexturesOffline" : true\n')
-            file_handler.write('}')
-            file_handler.close()
-
-        Logger.log('========= Writing of JSON file completed =========', 0)
+        octree = Octree(entries, capacity, maxDepth)
+        Logger.log('Octree of ' + format_int(octree.nEntries) + ' meshes & instances, capacity:  ' + format_int(capacity) + ', max depth:  ' + format_int(maxDepth), 1)
+        return octree
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # the node tree of a Blender material is only read once, no matter how many meshes use it
+    def getBJSMaterial(self, bpyMaterial):
+        self.nMaterialLookups += 1
+        bjsMaterial = self.materialCache.get(bpyMaterial.name)
+        if bjsMaterial is None:
+            bjsMaterial = BJSMaterial(bpyMaterial, self)
+            self.materialCache[bpyMaterial.name] = bjsMaterial
+
+        return bjsMaterial
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
     def getMaterial(self, baseMaterialId):
         for material in self.materials:
@@ -332,12 +546,39 @@ class JsonExporter:
         return None
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
     def getSourceMeshInstance(self, dataName):
-        for mesh in self.meshesAndNodes:
-            # nodes have no 'dataName', cannot be instanced in any case
-            if hasattr(mesh, 'dataName') and mesh.dataName == dataName:
-                return mesh
-
-        return None
+        # nodes have no 'dataName', cannot be instanced in any case
+        return self.sourceMeshes.get(dataName)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # only of instancers being exported, so not of those unselected, when exporting only the selected
+    def gatherThinInstances(self, objects):
+        thinSources = {}
+        for dataName, mesh in self.sourceMeshes.items():
+            if hasattr(mesh, 'thinInstances'):
+                thinSources[dataName] = mesh
+
+        if len(thinSources) == 0: return
+
+        Logger.log('========= Gathering of thin instances from collection instances & particles =========', 0)
+        exportedNames = set([object.name for object in objects])
+        instancersExported = {} # by name, whether exported & not culled
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        for instance in depsgraph.object_instances:
+            if not instance.is_instance or instance.object.type != 'MESH': continue
+
+            source = thinSources.get(instance.object.original.data.name)
+            if source is None: continue
+
+            # instancer is either the empty of a collection instance, or the emitter of a particle system
+            instancer = instance.parent.original
+            exported = instancersExported.get(instancer.name)
+            if exported is None:
+                exported = instancersExported[instancer.name] = instancer.name in exportedNames and not shouldBeCulled(instancer)
+            if not exported: continue
+
+            source.thinInstances.append(instance.matrix_world, instancer.color)
+
+        for mesh in thinSources.values():
+            Logger.log('thin instances of ' + mesh.name + ':  ' + format_int(mesh.thinInstances.count()), 1)
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
     def get_skeleton(self, name):
         for skeleton in self.skeletons:
@@ -2,38 +2,12 @@ from .logging import *
 from .package_level import *
 
 from .f_curve_animatable import *
+from .light_props import *
 
 import bpy
+from math import cos, sin
 from mathutils import Color, Vector
 
-# used in Light constructor, never formally defined in Babylon, but used in babylonFileLoader
-POINT_LIGHT = 0
-DIRECTIONAL_LIGHT = 1
-SPOT_LIGHT = 2
-HEMI_LIGHT = 3
-
-#used in ShadowGenerators
-NO_SHADOWS = 'NONE'
-STD_SHADOWS = 'STD'
-POISSON_SHADOWS = 'POISSON'
-ESM_SHADOWS = 'ESM'
-BLUR_ESM_SHADOWS = 'BLUR_ESM'
-CASCADED_SHADOWS = 'CASCADED'
-
-AUTOMATIC_MODE = '0';
-POWER_MODE = '1';
-LUMINOUS_INTENSITY_MODE = '2';
-ILLUMINANCE_MODE = '3';
-LUMINANCE_MODE = '4';
-
-DEF_SHADOW_BIAS = 0.00005
-DEF_SHADOW_DARKNESS = 0
-DEF_SHADOW_BLUR_SCALE = 2
-DEF_SHADOW_BLUR_BOX_OFFSET = 1
-DEF_AUTO_SHADOW_BOUNDS = False
-DEF_SHADOW_MIN_Z = 0
-DEF_SHADOW_MAX_Z = 1000000
-DEF_SHADOW_LAMBDA = 0.5
 #===============================================================================
 class Light(FCurveAnimatable):
     def __init__(self, bpyLight, exporter, usePBRMaterials):
@@ -145,7 +119,7 @@ class Light(FCurveAnimatable):
         file_handler.write('}')
 #===============================================================================
 class ShadowGenerator:
-    def __init__(self, lamp, meshesAndNodes, scene):
+    def __init__(self, lamp, meshesAndNodes, scene, casterIndex = None):
         Logger.log('processing begun of shadows for light:  ' + lamp.name)
         self.lightId = lamp.name
         self.mapSize = lamp.data.shadowMapSize
@@ -174,6 +148,48 @@ class ShadowGenerator:
         for mesh in meshesAndNodes:
             if (hasattr(mesh, 'castShadows') and mesh.castShadows):
                 self.shadowCasters.append(mesh.name)
+
+        if casterIndex is not None:
+            nAllCasters = len(self.shadowCasters)
+            self.shadowCasters = ShadowGenerator.getCastersInRange(lamp, meshesAndNodes, casterIndex)
+            Logger.log('shadow casters:  ' + format_int(nAllCasters) + ', within influence of light:  ' + format_int(len(self.shadowCasters)), 2)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # a caster outside of where the light reaches cannot be between the light & anything it lights.  Only point & spot lights
+    # have a reach;  where animated lights & casters are at the frame exported says nothing of where they are later, so
+    # they are not culled
+    @staticmethod
+    def getCastersInRange(lamp, meshesAndNodes, casterIndex):
+        light = lamp.data
+        casters = [mesh for mesh in meshesAndNodes if hasattr(mesh, 'castShadows') and mesh.castShadows]
+        if light.type == 'SUN' or is_animated(lamp):
+            return [mesh.name for mesh in casters]
+
+        center = lamp.matrix_world.translation.copy()
+        radius = light.cutoff_distance
+        if not light.autoCalcShadowZBounds:
+            radius = min(radius, light.shadowMaxZ)
+
+        extent = Vector((radius, radius, radius))
+        candidates = casterIndex.query(center - extent, center + extent)
+
+        if light.type == 'SPOT':
+            direction = (lamp.matrix_world.to_3x3() @ Vector((0.0, 0.0, -1.0))).normalized()
+            halfAngle = light.spot_size / 2
+
+        inRange = set([id(mesh) for mesh in casters if any([is_animated(bpy.data.objects.get(name)) for name in get_object_names(mesh)])])
+        for entry in candidates:
+            if not sphere_intersects_box(center, radius, entry.minimum, entry.maximum): continue
+
+            if light.type == 'SPOT':
+                entryCenter = (entry.minimum + entry.maximum) / 2
+                entryRadius = (entry.maximum - entry.minimum).length / 2
+                if not sphere_intersects_cone(entryCenter, entryRadius, center, direction, halfAngle): continue
+
+            # an instance in range needs its source in the render list, which renders all its instances
+            inRange.add(id(entry.item))
+
+        # keep the order of meshesAndNodes, so output is repeatable
+        return [mesh.name for mesh in meshesAndNodes if id(mesh) in inRange]
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
     def to_json_file(self, file_handler):
         # implement cancelled
@@ -208,156 +224,38 @@ class ShadowGenerator:
         file_handler.write(']')
         file_handler.write('}')
 #===============================================================================
-bpy.types.Light.autoAnimate = bpy.props.BoolProperty(
-    name='Auto launch animations',
-    description='',
-    default = False
-)
-
-bpy.types.Light.useOwnCollection = bpy.props.BoolProperty(
-    name='This collection Only',
-    description='Restrict this light to only shining on meshes also in this collection',
-    default = False
-)
-
-bpy.types.Light.pbrIntensityMode = bpy.props.EnumProperty(
-    name='', # use a row heading for label to reduce dropdown width
-    description='No Meaning for STD Materials',
-    items = ((AUTOMATIC_MODE         , 'Automatic'          , ''),
-             (POWER_MODE             , 'Luminous Power'    , 'Lumen (lm)'),
-             (LUMINOUS_INTENSITY_MODE, 'Luminous Intensity', 'Candela (lm/sr)'),
-             (ILLUMINANCE_MODE       , 'Illuminance'       , 'Lux (lm/m^2)'),
-             (LUMINANCE_MODE         , 'Luminance'         , 'Nit (cd/m^2')
-            ),
-    default = AUTOMATIC_MODE
-)
-
-bpy.types.Light.shadowMap = bpy.props.EnumProperty(
-    name='Shadow Map',
-    description='For Dynamic shadows.  Not available for Area lights,\nwhich convert to HemisphericLight',
-    items = ((NO_SHADOWS           , 'None'         , 'No Shadow Maps'),
-             (STD_SHADOWS          , 'Standard'     , 'Use Standard Shadow Maps'),
-             (POISSON_SHADOWS      , 'Poisson'      , 'Use Poisson Sampling'),
-             (ESM_SHADOWS          , 'ESM'          , 'Use Exponential Shadow Maps'),
-             (BLUR_ESM_SHADOWS     , 'Blur ESM'     , 'Use Blur Exponential Shadow Maps'),
-             (CASCADED_SHADOWS     , 'Cascaded'     , 'Use Cascaded Shadow Maps; NOT valid with a Point light')
-            ),
-    default = NO_SHADOWS
-)
-
-bpy.types.Light.shadowMapSize = bpy.props.IntProperty(
-    name='Shadow Map Size',
-    description='',
-    default = 512
-)
-bpy.types.Light.shadowBias = bpy.props.FloatProperty(
-    name='Shadow Bias',
-    description='',
-    default = DEF_SHADOW_BIAS
-)
-
-bpy.types.Light.autoCalcShadowZBounds = bpy.props.BoolProperty(
-    name='Auto Calculate Shadow Z Bounds',
-    description='',
-    default = DEF_AUTO_SHADOW_BOUNDS
-)
-bpy.types.Light.shadowMinZ = bpy.props.FloatProperty(
-    name='Min Z',
-    description='The minimum distance a caster may be from the light.\nMust be < max',
-    default = DEF_SHADOW_MIN_Z,
-    min = 0,
-    max = DEF_SHADOW_MAX_Z - 1
-)
-bpy.types.Light.shadowMaxZ = bpy.props.FloatProperty(
-    name='Max Z',
-    description='The maximum distance a caster may be from the light.\nMust be > min',
-    default = DEF_SHADOW_MAX_Z,
-    min = 0,
-    max = DEF_SHADOW_MAX_Z
-)
-
-bpy.types.Light.shadowBlurScale = bpy.props.IntProperty(
-    name='Blur Scale',
-    description='Setting when using a Blur Variance shadow map',
-    default = DEF_SHADOW_BLUR_SCALE
-)
-
-bpy.types.Light.shadowBlurBoxOffset = bpy.props.IntProperty(
-    name='Blur Box Offset',
-    description='Setting when using a Blur Variance shadow map',
-    default = DEF_SHADOW_BLUR_BOX_OFFSET
-)
-bpy.types.Light.shadowDarkness = bpy.props.FloatProperty(
-    name='Shadow Darkness',
-    description='Shadow Darkness',
-    default = DEF_SHADOW_DARKNESS,
-    min = 0,
-    max = 1
-)
-
-bpy.types.Light.shadowLambda = bpy.props.FloatProperty(
-    name='Shadow Lambda',
-    description='',
-    default=DEF_SHADOW_LAMBDA
-)
-#===============================================================================
-class BJS_PT_LightPanel(bpy.types.Panel):
-    bl_label = get_title()
-    bl_space_type = 'PROPERTIES'
-    bl_region_type = 'WINDOW'
-    bl_context = 'data'
-
-    @classmethod
-    def poll(cls, context):
-        ob = context.object
-        return ob is not None and isinstance(ob.data, bpy.types.Light)
-
-    def draw(self, context):
-        ob = context.object
-        layout = self.layout
-        row = layout.row(heading='PBR Intensity Mode')
-        row.prop(ob.data, 'pbrIntensityMode')
-
-        layout.prop(ob.data, 'useOwnCollection')
-        layout.prop(ob.data, 'shadowMap')
-
-        usingShadows = ob.data.shadowMap != NO_SHADOWS
-        row = layout.row()
-        row.enabled = usingShadows
-        row.prop(ob.data, 'shadowMapSize')
-
-        row = layout.row()
-        row.enabled = usingShadows
-        row.prop(ob.data, 'shadowBias')
-
-        row = layout.row()
-        row.enabled = usingShadows
-        row.prop(ob.data, 'shadowDarkness')
-
-        box = layout.box()
-        row = box.row()
-        row.enabled = usingShadows
-        row.prop(ob.data, 'autoCalcShadowZBounds')
-        row = box.row()
-        row.enabled = usingShadows and not ob.data.autoCalcShadowZBounds
-        row.prop(ob.data, 'shadowMinZ')
-        row.prop(ob.data, 'shadowMaxZ')
-
-        box = layout.box()
-        box.label(text="Blur ESM Shadows")
-        usingBlur = ob.data.shadowMap == BLUR_ESM_SHADOWS
-        row = box.row()
-        row.enabled = usingBlur
-        row.prop(ob.data, 'shadowBlurScale')
-        row = box.row()
-        row.enabled = usingBlur
-        row.prop(ob.data, 'shadowBlurBoxOffset')
-
-        box = layout.box()
-        box.label(text="Cascaded Shadows")
-        cascading = ob.data.shadowMap == CASCADED_SHADOWS
-        row = box.row()
-        row.enabled = cascading
-        row.prop(ob.data, 'shadowLambda')
-
-        layout.prop(ob.data, 'autoAnimate')
+# whether the object, or what it is parented to or deformed by, has an action
+def is_animated(bpyObject):
+    while bpyObject is not None:
+        if bpyObject.animation_data and bpyObject.animation_data.action: return True
+
+        if bpyObject.type == 'MESH':
+            shapeKeys = bpyObject.data.shape_keys
+            if shapeKeys is not None and shapeKeys.animation_data and shapeKeys.animation_data.action: return True
+
+            for modifier in bpyObject.modifiers:
+                if modifier.type == 'ARMATURE' and modifier.object is not None and is_animated(modifier.object): return True
+
+        bpyObject = bpyObject.parent
+    return False
+
+# the Blender objects of a mesh & its instances;  a static batch has none, since what it merges cannot be animated
+def get_object_names(mesh):
+    return [mesh.name] + [instance.name for instance in getattr(mesh, 'instances', [])]
+
+def sphere_intersects_box(center, radius, minimum, maximum):
+    distanceSquared = 0
+    for axis in range(3):
+        if center[axis] < minimum[axis]:
+            distanceSquared += (minimum[axis] - center[axis]) ** 2
+        elif center[axis] > maximum[axis]:
+            distanceSquared += (center[axis] - maximum[axis]) ** 2
+    return distanceSquared <= radius * radius
+
+def sphere_intersects_cone(center, radius, apex, direction, halfAngle):
+    toCenter = center - apex
+    alongAxis = toCenter.dot(direction)
+    if alongAxis < -radius: return False
+
+    fromAxis = max(toCenter.length_squared - alongAxis * alongAxis, 0) ** 0.5
+    return fromAxis * cos(halfAngle) - alongAxis * sin(halfAngle) <= radius
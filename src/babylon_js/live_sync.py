@@ -0,0 +1,324 @@
+# Serves an export of the scene to a viewer on the same machine, & pushes what changes in it, object by object, as the
+# scene is edited, rather than the viewer loading the whole file again.  Started & stopped from the World panel.
+#
+# Over HTTP, at http://127.0.0.1:<port>/ :
+#     /live.json, & its textures      the export, for the viewer to load first
+#     /events                         a stream of Server-Sent Events, of the changes since
+#
+# Changes noted by a depsgraph handler are debounced on a background thread, which asks for an incremental export once
+# editing pauses.  Blender data can only be read on the main thread, so a timer does the export;  the background thread
+# then compares what each mesh, material, camera, light & shadow generator wrote with what it wrote the last time, & sends
+# the differences.  Each is an event, with one JSON object of data:
+#     add        {"type", "id", "data"}                           data is the whole of what was written
+#     remove     {"type", "id"}
+#     transform  {"type", "id", "data"}                           only position, rotation, rotationQuaternion, scaling & parentId changed
+#     update     {"type", "id", "data", "removed"}                the changed properties, like the parameters of a material, & those no longer written
+#     geometry   {"type", "id", "key", "offset", "total", "values"}   a chunk of a changed vertex data array, like positions
+#     commit     {"version"}                                      the end of a batch;  a viewer applies what it has been sent
+# The first event of a connection is hello {"version", "scene"}, of the last export.  live_sync_client.py, next to this, is a
+# stand-in viewer which applies them, & can check the result against the export.
+#
+# A page served from elsewhere can only read the scene when its origin is the one set in the World panel;  otherwise any
+# page open in a browser of the machine could.
+from .logging import *
+from .package_level import *
+
+import bpy
+from bpy.app.handlers import persistent
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+import json
+import queue
+from os import path, replace
+from shutil import rmtree
+from tempfile import mkdtemp
+import threading
+from time import time
+
+SCENE_FILE = 'live.json'
+STAGING_FILE = 'live_staging.json' # exported to, then moved over SCENE_FILE, so a viewer never reads one part written
+DEBOUNCE_SECS = 0.3   # quiet time before an export
+MAX_WAIT_SECS = 2.0   # longest an export waits, while edits keep coming
+POLL_SECS = 0.1       # of the timer on the main thread
+GEOMETRY_CHUNK = 65536 # numbers in each geometry event
+
+TRANSFORM_KEYS = {'position', 'rotation', 'rotationQuaternion', 'scaling', 'parentId'}
+GEOMETRY_KEYS = {'positions', 'normals', 'tangents', 'uvs', 'uvs2', 'colors', 'indices', 'matricesIndices', 'matricesIndicesExtra',
+                 'matricesWeights', 'matricesWeightsExtra'}
+
+# the running server, when started
+_server = None
+
+#===============================================================================
+class LiveSyncHandler(SimpleHTTPRequestHandler):
+    def end_headers(self):
+        # the viewer is usually a page served from somewhere else, but only the one allowed can read what is sent
+        allowedOrigin = self.server.liveSync.allowedOrigin
+        if allowedOrigin and self.headers.get('Origin', '').rstrip('/') == allowedOrigin:
+            self.send_header('Access-Control-Allow-Origin', allowedOrigin)
+            self.send_header('Vary', 'Origin')
+        self.send_header('Cache-Control', 'no-store')
+        super().end_headers()
+
+    def do_GET(self):
+        if self.path.split('?')[0] == '/events':
+            self.stream_events()
+        else:
+            super().do_GET()
+
+    def stream_events(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+
+        events = self.server.liveSync.connect()
+        try:
+            while True:
+                event = events.get()
+                if event is None: break
+                self.wfile.write(event)
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.server.liveSync.disconnect(events)
+
+    # requests are not worth the console of Blender
+    def log_message(self, format, *args):
+        pass
+#===============================================================================
+class LiveSyncServer:
+    def __init__(self, port, allowedOrigin = ''):
+        self.exportDir = mkdtemp(prefix = 'bjs_live_')
+        self.allowedOrigin = allowedOrigin.strip().rstrip('/')
+        self.version = 0
+        self.fragments = {} # of the last export sent, by (type, id)
+        self.clients = []
+        self.clientsLock = threading.Lock()
+
+        self.changes = queue.Queue()   # times of changes, from the depsgraph handler
+        self.exported = queue.Queue()  # fragments of each export, from the timer
+        self.exportRequested = threading.Event()
+        self.exporting = False
+        self.running = True
+        self.lastError = None
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), lambda *args: LiveSyncHandler(*args, directory = self.exportDir))
+        self.httpd.daemon_threads = True
+        self.httpd.liveSync = self
+        self.port = self.httpd.server_address[1]
+
+        self.threads = [threading.Thread(target = self.httpd.serve_forever, name = 'bjs live sync http', daemon = True),
+                        threading.Thread(target = self.debounce, name = 'bjs live sync debounce', daemon = True),
+                        threading.Thread(target = self.computeDeltas, name = 'bjs live sync deltas', daemon = True)]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        self.running = False
+        self.changes.put(None)
+        self.exported.put(None)
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+        with self.clientsLock:
+            for events in self.clients:
+                events.put(None)
+            self.clients = []
+
+        rmtree(self.exportDir, ignore_errors = True)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def connect(self):
+        events = queue.Queue()
+        with self.clientsLock:
+            events.put(format_event('hello', {'version': self.version, 'scene': '/' + SCENE_FILE}))
+            self.clients.append(events)
+        return events
+
+    def disconnect(self, events):
+        with self.clientsLock:
+            if events in self.clients:
+                self.clients.remove(events)
+
+    def broadcast(self, events):
+        with self.clientsLock:
+            for client in self.clients:
+                for event in events:
+                    client.put(event)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # background thread;  an export is asked for once changes pause, or have been coming for too long
+    def debounce(self):
+        while self.running:
+            first = self.changes.get()
+            if first is None: return
+
+            last = first
+            while True:
+                timeout = min(DEBOUNCE_SECS - (time() - last), MAX_WAIT_SECS - (time() - first))
+                if timeout <= 0: break
+                try:
+                    change = self.changes.get(timeout = timeout)
+                except queue.Empty:
+                    break
+                if change is None: return
+                last = change
+
+            self.exportRequested.set()
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # main thread, by the timer
+    def export(self, context):
+        from .json_exporter import JsonExporter
+
+        self.exportRequested.clear()
+        self.exporting = True
+        try:
+            exporter = JsonExporter()
+            exporter.alwaysIncremental = True
+            exporter.reportProgress = False # exports are frequent & short, the status bar is left alone
+            exporter.execute(context, path.join(self.exportDir, STAGING_FILE), context.scene.objects)
+        finally:
+            self.exporting = False
+
+        if exporter.fatalError or exporter.nErrors > 0:
+            self.lastError = exporter.fatalError or 'data error, see ' + path.join(self.exportDir, STAGING_FILE.rpartition('.')[0] + '.log')
+            return
+
+        replace(path.join(self.exportDir, STAGING_FILE), path.join(self.exportDir, SCENE_FILE))
+        self.lastError = None
+        self.exported.put(get_fragments(exporter))
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # background thread;  the differences of each export from the last
+    def computeDeltas(self):
+        while self.running:
+            fragments = self.exported.get()
+            if fragments is None: return
+
+            events = []
+            for key, fragment in fragments.items():
+                previous = self.fragments.get(key)
+                if previous is None:
+                    events.append(format_event('add', {'type': key[0], 'id': key[1], 'data': json.loads(fragment)}))
+
+                # a fragment re-used by an incremental export is the same string
+                elif previous is not fragment and previous != fragment:
+                    events += get_change_events(key[0], key[1], json.loads(previous), json.loads(fragment))
+
+            for key in self.fragments.keys():
+                if key not in fragments:
+                    events.append(format_event('remove', {'type': key[0], 'id': key[1]}))
+
+            self.fragments = fragments
+            self.version += 1
+            if len(events) > 0:
+                events.append(format_event('commit', {'version': self.version}))
+                self.broadcast(events)
+#===============================================================================
+# what each mesh, material, camera, light & shadow generator wrote, by (type, id)
+def get_fragments(exporter):
+    fragments = {}
+    def add(type, id, entity):
+        fragment = getattr(entity, 'jsonFragment', None)
+        if fragment is None:
+            buffer = StringIO()
+            entity.to_json_file(buffer)
+            fragment = buffer.getvalue()
+        fragments[(type, id)] = fragment
+
+    for material in exporter.materials:
+        add('material', material.name, material)
+    for multimat in exporter.multiMaterials:
+        add('multiMaterial', multimat.name, multimat)
+    for mesh in exporter.meshesAndNodes:
+        add('mesh', mesh.name, mesh)
+    for camera in exporter.cameras:
+        if not hasattr(camera, 'fatalProblem'):
+            add('camera', camera.name, camera)
+    for light in exporter.lights:
+        add('light', light.name, light)
+    for shadowGen in exporter.shadowGenerators:
+        add('shadowGenerator', shadowGen.lightId, shadowGen)
+
+    return fragments
+
+def get_change_events(type, id, previous, current):
+    changed = {key: value for key, value in current.items() if previous.get(key) != value}
+    removed = [key for key in previous.keys() if key not in current]
+
+    if type == 'mesh' and len(removed) == 0 and changed.keys() <= TRANSFORM_KEYS:
+        return [format_event('transform', {'type': type, 'id': id, 'data': changed})]
+
+    events = []
+    if type == 'mesh':
+        for key in GEOMETRY_KEYS & changed.keys():
+            values = changed.pop(key)
+            for offset in range(0, max(len(values), 1), GEOMETRY_CHUNK):
+                events.append(format_event('geometry', {'type': type, 'id': id, 'key': key, 'offset': offset, 'total': len(values),
+                                                        'values': values[offset:offset + GEOMETRY_CHUNK]}))
+
+    if len(changed) > 0 or len(removed) > 0:
+        events.append(format_event('update', {'type': type, 'id': id, 'data': changed, 'removed': removed}))
+    return events
+
+def format_event(name, data):
+    return ('event: ' + name + '\ndata: ' + json.dumps(data, separators = (',', ':')) + '\n\n').encode('utf8')
+#===============================================================================
+@persistent
+def note_updates(scene, depsgraph):
+    if _server is None or _server.exporting: return
+
+    for update in depsgraph.updates:
+        id = update.id.original
+        if isinstance(id, bpy.types.Object):
+            if update.is_updated_transform or update.is_updated_geometry:
+                _server.changes.put(time())
+                return
+
+        elif isinstance(id, (bpy.types.Mesh, bpy.types.Material, bpy.types.Action, bpy.types.World, bpy.types.Image, bpy.types.Light, bpy.types.Camera)):
+            _server.changes.put(time())
+            return
+
+def poll_export():
+    from .json_exporter import is_export_in_progress
+
+    if _server is None: return None
+
+    # one from the window is part way through, so it is tried again on a later poll
+    if _server.exportRequested.is_set() and not is_export_in_progress():
+        try:
+            _server.export(bpy.context)
+        except Exception as ex:
+            _server.lastError = str(ex)
+
+    return POLL_SECS
+
+def is_running():
+    return _server is not None
+
+# of the last export, shown in the World panel, since there is no operator to report it
+def last_error():
+    return _server.lastError if _server is not None else None
+
+def start_server(context, port, allowedOrigin = ''):
+    global _server
+    _server = LiveSyncServer(port, allowedOrigin)
+    try:
+        _server.export(context)
+    except:
+        stop_server()
+        raise
+
+    bpy.app.handlers.depsgraph_update_post.append(note_updates)
+    bpy.app.timers.register(poll_export, first_interval = POLL_SECS)
+    return _server
+
+def stop_server():
+    global _server
+    if _server is None: return
+
+    if note_updates in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(note_updates)
+    if bpy.app.timers.is_registered(poll_export):
+        bpy.app.timers.unregister(poll_export)
+
+    _server.stop()
+    _server = None
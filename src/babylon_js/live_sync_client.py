@@ -0,0 +1,132 @@
+# A stand-in viewer for live sync, to check what the server sends without a browser:
+#     python live_sync_client.py --url http://127.0.0.1:8765 --verify --commits 3
+# It loads the scene the server serves, then applies each batch of events, as a viewer would, to its own copy.  With
+# --verify, after each commit its copy is compared with the export as now served, & what differs is printed.  Only the
+# root file is compared, so export without Chunk by Collection.  The exit status is 0 when the last comparison matched,
+# or nothing was compared, & 1 when it did not.  Needs only Python, not Blender.
+import argparse
+import json
+import sys
+from urllib.request import urlopen
+
+# where each type of event is in a scene, & the property which is its id
+COLLECTIONS = {'mesh': ('meshes', 'id'), 'material': ('materials', 'id'), 'multiMaterial': ('multiMaterials', 'id'),
+               'camera': ('cameras', 'id'), 'light': ('lights', 'id'), 'shadowGenerator': ('shadowGenerators', 'lightId')}
+
+#===============================================================================
+class SceneCopy:
+    def __init__(self, scene):
+        self.entities = {}
+        for type, (key, idKey) in COLLECTIONS.items():
+            for entity in scene.get(key, []):
+                self.entities[(type, entity[idKey])] = entity
+
+        self.pending = []
+        self.arrays = {} # geometry being received, by (type, id, key)
+
+    def receive(self, name, data):
+        self.pending.append((name, data))
+
+    # the events since the last commit, in order
+    def commit(self):
+        nApplied = len(self.pending)
+        for name, data in self.pending:
+            key = (data['type'], data['id'])
+            if name == 'add':
+                self.entities[key] = data['data']
+
+            elif name == 'remove':
+                self.entities.pop(key, None)
+
+            elif name == 'transform' or name == 'update':
+                entity = self.entities.setdefault(key, {})
+                entity.update(data['data'])
+                for removed in data.get('removed', []):
+                    entity.pop(removed, None)
+
+            elif name == 'geometry':
+                values = self.arrays.setdefault(key + (data['key'],), [])
+                values += data['values']
+                if data['offset'] + len(data['values']) >= data['total']:
+                    self.entities.setdefault(key, {})[data['key']] = values[:data['total']]
+                    del self.arrays[key + (data['key'],)]
+
+        self.pending = []
+        return nApplied
+
+    def differences(self, scene):
+        served = SceneCopy(scene).entities
+        problems = []
+        for key in sorted(set(served.keys()) | set(self.entities.keys())):
+            if key not in self.entities:
+                problems.append('missing:  ' + key[0] + ' ' + key[1])
+            elif key not in served:
+                problems.append('extra:  ' + key[0] + ' ' + key[1])
+            elif self.entities[key] != served[key]:
+                keys = [prop for prop in set(served[key].keys()) | set(self.entities[key].keys()) if self.entities[key].get(prop) != served[key].get(prop)]
+                problems.append('different:  ' + key[0] + ' ' + key[1] + ', ' + ', '.join(sorted(keys)))
+        return problems
+#===============================================================================
+def get_json(url):
+    with urlopen(url) as response:
+        return json.loads(response.read().decode('utf8'))
+
+# (name, data) of each Server-Sent Event
+def read_events(response):
+    name = 'message'
+    data = []
+    for line in response:
+        line = line.decode('utf8').rstrip('\r\n')
+        if line == '':
+            if len(data) > 0:
+                yield name, json.loads('\n'.join(data))
+            name = 'message'
+            data = []
+        elif line.startswith('event:'):
+            name = line[6:].strip()
+        elif line.startswith('data:'):
+            data.append(line[5:].strip())
+
+def main():
+    parser = argparse.ArgumentParser(prog = 'live_sync_client.py', description = 'Stand-in viewer of a babylon.js live sync server')
+    parser.add_argument('--url', default = 'http://127.0.0.1:8765', help = 'of the server')
+    parser.add_argument('--verify', action = 'store_true', help = 'compare the scene after each commit with the export served')
+    parser.add_argument('--commits', type = int, default = 0, help = 'stop after this many commits, 0 is never')
+    parser.add_argument('--timeout', type = float, default = None, help = 'seconds without an event before stopping')
+    args = parser.parse_args()
+
+    url = args.url.rstrip('/')
+    matched = True
+    nCommits = 0
+    with urlopen(url + '/events', timeout = args.timeout) as response:
+        copy = None
+        scene = None
+        for name, data in read_events(response):
+            if name == 'hello':
+                scene = url + data['scene']
+                copy = SceneCopy(get_json(scene))
+                print('connected, version ' + str(data['version']) + ', ' + str(len(copy.entities)) + ' entities', flush = True)
+                continue
+
+            if copy is None: continue
+            if name != 'commit':
+                copy.receive(name, data)
+                continue
+
+            nApplied = copy.commit()
+            nCommits += 1
+            line = 'version ' + str(data['version']) + ':  ' + str(nApplied) + ' events'
+            if args.verify:
+                problems = copy.differences(get_json(scene))
+                matched = len(problems) == 0
+                line += ', ' + ('matches export' if matched else str(len(problems)) + ' differences')
+                for problem in problems:
+                    line += '\n        ' + problem
+            print(line, flush = True)
+
+            if args.commits > 0 and nCommits >= args.commits: break
+
+    return 0 if matched else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
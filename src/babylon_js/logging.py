@@ -2,21 +2,52 @@ from .package_level import format_f, format_exporter_version
 
 from bpy import app
 from io import open
+import json
 from math import floor
+import queue
+from sys import _getframe, exc_info
+import threading
 from time import time
-from sys import exc_info
 from traceback import format_tb
 
+# severity of a message, as in the standard logging module
+DEBUG   = 10
+INFO    = 20
+WARNING = 30
+ERROR   = 40
+NEVER   = 100 # as a threshold, nothing passes
+
+LEVELS = {'DEBUG': DEBUG, 'INFO': INFO, 'QUIET': WARNING, 'WARNING': WARNING, 'ERROR': ERROR, 'NONE': NEVER}
+
+FLUSH_LINES = 512 # lines buffered before they are written
+
 class Logger:
     instance = None
 
-    def __init__(self, filename):
+    # level is of what goes in the file, consoleLevel of what is also printed, which is slow inside Blender.  A .jsonl file,
+    # one JSON object a line, is also written when jsonLines.  When threaded, the buffer is written by another thread.
+    def __init__(self, filename, level = INFO, consoleLevel = WARNING, jsonLines = False, threaded = False):
         self.start_time = time()
         self.nWarnings = 0
         self.nErrors   = 0
+        self.level = level
+        self.consoleLevel = consoleLevel
+        self.counts = {} # by category, [messages, warnings, errors]
+
+        self.buffer = []
+        self.jsonBuffer = [] if jsonLines else None
+        self.bufferLock = threading.Lock()
 
         self.log_handler = open(filename, 'w', encoding='utf8')
-        self.log_handler.write('Exporter version: ' + format_exporter_version() + ', Blender version: ' + app.version_string + '\n')
+        self.json_handler = open(filename.rpartition('.')[0] + '.jsonl', 'w', encoding='utf8') if jsonLines else None
+
+        self.writes = None
+        if threaded:
+            self.writes = queue.Queue()
+            self.writer = threading.Thread(target = self.write_queued, name = 'bjs log writer', daemon = True)
+            self.writer.start()
+
+        self.buffer.append('Exporter version: ' + format_exporter_version() + ', Blender version: ' + app.version_string + '\n')
 
         # allow the static methods to log, so instance does not need to be passed everywhere
         Logger.instance = self
@@ -26,38 +57,113 @@ class Logger:
         Logger.log('========= An error was encountered =========', 0)
         stack = format_tb(ex[2])
         for line in stack:
-           self.log_handler.write(line) # avoid tabs & extra newlines by not calling log() inside catch
+           self.buffer.append(line) # avoid tabs & extra newlines by not calling log() inside catch
 
-        self.log_handler.write('ERROR:  ' + str(ex[1]) + '\n')
+        self.buffer.append('ERROR:  ' + str(ex[1]) + '\n')
+        if self.jsonBuffer is not None:
+            self.add_json(ERROR, 'exception', str(ex[1]), 0, ''.join(stack))
 
     def close(self):
         Logger.log('========= end of processing =========', 0)
         elapsed_time = time() - self.start_time
         minutes = floor(elapsed_time / 60)
         seconds = elapsed_time - (minutes * 60)
+
+        Logger.log('messages by category:', 0)
+        for category in sorted(self.counts.keys()):
+            counts = self.counts[category]
+            Logger.log(category.ljust(20) + ':  ' + str(counts[0]) + (', warnings ' + str(counts[1]) if counts[1] > 0 else '') + (', errors ' + str(counts[2]) if counts[2] > 0 else ''), 1)
+
         Logger.log('elapsed time:  ' + str(minutes) + ' min, ' + format_f(seconds) + ' secs', 0)
+        if self.jsonBuffer is not None:
+            self.jsonBuffer.append(json.dumps({'summary': True, 'seconds': round(elapsed_time, 3), 'warnings': self.nWarnings,
+                                               'errors': self.nErrors, 'categories': self.counts}) + '\n')
+
+        self.flush()
+        if self.writes is not None:
+            self.writes.put(None)
+            self.writer.join()
 
         self.log_handler.close()
+        if self.json_handler is not None: self.json_handler.close()
         Logger.instance = None
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def flush(self):
+        with self.bufferLock:
+            text = ''.join(self.buffer)
+            self.buffer = []
+            jsonText = None
+            if self.jsonBuffer is not None:
+                jsonText = ''.join(self.jsonBuffer)
+                self.jsonBuffer = []
+
+        if self.writes is not None:
+            self.writes.put((text, jsonText))
+        else:
+            self.write(text, jsonText)
 
+    def write(self, text, jsonText):
+        self.log_handler.write(text)
+        if jsonText: self.json_handler.write(jsonText)
+
+    def write_queued(self):
+        while True:
+            texts = self.writes.get()
+            if texts is None: return
+            self.write(*texts)
+
+    def add_json(self, level, category, msg, numTabIndent, stack = None):
+        record = {'t': round(time() - self.start_time, 4), 'level': level, 'category': category, 'indent': numTabIndent, 'msg': msg.strip()}
+        if stack is not None: record['stack'] = stack
+        self.jsonBuffer.append(json.dumps(record) + '\n')
+
+    # the module of the caller of Logger, like mesh or texture, unless given
     @staticmethod
-    def error(msg):
-        Logger.log('\nERROR: ' + msg.upper() + '\n', 0, False)
+    def get_category(category):
+        if category is not None: return category
+        return _getframe(2).f_globals.get('__name__', '').rpartition('.')[2]
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    @staticmethod
+    def error(msg, category = None):
+        Logger.write_message(ERROR, '\nERROR: ' + msg.upper() + '\n', 0, False, Logger.get_category(category))
         Logger.instance.nErrors += 1
 
     @staticmethod
-    def warn(msg, numTabIndent = 1, noNewLine = False):
-        Logger.log('WARNING: ' + msg, numTabIndent, noNewLine)
+    def warn(msg, numTabIndent = 1, noNewLine = False, category = None):
+        Logger.write_message(WARNING, 'WARNING: ' + msg, numTabIndent, noNewLine, Logger.get_category(category))
         Logger.instance.nWarnings += 1
 
     @staticmethod
-    def log(msg, numTabIndent = 1, noNewLine = False):
+    def log(msg, numTabIndent = 1, noNewLine = False, category = None):
         # allow code that calls Logger run successfully when not logging
         if Logger.instance is None: return
+        Logger.write_message(INFO, msg, numTabIndent, noNewLine, Logger.get_category(category))
+
+    # detail only worth the time to write when looking for a problem
+    @staticmethod
+    def debug(msg, numTabIndent = 2, noNewLine = False, category = None):
+        if Logger.instance is None or Logger.instance.level > DEBUG: return
+        Logger.write_message(DEBUG, msg, numTabIndent, noNewLine, Logger.get_category(category))
+
+    @staticmethod
+    def write_message(level, msg, numTabIndent, noNewLine, category):
+        self = Logger.instance
+        counts = self.counts.get(category)
+        if counts is None:
+            counts = self.counts[category] = [0, 0, 0]
+        counts[0] += 1
+        if level == WARNING: counts[1] += 1
+        elif level == ERROR: counts[2] += 1
+
+        if level < self.level: return
+
+        with self.bufferLock:
+            self.buffer.append(('\t' * numTabIndent) + msg + ('' if noNewLine else '\n'))
+            if self.jsonBuffer is not None:
+                self.add_json(level, category, msg, numTabIndent)
 
-        for i in range(numTabIndent):
-            Logger.instance.log_handler.write('\t')
+        if level >= self.consoleLevel:
+            print(msg) # for debugging / running Blender fron console
 
-        Logger.instance.log_handler.write(msg)
-        print(msg) # for debugging / running Blender fron console
-        if not noNewLine: Logger.instance.log_handler.write('\n')
\ No newline at end of file
+        if len(self.buffer) >= FLUSH_LINES:
+            self.flush()
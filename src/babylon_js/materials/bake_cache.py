@@ -0,0 +1,142 @@
+from ..logging import *
+from ..package_level import *
+
+import bpy
+from array import array
+from hashlib import sha1
+from os import path
+
+# bump when a change to baking would make previously cached images wrong
+BAKE_CACHE_VERSION = '2'
+
+# properties of a node which are only about how it looks in the node editor
+UI_PROPERTIES = {'rna_type', 'name', 'label', 'location', 'width', 'width_hidden', 'height', 'dimensions', 'select', 'show_options',
+                 'show_preview', 'hide', 'show_texture', 'color', 'use_custom_color', 'parent', 'internal_links', 'inputs', 'outputs',
+                 'type', 'bl_idname', 'bl_label', 'bl_description', 'bl_icon', 'bl_static_type', 'bl_width_default', 'bl_width_min',
+                 'bl_width_max', 'bl_height_default', 'bl_height_min', 'bl_height_max', 'is_active_output', 'warning_propagation'}
+
+MAX_STRUCT_DEPTH = 3
+
+# Everything going into a bake, which does not change by channel.  Only the mesh & its materials are looked at, so an AO bake
+# is not re-done when nearby objects move.
+def get_bake_state_key(bpyMesh, recipe):
+    hasher = sha1()
+    hasher.update(BAKE_CACHE_VERSION.encode())
+    hasher.update(bpy.app.version_string.encode())
+
+    data = bpyMesh.data
+    hasher.update(repr((data.bakeSize, data.bakeQuality, data.usePNG, data.forceBaking, recipe.isMultiMaterial)).encode())
+
+    hash_mesh(hasher, bpyMesh)
+
+    treesDone = set()
+    for material, tree in zip(recipe.nodeTreeMaterials, recipe.node_trees):
+        hasher.update(material.name.encode())
+        hash_node_tree(hasher, tree, treesDone)
+
+    return hasher.hexdigest()
+
+def get_channel_key(stateKey, bakeType):
+    return sha1((stateKey + bakeType).encode()).hexdigest()
+#===============================================================================
+# the geometry & uvs with modifiers applied, as it is baked
+def hash_mesh(hasher, bpyMesh):
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    evaluated = bpyMesh.evaluated_get(depsgraph)
+    mesh = evaluated.to_mesh()
+    try:
+        coords = array('f', [0.0]) * (len(mesh.vertices) * 3)
+        mesh.vertices.foreach_get('co', coords)
+        hasher.update(coords.tobytes())
+
+        loopVerts = array('i', [0]) * len(mesh.loops)
+        mesh.loops.foreach_get('vertex_index', loopVerts)
+        hasher.update(loopVerts.tobytes())
+
+        polyValues = array('i', [0]) * len(mesh.polygons)
+        mesh.polygons.foreach_get('loop_total', polyValues)
+        hasher.update(polyValues.tobytes())
+        mesh.polygons.foreach_get('material_index', polyValues)
+        hasher.update(polyValues.tobytes())
+
+        for uvLayer in mesh.uv_layers:
+            hasher.update(uvLayer.name.encode())
+            uvs = array('f', [0.0]) * (len(uvLayer.data) * 2)
+            uvLayer.data.foreach_get('uv', uvs)
+            hasher.update(uvs.tobytes())
+    finally:
+        evaluated.to_mesh_clear()
+
+    # baking of normals is in tangent space, but the others are not
+    hasher.update(repr([tuple(row) for row in bpyMesh.matrix_world]).encode())
+#===============================================================================
+# trees are told apart by pointer, since the embedded tree of every material is named 'Shader Nodetree'
+def hash_node_tree(hasher, tree, treesDone):
+    hasher.update(tree.name.encode())
+    if tree.as_pointer() in treesDone: return
+    treesDone.add(tree.as_pointer())
+
+    for node in sorted(tree.nodes, key = lambda node: node.name):
+        hasher.update(node.bl_idname.encode())
+        hasher.update(node.name.encode())
+        hash_struct(hasher, node, treesDone, MAX_STRUCT_DEPTH)
+
+        for socket in node.inputs:
+            if socket.is_linked or not hasattr(socket, 'default_value'): continue
+            hasher.update(socket.identifier.encode())
+            hasher.update(repr(format_rna_value(socket.default_value)).encode())
+
+    for link in tree.links:
+        hasher.update(repr((link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier, link.is_muted)).encode())
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+# settings of a node, including those held in structs like color ramps & curve maps
+def hash_struct(hasher, struct, treesDone, depth):
+    for prop in struct.bl_rna.properties:
+        identifier = prop.identifier
+        if identifier in UI_PROPERTIES: continue
+
+        value = getattr(struct, identifier, None)
+        if value is None: continue
+
+        if prop.type == 'POINTER':
+            if isinstance(value, bpy.types.Image):
+                hash_image(hasher, value)
+            elif isinstance(value, bpy.types.NodeTree):
+                hash_node_tree(hasher, value, treesDone)
+            elif isinstance(value, bpy.types.ID):
+                hasher.update(value.name.encode())
+            elif depth > 0:
+                hash_struct(hasher, value, treesDone, depth - 1)
+
+        elif prop.type == 'COLLECTION':
+            if depth > 0:
+                for item in value:
+                    hash_struct(hasher, item, treesDone, depth - 1)
+        else:
+            hasher.update(identifier.encode())
+            hasher.update(repr(format_rna_value(value)).encode())
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+# file images by their modification time & size, so large files are not read
+def hash_image(hasher, image):
+    hasher.update(repr((image.name, image.source, image.colorspace_settings.name, image.alpha_mode)).encode())
+    if image.packed_file is not None:
+        hasher.update(sha1(image.packed_file.data).digest())
+
+    elif image.source == 'GENERATED':
+        hasher.update(repr((image.generated_type, tuple(image.generated_color), image.generated_width, image.generated_height)).encode())
+
+    else:
+        filepath = path.normpath(bpy.path.abspath(image.filepath))
+        hasher.update(filepath.encode())
+        if path.isfile(filepath):
+            hasher.update(repr((path.getsize(filepath), path.getmtime(filepath))).encode())
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+def format_rna_value(value):
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, set):
+        return sorted(value)
+    try:
+        return tuple(value)
+    except TypeError:
+        return str(value)
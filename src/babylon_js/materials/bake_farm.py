@@ -0,0 +1,166 @@
+from ..logging import *
+from ..package_level import *
+from ..progress import *
+
+from .material import BJSMaterial
+from .texture import BakedTexture
+
+import bpy
+import json
+from io import open
+from os import cpu_count, path
+from shutil import copy, rmtree
+from subprocess import Popen, STDOUT, TimeoutExpired
+from tempfile import mkdtemp
+from time import time
+
+WORKER_SCRIPT = path.join(path.dirname(path.abspath(__file__)), 'bake_worker.py')
+POLL_SECS = 0.1 # of waiting on a worker, between yielding to check for a cancel
+
+#===============================================================================
+# one channel of one mesh to bake, along with where the result goes once done
+class BakeJob:
+    def __init__(self, bakedMaterial, bjs_type, bake_type, bpyMesh, cacheKey):
+        self.bakedMaterial = bakedMaterial
+        self.bjs_type = bjs_type
+        self.bake_type = bake_type
+        self.bpyMesh = bpyMesh
+        self.cacheKey = cacheKey
+
+        data = bpyMesh.data
+        self.fileName = path.basename(bakedMaterial.image.filepath)
+        self.extension = '.png' if data.usePNG else '.jpg'
+
+        # what the worker needs, all plain values
+        self.description = {
+            'object': bpyMesh.name,
+            'uvMapName': bakedMaterial.uvMapName,
+            'bakeType': bake_type,
+            'bakeSize': data.bakeSize,
+            'bakeQuality': data.bakeQuality,
+            'usePNG': data.usePNG,
+            'format': 'PNG' if data.usePNG else 'JPEG'
+        }
+
+        # for balancing, the number of pixels is the best guess of the time a bake takes
+        self.cost = data.bakeSize * data.bakeSize
+#===============================================================================
+# Instead of baking in BJSMaterial.bakeChannel, jobs are queued while meshes are processed.  Once all meshes are done, a
+# copy of the .blend is saved & the jobs are split between background Blender processes.  The uv maps made for baking & the
+# bake images are kept on the meshes until then, so the results can be wired in as BakedTextures, like a bake cache hit.
+class BakeFarm:
+    def __init__(self, exporter, nWorkers):
+        self.exporter = exporter
+        self.nWorkers = nWorkers
+        self.jobs = []
+        self.deferredCleans = []
+        self.deferredPacks = [] # of (bakedMaterial, bpyMesh), packed once their channels are baked
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def addJob(self, bakedMaterial, bjs_type, bake_type, bpyMesh, cacheKey):
+        self.jobs.append(BakeJob(bakedMaterial, bjs_type, bake_type, bpyMesh, cacheKey))
+        Logger.log('bake queued for farm, type: ' + bake_type, 3)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def deferPackORM(self, bakedMaterial, bpyMesh):
+        self.deferredPacks.append((bakedMaterial, bpyMesh))
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # called in place of BJSMaterial.meshBakingClean in Mesh, returns whether the clean is deferred;  packing also needs the
+    # bake image, even when all the channels were from the bake cache
+    def deferClean(self, bpyMesh):
+        meshes = [job.bpyMesh for job in self.jobs] + [pack[1] for pack in self.deferredPacks]
+        if bpyMesh in meshes:
+            self.deferredCleans.append(bpyMesh)
+            return True
+        return False
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # a generator, yielding while the workers bake, so a cancel can be acted on;  workers still running are then terminated
+    def run(self):
+        # everything from the bake cache, but there may still be packing
+        if len(self.jobs) == 0:
+            try:
+                self.packORMs()
+            finally:
+                self.cleanDeferred()
+            return
+
+        start_time = time()
+        nWorkers = min(self.nWorkers, len(self.jobs))
+        nThreads = max(1, (cpu_count() or 1) // nWorkers)
+        Logger.log('========= Baking of ' + format_int(len(self.jobs)) + ' channels by ' + format_int(nWorkers) + ' workers, of ' + format_int(nThreads) + ' threads =========', 0)
+
+        tempDir = mkdtemp(prefix = 'bjs_bake_')
+        processes = []
+        try:
+            blendCopy = path.join(tempDir, 'bake.blend')
+            bpy.ops.wm.save_as_mainfile(filepath = blendCopy, copy = True, check_existing = False, relative_remap = True)
+
+            # longest first onto the least loaded worker
+            loads = [[0, []] for idx in range(nWorkers)]
+            for idx, job in sorted(enumerate(self.jobs), key = lambda item: -item[1].cost):
+                job.output = path.join(tempDir, str(idx) + '_' + job.fileName)
+                job.description['output'] = job.output
+                load = min(loads, key = lambda load: load[0])
+                load[0] += job.cost
+                load[1].append(job.description)
+
+            for idx, load in enumerate(loads):
+                jobsFile = path.join(tempDir, 'jobs' + str(idx) + '.json')
+                with open(jobsFile, 'w', encoding='utf8') as file_handler:
+                    json.dump(load[1], file_handler)
+
+                logFile = open(path.join(tempDir, 'worker' + str(idx) + '.log'), 'w', encoding='utf8')
+                args = [bpy.app.binary_path, '--background', '--factory-startup', blendCopy, '--threads', str(nThreads), '--python', WORKER_SCRIPT, '--', jobsFile]
+                processes.append((Popen(args, stdout = logFile, stderr = STDOUT), logFile))
+
+            for idx, (process, logFile) in enumerate(processes):
+                while True:
+                    try:
+                        returnCode = process.wait(timeout = POLL_SECS)
+                        break
+                    except TimeoutExpired:
+                        yield
+                        Progress.check()
+                logFile.close()
+                if returnCode != 0:
+                    with open(logFile.name, 'r', encoding='utf8', errors='replace') as file_handler:
+                        Logger.warn('bake worker ' + str(idx) + ' failed, output:\n' + file_handler.read(), 1)
+
+            self.wireResults()
+
+        finally:
+            # otherwise they would go on baking from the copy of the .blend, which could then not be deleted on Windows
+            for process, logFile in processes:
+                if process.poll() is None:
+                    process.terminate()
+                    process.wait()
+                logFile.close()
+            self.cleanDeferred()
+            rmtree(tempDir, ignore_errors = True)
+
+        elapsed_time = time() - start_time
+        Logger.log('farm bake time:  ' + format_f(elapsed_time / 60) + ' min', 1)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def wireResults(self):
+        exporter = self.exporter
+        for job in self.jobs:
+            if not path.isfile(job.output):
+                Logger.error('bake of ' + job.bpyMesh.name + ', type: ' + job.bake_type + ' produced no image')
+                continue
+
+            Logger.log('wiring baked texture of ' + job.bpyMesh.name + ', type: ' + job.bake_type, 1)
+            if exporter.bakeCache is not None:
+                exporter.bakeCache.store(job.cacheKey, job.extension, lambda filepath: copy(job.output, filepath))
+
+            # BakedTexture names itself from the image, which is shared by the channels of a mesh
+            bakedMaterial = job.bakedMaterial
+            bakedMaterial.image.filepath = job.fileName
+            bakedMaterial.textures[job.bjs_type] = BakedTexture(job.bjs_type, bakedMaterial, job.bpyMesh, exporter, job.output)
+
+        self.packORMs()
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def cleanDeferred(self):
+        for bpyMesh in self.deferredCleans:
+            BJSMaterial.meshBakingClean(bpyMesh)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def packORMs(self):
+        for bakedMaterial, bpyMesh in self.deferredPacks:
+            bakedMaterial.packORM(bpyMesh)
@@ -0,0 +1,79 @@
+# Run by BakeFarm in a background Blender, on a copy of the .blend being exported:
+#     blender --background copy.blend --python bake_worker.py -- jobs.json
+# Not part of the add-on's package when run, so it imports nothing from it.  Each job is a channel of one mesh; the copy
+# already has the uv map to bake to, since it was saved after the exporter made it.
+import bpy
+
+import json
+import sys
+from os import path
+
+def bake_job(job, scene):
+    bpyMesh = bpy.data.objects[job['object']]
+
+    # texture is baked from selected mesh(es), need to insure this mesh is only one selected
+    for object in bpy.context.view_layer.objects:
+        object.select_set(False)
+    bpyMesh.select_set(True)
+    bpy.context.view_layer.objects.active = bpyMesh
+    bpyMesh.hide_render = False
+
+    uv = bpyMesh.data.uv_layers.get(job['uvMapName'])
+    if uv is not None:
+        bpyMesh.data.uv_layers.active = uv
+
+    image = bpy.data.images.new(name = bpyMesh.name + '_BJS_FARM', width = job['bakeSize'], height = job['bakeSize'], alpha = job['usePNG'], float_buffer = False)
+    image.file_format = job['format']
+
+    node_trees = []
+    for material_slot in bpyMesh.material_slots:
+        if material_slot.material is not None and material_slot.material.use_nodes:
+            node_trees.append(material_slot.material.node_tree)
+
+    # the active image node of each material is what is baked to
+    for tree in node_trees:
+        bakeNode = tree.nodes.new(type='ShaderNodeTexImage')
+        bakeNode.image = image
+        bakeNode.select = True
+        tree.nodes.active = bakeNode
+
+    try:
+        bpy.ops.object.bake(type = job['bakeType'], use_clear = True, margin = 5, use_selected_to_active = False)
+        image.save_render(job['output'], scene = scene)
+    finally:
+        for tree in node_trees:
+            tree.nodes.remove(tree.nodes.active)
+        bpy.data.images.remove(image)
+
+def main():
+    jobsFile = sys.argv[sys.argv.index('--') + 1]
+    with open(jobsFile, 'r', encoding='utf8') as file_handler:
+        jobs = json.load(file_handler)
+
+    # same settings as BJSMaterial.bake, except CPU, since workers are sized to the cores
+    scene = bpy.context.scene
+    render = scene.render
+    render.engine = 'CYCLES'
+    scene.cycles.device = 'CPU'
+    scene.cycles.samples = 16
+    render.bake.use_pass_indirect = False
+    render.bake.use_pass_direct   = False
+
+    nFailed = 0
+    for job in jobs:
+        image_settings = render.image_settings
+        image_settings.file_format = job['format']
+        image_settings.color_mode = 'RGBA' if job['usePNG'] else 'RGB'
+        image_settings.quality = job['bakeQuality']
+        image_settings.compression = job['bakeQuality']
+
+        try:
+            bake_job(job, scene)
+            print('baked ' + job['object'] + ', ' + job['bakeType'] + ' to ' + path.basename(job['output']))
+        except Exception as ex:
+            nFailed += 1
+            print('failed ' + job['object'] + ', ' + job['bakeType'] + ':  ' + str(ex))
+
+    sys.exit(1 if nFailed > 0 else 0)
+
+main()
@@ -16,6 +16,10 @@ class BakingRecipe:
         self.specularChannel = False
         self.bumpChannel     = False
 
+        # roughness is bakeable, but only has somewhere to go when packed with ambient occlusion & metallic
+        self.packORM = bpyMesh.data.packORM and exporter.settings.usePBRMaterials
+        self.roughnessChannel = False
+
         # un-bakeable Channels
         opacityChannel    = False
         metalChannel      = False
@@ -26,6 +30,7 @@ class BakingRecipe:
 
         # need to get the node trees of each material using nodes, if baking ends up required, so temp node can be added
         self.node_trees = []
+        self.nodeTreeMaterials = [] # the material of each, since embedded trees are all named the same
 
         # only used, when mesh does not end up being baked
         self.bjsMaterials = []
@@ -40,7 +45,7 @@ class BakingRecipe:
             bpyMaterial = material_slot.material
             if bpyMaterial is None: continue
 
-            bjsMaterial = BJSMaterial(bpyMaterial, exporter)
+            bjsMaterial = exporter.getBJSMaterial(bpyMaterial)
             self.bjsMaterials.append(bjsMaterial)
 
             if bpyMaterial.use_nodes == True:
@@ -48,6 +53,7 @@ class BakingRecipe:
                     firstMatUsingNodes = bjsMaterial
 
                 self.node_trees.append(bpyMaterial.node_tree)
+                self.nodeTreeMaterials.append(bpyMaterial)
 
                 bjsNodeTree = bjsMaterial.bjsNodeTree
                 self.needsBaking |= bjsNodeTree.mustBake
@@ -81,6 +87,10 @@ class BakingRecipe:
                     clearCoatChannel  = bjsNodeTree.mustBakeClearCoat
                     refractionChannel = bjsNodeTree.mustBakeRefraction
 
+        if self.packORM:
+            self.roughnessChannel = roughnessChannel
+            roughnessChannel = False
+
         if self.needsBaking:
             if opacityChannel:
                 Logger.warn('opacity channel baking required, but not possible, ignored', 3)
@@ -95,9 +105,9 @@ class BakingRecipe:
             if refractionChannel:
                 Logger.warn('Refraction channel baking required, but not possible, ignored', 3)
 
-            # when baking let the values of any custom properties come from the first node material
-            firstMatUsingNodes.name = bpyMesh.name + '_baked'
+            # when baking let the values of any custom properties come from the first node material, which is shared
             self.bakedMaterial = BJSMaterial(firstMatUsingNodes, exporter)
+            self.bakedMaterial.name = bpyMesh.name + '_baked'
             if not self.isMultiMaterial:
                 # there may be other image textures, which could be transferred when not multi material
                 self.bakedMaterial.processImageTextures(bpyMesh)
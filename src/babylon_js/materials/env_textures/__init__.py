@@ -1,6 +1 @@
 import bpy
-
-if "bpy" in locals():
-    import imp
-    if 'support' in locals():
-        imp.reload(support)
\ No newline at end of file
@@ -1,44 +1,16 @@
 from ..logging import *
 from ..package_level import *
+from ..progress import *
 
+from .bake_cache import get_bake_state_key, get_channel_key
 from .nodes.abstract import *
 from .texture import BakedTexture
+from .material_props import *
 
 import bpy
+from copy import copy
+from os import path, remove
 
-PBRMATERIAL_OPAQUE = '0'
-PBRMATERIAL_ALPHATEST = '1'
-PBRMATERIAL_ALPHABLEND = '2'
-PBRMATERIAL_ALPHATESTANDBLEND  = '3'
-
-# BJS defaults for both setting initial value of property, and reduce output if final value same as default
-DEF_ALPHA = 1.0
-DEF_FREEZE = False
-DEF_CULLING = True
-DEF_2_SIDED_LIGHTING = False
-DEF_MAX_LIGHTS = 4
-DEF_DISABLE_LIGHTING = False
-DEF_INV_NORMALS_X = False
-DEF_INV_NORMALS_Y = False
-DEF_OBJECT_SPACE_NORMAL_MAP = False
-DEF_PARALLAX = False
-DEF_PARALLAX_SCALE_BIAS = 0.05
-DEF_PARALLAX_OCCLUSION = False
-DEF_TRANSPARENCY_MODE = PBRMATERIAL_OPAQUE
-DEF_ALPHA_CUTOFF = 0.4
-DEF_ENV_INTENSITY = 1.0
-DEF_HORIZON_OCCLUSION = True
-DEF_RADIANCE_OCCLUSION = True
-DEF_IRADIANCE_IN_FRAG = False
-DEF_RADIANCE_OVER_ALPHA = True
-DEF_NORMALS_FORWARD = False
-DEF_SPECULAR_ANTIALISING = False
-
-DEF_EMISSIVE_INTENSITY = 1.0
-
-DEF_IRIDESCENCE_INTENSITY = 0
-DEF_IRIDESCENCE_MIN_THICKNESS = 0
-DEF_IRIDESCENCE_MAX_THICKNESS = 0
 #===============================================================================
 class MultiMaterial:
     def __init__(self, material_slots, idx, nameSpace):
@@ -98,6 +70,7 @@ class BJSMaterial:
         self.iridescenceMinThickness = mat.iridescenceMinThickness
         self.iridescenceMaxThickness = mat.iridescenceMaxThickness
         self.STDMatOverride = mat.STDMatOverride
+        self.maxTextureSize = mat.maxTextureSize
 
         self.isPBR = exporter.settings.usePBRMaterials and not self.STDMatOverride
         # Fix for AttributeError: 'BJSMaterial' object has no attribute 'node_tree'
@@ -123,7 +96,9 @@ class BJSMaterial:
     def processImageTextures(self, bpyMesh):
         if not self.use_nodes: return False
 
+        # node trees are shared with baked materials made from this one, so the processed textures are copies
         for texType, tex in self.bjsNodeTree.bjsTextures.items():
+            tex = copy(tex)
             self.textures[texType] = tex
             tex.process(self.exporter, True, bpyMesh)
 
@@ -143,99 +118,113 @@ class BJSMaterial:
         forceBaking = bpyMesh.data.forceBaking
         usePNG      = bpyMesh.data.usePNG
 
+        # hashed before the baking uv is added, or the temporary bake node
+        bakeCache = self.exporter.bakeCache
+        self.bakeStateKey = get_bake_state_key(bpyMesh, recipe) if bakeCache is not None else None
+
         # store setting to restore; always bake using CYCLES, GPU, and performance improvements of tile size & samples
         # does not fail when no GPU
         scene = bpy.context.scene
         render = scene.render
 
         deviceHold = scene.cycles.device
-        scene.cycles.device = 'GPU'
-
         engineHold = render.engine
-        render.engine = 'CYCLES'
-
         usePassIndirectHold = render.bake.use_pass_indirect
         usePassDirectHold   = render.bake.use_pass_direct
-        render.bake.use_pass_indirect = False
-        render.bake.use_pass_direct   = False
-
         samplesHold = scene.cycles.samples
-        scene.cycles.samples = 16
-
-        # mode_set's only work when there is an active object
-        bpy.context.view_layer.objects.active = bpyMesh
-
-        # UV unwrap operates on mesh in only edit mode, procedurals can also give error of 'no images to be found' when not done
-        # select all verticies of mesh, since smart_project works only with selected verticies
-        bpy.ops.object.mode_set(mode='EDIT')
-        bpy.ops.mesh.select_all(action='SELECT')
-
-        # you need UV on a mesh in order to bake image.  This is not reqd for procedural textures, so may not exist
-        # need to look if it might already be created, if so use the first one
-        uv = bpyMesh.data.uv_layers[0] if len(bpyMesh.data.uv_layers) > 0 else None
-
-        if uv == None or recipe.isMultiMaterial:
-            uv = bpyMesh.data.uv_layers.new(name='BakingUV')
-            uv.active = True
-            uv.active_render = not forceBaking # want the other uv's for the source when combining
-
-            bpy.ops.uv.smart_project(area_weight = 1.0, scale_to_bounds = True)
-            bpyMesh.update_from_editmode()
-
-            # syntax for using unwrap enstead of smart project
-#            bpy.ops.uv.unwrap(margin = 1.0) # defaulting on all
-            self.uvMapName = 'BakingUV'  # issues with cycles when not done this way
-        else:
-            self.uvMapName = uv.name
-
-        format = 'PNG' if usePNG else 'JPEG'
-
-        # create a temporary image & link it to the UV/Image Editor so bake_image works
-        self.image = bpy.data.images.new(name = bpyMesh.name + '_BJS_BAKE', width = bakeSize, height = bakeSize, alpha = usePNG, float_buffer = False)
-        self.image.file_format = format
-    #    self.image.mapping = 'UV' # default value
-
-        image_settings = render.image_settings
-        image_settings.file_format = format
-        image_settings.color_mode = 'RGBA' if usePNG else 'RGB'
-        image_settings.quality = bakeQuality # for lossy compression formats
-        image_settings.compression = bakeQuality  # Amount of time to determine best compression: 0 = no compression with fast file output, 100 = maximum lossless compression with slow file output
-
-        # now go thru all the textures that need to be baked
-        if recipe.diffuseChannel:
-            self.bakeChannel(DIFFUSE_TEX , 'DIFFUSE', usePNG, recipe.node_trees, bpyMesh)
-            Logger.log('Diffuse / albeto channel baked', 3)
 
-        if recipe.ambientChannel:
-            self.bakeChannel(AMBIENT_TEX , 'AO'     , usePNG, recipe.node_trees, bpyMesh)
-            Logger.log('ambient channel baked', 3)
-
-        if recipe.emissiveChannel:
-            self.bakeChannel(EMMISIVE_TEX, 'EMIT'   , usePNG, recipe.node_trees, bpyMesh)
-            Logger.log('emissive channel baked', 3)
-
-        if recipe.specularChannel:
-            self.bakeChannel(SPECULAR_TEX, 'GLOSSY' , usePNG, recipe.node_trees, bpyMesh)
-            Logger.log('specular channel baked', 3)
+        # the settings are put back, & the mesh back to object mode, even when the bake is cancelled or fails
+        try:
+            scene.cycles.device = 'GPU'
+            render.engine = 'CYCLES'
+            render.bake.use_pass_indirect = False
+            render.bake.use_pass_direct   = False
+            scene.cycles.samples = 16
+
+            # mode_set's only work when there is an active object
+            bpy.context.view_layer.objects.active = bpyMesh
+
+            # UV unwrap operates on mesh in only edit mode, procedurals can also give error of 'no images to be found' when not done
+            # select all verticies of mesh, since smart_project works only with selected verticies
+            bpy.ops.object.mode_set(mode='EDIT')
+            bpy.ops.mesh.select_all(action='SELECT')
+
+            # the exporter removes the baking uv & image of meshes it does not finish
+            self.exporter.bakedMeshes.append(bpyMesh)
+
+            # you need UV on a mesh in order to bake image.  This is not reqd for procedural textures, so may not exist
+            # need to look if it might already be created, if so use the first one
+            uv = bpyMesh.data.uv_layers[0] if len(bpyMesh.data.uv_layers) > 0 else None
+
+            if uv == None or recipe.isMultiMaterial:
+                uv = bpyMesh.data.uv_layers.new(name='BakingUV')
+                uv.active = True
+                uv.active_render = not forceBaking # want the other uv's for the source when combining
+
+                bpy.ops.uv.smart_project(area_weight = 1.0, scale_to_bounds = True)
+                bpyMesh.update_from_editmode()
+
+                # syntax for using unwrap enstead of smart project
+#                bpy.ops.uv.unwrap(margin = 1.0) # defaulting on all
+                self.uvMapName = 'BakingUV'  # issues with cycles when not done this way
+            else:
+                self.uvMapName = uv.name
+
+            format = 'PNG' if usePNG else 'JPEG'
+
+            # create a temporary image & link it to the UV/Image Editor so bake_image works
+            self.image = bpy.data.images.new(name = bpyMesh.name + '_BJS_BAKE', width = bakeSize, height = bakeSize, alpha = usePNG, float_buffer = False)
+            self.image.file_format = format
+        #    self.image.mapping = 'UV' # default value
+
+            image_settings = render.image_settings
+            image_settings.file_format = format
+            image_settings.color_mode = 'RGBA' if usePNG else 'RGB'
+            image_settings.quality = bakeQuality # for lossy compression formats
+            image_settings.compression = bakeQuality  # Amount of time to determine best compression: 0 = no compression with fast file output, 100 = maximum lossless compression with slow file output
+
+            # now go thru all the textures that need to be baked;  when packing, ambient occlusion is always baked, since it
+            # then costs no extra texture
+            packORM = recipe.packORM and self.isPBR
+            channels = []
+            if recipe.diffuseChannel                 : channels.append((DIFFUSE_TEX  , 'DIFFUSE'  , 'Diffuse / albeto'))
+            if recipe.ambientChannel or packORM      : channels.append((AMBIENT_TEX  , 'AO'       , 'ambient'))
+            if recipe.roughnessChannel and packORM   : channels.append((ROUGHNESS_TEX, 'ROUGHNESS', 'roughness'))
+            if recipe.emissiveChannel                : channels.append((EMMISIVE_TEX , 'EMIT'     , 'emissive'))
+            if recipe.specularChannel                : channels.append((SPECULAR_TEX , 'GLOSSY'   , 'specular'))
+            if recipe.bumpChannel                    : channels.append((BUMP_TEX     , 'NORMAL'   , 'bump'))
+
+            channelWork = bakeSize * bakeSize * WEIGHT_BAKE_PIXEL
+            Progress.add_work(len(channels) * channelWork)
+            for bjs_type, bake_type, description in channels:
+                Progress.check()
+                self.bakeChannel(bjs_type, bake_type, usePNG, recipe.node_trees, bpyMesh)
+                Logger.log(description + ' channel baked', 3)
+                Progress.advance(channelWork, 'baking ' + bpyMesh.name)
+
+            # channels baked by the farm are not there yet, so it packs once they are
+            if packORM:
+                if self.exporter.bakeFarm is not None:
+                    self.exporter.bakeFarm.deferPackORM(self, bpyMesh)
+                else:
+                    self.packORM(bpyMesh)
 
-        if recipe.bumpChannel:
-            self.bakeChannel(BUMP_TEX    , 'NORMAL' , usePNG, recipe.node_trees, bpyMesh)
-            Logger.log('bump channel baked', 3)
+            # Toggle vertex selection & mode, if setting changed their value
+            bpy.ops.mesh.select_all(action='TOGGLE')  # still in edit mode toggle select back to previous
+            bpy.ops.object.mode_set(toggle=True)      # change back to Object
 
-        # Toggle vertex selection & mode, if setting changed their value
-        bpy.ops.mesh.select_all(action='TOGGLE')  # still in edit mode toggle select back to previous
-        bpy.ops.object.mode_set(toggle=True)      # change back to Object
+            bpy.ops.object.select_all(action='TOGGLE') # change scene selection back, not seeming to work
 
-        bpy.ops.object.select_all(action='TOGGLE') # change scene selection back, not seeming to work
+        finally:
+            if bpy.ops.object.mode_set.poll() and bpyMesh.mode != 'OBJECT':
+                bpy.ops.object.mode_set(mode='OBJECT')
 
-        # restore settings
-        scene.cycles.device = deviceHold
-        render.engine = engineHold
-        render.bake.use_pass_indirect = usePassIndirectHold
-        render.bake.use_pass_direct   = usePassDirectHold
-        render.bake.use_pass_indirect = False
-        render.bake.use_pass_direct   = False
-        scene.cycles.samples = samplesHold
+            # restore settings
+            scene.cycles.device = deviceHold
+            render.engine = engineHold
+            render.bake.use_pass_indirect = usePassIndirectHold
+            render.bake.use_pass_direct   = usePassDirectHold
+            scene.cycles.samples = samplesHold
 
         elapsed_time = time() - start_time
         minutes = floor(elapsed_time / 60)
@@ -245,7 +234,26 @@ class BJSMaterial:
     def bakeChannel(self, bjs_type, bake_type, usePNG, node_trees, bpyMesh):
         Logger.log('Baking texture, type: ' + bake_type + ', mapped using: ' + self.uvMapName, 3)
         legalName = legal_js_identifier(self.name)
-        self.image.filepath = legalName + '_' + bake_type + ('.png' if usePNG else '.jpg')
+        extension = '.png' if usePNG else '.jpg'
+        self.image.filepath = legalName + '_' + bake_type + extension
+
+        bakeCache = self.exporter.bakeCache
+        if bakeCache is not None:
+            cacheKey = get_channel_key(self.bakeStateKey, bake_type)
+            cachedFile = bakeCache.lookup(cacheKey)
+            if cachedFile is not None:
+                Logger.log('bake cache hit, type: ' + bake_type, 3)
+                self.textures[bjs_type] = BakedTexture(bjs_type, self, bpyMesh, self.exporter, cachedFile)
+                return
+
+            Logger.log('bake cache miss, type: ' + bake_type, 3)
+
+        else:
+            cacheKey = None
+
+        if self.exporter.bakeFarm is not None:
+            self.exporter.bakeFarm.addJob(self, bjs_type, bake_type, bpyMesh, cacheKey)
+            return
 
         # create an unlinked temporary node to bake to for each material
         for tree in node_trees:
@@ -267,7 +275,72 @@ class BJSMaterial:
         for tree in node_trees:
             tree.nodes.remove(tree.nodes.active)
 
+        if bakeCache is not None:
+            bakeCache.store(cacheKey, extension, self.image.save_render)
+
         self.textures[bjs_type] = BakedTexture(bjs_type, self, bpyMesh, self.exporter)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # Ambient occlusion, roughness & metallic into the red, green & blue of one texture, from the files written for the baked
+    # channels.  Roughness & metallic are the values of the node tree, when not baked.  The texture is under all 3 types, so
+    # to_json_file writes it once as the metallic texture, with the flags for each channel.  Image textures of the material,
+    # kept when not multi material, are not bakes;  when there is a roughness or metallic one, nothing is packed.
+    def packORM(self, bpyMesh):
+        import numpy
+
+        for textureType, description in ((ROUGHNESS_TEX, 'roughness'), (METAL_TEX, 'metallic')):
+            texture = self.textures.get(textureType)
+            if texture is not None and not isinstance(texture, BakedTexture):
+                Logger.log('not packed, since the material has a ' + description + ' texture:  ' + texture.name, 3)
+                return
+
+        ambient = self.textures.get(AMBIENT_TEX)
+        rough = self.textures.get(ROUGHNESS_TEX)
+        if not isinstance(ambient, BakedTexture): ambient = None
+        if ambient is None and rough is None: return
+
+        width, height = self.image.size
+        pixels = numpy.ones((height * width, 4), dtype = numpy.float32)
+
+        roughness = self.bjsNodeTree.roughness if self.bjsNodeTree.roughness is not None else 0.2 # as to_json_file
+        metallic = self.bjsNodeTree.metallic if self.bjsNodeTree.metallic is not None else 0.0
+        pixels[:, 0] = self.readBakedChannel(ambient, width, height) if ambient is not None else 1.0
+        pixels[:, 1] = self.readBakedChannel(rough, width, height) if rough is not None else roughness
+        pixels[:, 2] = metallic
+
+        extension = '.png' if self.image.file_format == 'PNG' else '.jpg'
+        self.image.filepath = legal_js_identifier(self.name) + '_ORM' + extension
+        self.image.pixels.foreach_set(pixels.ravel())
+
+        packed = BakedTexture(METAL_TEX, self, bpyMesh, self.exporter)
+        self.textures[AMBIENT_TEX] = packed
+        self.textures[ROUGHNESS_TEX] = packed
+        self.textures[METAL_TEX] = packed
+        Logger.log('ambient occlusion, roughness & metallic packed into ' + packed.name, 3)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # the red of the file written for a baked channel, which is then not needed, unless it is being in-lined from there
+    def readBakedChannel(self, texture, width, height):
+        import numpy
+
+        if texture.inlineData is not None:
+            filepath = texture.inlineData.filepath
+        else:
+            filepath = path.join(path.dirname(self.exporter.filepathMinusExtension), texture.fileNoPath)
+
+        image = bpy.data.images.load(filepath, check_existing = False)
+        try:
+            if tuple(image.size) != (width, height):
+                Logger.warn('baked channel not the size of the bake, not packed:  ' + filepath, 4)
+                return 1.0
+
+            channel = numpy.empty(width * height * 4, dtype = numpy.float32)
+            image.pixels.foreach_get(channel)
+        finally:
+            bpy.data.images.remove(image)
+
+        if texture.inlineData is None:
+            remove(filepath)
+
+        return channel.reshape((-1, 4))[:, 0]
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
     def to_json_file(self, file_handler):
         file_handler.write('{')
@@ -506,223 +579,3 @@ class BJSMaterial:
                 image.user_clear() # cannot remove image unless 0 references
                 bpy.data.images.remove(image)
                 break
-#===============================================================================
-bpy.types.Material.overloadChannels = bpy.props.BoolProperty(
-    name='Overload Colors & textures for Diffuse / Albedo & Emmission Fields',
-    description='When checked, a color is sent for the field even when\nit is also connected with a texture node',
-    default = False
-)
-bpy.types.Material.backFaceCulling = bpy.props.BoolProperty(
-    name='Back Face Culling',
-    description='When checked, the faces on the inside of the mesh will not be drawn',
-    default = DEF_CULLING
-)
-bpy.types.Material.twoSidedLighting = bpy.props.BoolProperty(
-    name='2 Sided lighting',
-    description='When checked and backfaceCulling is false,\nnormals will be flipped on the backside',
-    default = DEF_2_SIDED_LIGHTING
-)
-bpy.types.Material.disableLighting = bpy.props.BoolProperty(
-    name='Disable Lights',
-    description='When checked, disables all the lights affecting the material',
-    default = DEF_DISABLE_LIGHTING
-)
-bpy.types.Material.maxSimultaneousLights = bpy.props.IntProperty(
-    name='Max Simultaneous Lights',
-    description='BJS property set on each material.\nSet higher for more complex lighting.\nSet lower for armatures on mobile',
-    default = DEF_MAX_LIGHTS, min = 0, max = 32
-)
-bpy.types.Material.invertNormalMapX = bpy.props.BoolProperty(
-    name='Invert Normals X',
-    description='When checked, x component of normal map value will invert (x = 1.0 - x)',
-    default = DEF_INV_NORMALS_X
-)
-bpy.types.Material.freeze = bpy.props.BoolProperty(
-    name='Freeze',
-    description='When checked, Material freeze is executed, same as checkReadyOnlyOnce',
-    default = DEF_FREEZE
-)
-bpy.types.Material.invertNormalMapY = bpy.props.BoolProperty(
-    name='Invert Normals Y',
-    description='When checked, y component (z in Blender)\nof normal map value will invert (y = 1.0 - y)',
-    default = DEF_INV_NORMALS_Y
-)
-bpy.types.Material.useObjectSpaceNormalMap = bpy.props.BoolProperty(
-    name='Object Space Normal Map',
-    description='When checked, Allows using an object space normal map (instead of tangent space)',
-    default = DEF_OBJECT_SPACE_NORMAL_MAP
-)
-bpy.types.Material.useParallax = bpy.props.BoolProperty(
-    name='Parallax',
-    description='When checked, parallax is enabled',
-    default = DEF_PARALLAX
-)
-bpy.types.Material.parallaxScaleBias = bpy.props.FloatProperty(
-    name='Scale Bias',
-    description='A scaling factor that determine which "depth" the height\nmap should represent for Parallax',
-    default = DEF_PARALLAX_SCALE_BIAS, min = 0, max = 1.0
-)
-bpy.types.Material.useParallaxOcclusion = bpy.props.BoolProperty(
-    name='Parallax Occlusion',
-    description="When checked, the outcome is way more realistic than traditional Parallax,\nbut you can expect a performance hit that's worth consideration",
-    default = DEF_PARALLAX_OCCLUSION
-)
-bpy.types.Material.transparencyMode = bpy.props.EnumProperty(
-    name='', # use a row heading for label to reduce dropdown width
-    description='How the alpha of this material is to be handled.  No meaning unless exporting PBR materials.',
-    items = ((PBRMATERIAL_OPAQUE           , 'Opaque'            , 'Alpha channel is not used.'),
-             (PBRMATERIAL_ALPHATEST        , 'Alpha Test'        , 'Pixels are discarded below a certain threshold defined by the alpha cutoff value.'),
-             (PBRMATERIAL_ALPHABLEND       , 'Alpha Blend'       , 'Pixels are blended (according to the alpha mode) with\n the already drawn pixels in the current frame buffer.'),
-             (PBRMATERIAL_ALPHATESTANDBLEND, 'Alpha Test & Blend', 'Pixels are blended after being higher than the cutoff threshold.')
-            ),
-    default = DEF_TRANSPARENCY_MODE
-)
-bpy.types.Material.alphaCutOff = bpy.props.FloatProperty(
-    name='Transparency Alpha Cutoff',
-    description='The threshold used for Alpha Test and Alpha Test & Blend transparency modes .\nNo meaning unless exporting PBR materials',
-    default = DEF_ALPHA_CUTOFF, min = 0, max = 1.0
-)
-bpy.types.Material.intensityOverride = bpy.props.BoolProperty(
-    name='Override World Environment Intensity',
-    description='When checked, use the intensity here, instead of the one in World',
-    default = False
-)
-bpy.types.Material.environmentIntensity = bpy.props.FloatProperty(
-    name='Env. Intensity',
-    description='This is the intensity of the environment to be applied to this material.\nNo meaning unless exporting PBR materials.',
-    default = DEF_ENV_INTENSITY, min = 0, max = 1.0
-)
-bpy.types.Material.useHorizonOcclusion = bpy.props.BoolProperty(
-    name='Horizon Occlusion',
-    description='When checked, to prevent normal maps to look shiny when the\nnormal makes the reflect vector face the model (under horizon)',
-    default = DEF_HORIZON_OCCLUSION
-)
-bpy.types.Material.useRadianceOcclusion = bpy.props.BoolProperty(
-    name='Radiance Occlusion',
-    description='When checked, to prevent the radiance to light too much the area relying on ambient texture to define their ambient occlusion',
-    default = DEF_RADIANCE_OCCLUSION
-)
-bpy.types.Material.forceIrradianceInFragment = bpy.props.BoolProperty(
-    name='Irradiance in Fragment',
-    description='When checked, force the shader to compute irradiance in the fragment shader in order to take bump in account',
-    default = DEF_IRADIANCE_IN_FRAG
-)
-bpy.types.Material.useRadianceOverAlpha = bpy.props.BoolProperty(
-    name='Radiance over Alpha',
-    description='When checked, the material will keeps the reflection highlights over a transparent surface\n(only the most luminous ones).  A car glass is a good example of that.\nWhen the street lights reflects on it you can not see what is behind',
-    default = DEF_RADIANCE_OVER_ALPHA
-)
-bpy.types.Material.forceNormalForward = bpy.props.BoolProperty(
-    name='Normals Forward',
-    description='When checked, force normal to face away from face',
-    default = DEF_NORMALS_FORWARD
-)
-bpy.types.Material.enableSpecularAntiAliasing = bpy.props.BoolProperty(
-    name='Specular Anti-Aliasing',
-    description='When checked, specular anti aliasing in the PBR shader',
-    default = DEF_SPECULAR_ANTIALISING
-)
-bpy.types.Material.iridescenceIntensity = bpy.props.FloatProperty(
-    name='Intensity',
-    description='To turn on, make greater than 0',
-    default = DEF_IRIDESCENCE_INTENSITY, min = 0, max = 1.0
-)
-bpy.types.Material.iridescenceMinThickness = bpy.props.FloatProperty(
-    name='Min Thickness',
-    description='in nanometers',
-    default = DEF_IRIDESCENCE_MIN_THICKNESS, min = 0
-)
-bpy.types.Material.iridescenceMaxThickness = bpy.props.FloatProperty(
-    name='Max Thickness',
-    description='in nanometers',
-    default = DEF_IRIDESCENCE_MAX_THICKNESS, min = 0
-)
-bpy.types.Material.STDMatOverride = bpy.props.BoolProperty(
-    name='Override as a STD Material',
-    description='When checked, a STD material is generated , not PBR.\nNo meaning unless exporting in PBR.',
-    default = False
-)
-#===============================================================================
-class BJS_PT_MaterialsPanel(bpy.types.Panel):
-    bl_label = get_title()
-    bl_space_type = 'PROPERTIES'
-    bl_region_type = 'WINDOW'
-    bl_context = 'material'
-
-    def draw(self, context):
-        layout = self.layout
-
-        mesh = context.object
-        index = mesh.active_material_index
-
-        if  len(mesh.material_slots) >= 1:
-            material = mesh.material_slots[index].material
-            if material:
-                layout.prop(material, 'overloadChannels')
-                layout.row() # just usde for spacing
-
-                row = layout.row()
-                row.prop(material, 'backFaceCulling')
-                row.prop(material, 'twoSidedLighting')
-
-                row = layout.row()
-                row.prop(material, 'disableLighting')
-                row.prop(material, 'maxSimultaneousLights')
-
-                row = layout.row()
-                row.prop(material, 'invertNormalMapX')
-                row.prop(material, 'invertNormalMapY')
-
-                row = layout.row()
-                row.prop(material, 'useObjectSpaceNormalMap')
-                row.prop(material, 'freeze')
-
-                box = layout.box()
-                box.prop(material, 'useParallax')
-                row = box.row()
-                row.enabled = material.useParallax
-                row.prop(material, 'parallaxScaleBias')
-                row.prop(material, 'useParallaxOcclusion')
-
-                box = layout.box()
-                box.label(text='PBR Only Properties:')
-
-                row = box.row(heading='Transparency Mode')
-                row.prop(material, 'transparencyMode')
-
-                row = box.row()
-                row.enabled = material.transparencyMode == PBRMATERIAL_ALPHATEST or material.transparencyMode == PBRMATERIAL_ALPHATESTANDBLEND
-                row.prop(material, 'alphaCutOff')
-                box.row() # just usde for spacing
-
-                box.prop(material, 'intensityOverride')
-                row = box.row()
-                row.enabled = material.intensityOverride
-                row.prop(material, 'environmentIntensity')
-                box.row() # just usde for spacing
-
-                row = box.row()
-                row.prop(material, 'useHorizonOcclusion')
-                row.prop(material, 'useRadianceOcclusion')
-
-                row = box.row()
-                row.prop(material, 'forceIrradianceInFragment')
-                row.prop(material, 'useRadianceOverAlpha')
-
-                row = box.row()
-                row.prop(material, 'forceNormalForward')
-                row.prop(material, 'enableSpecularAntiAliasing')
-
-                box = box.box()
-                box.label(text='Iridescence:')
-
-                row = box.row()
-                row.prop(material, 'iridescenceIntensity')
-
-                row = box.row()
-                row.enabled = material.iridescenceIntensity > 0
-                row.prop(material, 'iridescenceMinThickness')
-                row.prop(material, 'iridescenceMaxThickness')
-
-
-                layout.prop(material, 'STDMatOverride')
\ No newline at end of file
@@ -0,0 +1,264 @@
+from ..package_level import get_title
+
+import bpy
+
+PBRMATERIAL_OPAQUE = '0'
+PBRMATERIAL_ALPHATEST = '1'
+PBRMATERIAL_ALPHABLEND = '2'
+PBRMATERIAL_ALPHATESTANDBLEND  = '3'
+
+# BJS defaults for both setting initial value of property, and reduce output if final value same as default
+DEF_ALPHA = 1.0
+DEF_FREEZE = False
+DEF_CULLING = True
+DEF_2_SIDED_LIGHTING = False
+DEF_MAX_LIGHTS = 4
+DEF_DISABLE_LIGHTING = False
+DEF_INV_NORMALS_X = False
+DEF_INV_NORMALS_Y = False
+DEF_OBJECT_SPACE_NORMAL_MAP = False
+DEF_PARALLAX = False
+DEF_PARALLAX_SCALE_BIAS = 0.05
+DEF_PARALLAX_OCCLUSION = False
+DEF_TRANSPARENCY_MODE = PBRMATERIAL_OPAQUE
+DEF_ALPHA_CUTOFF = 0.4
+DEF_ENV_INTENSITY = 1.0
+DEF_HORIZON_OCCLUSION = True
+DEF_RADIANCE_OCCLUSION = True
+DEF_IRADIANCE_IN_FRAG = False
+DEF_RADIANCE_OVER_ALPHA = True
+DEF_NORMALS_FORWARD = False
+DEF_SPECULAR_ANTIALISING = False
+
+DEF_EMISSIVE_INTENSITY = 1.0
+
+DEF_IRIDESCENCE_INTENSITY = 0
+DEF_IRIDESCENCE_MIN_THICKNESS = 0
+DEF_IRIDESCENCE_MAX_THICKNESS = 0
+#===============================================================================
+bpy.types.Material.overloadChannels = bpy.props.BoolProperty(
+    name='Overload Colors & textures for Diffuse / Albedo & Emmission Fields',
+    description='When checked, a color is sent for the field even when\nit is also connected with a texture node',
+    default = False
+)
+bpy.types.Material.backFaceCulling = bpy.props.BoolProperty(
+    name='Back Face Culling',
+    description='When checked, the faces on the inside of the mesh will not be drawn',
+    default = DEF_CULLING
+)
+bpy.types.Material.twoSidedLighting = bpy.props.BoolProperty(
+    name='2 Sided lighting',
+    description='When checked and backfaceCulling is false,\nnormals will be flipped on the backside',
+    default = DEF_2_SIDED_LIGHTING
+)
+bpy.types.Material.disableLighting = bpy.props.BoolProperty(
+    name='Disable Lights',
+    description='When checked, disables all the lights affecting the material',
+    default = DEF_DISABLE_LIGHTING
+)
+bpy.types.Material.maxSimultaneousLights = bpy.props.IntProperty(
+    name='Max Simultaneous Lights',
+    description='BJS property set on each material.\nSet higher for more complex lighting.\nSet lower for armatures on mobile',
+    default = DEF_MAX_LIGHTS, min = 0, max = 32
+)
+bpy.types.Material.invertNormalMapX = bpy.props.BoolProperty(
+    name='Invert Normals X',
+    description='When checked, x component of normal map value will invert (x = 1.0 - x)',
+    default = DEF_INV_NORMALS_X
+)
+bpy.types.Material.freeze = bpy.props.BoolProperty(
+    name='Freeze',
+    description='When checked, Material freeze is executed, same as checkReadyOnlyOnce',
+    default = DEF_FREEZE
+)
+bpy.types.Material.invertNormalMapY = bpy.props.BoolProperty(
+    name='Invert Normals Y',
+    description='When checked, y component (z in Blender)\nof normal map value will invert (y = 1.0 - y)',
+    default = DEF_INV_NORMALS_Y
+)
+bpy.types.Material.useObjectSpaceNormalMap = bpy.props.BoolProperty(
+    name='Object Space Normal Map',
+    description='When checked, Allows using an object space normal map (instead of tangent space)',
+    default = DEF_OBJECT_SPACE_NORMAL_MAP
+)
+bpy.types.Material.useParallax = bpy.props.BoolProperty(
+    name='Parallax',
+    description='When checked, parallax is enabled',
+    default = DEF_PARALLAX
+)
+bpy.types.Material.parallaxScaleBias = bpy.props.FloatProperty(
+    name='Scale Bias',
+    description='A scaling factor that determine which "depth" the height\nmap should represent for Parallax',
+    default = DEF_PARALLAX_SCALE_BIAS, min = 0, max = 1.0
+)
+bpy.types.Material.useParallaxOcclusion = bpy.props.BoolProperty(
+    name='Parallax Occlusion',
+    description="When checked, the outcome is way more realistic than traditional Parallax,\nbut you can expect a performance hit that's worth consideration",
+    default = DEF_PARALLAX_OCCLUSION
+)
+bpy.types.Material.transparencyMode = bpy.props.EnumProperty(
+    name='', # use a row heading for label to reduce dropdown width
+    description='How the alpha of this material is to be handled.  No meaning unless exporting PBR materials.',
+    items = ((PBRMATERIAL_OPAQUE           , 'Opaque'            , 'Alpha channel is not used.'),
+             (PBRMATERIAL_ALPHATEST        , 'Alpha Test'        , 'Pixels are discarded below a certain threshold defined by the alpha cutoff value.'),
+             (PBRMATERIAL_ALPHABLEND       , 'Alpha Blend'       , 'Pixels are blended (according to the alpha mode) with\n the already drawn pixels in the current frame buffer.'),
+             (PBRMATERIAL_ALPHATESTANDBLEND, 'Alpha Test & Blend', 'Pixels are blended after being higher than the cutoff threshold.')
+            ),
+    default = DEF_TRANSPARENCY_MODE
+)
+bpy.types.Material.alphaCutOff = bpy.props.FloatProperty(
+    name='Transparency Alpha Cutoff',
+    description='The threshold used for Alpha Test and Alpha Test & Blend transparency modes .\nNo meaning unless exporting PBR materials',
+    default = DEF_ALPHA_CUTOFF, min = 0, max = 1.0
+)
+bpy.types.Material.intensityOverride = bpy.props.BoolProperty(
+    name='Override World Environment Intensity',
+    description='When checked, use the intensity here, instead of the one in World',
+    default = False
+)
+bpy.types.Material.environmentIntensity = bpy.props.FloatProperty(
+    name='Env. Intensity',
+    description='This is the intensity of the environment to be applied to this material.\nNo meaning unless exporting PBR materials.',
+    default = DEF_ENV_INTENSITY, min = 0, max = 1.0
+)
+bpy.types.Material.useHorizonOcclusion = bpy.props.BoolProperty(
+    name='Horizon Occlusion',
+    description='When checked, to prevent normal maps to look shiny when the\nnormal makes the reflect vector face the model (under horizon)',
+    default = DEF_HORIZON_OCCLUSION
+)
+bpy.types.Material.useRadianceOcclusion = bpy.props.BoolProperty(
+    name='Radiance Occlusion',
+    description='When checked, to prevent the radiance to light too much the area relying on ambient texture to define their ambient occlusion',
+    default = DEF_RADIANCE_OCCLUSION
+)
+bpy.types.Material.forceIrradianceInFragment = bpy.props.BoolProperty(
+    name='Irradiance in Fragment',
+    description='When checked, force the shader to compute irradiance in the fragment shader in order to take bump in account',
+    default = DEF_IRADIANCE_IN_FRAG
+)
+bpy.types.Material.useRadianceOverAlpha = bpy.props.BoolProperty(
+    name='Radiance over Alpha',
+    description='When checked, the material will keeps the reflection highlights over a transparent surface\n(only the most luminous ones).  A car glass is a good example of that.\nWhen the street lights reflects on it you can not see what is behind',
+    default = DEF_RADIANCE_OVER_ALPHA
+)
+bpy.types.Material.forceNormalForward = bpy.props.BoolProperty(
+    name='Normals Forward',
+    description='When checked, force normal to face away from face',
+    default = DEF_NORMALS_FORWARD
+)
+bpy.types.Material.enableSpecularAntiAliasing = bpy.props.BoolProperty(
+    name='Specular Anti-Aliasing',
+    description='When checked, specular anti aliasing in the PBR shader',
+    default = DEF_SPECULAR_ANTIALISING
+)
+bpy.types.Material.iridescenceIntensity = bpy.props.FloatProperty(
+    name='Intensity',
+    description='To turn on, make greater than 0',
+    default = DEF_IRIDESCENCE_INTENSITY, min = 0, max = 1.0
+)
+bpy.types.Material.iridescenceMinThickness = bpy.props.FloatProperty(
+    name='Min Thickness',
+    description='in nanometers',
+    default = DEF_IRIDESCENCE_MIN_THICKNESS, min = 0
+)
+bpy.types.Material.iridescenceMaxThickness = bpy.props.FloatProperty(
+    name='Max Thickness',
+    description='in nanometers',
+    default = DEF_IRIDESCENCE_MAX_THICKNESS, min = 0
+)
+bpy.types.Material.STDMatOverride = bpy.props.BoolProperty(
+    name='Override as a STD Material',
+    description='When checked, a STD material is generated , not PBR.\nNo meaning unless exporting in PBR.',
+    default = False
+)
+bpy.types.Material.maxTextureSize = bpy.props.IntProperty(
+    name='Max Texture Size',
+    description='Textures of this material larger than this in either dimension are scaled down when exported.\n0 uses the scene setting',
+    default = 0, min = 0, max = 16384
+)
+#===============================================================================
+class BJS_PT_MaterialsPanel(bpy.types.Panel):
+    bl_label = get_title()
+    bl_space_type = 'PROPERTIES'
+    bl_region_type = 'WINDOW'
+    bl_context = 'material'
+
+    def draw(self, context):
+        layout = self.layout
+
+        mesh = context.object
+        index = mesh.active_material_index
+
+        if  len(mesh.material_slots) >= 1:
+            material = mesh.material_slots[index].material
+            if material:
+                layout.prop(material, 'overloadChannels')
+                layout.row() # just usde for spacing
+
+                row = layout.row()
+                row.prop(material, 'backFaceCulling')
+                row.prop(material, 'twoSidedLighting')
+
+                row = layout.row()
+                row.prop(material, 'disableLighting')
+                row.prop(material, 'maxSimultaneousLights')
+
+                row = layout.row()
+                row.prop(material, 'invertNormalMapX')
+                row.prop(material, 'invertNormalMapY')
+
+                row = layout.row()
+                row.prop(material, 'useObjectSpaceNormalMap')
+                row.prop(material, 'freeze')
+
+                layout.prop(material, 'maxTextureSize')
+
+                box = layout.box()
+                box.prop(material, 'useParallax')
+                row = box.row()
+                row.enabled = material.useParallax
+                row.prop(material, 'parallaxScaleBias')
+                row.prop(material, 'useParallaxOcclusion')
+
+                box = layout.box()
+                box.label(text='PBR Only Properties:')
+
+                row = box.row(heading='Transparency Mode')
+                row.prop(material, 'transparencyMode')
+
+                row = box.row()
+                row.enabled = material.transparencyMode == PBRMATERIAL_ALPHATEST or material.transparencyMode == PBRMATERIAL_ALPHATESTANDBLEND
+                row.prop(material, 'alphaCutOff')
+                box.row() # just usde for spacing
+
+                box.prop(material, 'intensityOverride')
+                row = box.row()
+                row.enabled = material.intensityOverride
+                row.prop(material, 'environmentIntensity')
+                box.row() # just usde for spacing
+
+                row = box.row()
+                row.prop(material, 'useHorizonOcclusion')
+                row.prop(material, 'useRadianceOcclusion')
+
+                row = box.row()
+                row.prop(material, 'forceIrradianceInFragment')
+                row.prop(material, 'useRadianceOverAlpha')
+
+                row = box.row()
+                row.prop(material, 'forceNormalForward')
+                row.prop(material, 'enableSpecularAntiAliasing')
+
+                box = box.box()
+                box.label(text='Iridescence:')
+
+                row = box.row()
+                row.prop(material, 'iridescenceIntensity')
+
+                row = box.row()
+                row.enabled = material.iridescenceIntensity > 0
+                row.prop(material, 'iridescenceMinThickness')
+                row.prop(material, 'iridescenceMaxThickness')
+
+
+                layout.prop(material, 'STDMatOverride')
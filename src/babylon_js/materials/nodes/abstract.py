@@ -2,6 +2,7 @@
 # done as needed in various methods
 from babylon_js.logging import *
 
+from copy import copy
 from mathutils import Color
 # various texture types, value contains the BJS name when needed to be written in output
 ENVIRON_TEX    = 'value not meaningful 1'
@@ -28,6 +29,8 @@ UV_ACTIVE_TEXTURE = 'value not meaningful 3'
 DEF_DIFFUSE_COLOR = Color((.8, .8, .8))
 #===============================================================================
 class AbstractBJSNode:
+    # wrappers already made while reading a tree, by (node, socket, overloadChannels); None when not reading
+    wrapperMemo = None
 
     def __init__(self, bpyNode, socketName, overloadChannels = False):
         self.socketName = socketName
@@ -231,7 +234,8 @@ class AbstractBJSNode:
         # looking for a Image Texture, Environment, or a Normal Map Node
         if isinstance(input, AbstractBJSNode):
             if input.unAssignedBjsTexture is not None:
-                bjsImageTexture = input.unAssignedBjsTexture
+                # a wrapper can be shared by multiple links, so each gets its own texture to assign a channel to
+                bjsImageTexture = copy(input.unAssignedBjsTexture)
                 bjsImageTexture.assignChannel(textureType) # add channel directly to texture, so it also knows what type it is
 
                 # add texture to nodes dictionary, for bubbling up which reduces multiples
@@ -282,75 +286,28 @@ class AbstractBJSNode:
         if output is None:
             return None
 
-        return AbstractBJSNode(output, topLevelId, overloadChannels)
+        # a sub-graph linked to more than one input is only wrapped once
+        AbstractBJSNode.wrapperMemo = {}
+        try:
+            return AbstractBJSNode(output, topLevelId, overloadChannels)
+        finally:
+            AbstractBJSNode.wrapperMemo = None
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
     @staticmethod
     def GetBJSWrapperNode(bpyNode, socketName, overloadChannels):
-        from .ambient_occlusion import AmbientOcclusionBJSNode
-        from .background import BackgroundBJSNode
-        from .diffuse import DiffuseBJSNode
-        from .emission import EmissionBJSNode
-        from .fresnel import FresnelBJSNode
-        from .glossy import GlossyBJSNode
-        from .mapping import MappingBJSNode
-        from .normal_map import NormalMapBJSNode
-        from .passthru import PassThruBJSNode
-        from .principled import PrincipledBJSNode
-        from .refraction import RefractionBJSNode
-        from .tex_coord import TextureCoordBJSNode
-        from .tex_environment import TextureEnvironmentBJSNode
-        from .tex_image import TextureImageBJSNode
-        from .transparency import TransparentBJSNode
-        from .uv_map import UVMapBJSNode
-        from .unsupported import UnsupportedNode
-
-        if AmbientOcclusionBJSNode.bpyType == bpyNode.bl_idname:
-            return AmbientOcclusionBJSNode(bpyNode, socketName, overloadChannels)
-
-        elif BackgroundBJSNode.bpyType == bpyNode.bl_idname:
-            return BackgroundBJSNode(bpyNode, socketName, overloadChannels)
-
-        elif DiffuseBJSNode.bpyType == bpyNode.bl_idname:
-            return DiffuseBJSNode(bpyNode, socketName, overloadChannels)
-
-        elif EmissionBJSNode.bpyType == bpyNode.bl_idname:
-            return EmissionBJSNode(bpyNode, socketName, overloadChannels)
-
-        elif FresnelBJSNode.bpyType == bpyNode.bl_idname:
-            return FresnelBJSNode(bpyNode, socketName, overloadChannels)
-
-        elif GlossyBJSNode.bpyType == bpyNode.bl_idname:
-            return GlossyBJSNode(bpyNode, socketName, overloadChannels)
-
-        elif MappingBJSNode.bpyType == bpyNode.bl_idname:
-            return MappingBJSNode(bpyNode, socketName, overloadChannels)
-
-        elif NormalMapBJSNode.bpyType == bpyNode.bl_idname:
-            return NormalMapBJSNode(bpyNode, socketName, overloadChannels)
-
-        elif bpyNode.bl_idname in PassThruBJSNode.PASS_THRU_SHADERS:
-            return PassThruBJSNode(bpyNode, socketName, overloadChannels)
-
-        elif PrincipledBJSNode.bpyType == bpyNode.bl_idname:
-            return PrincipledBJSNode(bpyNode, socketName, overloadChannels)
-
-        elif RefractionBJSNode.bpyType == bpyNode.bl_idname:
-            return RefractionBJSNode(bpyNode, socketName, overloadChannels)
-
-        elif TextureCoordBJSNode.bpyType == bpyNode.bl_idname:
-            return TextureCoordBJSNode(bpyNode, socketName, overloadChannels)
-
-        elif TextureEnvironmentBJSNode.bpyType == bpyNode.bl_idname:
-            return TextureEnvironmentBJSNode(bpyNode, socketName, overloadChannels)
-
-        elif TextureImageBJSNode.bpyType == bpyNode.bl_idname:
-            return TextureImageBJSNode(bpyNode, socketName, overloadChannels)
-
-        elif TransparentBJSNode.bpyType == bpyNode.bl_idname:
-            return TransparentBJSNode(bpyNode, socketName, overloadChannels)
-
-        elif UVMapBJSNode.bpyType == bpyNode.bl_idname:
-            return UVMapBJSNode(bpyNode, socketName, overloadChannels)
-
-        else:
-            return UnsupportedNode(bpyNode, socketName, overloadChannels)
\ No newline at end of file
+        memo = AbstractBJSNode.wrapperMemo
+        if memo is None:
+            return AbstractBJSNode.CreateBJSWrapperNode(bpyNode, socketName, overloadChannels)
+
+        key = (bpyNode.as_pointer(), socketName, overloadChannels)
+        bjsWrapperNode = memo.get(key)
+        if bjsWrapperNode is None:
+            bjsWrapperNode = AbstractBJSNode.CreateBJSWrapperNode(bpyNode, socketName, overloadChannels)
+            memo[key] = bjsWrapperNode
+        return bjsWrapperNode
+
+    # the wrapper class is from the registry, where custom nodes & node groups can also be added
+    @staticmethod
+    def CreateBJSWrapperNode(bpyNode, socketName, overloadChannels):
+        from .registry import get_node_wrapper
+        return get_node_wrapper(bpyNode)(bpyNode, socketName, overloadChannels)
@@ -0,0 +1,88 @@
+# The wrapper class for each kind of Blender node, so reading a node tree is a dictionary lookup per node.  The built in
+# wrappers are loaded the first time a wrapper is needed, not at import, since they all import abstract.
+#
+# Wrappers for custom nodes, or for node groups by the name of their tree, can be added from another add-on or a start up
+# script, without changing this package:
+#
+#     from babylon_js.materials.nodes.abstract import AbstractBJSNode
+#     from babylon_js.materials.nodes.registry import register_node_wrapper
+#
+#     class StudioToonBJSNode(AbstractBJSNode):
+#         bpyType = 'ShaderNodeGroup'
+#         def __init__(self, bpyNode, socketName, overloadChannels):
+#             super().__init__(bpyNode, socketName, overloadChannels)
+#             ...
+#
+#     register_node_wrapper(StudioToonBJSNode, group_name = 'StudioToon')
+#
+# A wrapper is constructed as cls(bpyNode, socketName, overloadChannels).  Registering for a bl_idname, or group name,
+# already registered replaces the wrapper, including built in ones.
+GROUP_NODE = 'ShaderNodeGroup'
+
+_wrappers = {} # by bl_idname
+_groupWrappers = {} # by the name of the node tree of a group node
+_builtInsLoaded = False
+_unsupported = None
+
+def register_node_wrapper(cls, bl_idname = None, group_name = None):
+    if group_name is not None:
+        _groupWrappers[group_name] = cls
+    else:
+        if bl_idname is None:
+            bl_idname = cls.bpyType
+        _wrappers[bl_idname] = cls
+
+def unregister_node_wrapper(bl_idname = None, group_name = None):
+    if group_name is not None:
+        _groupWrappers.pop(group_name, None)
+    elif bl_idname is not None:
+        _wrappers.pop(bl_idname, None)
+
+# returns UnsupportedNode, when nothing is registered for the node
+def get_node_wrapper(bpyNode):
+    if not _builtInsLoaded:
+        _load_built_ins()
+
+    bl_idname = bpyNode.bl_idname
+    if bl_idname == GROUP_NODE and len(_groupWrappers) > 0 and bpyNode.node_tree is not None:
+        cls = _groupWrappers.get(bpyNode.node_tree.name)
+        if cls is not None: return cls
+
+    return _wrappers.get(bl_idname, _unsupported)
+#===============================================================================
+def _load_built_ins():
+    global _builtInsLoaded, _unsupported
+    from .ambient_occlusion import AmbientOcclusionBJSNode
+    from .background import BackgroundBJSNode
+    from .diffuse import DiffuseBJSNode
+    from .emission import EmissionBJSNode
+    from .fresnel import FresnelBJSNode
+    from .glossy import GlossyBJSNode
+    from .mapping import MappingBJSNode
+    from .normal_map import NormalMapBJSNode
+    from .passthru import PassThruBJSNode
+    from .principled import PrincipledBJSNode
+    from .refraction import RefractionBJSNode
+    from .tex_coord import TextureCoordBJSNode
+    from .tex_environment import TextureEnvironmentBJSNode
+    from .tex_image import TextureImageBJSNode
+    from .transparency import TransparentBJSNode
+    from .uv_map import UVMapBJSNode
+    from .unsupported import UnsupportedNode
+
+    # anything registered before the first lookup wins over a built in
+    builtIns = {}
+    for cls in [AmbientOcclusionBJSNode, BackgroundBJSNode, DiffuseBJSNode, EmissionBJSNode, FresnelBJSNode, GlossyBJSNode,
+                MappingBJSNode, NormalMapBJSNode, PrincipledBJSNode, RefractionBJSNode, TextureCoordBJSNode,
+                TextureEnvironmentBJSNode, TextureImageBJSNode, TransparentBJSNode, UVMapBJSNode]:
+        builtIns[cls.bpyType] = cls
+
+    # ShaderNodeMix, the Mix node of Blender 3.4 on, was passed thru when this was a substring test of the list
+    for bl_idname in PassThruBJSNode.PASS_THRU_SHADERS.split() + ['ShaderNodeMix']:
+        builtIns[bl_idname] = PassThruBJSNode
+
+    for bl_idname, cls in builtIns.items():
+        _wrappers.setdefault(bl_idname, cls)
+
+    _unsupported = UnsupportedNode
+    _builtInsLoaded = True
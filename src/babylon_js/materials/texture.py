@@ -6,8 +6,8 @@ from .nodes.mapping import MappingBJSNode
 
 import bpy
 
-from base64 import b64encode
-from os import path, remove
+from io import open
+from os import path
 from shutil import copy
 from sys import exc_info # for writing errors to log file
 
@@ -35,7 +35,18 @@ U_ANG    = 0
 V_ANG    = 0
 W_ANG    = 0
 #===============================================================================
+# one per texture slot of every material, so slots instead of an instance dictionary;  sub-classes assign the rest
 class Texture:
+    __slots__ = ('textureType', 'image', 'isInternalImage', 'hasAlpha', 'level', 'coordinatesMode', 'coordinatesIndex',
+                 'uOffset', 'vOffset', 'uScale', 'vScale', 'uAng', 'vAng', 'wAng', 'wrapU', 'wrapV', 'uvMapName',
+                 'name', 'fileNoPath', 'isSourceFile', 'inlineData')
+
+    # fields which are only assigned once processed, or when in-lined
+    def __init__(self):
+        self.fileNoPath = None
+        self.isSourceFile = False
+        self.inlineData = None
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
     # called in constructor for BakeTexture, but for BJSImageTexture, called in Mesh, after ruling out will be baked
     # An environment texture cannot be base64, & does not supply a mesh argument
     def process(self, exporter, canBeBase64 = True, bpyMesh = None):
@@ -48,57 +59,85 @@ class Texture:
 
         # name of the texture without the extension, made into a legal js name, so load function can be written
         self.name = legal_js_identifier(self.fileNoPath.rpartition('.')[0])
+        self.isSourceFile = False
 
-        # always write the file out, since base64 encoding is easiest from a file
-        try:
-            Logger.log('processing texture ' + self.name, 3)
+        Logger.log('processing texture ' + self.name, 3)
+        if inlineTextures:
+            self.prepareInline(exporter, filePath)
+        else:
+            try:
+                # when coming from either a packed image or a baked image, then save_render
+                if self.isInternalImage:
+                    self.image.save_render(path.join(exporter.textureFullPathDir, self.fileNoPath))
 
-            # when coming from either a packed image or a baked image, then save_render
-            if self.isInternalImage:
-                if inlineTextures:
-                    textureFile = path.join(exporter.textureFullPathDir, self.fileNoPath + 'temp')
+                # when backed by an actual file, copy to target dir
+                else:
+                    copy(bpy.path.abspath(filePath), exporter.textureFullPathDir)
+            except:
+                ex = exc_info()
+                msg = str(ex[1])
+                if 'are the same file' not in msg:
+                    Logger.warn('Exception during copy:\n\t\t\t\t\t'+ msg, 4)
                 else:
-                    textureFile = path.join(exporter.textureFullPathDir, self.fileNoPath)
-                self.image.save_render(textureFile)
-
-            # when backed by an actual file, copy to target dir, unless inlining
-            else:
-                textureFile = bpy.path.abspath(filePath)
-                if not inlineTextures:
-                    copy(textureFile, exporter.textureFullPathDir)
-        except:
-            ex = exc_info()
-            msg = str(ex[1])
-            if 'are the same file' not in msg:
-                Logger.warn('Exception during copy:\n\t\t\t\t\t'+ msg, 4)
+                    # the texture directory is where the source is, so the file must never be written over
+                    self.isSourceFile = True
 
-        if inlineTextures:
-            # base64 is easiest from a file, so sometimes a temp file was made above;  need to delete those
-            with open(textureFile, "rb") as image_file:
-                asString = b64encode(image_file.read()).decode()
-            self.encoded_URI = 'data:image/' + self.image.file_format + ';base64,' + asString
+            self.addRelativePath(exporter)
 
-            if self.isInternalImage:
-                remove(textureFile)
+        if bpyMesh:
+            self.assignCoordinatesIndex(bpyMesh)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # nothing is encoded until the JSON is written, see InlineData;  packed images need no file at all, & baked ones only
+    # a temporary one
+    def prepareInline(self, exporter, filePath):
+        mimeType = 'image/' + self.image.file_format
+        if self.image.packed_file is not None:
+            self.inlineData = InlineData(mimeType, packedImage = self.image)
+
+        elif self.isInternalImage:
+            textureFile = path.join(exporter.getInlineTempDir(), self.fileNoPath)
+            self.image.save_render(textureFile)
+            self.inlineData = InlineData(mimeType, filepath = textureFile)
 
         else:
-            # adjust name to reflect path
-            relPath = exporter.settings.textureDir
-            if len(relPath) > 0:
-                if not relPath.endswith('/'): relPath += '/'
-                self.fileNoPath = relPath + self.fileNoPath
+            self.inlineData = InlineData(mimeType, filepath = bpy.path.abspath(filePath))
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # used instead of process, when a baked image is already in the bake cache;  fileNoPath was already assigned
+    def processCached(self, exporter, cachedFile, bpyMesh):
+        settings = bpy.context.scene.world
+        self.name = legal_js_identifier(self.fileNoPath.rpartition('.')[0])
+        self.isSourceFile = False
+        Logger.log('texture ' + self.name + ' from bake cache', 3)
 
-        if bpyMesh:
-            if not self.uvMapName or self.uvMapName == UV_ACTIVE_TEXTURE:  # only for image based & no node specifying
-                self.uvMapName = bpyMesh.data.uv_layers.active.name
-
-            if bpyMesh.data.uv_layers[0].name == self.uvMapName:
-                self.coordinatesIndex = 0
-            elif bpyMesh.data.uv_layers[1].name == self.uvMapName:
-                self.coordinatesIndex = 1
-            else:
-                Logger.warn('Texture is not mapped as UV or UV2, assigned 1', 5)
-                self.coordinatesIndex = 0
+        # the cached file may be evicted, or a bake farm output removed, before the JSON is written
+        if settings.inlineTextures:
+            textureFile = path.join(exporter.getInlineTempDir(), self.fileNoPath)
+            copy(cachedFile, textureFile)
+            self.inlineData = InlineData('image/' + self.image.file_format, filepath = textureFile)
+        else:
+            copy(cachedFile, path.join(exporter.textureFullPathDir, self.fileNoPath))
+            self.addRelativePath(exporter)
+
+        self.assignCoordinatesIndex(bpyMesh)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # adjust name to reflect path
+    def addRelativePath(self, exporter):
+        relPath = exporter.settings.textureDir
+        if len(relPath) > 0:
+            if not relPath.endswith('/'): relPath += '/'
+            self.fileNoPath = relPath + self.fileNoPath
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def assignCoordinatesIndex(self, bpyMesh):
+        if not self.uvMapName or self.uvMapName == UV_ACTIVE_TEXTURE:  # only for image based & no node specifying
+            self.uvMapName = bpyMesh.data.uv_layers.active.name
+
+        if bpyMesh.data.uv_layers[0].name == self.uvMapName:
+            self.coordinatesIndex = 0
+        elif bpyMesh.data.uv_layers[1].name == self.uvMapName:
+            self.coordinatesIndex = 1
+        else:
+            Logger.warn('Texture is not mapped as UV or UV2, assigned 1', 5)
+            self.coordinatesIndex = 0
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
     def to_json_file(self, file_handler):
         file_handler.write(', \n"' + self.textureType + '":{')
@@ -121,15 +160,40 @@ class Texture:
         if not same_number(self.wrapU, CLAMP_ADDRESSMODE): write_int(file_handler, 'wrapU', self.wrapU)
         if not same_number(self.wrapV, CLAMP_ADDRESSMODE): write_int(file_handler, 'wrapV', self.wrapV)
         
-        if hasattr(self,'encoded_URI'):
-            write_string(file_handler, 'base64String', self.encoded_URI)
+        if self.inlineData is not None:
+            write_base64(file_handler, 'base64String', 'data:' + self.inlineData.mimeType + ';base64,', self.inlineData.getChunks())
         file_handler.write('}')
 #===============================================================================
+# What an in-lined texture is encoded from, when the JSON is written rather than when it is processed, so only a chunk of
+# it is ever in memory.  Packed images are read from the packed data of the .blend, anything else from a file.
+class InlineData:
+    def __init__(self, mimeType, filepath = None, packedImage = None):
+        self.mimeType = mimeType
+        self.filepath = filepath
+        self.packedImage = packedImage
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # called on the main thread, since packed data is from bpy;  the iterator returned is run on the encoding thread
+    def getChunks(self):
+        if self.packedImage is not None:
+            data = memoryview(self.packedImage.packed_file.data)
+            return (data[idx : idx + BASE64_CHUNK] for idx in range(0, len(data), BASE64_CHUNK))
+
+        return InlineData.readChunks(self.filepath)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    @staticmethod
+    def readChunks(filepath):
+        with open(filepath, 'rb') as file_handler:
+            while True:
+                chunk = file_handler.read(BASE64_CHUNK)
+                if len(chunk) == 0: break
+                yield chunk
+#===============================================================================
 class BakedTexture(Texture):
-    def __init__(self, textureType, bakedMaterial, bpyMesh, exporter):
-        self.textureType = textureType
+    __slots__ = ()
 
-        # super class does not have a constructor
+    def __init__(self, textureType, bakedMaterial, bpyMesh, exporter, cachedFile = None):
+        super().__init__()
+        self.textureType = textureType
         self.image = bakedMaterial.image
         self.isInternalImage = True
         self.hasAlpha = bakedMaterial.image.file_format not in NON_ALPHA_FORMATS
@@ -148,11 +212,45 @@ class BakedTexture(Texture):
         self.wrapV = CLAMP_ADDRESSMODE
 
         self.uvMapName = bakedMaterial.uvMapName
-        self.process(exporter, True, bpyMesh)
+        if cachedFile is not None:
+            self.fileNoPath = path.basename(bakedMaterial.image.filepath)
+            self.processCached(exporter, cachedFile, bpyMesh)
+        else:
+            self.process(exporter, True, bpyMesh)
+#===============================================================================
+# An image of other textures packed together, already saved to the texture directory, see TextureAtlaser
+class AtlasTexture(Texture):
+    __slots__ = ()
+
+    def __init__(self, image, template, exporter):
+        super().__init__()
+        self.textureType = template.textureType
+        self.image = image
+        self.isInternalImage = False
+        self.hasAlpha = template.hasAlpha
+        self.level = template.level
+        self.coordinatesMode = EXPLICIT_MODE
+
+        self.uOffset = U_OFFSET
+        self.vOffset = V_OFFSET
+        self.uScale  = U_SCALE
+        self.vScale  = V_SCALE
+        self.uAng    = U_ANG
+        self.vAng    = V_ANG
+        self.wAng    = W_ANG
+
+        self.wrapU = CLAMP_ADDRESSMODE
+        self.wrapV = CLAMP_ADDRESSMODE
+
+        self.process(exporter, False)
+        self.coordinatesIndex = template.coordinatesIndex
+        self.isSourceFile = False # was already saved to the texture directory, but is not authored
 #===============================================================================
 class BJSImageTexture(Texture):
+    __slots__ = ()
+
     def __init__(self, bjsImageNode, isForEnvironment = False):
-        # super class does not have a constructor
+        super().__init__()
         if bjsImageNode.image is None:
             Logger.error('Node has no image.  This should be being filtered upstream.  Bad programmer.')
             return
@@ -3,23 +3,19 @@ from .package_level import *
 
 from .f_curve_animatable import *
 from .armature import *
+from .bounding import *
 from .shape_key_group import *
+from .mesh_props import *
 
 from .materials.material import *
 from .materials.baking_recipe import *
 
 import bpy
 import math
-from mathutils import Vector, Quaternion
+from array import array
+from mathutils import Matrix, Vector, Quaternion
 from random import randint
 
-# used in Mesh & Node constructors, defined in BABYLON.AbstractMesh; strings so can be value part of EnumProperty
-BILLBOARDMODE_NONE = '0'
-BILLBOARDMODE_X = '1'
-BILLBOARDMODE_Y = '2'
-BILLBOARDMODE_Z = '4'
-BILLBOARDMODE_ALL = '7'
-
 # used in Mesh constructor, defined in BABYLON.PhysicsImpostor
 SPHERE_IMPOSTER = 1
 BOX_IMPOSTER = 2
@@ -30,15 +26,11 @@ CONE_IMPOSTER = 6
 CYLINDER_IMPOSTER = 7
 PARTICLE_IMPOSTER = 8
 
+# converts a matrix between Blender's Z-up right handed & BJS's Y-up left handed systems, it is its own inverse
+SWAP_YZ_MATRIX = Matrix(((1, 0, 0, 0), (0, 0, 1, 0), (0, 1, 0, 0), (0, 0, 0, 1)))
+
 ZERO_V = Vector((0, 0, 0))
 ZERO_Q = Quaternion((1, 0, 0, 0))
-DEF_BILLBOARDMODE = BILLBOARDMODE_NONE
-DEF_DISABLED = False
-DEF_CHECKCOLLISIONS = False
-DEF_RECEIVE_SHADOWS = False
-DEF_CAST_SHADOWS = False
-DEF_IS_PICKABLE = False
-DEF_FREEZE_WORLD_MATRIX = False
 #===============================================================================
 class Mesh(FCurveAnimatable):
     def __init__(self, bpyMesh, scene, exporter):
@@ -91,6 +83,7 @@ class Mesh(FCurveAnimatable):
                 locMatrix = bpyMesh.matrix_world @ exportedParent.matrix_world.inverted()
 
         loc, rot, scale = locMatrix.decompose()
+        self.matrix_world = bpyMesh.matrix_world.copy() # not exported, used for world space operations like batching
         self.position = loc
         if bpyMesh.rotation_mode == 'QUATERNION':
             self.rotationQuaternion = rot
@@ -132,6 +125,11 @@ class Mesh(FCurveAnimatable):
         # Get if this will be an instance of another, before processing materials, to avoid multi-bakes
         sourceMesh = exporter.getSourceMeshInstance(self.dataName)
         if sourceMesh is not None:
+            if hasattr(sourceMesh, 'thinInstances'):
+                sourceMesh.thinInstances.append(bpyMesh.matrix_world, bpyMesh.color)
+                Logger.log('mesh is a thin instance of :  ' + sourceMesh.name + '.  Processing halted.', 2)
+                return
+
             #need to make sure rotation mode matches, since value initially copied in InstancedMesh constructor
             if hasattr(sourceMesh, 'rotationQuaternion'):
                 instRot = None
@@ -146,6 +144,8 @@ class Mesh(FCurveAnimatable):
             return
         else:
             self.instances = []
+            if bpyMesh.data.useThinInstances:
+                self.thinInstances = ThinInstances(bpyMesh)
 
         # process all of the materials required
         recipe = BakingRecipe(bpyMesh, exporter)
@@ -166,7 +166,8 @@ class Mesh(FCurveAnimatable):
                 self.materialId = recipe.bjsMaterials[0].name
 
             elif len(recipe.bjsMaterials) > 1:
-                multimat = MultiMaterial(recipe.bjsMaterials, len(exporter.multiMaterials), exporter.nameSpace)
+                multimat = MultiMaterial(recipe.bjsMaterials, exporter.nextMultiMaterialIdx, exporter.nameSpace)
+                exporter.nextMultiMaterialIdx += 1
                 self.materialId = multimat.name
                 exporter.multiMaterials.append(multimat)
             else:
@@ -181,14 +182,15 @@ class Mesh(FCurveAnimatable):
         # Triangulate mesh if required
         Mesh.mesh_triangulate(mesh)
 
-        # Getting vertices and indices
-        self.positions  = []
-        self.normals    = []
-        self.tangents   = [] # not always used, only when split normals are used
-        self.uvs        = [] # not always used
-        self.uvs2       = [] # not always used
-        self.colors     = [] # not always used
-        self.indices    = []
+        # Getting vertices and indices, into buffers of a fixed layout:  3 floats for each position & normal, 4 for each
+        # tangent & color, 2 for each uv, & an unsigned int for each index
+        self.positions  = array('f')
+        self.normals    = array('f')
+        self.tangents   = array('f') # not always used, only when split normals are used
+        self.uvs        = array('f') # not always used
+        self.uvs2       = array('f') # not always used
+        self.colors     = array('f') # not always used
+        self.indices    = array('I')
         self.subMeshes  = []
 
         hasUV = len(mesh.uv_layers) > 0
@@ -204,6 +206,10 @@ class Mesh(FCurveAnimatable):
         if hasVertexColor:
             Colormap = mesh.vertex_colors.active.data
 
+        # Blender 4.1+: has_custom_normals might be removed or always true-ish for split normals?
+        # Actually, let's check if we can access split normals the old way.
+        has_custom_normals = mesh.has_custom_normals if hasattr(mesh, 'has_custom_normals') else True
+
         if self.hasSkeleton:
             weightsPerVertex = []
             indicesPerVertex = []
@@ -222,27 +228,13 @@ class Mesh(FCurveAnimatable):
             if not hasShapeKeys:
                 Logger.warn('Basis key missing, shape-key processing NOT performed', 2)
 
-        # used tracking of vertices as they are received
-        alreadySavedVertices = []
-        vertices_Normals = []
-        vertices_Tangents = []
-        vertices_UVs = []
-        vertices_UV2s = []
-        vertices_Colors = []
-        vertices_indices = []
-        vertices_sk_weights = []
-        vertices_sk_indices = []
-
-        for v in range(len(mesh.vertices)):
-            alreadySavedVertices.append(False)
-            vertices_Normals.append([])
-            vertices_Tangents.append([])
-            vertices_UVs.append([])
-            vertices_UV2s.append([])
-            vertices_Colors.append([])
-            vertices_indices.append([])
-            vertices_sk_weights.append([])
-            vertices_sk_indices.append([])
+        # positions of all vertices in one call, not a Vector copy for each corner of each triangle
+        coordinates = array('f', [0.0]) * (len(mesh.vertices) * 3)
+        mesh.vertices.foreach_get('co', coordinates)
+
+        # used tracking of vertices as they are received;  for each Blender vertex, None until saved, then a list of
+        # (index, normal, tangent, uv, uv2, color, weights, bone indices) of each exported vertex made from it
+        savedVertices = [None] * len(mesh.vertices)
 
         materialsCount = 1 if recipe.needsBaking else max(1, len(bpyMesh.material_slots))
         verticesCount = 0
@@ -262,12 +254,7 @@ class Mesh(FCurveAnimatable):
                     loop_index = tri.loops[v] # used for uv's & vertex colors
 
                     vertex = mesh.vertices[vertex_index]
-                    position = vertex.co.copy()
-
-                    # Blender 4.1+: has_custom_normals might be removed or always true-ish for split normals?
-                    # Actually, let's check if we can access split normals the old way.
-                    has_custom_normals = mesh.has_custom_normals if hasattr(mesh, 'has_custom_normals') else True
-
+                    tangent = None
                     if has_custom_normals:
                         if hasattr(tri, 'split_normals'):
                             split_normal = tri.split_normals[v]
@@ -284,6 +271,8 @@ class Mesh(FCurveAnimatable):
                         normal = tri.normal.copy()
 
                     #skeletons
+                    matricesWeights = None
+                    matricesIndices = None
                     if self.hasSkeleton:
                         matricesWeights = []
                         matricesIndices = []
@@ -299,55 +288,44 @@ class Mesh(FCurveAnimatable):
                                     matricesIndices.append(self.skeleton.get_index_of_bone(bone.name))
 
                     # Texture coordinates
-                    if hasUV:
-                        vertex_UV = UVmap[loop_index].uv
-
-                    if hasUV2:
-                        vertex_UV2 = UV2map[loop_index].uv
+                    vertex_UV = UVmap[loop_index].uv if hasUV else None
+                    vertex_UV2 = UV2map[loop_index].uv if hasUV2 else None
 
                     # Vertex color
-                    if hasVertexColor:
-                        vertex_Color = Colormap[loop_index].color
+                    vertex_Color = Colormap[loop_index].color if hasVertexColor else None
 
                     # Check if the current vertex is already saved
-                    alreadySaved = alreadySavedVertices[vertex_index]
-                    if alreadySaved:
-                        alreadySaved = False
-
+                    saved = savedVertices[vertex_index]
+                    alreadySaved = False
+                    if saved is not None:
                         # UV
                         index_UV = 0
-                        for savedIndex in vertices_indices[vertex_index]:
-                            vNormal = vertices_Normals[vertex_index][index_UV]
+                        for attempt in range(len(saved)):
+                            savedIndex, vNormal, vTangent, vUV, vUV2, vColor, vSkWeights, vSkIndices = saved[index_UV]
                             if not same_vertex(normal, vNormal, world.normalsPrecision):
                                 continue;
 
-                            if mesh.has_custom_normals:
-                                vTangent = vertices_Tangents[vertex_index][index_UV]
+                            if has_custom_normals:
                                 if not same_array(tangent, vTangent, world.normalsPrecision):
                                     continue;
 
                             if hasUV:
-                                vUV = vertices_UVs[vertex_index][index_UV]
                                 if not same_array(vertex_UV, vUV, world.UVsPrecision):
                                     continue
 
                             if hasUV2:
-                                vUV2 = vertices_UV2s[vertex_index][index_UV]
                                 if not same_array(vertex_UV2, vUV2, world.UVsPrecision):
                                     continue
 
                             if hasVertexColor:
-                                vColor = vertices_Colors[vertex_index][index_UV]
                                 if not same_array(vertex_Color, vColor, world.vColorsPrecision):
                                     continue
 
                             if self.hasSkeleton:
-                                vSkWeight = vertices_sk_weights[vertex_index]
-                                vSkIndices = vertices_sk_indices[vertex_index]
-                                if not same_array(vSkWeight[index_UV], matricesWeights, world.mWeightsPrecision) or not same_array(vSkIndices[index_UV], matricesIndices, 1):
+                                if not same_array(vSkWeights, matricesWeights, world.mWeightsPrecision) or not same_array(vSkIndices, matricesIndices, 1):
                                     continue
 
-                            if vertices_indices[vertex_index][index_UV] >= subMeshVerticesStart:
+                            if savedIndex >= subMeshVerticesStart:
                                 alreadySaved = True
                                 break
 
@@ -355,39 +333,26 @@ class Mesh(FCurveAnimatable):
 
                     if (alreadySaved):
                         # Reuse vertex
-                        index = vertices_indices[vertex_index][index_UV]
+                        index = saved[index_UV][0]
                     else:
                         # Export new one
                         index = verticesCount
-                        alreadySavedVertices[vertex_index] = True
+                        if saved is None:
+                            saved = savedVertices[vertex_index] = []
+                        saved.append((index, normal, tangent, vertex_UV, vertex_UV2, vertex_Color, matricesWeights, matricesIndices))
 
-                        vertices_Normals[vertex_index].append(normal)
-                        self.normals.append(normal)
+                        self.normals.extend(normal)
 
-                        if mesh.has_custom_normals:
-                            vertices_Tangents[vertex_index].append(tangent)
-                            self.tangents.append(tangent[0])
-                            self.tangents.append(tangent[1])
-                            self.tangents.append(tangent[2])
-                            self.tangents.append(tangent[3])
+                        if has_custom_normals:
+                            self.tangents.extend(tangent)
 
                         if hasUV:
-                            vertices_UVs[vertex_index].append(vertex_UV)
-                            self.uvs.append(vertex_UV[0])
-                            self.uvs.append(vertex_UV[1])
+                            self.uvs.extend(vertex_UV)
                         if hasUV2:
-                            vertices_UV2s[vertex_index].append(vertex_UV2)
-                            self.uvs2.append(vertex_UV2[0])
-                            self.uvs2.append(vertex_UV2[1])
+                            self.uvs2.extend(vertex_UV2)
                         if hasVertexColor:
-                            vertices_Colors[vertex_index].append(vertex_Color)
-                            self.colors.append(vertex_Color[0])
-                            self.colors.append(vertex_Color[1])
-                            self.colors.append(vertex_Color[2])
-                            self.colors.append(vertex_Color[3])
+                            self.colors.extend(vertex_Color)
                         if self.hasSkeleton:
-                            vertices_sk_weights[vertex_index].append(matricesWeights)
-                            vertices_sk_indices[vertex_index].append(matricesIndices)
                             nInfluencers = len(matricesWeights)
                             totalInfluencers += nInfluencers
                             if nInfluencers <= 8:
@@ -399,22 +364,24 @@ class Mesh(FCurveAnimatable):
                             indicesPerVertex.append(matricesIndices)
 
                         if hasShapeKeys:
-                            orderMap.append([vertex_index, len(self.positions)]) # use len positions before it is append to convert from 1 to 0 origin
+                            orderMap.append([vertex_index, verticesCount])
 
-                        vertices_indices[vertex_index].append(index)
-
-                        self.positions.append(position)
+                        self.positions.extend(coordinates[vertex_index * 3 : vertex_index * 3 + 3])
 
                         verticesCount += 1
                     self.indices.append(index)
                     indicesCount += 1
             self.subMeshes.append(SubMesh(materialIndex, subMeshVerticesStart, subMeshIndexStart, verticesCount - subMeshVerticesStart, indicesCount - subMeshIndexStart))
 
+        # only needed for welding
+        del savedVertices, coordinates
+
         bpyMesh.to_mesh_clear()
-        BJSMaterial.meshBakingClean(bpyMesh)
+        if exporter.bakeFarm is None or not exporter.bakeFarm.deferClean(bpyMesh):
+            BJSMaterial.meshBakingClean(bpyMesh)
 
-        Logger.log('num positions      :  ' + str(len(self.positions)), 2)
-        Logger.log('num normals        :  ' + str(len(self.normals  )), 2)
+        Logger.log('num positions      :  ' + str(verticesCount), 2)
+        Logger.log('num normals        :  ' + str(verticesCount), 2)
         Logger.log('num tangents       :  ' + str(len(self.tangents )), 2)
         Logger.log('num uvs            :  ' + str(len(self.uvs      )), 2)
         Logger.log('num uvs2           :  ' + str(len(self.uvs2     )), 2)
@@ -424,19 +391,22 @@ class Mesh(FCurveAnimatable):
         if self.hasSkeleton:
             Logger.log('Skeleton stats:  ', 2)
             self.toFixedInfluencers(weightsPerVertex, indicesPerVertex, bpyMesh.data.maxInfluencers, highestInfluenceObserved)
+            del weightsPerVertex, indicesPerVertex
 
             self.skeletonIndices = Mesh.packSkeletonIndices(self.skeletonIndices)
             if (self.numBoneInfluencers > 4):
                 self.skeletonIndicesExtra = Mesh.packSkeletonIndices(self.skeletonIndicesExtra)
 
             Logger.log('Total Influencers:  ' + format_f(totalInfluencers), 3)
-            if len(self.positions) > 0:
-                Logger.log('Avg # of influencers per vertex:  ' + format_f(totalInfluencers / len(self.positions)), 3)
+            if verticesCount > 0:
+                Logger.log('Avg # of influencers per vertex:  ' + format_f(totalInfluencers / verticesCount), 3)
             Logger.log('Highest # of influencers observed:  ' + str(highestInfluenceObserved) + ', num vertices with this:  ' + format_int(influenceCounts[highestInfluenceObserved if highestInfluenceObserved < 9 else 0]), 3)
             Logger.log('exported as ' + str(self.numBoneInfluencers) + ' influencers', 3)
             nWeights = len(self.skeletonWeights) + (len(self.skeletonWeightsExtra) if hasattr(self, 'skeletonWeightsExtra') else 0)
             Logger.log('num skeletonWeights and skeletonIndices:  ' + str(nWeights), 3)
 
+        self.calcBoundingInfo()
+
         numZeroAreaFaces = self.find_zero_area_faces()
         if numZeroAreaFaces > 0:
             Logger.warn('# of 0 area faces found:  ' + str(numZeroAreaFaces), 2)
@@ -477,8 +447,8 @@ class Mesh(FCurveAnimatable):
 
     def getMeshStats(self, file_handler):
         file_handler.write('"' + self.name + '", ' +
-                                 str(len(self.positions)) + ', ' +
-                                 str(len(self.normals)) + ', ' +
+                                 str(len(self.positions) // 3) + ', ' +
+                                 str(len(self.normals) // 3) + ', ' +
                                  str(len(self.tangents)) + ', ' +
                                  str(len(self.uvs)) + ', ' +
                                  str(len(self.uvs2)) + ', ' +
@@ -488,17 +458,49 @@ class Mesh(FCurveAnimatable):
             file_handler.write(', ' + str(len(self.skeletonWeights) + (len(self.skeletonWeightsExtra) if hasattr(self, 'skeletonWeightsExtra') else 0)) )
 
         file_handler.write('\n')
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def calcBoundingInfo(self):
+        self.boundingInfo = BoundingInfo(self.positions)
+        for subMesh in self.subMeshes:
+            subMesh.boundingInfo = BoundingInfo(self.positions, subMesh.verticesStart, subMesh.verticesStart + subMesh.verticesCount)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # with thin instances, the mesh is only drawn as the instances, so its box must contain all of them
+    def getLocalBoundingInfo(self):
+        if not hasattr(self, 'thinInstances'):
+            return self.boundingInfo
+
+        minimum = Vector(( float('inf'),  float('inf'),  float('inf')))
+        maximum = Vector((-float('inf'), -float('inf'), -float('inf')))
+        for matrix in self.thinInstances.matrices:
+            instanceMin, instanceMax = self.boundingInfo.transformed(matrix)
+            expand_bounds(minimum, maximum, instanceMin, instanceMax)
+        return BoundingInfo.fromBox(minimum, maximum)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # world space boxes for this mesh & each of its instances, item of each is the mesh
+    def getOctreeEntries(self):
+        minimum, maximum = self.getLocalBoundingInfo().transformed(self.matrix_world)
+        entries = [OctreeEntry(self.name, minimum, maximum, self)]
+
+        for instance in self.instances:
+            minimum, maximum = self.boundingInfo.transformed(instance.matrix_world)
+            entries.append(OctreeEntry(instance.name, minimum, maximum, self))
+
+        return entries
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
     def find_zero_area_faces(self):
         nFaces = int(len(self.indices) / 3)
         nZeroAreaFaces = 0
         for f in range(nFaces):
             faceOffset = f * 3
-            p1 = self.positions[self.indices[faceOffset    ]]
-            p2 = self.positions[self.indices[faceOffset + 1]]
-            p3 = self.positions[self.indices[faceOffset + 2]]
+            # positions are flat, 3 floats each
+            i1 = self.indices[faceOffset    ] * 3
+            i2 = self.indices[faceOffset + 1] * 3
+            i3 = self.indices[faceOffset + 2] * 3
+            p1 = self.positions[i1 : i1 + 3]
+            p2 = self.positions[i2 : i2 + 3]
+            p3 = self.positions[i3 : i3 + 3]
 
-            if same_vertex(p1, p2) or same_vertex(p1, p3) or same_vertex(p2, p3): nZeroAreaFaces += 1
+            if same_array(p1, p2) or same_array(p1, p3) or same_array(p2, p3): nZeroAreaFaces += 1
 
         return nZeroAreaFaces
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -547,11 +549,11 @@ class Mesh(FCurveAnimatable):
 
         maxInfluencersExceeded = 0
 
-        fixedWeights = []
-        fixedIndices = []
+        fixedWeights = array('f')
+        fixedIndices = array('I')
 
-        fixedWeightsExtra = []
-        fixedIndicesExtra = []
+        fixedWeightsExtra = array('f')
+        fixedIndicesExtra = array('I')
 
         for i in range(len(weightsPerVertex)):
             weights = weightsPerVertex[i]
@@ -603,7 +605,7 @@ class Mesh(FCurveAnimatable):
     # assume that toFixedInfluencers has already run, which ensures indices length is a multiple of 4
     @staticmethod
     def packSkeletonIndices(indices):
-        compressedIndices = []
+        compressedIndices = array('I')
 
         for i in range(math.floor(len(indices) / 4)):
             idx = i * 4
@@ -620,7 +622,7 @@ class Mesh(FCurveAnimatable):
         file_handler.write(',"metadata": {')
         noComma = True
         for k, v in self.customProps:
-            print('writing custom prop:', k, v)
+            Logger.debug('writing custom prop:  ' + k + ', ' + str(v))
             if type(v) == str: write_string(file_handler, k, v, noComma)
             elif type(v) == float: write_float(file_handler, k, v, FLOAT_PRECISION_DEFAULT, noComma)
             elif type(v) == int: write_int(file_handler, k, v, noComma)
@@ -672,14 +674,21 @@ class Mesh(FCurveAnimatable):
             write_float(file_handler, 'physicsFriction', self.physicsFriction)
             write_float(file_handler, 'physicsRestitution', self.physicsRestitution)
 
+        # Thin Instances
+        if hasattr(self, 'thinInstances'):
+            self.thinInstances.to_json_file(file_handler, self.isPickable)
+
         # Geometry
         world = self.scene.world
+        if world.writeBoundingInfo:
+            self.getLocalBoundingInfo().to_json_file(file_handler, world.positionsPrecision)
+
         if self.hasSkeleton:
             write_int(file_handler, 'skeletonId', self.skeletonId)
             write_int(file_handler, 'numBoneInfluencers', self.numBoneInfluencers)
 
-        write_vector_array(file_handler, 'positions', self.positions, world.positionsPrecision)
-        write_vector_array(file_handler, 'normals'  , self.normals, world.normalsPrecision)
+        write_vector_buffer(file_handler, 'positions', self.positions, world.positionsPrecision)
+        write_vector_buffer(file_handler, 'normals'  , self.normals, world.normalsPrecision)
 
         if len(self.tangents) > 0:
             write_array(file_handler, 'tangents'  , self.tangents, world.normalsPrecision)
@@ -712,10 +721,11 @@ class Mesh(FCurveAnimatable):
         # Sub meshes
         file_handler.write('\n,"subMeshes":[')
         first = True
+        boundsPrecision = world.positionsPrecision if world.writeBoundingInfo else None
         for subMesh in self.subMeshes:
             if first == False:
                 file_handler.write(',')
-            subMesh.to_json_file(file_handler)
+            subMesh.to_json_file(file_handler, boundsPrecision)
             first = False
         file_handler.write(']')
 
@@ -818,22 +828,26 @@ class Mesh(FCurveAnimatable):
         return [lowest, highest]
 #===============================================================================
 class MeshInstance:
+     # a scattered scene can have tens of thousands, so slots instead of an instance dictionary
+     __slots__ = ('name', 'matrix_world', 'parentId', 'position', 'rotation', 'rotationQuaternion', 'scaling', 'freezeWorldMatrix', 'tags',
+                  'checkCollisions', 'isPickable', 'physicsImpostor', 'physicsMass', 'physicsFriction', 'physicsRestitution')
+
      def __init__(self, instancedMesh, rotation, rotationQuaternion):
         self.name = instancedMesh.name
-        if hasattr(instancedMesh, 'parentId'): self.parentId = instancedMesh.parentId
+        self.matrix_world = instancedMesh.matrix_world # not exported
+        self.parentId = getattr(instancedMesh, 'parentId', None)
         self.position = instancedMesh.position
-        if rotation is not None:
-            self.rotation = rotation
-        if rotationQuaternion is not None:
-            self.rotationQuaternion = rotationQuaternion
+        self.rotation = rotation
+        self.rotationQuaternion = rotationQuaternion
         self.scaling = instancedMesh.scaling
         self.freezeWorldMatrix = instancedMesh.freezeWorldMatrix
         self.tags = instancedMesh.tags
         self.checkCollisions = instancedMesh.checkCollisions
         self.isPickable = instancedMesh.isPickable
 
-        if hasattr(instancedMesh, 'physicsImpostor'):
-            self.physicsImpostor = instancedMesh.physicsImpostor
+        # the rest of physics are only assigned with an impostor
+        self.physicsImpostor = getattr(instancedMesh, 'physicsImpostor', None)
+        if self.physicsImpostor is not None:
             self.physicsMass = instancedMesh.physicsMass
             self.physicsFriction = instancedMesh.physicsFriction
             self.physicsRestitution = instancedMesh.physicsRestitution
@@ -841,9 +855,9 @@ class MeshInstance:
      def to_json_file(self, file_handler):
         file_handler.write('{')
         write_string(file_handler, 'name', self.name, True)
-        if hasattr(self, 'parentId'): write_string(file_handler, 'parentId', self.parentId)
+        if self.parentId is not None: write_string(file_handler, 'parentId', self.parentId)
         write_vector(file_handler, 'position', self.position)
-        if hasattr(self, 'rotation'):
+        if self.rotation is not None:
             write_vector(file_handler, 'rotation', self.rotation)
         else:
             write_quaternion(file_handler, 'rotationQuaternion', self.rotationQuaternion)
@@ -860,7 +874,7 @@ class MeshInstance:
 
         write_bool(file_handler, 'pickable', self.isPickable)
 
-        if hasattr(self, 'physicsImpostor'):
+        if self.physicsImpostor is not None:
             write_int(file_handler, 'physicsImpostor', self.physicsImpostor)
             write_float(file_handler, 'physicsMass', self.physicsMass)
             write_float(file_handler, 'physicsFriction', self.physicsFriction)
@@ -868,183 +882,81 @@ class MeshInstance:
 
         file_handler.write('}')
 #===============================================================================
+# BJS does not draw the source mesh of thin instances, so it is added as the first instance
+class ThinInstances:
+    def __init__(self, bpySourceMesh):
+        self.sourceName = bpySourceMesh.name
+        self.inverseSourceMatrix = bpySourceMesh.matrix_world.inverted()
+        self.useColors = bpySourceMesh.data.thinInstanceColors
+        self.matrices = []
+        self.colors = []
+
+        self.append(bpySourceMesh.matrix_world, bpySourceMesh.color)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # world matrix of a linked duplicate, collection instance, or particle; color is the object color of it, or its instancer
+    def append(self, matrix_world, color):
+        self.matrices.append(self.inverseSourceMatrix @ matrix_world)
+        if self.useColors:
+            self.colors.append([color[0], color[1], color[2], color[3]])
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def count(self):
+        return len(self.matrices)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # a single packed Float32 buffer, 16 per instance; BJS matrices are column major, so translation is at 12 - 14
+    def getMatrixBuffer(self):
+        swapYZ = not bpy.context.scene.world.preserveZUpRight
+        buffer = []
+        for matrix in self.matrices:
+            if swapYZ:
+                matrix = SWAP_YZ_MATRIX @ matrix @ SWAP_YZ_MATRIX
+
+            for col in range(4):
+                for row in range(4):
+                    buffer.append(matrix[row][col])
+        return buffer
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def getColorBuffer(self):
+        buffer = []
+        for color in self.colors:
+            buffer.extend(color)
+        return buffer
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def to_json_file(self, file_handler, enablePicking):
+        Logger.log('num thin instances :  ' + format_int(self.count()), 2)
+        matrixBuffer = self.getMatrixBuffer()
+
+        file_handler.write('\n,"thinInstances":{')
+        write_int(file_handler, 'instancesCount', self.count(), True)
+        write_int(file_handler, 'matrixBufferSize', len(matrixBuffer))
+        write_bool(file_handler, 'enablePicking', enablePicking)
+        write_array(file_handler, 'matrixData', matrixBuffer)
+
+        if self.useColors:
+            colorBuffer = self.getColorBuffer()
+            file_handler.write('\n,"userThinInstance":{"data":{"instanceColor":[' + format_array(colorBuffer, FLOAT_PRECISION_DEFAULT) + ']}')
+            file_handler.write(',"sizes":{"instanceColor":' + format_int(len(colorBuffer)) + '}')
+            file_handler.write(',"strides":{"instanceColor":4}}')
 
+        file_handler.write('}')
 #===============================================================================
 class SubMesh:
+    __slots__ = ('materialIndex', 'verticesStart', 'indexStart', 'verticesCount', 'indexCount', 'boundingInfo')
+
     def __init__(self, materialIndex, verticesStart, indexStart, verticesCount, indexCount):
         self.materialIndex = materialIndex
         self.verticesStart = verticesStart
         self.indexStart = indexStart
         self.verticesCount = verticesCount
         self.indexCount = indexCount
+        self.boundingInfo = None # assigned once all sub-meshes are built, see Mesh.calcBoundingInfo
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-    def to_json_file(self, file_handler):
+    def to_json_file(self, file_handler, boundsPrecision = None):
         file_handler.write('{')
         write_int(file_handler, 'materialIndex', self.materialIndex, True)
         write_int(file_handler, 'verticesStart', self.verticesStart)
         write_int(file_handler, 'verticesCount', self.verticesCount)
         write_int(file_handler, 'indexStart'   , self.indexStart)
         write_int(file_handler, 'indexCount'   , self.indexCount)
+        if boundsPrecision is not None and self.boundingInfo is not None:
+            self.boundingInfo.to_json_file(file_handler, boundsPrecision)
         file_handler.write('}')
-#===============================================================================
-bpy.types.Mesh.autoAnimate = bpy.props.BoolProperty(
-    name='Auto launch animations',
-    description='',
-    default = False
-)
-bpy.types.Mesh.checkCollisions = bpy.props.BoolProperty(
-    name='Check Collisions',
-    description='Indicates mesh should be checked that it does not run into anything.',
-    default = DEF_CHECKCOLLISIONS
-)
-bpy.types.Mesh.castShadows = bpy.props.BoolProperty(
-    name='Cast Shadows',
-    description='',
-    default = DEF_CAST_SHADOWS
-)
-bpy.types.Mesh.receiveShadows = bpy.props.BoolProperty(
-    name='Receive Shadows',
-    description='',
-    default = DEF_RECEIVE_SHADOWS
-)
-bpy.types.Mesh.tags = bpy.props.StringProperty(
-    name='Tags',
-    description='Add meta-data to mesh (space delimited for multiples)',
-    default = ''
-)
-bpy.types.Mesh.forceBaking = bpy.props.BoolProperty(
-    name='Force Baking',
-    description='Combine multiple materials.  May not work well with materials\nwith alpha textures in front of other materials.',
-    default = False
-)
-bpy.types.Mesh.usePNG = bpy.props.BoolProperty(
-    name='Need Alpha',
-    description='Saved as PNG when alpha is required, else JPG.',
-    default = False
-)
-bpy.types.Mesh.bakeSize = bpy.props.IntProperty(
-    name='Texture Size',
-    description='Final dimensions of texture(s).  Not required to be a power of 2, but recommended.',
-    default = 1024
-)
-bpy.types.Mesh.bakeQuality = bpy.props.IntProperty(
-    name='Quality 1-100',
-    description='For JPG: The trade-off between Quality - File size(100 highest quality)\nFor PNG: amount of time spent for compression',
-    default = 50, min = 1, max = 100
-)
-bpy.types.Mesh.freezeWorldMatrix = bpy.props.BoolProperty(
-    name='Freeze World Matrix',
-    description='Indicate the position, rotation, & scale do not change for performance reasons',
-    default = DEF_FREEZE_WORLD_MATRIX
-)
-bpy.types.Mesh.attachedSound = bpy.props.StringProperty(
-    name='Sound',
-    description='',
-    default = ''
-)
-bpy.types.Mesh.loopSound = bpy.props.BoolProperty(
-    name='Loop sound',
-    description='',
-    default = True
-)
-bpy.types.Mesh.autoPlaySound = bpy.props.BoolProperty(
-    name='Auto play sound',
-    description='',
-    default = True
-)
-bpy.types.Mesh.maxSoundDistance = bpy.props.FloatProperty(
-    name='Max sound distance',
-    description='',
-    default = 100
-)
-bpy.types.Mesh.ignoreSkeleton = bpy.props.BoolProperty(
-    name='Ignore',
-    description='Do not export assignment to a skeleton',
-    default = False
-)
-bpy.types.Mesh.maxInfluencers = bpy.props.IntProperty(
-    name='Max bone Influencers / Vertex',
-    description='When fewer than this are observed, the lower value is used',
-    default = 8, min = 1, max = 8
-)
-bpy.types.Mesh.billboardMode = bpy.props.EnumProperty(
-    name='Billboard',
-    description='This is if or how a mesh should always face the camera',
-    items = (
-             (BILLBOARDMODE_NONE, 'None', 'No dimension should always face the camera {default}.'),
-             (BILLBOARDMODE_X   , 'X'   , 'X dimension should always face the camera.'),
-             (BILLBOARDMODE_Y   , 'Y'   , 'Y dimension should always face the camera.'),
-             (BILLBOARDMODE_Z   , 'Z'   , 'Z dimension should always face the camera.'),
-             (BILLBOARDMODE_ALL , 'All' , 'Mesh should always face the camera in all dimensions.')
-            ),
-    default = DEF_BILLBOARDMODE
-)
-bpy.types.Mesh.isPickable = bpy.props.BoolProperty(
-    name='Pickable',
-    description='Allow picking for a mesh',
-    default = DEF_IS_PICKABLE
-)
-bpy.types.Mesh.disabled = bpy.props.BoolProperty(
-    name='Disabled',
-    description='Load mesh disabled, which also disables all children',
-    default = DEF_DISABLED
-)
-
-#===============================================================================
-class BJS_PT_MeshPanel(bpy.types.Panel):
-    bl_label = get_title()
-    bl_space_type = 'PROPERTIES'
-    bl_region_type = 'WINDOW'
-    bl_context = 'data'
-
-    @classmethod
-    def poll(cls, context):
-        ob = context.object
-        return ob is not None and isinstance(ob.data, bpy.types.Mesh)
-
-    def draw(self, context):
-        ob = context.object
-        layout = self.layout
-
-        # - - - - - - - - - - - - - - - - - - - - - - - - -
-        row = layout.row()
-
-        row = layout.row()
-        row.prop(ob.data, 'castShadows')
-        row.prop(ob.data, 'receiveShadows')
-
-        row = layout.row()
-        row.prop(ob.data, 'freezeWorldMatrix')
-        row.prop(ob.data, 'checkCollisions')
-
-        row = layout.row()
-        row.prop(ob.data, 'isPickable')
-        row.prop(ob.data, 'disabled')
-
-        layout.prop(ob.data, 'autoAnimate')
-
-        layout.prop(ob.data, 'tags')
-        layout.prop(ob.data, 'billboardMode')
-        # - - - - - - - - - - - - - - - - - - - - - - - - -
-        box = layout.box()
-        box.label(text='Skeleton:')
-        box.prop(ob.data, 'ignoreSkeleton')
-        row = box.row()
-        row.enabled = not ob.data.ignoreSkeleton
-        row.prop(ob.data, 'maxInfluencers')
-        # - - - - - - - - - - - - - - - - - - - - - - - - -
-        box = layout.box()
-        box.label(text='Baking Settings')
-        row = box.row()
-        row.prop(ob.data, 'forceBaking')
-        row.prop(ob.data, 'usePNG')
-        box.prop(ob.data, 'bakeSize')
-        box.prop(ob.data, 'bakeQuality')
-        # - - - - - - - - - - - - - - - - - - - - - - - - -
-        box = layout.box()
-        box.prop(ob.data, 'attachedSound')
-        row = box.row()
-
-        row.prop(ob.data, 'autoPlaySound')
-        row.prop(ob.data, 'loopSound')
-        box.prop(ob.data, 'maxSoundDistance')
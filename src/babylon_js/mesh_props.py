@@ -0,0 +1,203 @@
+from .package_level import get_title
+
+import bpy
+
+# used in Mesh & Node constructors, defined in BABYLON.AbstractMesh; strings so can be value part of EnumProperty
+BILLBOARDMODE_NONE = '0'
+BILLBOARDMODE_X = '1'
+BILLBOARDMODE_Y = '2'
+BILLBOARDMODE_Z = '4'
+BILLBOARDMODE_ALL = '7'
+DEF_BILLBOARDMODE = BILLBOARDMODE_NONE
+DEF_DISABLED = False
+DEF_CHECKCOLLISIONS = False
+DEF_RECEIVE_SHADOWS = False
+DEF_CAST_SHADOWS = False
+DEF_IS_PICKABLE = False
+DEF_FREEZE_WORLD_MATRIX = False
+#===============================================================================
+bpy.types.Mesh.autoAnimate = bpy.props.BoolProperty(
+    name='Auto launch animations',
+    description='',
+    default = False
+)
+bpy.types.Mesh.checkCollisions = bpy.props.BoolProperty(
+    name='Check Collisions',
+    description='Indicates mesh should be checked that it does not run into anything.',
+    default = DEF_CHECKCOLLISIONS
+)
+bpy.types.Mesh.castShadows = bpy.props.BoolProperty(
+    name='Cast Shadows',
+    description='',
+    default = DEF_CAST_SHADOWS
+)
+bpy.types.Mesh.receiveShadows = bpy.props.BoolProperty(
+    name='Receive Shadows',
+    description='',
+    default = DEF_RECEIVE_SHADOWS
+)
+bpy.types.Mesh.tags = bpy.props.StringProperty(
+    name='Tags',
+    description='Add meta-data to mesh (space delimited for multiples)',
+    default = ''
+)
+bpy.types.Mesh.forceBaking = bpy.props.BoolProperty(
+    name='Force Baking',
+    description='Combine multiple materials.  May not work well with materials\nwith alpha textures in front of other materials.',
+    default = False
+)
+bpy.types.Mesh.usePNG = bpy.props.BoolProperty(
+    name='Need Alpha',
+    description='Saved as PNG when alpha is required, else JPG.',
+    default = False
+)
+bpy.types.Mesh.packORM = bpy.props.BoolProperty(
+    name='Pack ORM',
+    description='When baking for PBR, bake ambient occlusion & roughness, & pack them with metallic into the\nred, green & blue of one texture, instead of a texture each.',
+    default = False
+)
+bpy.types.Mesh.bakeSize = bpy.props.IntProperty(
+    name='Texture Size',
+    description='Final dimensions of texture(s).  Not required to be a power of 2, but recommended.',
+    default = 1024
+)
+bpy.types.Mesh.bakeQuality = bpy.props.IntProperty(
+    name='Quality 1-100',
+    description='For JPG: The trade-off between Quality - File size(100 highest quality)\nFor PNG: amount of time spent for compression',
+    default = 50, min = 1, max = 100
+)
+bpy.types.Mesh.freezeWorldMatrix = bpy.props.BoolProperty(
+    name='Freeze World Matrix',
+    description='Indicate the position, rotation, & scale do not change for performance reasons',
+    default = DEF_FREEZE_WORLD_MATRIX
+)
+bpy.types.Mesh.attachedSound = bpy.props.StringProperty(
+    name='Sound',
+    description='',
+    default = ''
+)
+bpy.types.Mesh.loopSound = bpy.props.BoolProperty(
+    name='Loop sound',
+    description='',
+    default = True
+)
+bpy.types.Mesh.autoPlaySound = bpy.props.BoolProperty(
+    name='Auto play sound',
+    description='',
+    default = True
+)
+bpy.types.Mesh.maxSoundDistance = bpy.props.FloatProperty(
+    name='Max sound distance',
+    description='',
+    default = 100
+)
+bpy.types.Mesh.ignoreSkeleton = bpy.props.BoolProperty(
+    name='Ignore',
+    description='Do not export assignment to a skeleton',
+    default = False
+)
+bpy.types.Mesh.maxInfluencers = bpy.props.IntProperty(
+    name='Max bone Influencers / Vertex',
+    description='When fewer than this are observed, the lower value is used',
+    default = 8, min = 1, max = 8
+)
+bpy.types.Mesh.billboardMode = bpy.props.EnumProperty(
+    name='Billboard',
+    description='This is if or how a mesh should always face the camera',
+    items = (
+             (BILLBOARDMODE_NONE, 'None', 'No dimension should always face the camera {default}.'),
+             (BILLBOARDMODE_X   , 'X'   , 'X dimension should always face the camera.'),
+             (BILLBOARDMODE_Y   , 'Y'   , 'Y dimension should always face the camera.'),
+             (BILLBOARDMODE_Z   , 'Z'   , 'Z dimension should always face the camera.'),
+             (BILLBOARDMODE_ALL , 'All' , 'Mesh should always face the camera in all dimensions.')
+            ),
+    default = DEF_BILLBOARDMODE
+)
+bpy.types.Mesh.isPickable = bpy.props.BoolProperty(
+    name='Pickable',
+    description='Allow picking for a mesh',
+    default = DEF_IS_PICKABLE
+)
+bpy.types.Mesh.disabled = bpy.props.BoolProperty(
+    name='Disabled',
+    description='Load mesh disabled, which also disables all children',
+    default = DEF_DISABLED
+)
+bpy.types.Mesh.useThinInstances = bpy.props.BoolProperty(
+    name='Thin Instances',
+    description='Export linked duplicates, collection instances & particles of this mesh as a single\nbuffer of thin instance matrices, instead of one InstancedMesh each.\nThin instances cannot be individually picked, animated, or parented.',
+    default = False
+)
+bpy.types.Mesh.thinInstanceColors = bpy.props.BoolProperty(
+    name='Per-Instance Color',
+    description='Also export an instanceColor buffer from the object color of each instance,\nor the color of the instancing empty / particle emitter',
+    default = False
+)
+
+#===============================================================================
+class BJS_PT_MeshPanel(bpy.types.Panel):
+    bl_label = get_title()
+    bl_space_type = 'PROPERTIES'
+    bl_region_type = 'WINDOW'
+    bl_context = 'data'
+
+    @classmethod
+    def poll(cls, context):
+        ob = context.object
+        return ob is not None and isinstance(ob.data, bpy.types.Mesh)
+
+    def draw(self, context):
+        ob = context.object
+        layout = self.layout
+
+        # - - - - - - - - - - - - - - - - - - - - - - - - -
+        row = layout.row()
+
+        row = layout.row()
+        row.prop(ob.data, 'castShadows')
+        row.prop(ob.data, 'receiveShadows')
+
+        row = layout.row()
+        row.prop(ob.data, 'freezeWorldMatrix')
+        row.prop(ob.data, 'checkCollisions')
+
+        row = layout.row()
+        row.prop(ob.data, 'isPickable')
+        row.prop(ob.data, 'disabled')
+
+        layout.prop(ob.data, 'autoAnimate')
+
+        layout.prop(ob.data, 'tags')
+        layout.prop(ob.data, 'billboardMode')
+        # - - - - - - - - - - - - - - - - - - - - - - - - -
+        box = layout.box()
+        box.label(text='Instancing:')
+        row = box.row()
+        row.prop(ob.data, 'useThinInstances')
+        row = row.row()
+        row.enabled = ob.data.useThinInstances
+        row.prop(ob.data, 'thinInstanceColors')
+        # - - - - - - - - - - - - - - - - - - - - - - - - -
+        box = layout.box()
+        box.label(text='Skeleton:')
+        box.prop(ob.data, 'ignoreSkeleton')
+        row = box.row()
+        row.enabled = not ob.data.ignoreSkeleton
+        row.prop(ob.data, 'maxInfluencers')
+        # - - - - - - - - - - - - - - - - - - - - - - - - -
+        box = layout.box()
+        box.label(text='Baking Settings')
+        row = box.row()
+        row.prop(ob.data, 'forceBaking')
+        row.prop(ob.data, 'usePNG')
+        box.prop(ob.data, 'packORM')
+        box.prop(ob.data, 'bakeSize')
+        box.prop(ob.data, 'bakeQuality')
+        # - - - - - - - - - - - - - - - - - - - - - - - - -
+        box = layout.box()
+        box.prop(ob.data, 'attachedSound')
+        row = box.row()
+
+        row.prop(ob.data, 'autoPlaySound')
+        row.prop(ob.data, 'loopSound')
+        box.prop(ob.data, 'maxSoundDistance')
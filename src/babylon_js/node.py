@@ -4,17 +4,20 @@ from .f_curve_animatable import *
 DEF_DISABLED = False
 
 class Node(FCurveAnimatable):
+    # jsonFragment is only assigned when incremental, see IncrementalExport.write
+    __slots__ = ('name', 'parentId', 'position', 'rotation', 'rotationQuaternion', 'scaling', 'isVisible', 'isEnabled', 'customProperties', 'jsonFragment')
+
     def __init__(self, node):
         Logger.log('processing begun of node:  ' + node.name)
         self.define_animations(node, True, True, True)  #Should animations be done when forcedParent
         self.name = node.name
-
-        if node.parent and node.parent.type != 'ARMATURE':
-            self.parentId = node.parent.name
+        self.parentId = node.parent.name if node.parent and node.parent.type != 'ARMATURE' else None
 
         loc, rot, scale = node.matrix_local.decompose()
 
         self.position = loc
+        self.rotation = None
+        self.rotationQuaternion = None
         if node.rotation_mode == 'QUATERNION':
             self.rotationQuaternion = rot
         else:
@@ -29,10 +32,10 @@ class Node(FCurveAnimatable):
         file_handler.write('{')
         write_string(file_handler, 'name', self.name, True)
         write_string(file_handler, 'id', self.name)
-        if hasattr(self, 'parentId'): write_string(file_handler, 'parentId', self.parentId)
+        if self.parentId is not None: write_string(file_handler, 'parentId', self.parentId)
 
         write_vector(file_handler, 'position', self.position)
-        if hasattr(self, "rotationQuaternion"):
+        if self.rotationQuaternion is not None:
             write_quaternion(file_handler, "rotationQuaternion", self.rotationQuaternion)
         else:
             write_vector(file_handler, 'rotation', self.rotation)
@@ -50,7 +53,7 @@ class Node(FCurveAnimatable):
         file_handler.write(',"metadata": {')
         noComma = True
         for k, v in self.customProperties:
-            print('writing custom prop:', k, v)
+            Logger.debug('writing custom prop:  ' + k + ', ' + str(v))
             if type(v) == str: write_string(file_handler, k, v, noComma)
             elif type(v) == float: write_float(file_handler, k, v, noComma)
             elif type(v) == int: write_int(file_handler, k, v, noComma)
@@ -3,11 +3,16 @@ from math import floor
 from mathutils import Euler, Matrix
 
 import bpy
+from base64 import b64encode
 from bpy import app
+from queue import Full, Queue
+from threading import Event, Thread
 from time import strftime
 FLOAT_PRECISION_DEFAULT = 4
 VERTEX_OUTPUT_PER_LINE = 50
 STRIP_LEADING_ZEROS_DEFAULT = False # false for .babylon
+BASE64_CHUNK = 3 * 256 * 1024 # multiple of 3, so each chunk encodes without padding
+BASE64_QUEUE_DEPTH = 4
 #===============================================================================
 #  module level formatting methods, called from multiple classes
 #===============================================================================
@@ -190,6 +195,31 @@ def format_vector_array(vectorArray, precision = FLOAT_PRECISION_DEFAULT, indent
 
     return ret
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+# like format_vector_array, but of a flat buffer of x, y, z, like array('f'), as the geometry of a mesh is held
+def format_vector_buffer(buffer, precision = FLOAT_PRECISION_DEFAULT, indent = ''):
+    ret = ''
+    first = True
+    nOnLine = 0
+
+    fmt = '%.' + str(precision) + 'f'
+    preserveZUpRight = bpy.context.scene.world.preserveZUpRight == True
+    for idx in range(0, len(buffer) - 2, 3):
+        if (first != True):
+            ret +=','
+        first = False;
+
+        if preserveZUpRight:
+            ret += format_float(buffer[idx], fmt) + ',' + format_float(buffer[idx + 1], fmt) + ',' + format_float(buffer[idx + 2], fmt)
+        else:
+            ret += format_float(buffer[idx], fmt) + ',' + format_float(buffer[idx + 2], fmt) + ',' + format_float(buffer[idx + 1], fmt)
+        nOnLine += 3
+
+        if nOnLine >= VERTEX_OUTPUT_PER_LINE:
+            ret += '\n' + indent
+            nOnLine = 0
+
+    return ret
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 def format_quaternion(quaternion, precision = FLOAT_PRECISION_DEFAULT):
     fmt = '%.' + str(precision) + 'f'
     if bpy.context.scene.world.preserveZUpRight == True :
@@ -283,9 +313,10 @@ def same_number(numberA, numberB, precision = FLOAT_PRECISION_DEFAULT):
     fmt = '%.' + str(precision) + 'f'
     return format_float(numberA, fmt) == format_float(numberB, fmt)
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+# the view layer of the context, since there is no window when run in the background
 def shouldBeCulled(object):
     collectionName = object.users_collection[0].name
-    return collectionExcluded(bpy.context.window.view_layer.layer_collection, collectionName)
+    return collectionExcluded(bpy.context.view_layer.layer_collection, collectionName)
 
 def collectionExcluded(viewLayer, collectionName):
     if collectionName == viewLayer.name:
@@ -321,6 +352,9 @@ def write_vector(file_handler, name, vector, precision = FLOAT_PRECISION_DEFAULT
 def write_vector_array(file_handler, name, vectorArray, precision = FLOAT_PRECISION_DEFAULT):
     file_handler.write('\n,"' + name + '":[' + format_vector_array(vectorArray, precision, '') + ']')
 
+def write_vector_buffer(file_handler, name, buffer, precision = FLOAT_PRECISION_DEFAULT):
+    file_handler.write('\n,"' + name + '":[' + format_vector_buffer(buffer, precision, '') + ']')
+
 def write_quaternion(file_handler, name, quaternion, precision = FLOAT_PRECISION_DEFAULT):
     file_handler.write(',"' + name  +'":[' + format_quaternion(quaternion, precision) + ']')
 
@@ -342,4 +376,46 @@ def write_int(file_handler, name, int, noComma = False):
 def write_bool(file_handler, name, bool, noComma = False):
     if noComma == False:
         file_handler.write(',')
-    file_handler.write('"' + name + '":' + format_bool(bool))
\ No newline at end of file
+    file_handler.write('"' + name + '":' + format_bool(bool))
+# base64 of chunks, encoded by a thread while earlier ones are written, so no more than a few chunks are ever in memory.
+# chunks is an iterator of bytes, each a multiple of 3 long except the last;  it runs on the thread, so must not use bpy
+def write_base64(file_handler, name, prefix, chunks, noComma = False):
+    if noComma == False:
+        file_handler.write(',')
+    file_handler.write('"' + name + '":"' + prefix)
+
+    # when writing fails, the thread is stopped rather than left blocked on the full queue, holding the source open
+    encoded = Queue(maxsize = BASE64_QUEUE_DEPTH)
+    stopped = Event()
+    def put(item):
+        while not stopped.is_set():
+            try:
+                encoded.put(item, timeout = 0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def encode():
+        try:
+            for chunk in chunks:
+                if not put(b64encode(chunk).decode()): return
+            put(None)
+        except BaseException as ex:
+            put(ex)
+        finally:
+            if hasattr(chunks, 'close'): chunks.close()
+
+    thread = Thread(target = encode, daemon = True)
+    thread.start()
+    try:
+        while True:
+            item = encoded.get()
+            if item is None: break
+            if isinstance(item, BaseException): raise item
+            file_handler.write(item)
+    finally:
+        stopped.set()
+        thread.join()
+
+    file_handler.write('"')
@@ -0,0 +1,149 @@
+from .package_level import format_int
+
+import bpy
+from time import time
+
+# rough relative costs of the units of work, in triangles read, so the bar moves at about the rate time passes
+WEIGHT_TRIANGLE = 1          # reading a triangle of a mesh
+WEIGHT_TRIANGLE_WRITTEN = 1  # writing it to the JSON
+WEIGHT_FRAME_CHANNEL = 40    # a frame_set, & reading one object, bone or shape key at it
+WEIGHT_BAKE_PIXEL = 0.05     # of each channel baked, even at 16 samples Cycles is slow
+WEIGHT_OBJECT = 50           # everything else of an object, like its materials
+
+UPDATE_SECS = 0.25 # between updates of the progress shown, which are not free
+#===============================================================================
+class ExportCancelled(Exception):
+    pass
+#===============================================================================
+# How far along an export is, shown with window_manager.progress_update & an ETA in the status bar, when there is a
+# window.  Work is in units weighted by the WEIGHT_ constants, estimated before the export by estimate_work, with work only
+# found along the way, like bakes, added as it is.  Also where a cancel requested, by Esc or SIGINT, is acted on:  every
+# advance() raises ExportCancelled once one has been, which the finally blocks of what was changing the scene undo.
+class Progress:
+    instance = None
+
+    def __init__(self, context, work, showInUI = True):
+        self.start_time = time()
+        self.lastUpdate = self.start_time
+        self.total = max(work, 1)
+        self.done = 0
+        self.activity = ''
+        self.cancelRequested = False
+
+        self.windowManager = None
+        self.workspace = None
+        if showInUI and context.window is not None:
+            self.windowManager = context.window_manager
+            self.workspace = context.workspace
+            self.windowManager.progress_begin(0, 100)
+
+        # allow the static methods to be called, so instance does not need to be passed everywhere
+        Progress.instance = self
+
+    def close(self):
+        if self.windowManager is not None:
+            self.windowManager.progress_end()
+        if self.workspace is not None:
+            self.workspace.status_text_set(None)
+        Progress.instance = None
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def update(self, now):
+        fraction = min(self.done / self.total, 0.99) # estimates are never exact, so only full once finished
+        if self.windowManager is not None:
+            self.windowManager.progress_update(fraction * 100)
+
+        if self.workspace is not None:
+            text = 'Exporting:  ' + format_int(fraction * 100) + '%'
+            elapsed = now - self.start_time
+            if fraction >= 0.02:
+                text += ', ' + format_duration(elapsed * (1 - fraction) / fraction) + ' left'
+            if len(self.activity) > 0:
+                text += ', ' + self.activity
+            self.workspace.status_text_set(text + '  (Esc to cancel)')
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # for work which was not in the estimate, like the channels of a bake
+    @staticmethod
+    def add_work(units):
+        if Progress.instance is None: return
+        Progress.instance.total += units
+
+    # called between units of work, so also where a requested cancel is acted on, unless the work cannot be left half done
+    @staticmethod
+    def advance(units, activity = None, canCancel = True):
+        self = Progress.instance
+        if self is None: return
+
+        if canCancel: Progress.check()
+        self.done += units
+        if activity is not None: self.activity = activity
+
+        now = time()
+        if now - self.lastUpdate >= UPDATE_SECS:
+            self.lastUpdate = now
+            self.update(now)
+
+    @staticmethod
+    def check():
+        if Progress.instance is not None and Progress.instance.cancelRequested:
+            raise ExportCancelled('Export cancelled')
+
+    # returns False when there is no export to cancel
+    @staticmethod
+    def request_cancel():
+        if Progress.instance is None: return False
+        Progress.instance.cancelRequested = True
+        return True
+#===============================================================================
+def format_duration(secs):
+    secs = int(secs)
+    if secs < 60: return str(secs) + ' secs'
+    return str(secs // 60) + ' min ' + str(secs % 60).zfill(2) + ' secs'
+
+# The work of exporting objects, in the units of the WEIGHT_ constants.  Only the first user of mesh data is read, the
+# others are instances of it.  Frames are those Animation & Skeleton will frame_set, of the actions each would use.
+def estimate_work(objects, currentActionOnly):
+    work = 0
+    dataDone = set()
+    keyFrames = {} # by action name
+
+    def nKeyFrames(action):
+        nFrames = keyFrames.get(action.name)
+        if nFrames is None:
+            nFrames = keyFrames[action.name] = len(set([int(key.co.x) for fcurve in action.fcurves for key in fcurve.keyframe_points]))
+        return nFrames
+
+    def nAllFrames(action):
+        return int(action.frame_range[1]) - int(action.frame_range[0]) + 1
+
+    # same test as AnimationRange.actionPrep, of actions named object-action
+    def appliesTo(action, object):
+        return action.name.find('-') <= 0 or action.name.partition('-')[0] == object.name
+
+    # the key blocks of which the action animates the value, each is frame_set through all frames by RawShapeKey
+    def nKeyBlocks(action):
+        return len([fcurve for fcurve in action.fcurves if fcurve.data_path.startswith('key_blocks[') and fcurve.data_path.endswith('.value')])
+
+    for object in objects:
+        work += WEIGHT_OBJECT
+
+        if object.type == 'MESH' and object.data.name not in dataDone:
+            dataDone.add(object.data.name)
+            mesh = object.data
+            nTriangles = len(mesh.loops) - 2 * len(mesh.polygons)
+            work += nTriangles * (WEIGHT_TRIANGLE + WEIGHT_TRIANGLE_WRITTEN)
+
+            shapeKeys = mesh.shape_keys
+            if shapeKeys is not None and shapeKeys.animation_data and shapeKeys.animation_data.action:
+                actions = [shapeKeys.animation_data.action] if currentActionOnly else bpy.data.actions
+                work += sum([nKeyBlocks(action) * nAllFrames(action) for action in actions]) * WEIGHT_FRAME_CHANNEL
+
+        if object.animation_data and object.animation_data.action:
+            if object.type == 'ARMATURE':
+                actions = [action for action in bpy.data.actions if appliesTo(action, object)]
+                work += len(object.pose.bones) * sum([nAllFrames(action) for action in actions]) * WEIGHT_FRAME_CHANNEL
+            else:
+                actions = [object.animation_data.action] if currentActionOnly else bpy.data.actions
+                actions = [action for action in actions if appliesTo(action, object)]
+                work += 3 * sum([nKeyFrames(action) for action in actions]) * WEIGHT_FRAME_CHANNEL
+
+    return work
@@ -1,128 +1,136 @@
 """
 Utility module to disconnect and reconnect shader nodes from Material Output.
 This prevents textures from being exported while preserving material colors/values.
+
+Only the materials of the objects being exported are touched.  The link taken off of each is also kept on the material
+itself, as a custom property, so a crash part way through an export, or an autosave made during one, does not lose it;
+recover_disconnected_shaders() puts those back when a file is loaded or the next export starts.
 """
 import bpy
+from bpy.app.handlers import persistent
+
+# custom property of a material, holding (node name, socket identifier) of what was linked to the Surface of its output
+STORED_LINK_PROP = 'bjs_disconnected_surface'
+
+# materials disconnected by the current export, by name
+_disconnected = {}
+
+def get_exported_materials(objects):
+    """
+    The materials of the mesh objects, including those of collections instanced by empties, each once.
+    """
+    materials = {}
+    done = set()
+
+    def add(object):
+        if object.name in done: return
+        done.add(object.name)
+
+        if object.type == 'MESH':
+            for slot in object.material_slots:
+                if slot.material is not None:
+                    materials[slot.material.name] = slot.material
+
+        elif object.instance_type == 'COLLECTION' and object.instance_collection is not None:
+            for child in object.instance_collection.all_objects:
+                add(child)
+
+    for object in objects:
+        add(object)
 
-# Global dictionary to store connections
-_stored_connections = {}
+    return list(materials.values())
 
-def disconnect_all_shaders():
+def get_output_nodes(materials):
     """
-    Disconnect all shaders from Material Output nodes in all materials.
-    Stores the connections for later reconnection.
-    Returns the number of disconnected links.
+    The active Material Output of each material using nodes, found in one pass over each tree.
     """
-    global _stored_connections
-    _stored_connections = {}
-    
-    disconnect_count = 0
-    
-    # For each material
-    for mat in bpy.data.materials:
-        if not mat.use_nodes:
+    outputs = {}
+    for mat in materials:
+        if not mat.use_nodes or mat.node_tree is None:
             continue
-        
-        nodes = mat.node_tree.nodes
-        links = mat.node_tree.links
-        
-        # Find the Material Output node
-        material_output = None
-        for node in nodes:
+
+        # the active output is the one rendered, but any is better than none
+        found = None
+        for node in mat.node_tree.nodes:
             if node.type == 'OUTPUT_MATERIAL':
-                material_output = node
-                break
-        
-        if not material_output:
-            continue
-        
-        # Check if Material Output is connected
+                if node.is_active_output:
+                    found = node
+                    break
+                if found is None:
+                    found = node
+
+        if found is not None:
+            outputs[mat.name] = (mat, found)
+
+    return outputs
+
+def disconnect_shaders(objects):
+    """
+    Disconnect the shader from the Material Output of each material used by the objects.
+    Returns the number of materials touched.
+    """
+    global _disconnected
+    _disconnected = {}
+
+    for mat, material_output in get_output_nodes(get_exported_materials(objects)).values():
         input_surface = material_output.inputs.get('Surface')
-        is_connected = input_surface and input_surface.is_linked
-        
-        if is_connected:
-            # Get links before removing them
-            links_to_remove = [link for link in links if link.to_node == material_output and link.to_socket.name == 'Surface']
-            for link in links_to_remove:
-                from_node = link.from_node.name
-                from_socket = link.from_socket.name
-                _stored_connections[mat.name] = (from_node, from_socket)
-                links.remove(link)
-                disconnect_count += 1
-    
-    return disconnect_count
-
-def reconnect_all_shaders():
+        if input_surface is None or not input_surface.is_linked:
+            continue
+
+        link = input_surface.links[0]
+        stored = (link.from_node.name, link.from_socket.identifier)
+
+        # stored before removing, so the link is never only in memory
+        mat[STORED_LINK_PROP] = list(stored)
+        mat.node_tree.links.remove(link)
+        _disconnected[mat.name] = mat
+
+    return len(_disconnected)
+
+def reconnect_shaders():
+    """
+    Reconnect the shaders disconnected by disconnect_shaders().
+    Returns the number of materials reconnected.
     """
-    Reconnect all previously disconnected shaders to Material Output nodes.
-    Returns the number of reconnected links.
+    global _disconnected
+    materials = list(_disconnected.values())
+    _disconnected = {}
+
+    return _reconnect(materials)
+
+def recover_disconnected_shaders():
+    """
+    Reconnect any material still holding a stored link, left by an export which never finished.
+    Returns the number of materials reconnected.
     """
-    global _stored_connections
-    
+    return _reconnect([mat for mat in bpy.data.materials if STORED_LINK_PROP in mat])
+
+@persistent
+def recover_on_load(dummy):
+    count = recover_disconnected_shaders()
+    if count > 0:
+        print('Reconnected ' + str(count) + ' shader(s) left disconnected by an unfinished export')
+
+def _reconnect(materials):
     reconnect_count = 0
-    
-    # For each material
-    for mat in bpy.data.materials:
-        if not mat.use_nodes:
+    for mat, material_output in get_output_nodes(materials).values():
+        stored = mat.get(STORED_LINK_PROP)
+        if stored is None:
             continue
-        
-        nodes = mat.node_tree.nodes
-        links = mat.node_tree.links
-        
-        # Find the Material Output node
-        material_output = None
-        for node in nodes:
-            if node.type == 'OUTPUT_MATERIAL':
-                material_output = node
-                break
-        
-        if not material_output:
-            continue
-        
+
+        from_node = mat.node_tree.nodes.get(stored[0])
         to_socket = material_output.inputs.get('Surface')
-        if not to_socket:
-            continue
-        
-        # First, use stored connection if it exists
-        if mat.name in _stored_connections:
-            from_node_name, from_socket_name = _stored_connections[mat.name]
-            from_node = nodes.get(from_node_name)
-            
-            if from_node:
-                from_socket = from_node.outputs.get(from_socket_name)
-                if from_socket:
-                    links.new(from_socket, to_socket)
-                    reconnect_count += 1
-                    del _stored_connections[mat.name]
-                    continue
-        
-        # If no stored connection, find the first connected shader
-        shader_node = None
-        for node in nodes:
-            if node.type in ('ShaderNodeBsdfPrincipled', 'ShaderNodeBsdfDiffuse', 'ShaderNodeBsdfGlossy', 
-                            'ShaderNodeBsdfTransparent', 'ShaderNodeBsdfRefraction', 'ShaderNodeBsdfAnisotropic',
-                            'ShaderNodeBsdfVelvet', 'ShaderNodeBsdfToon', 'ShaderNodeSubsurfaceScattering',
-                            'ShaderNodeMixShader', 'ShaderNodeAddShader', 'ShaderNodeEmission'):
-                shader_node = node
-                break
-        
-        # If no shader found by type, search for any node with a SHADER output socket
-        if not shader_node:
-            for node in nodes:
-                for output in node.outputs:
-                    if output.type == 'SHADER':
-                        shader_node = node
-                        break
-                if shader_node:
-                    break
-        
-        # Connect the found shader to Material Output Surface
-        if shader_node:
-            # Find the first SHADER socket in outputs
-            for socket in shader_node.outputs:
-                if socket.type == 'SHADER':
-                    links.new(socket, to_socket)
-                    reconnect_count += 1
-                    break
-    
+        if from_node is not None and to_socket is not None:
+            from_socket = next((socket for socket in from_node.outputs if socket.identifier == stored[1]), None)
+            if from_socket is not None:
+                mat.node_tree.links.new(from_socket, to_socket)
+                reconnect_count += 1
+
+        del mat[STORED_LINK_PROP]
+
+    # a material without nodes any more still should not keep the property
+    for mat in materials:
+        if STORED_LINK_PROP in mat:
+            del mat[STORED_LINK_PROP]
+
     return reconnect_count
@@ -1,28 +1,30 @@
 from .animation import *
 from .logging import *
 from .package_level import *
+from .progress import *
 
 import bpy
+from array import array
 #===============================================================================
 # extract data in Mesh order; mapped into a copy of position
 #
 class RawShapeKey:
+    __slots__ = ('state', 'morphTargetId', 'precision', 'influence', 'animations', 'vertices')
+
     def __init__(self, keyBlock, state, keyOrderMap, precision, currentAction, meshNameForAnim):
         self.state = state
         self.morphTargetId = meshNameForAnim + '-' + state
         self.precision = precision
         self.influence = keyBlock.value
-        self.vertices = []
         self.animations = []
 
-        retSz = len(keyOrderMap)
-        for i in range(retSz):
-            self.vertices.append(None)
+        # the key positions of all Blender vertices in one call, then those exported put in the order they were, 3 floats each
+        coordinates = array('f', [0.0]) * (len(keyBlock.data) * 3)
+        keyBlock.data.foreach_get('co', coordinates)
 
-        for i in range(retSz):
-            pair = keyOrderMap[i]
-            value = keyBlock.data[pair[0]].co
-            self.vertices[pair[1]] = value
+        self.vertices = array('f', [0.0]) * (len(keyOrderMap) * 3)
+        for blenderIdx, exportedIdx in keyOrderMap:
+            self.vertices[exportedIdx * 3 : exportedIdx * 3 + 3] = coordinates[blenderIdx * 3 : blenderIdx * 3 + 3]
 
         Logger.log(state + ' added', 3)
         if currentAction is not None:
@@ -54,6 +56,7 @@ class RawShapeKey:
                     animation.frames.append(frame)
                     animation.values.append(keyBlock.value)
                     previousInfluence = keyBlock.value
+                Progress.advance(WEIGHT_FRAME_CHANNEL)
 
             Logger.log('adding action "' + action.name + '":  [' + format_int(animation.get_first_frame()) + ' - ' + format_int(animation.get_last_frame()) + ']', 4)
             self.animations.append(animation)
@@ -70,6 +73,6 @@ class RawShapeKey:
         write_string(file_handler, 'name', self.state, True)
         write_string(file_handler, 'id', self.morphTargetId)
         write_int(file_handler, 'influence', self.influence)
-        write_vector_array(file_handler, 'positions', self.vertices, self.precision)
+        write_vector_buffer(file_handler, 'positions', self.vertices, self.precision)
         file_handler.write('}')
 #===============================================================================
@@ -0,0 +1,227 @@
+from .logging import *
+from .package_level import *
+
+from .mesh import *
+
+import bpy
+from array import array
+from mathutils import Matrix, Vector
+
+#===============================================================================
+# A mesh built from the geometry of other meshes, with their world transforms baked into the vertices.
+# Constructor of Mesh is not called, every attribute its to_json_file uses is assigned here.
+class StaticBatch(Mesh):
+    def __init__(self, name, members, scene):
+        Logger.log('building static batch:  ' + name + ', from ' + format_int(len(members)) + ' meshes', 2)
+        first = members[0]
+        self.scene = scene
+        self.name = name
+        self.collectionName = first.collectionName
+        self.animationsPresent = None
+        self.customProps = None
+        self.isVisible = first.isVisible
+        self.isPickable = first.isPickable
+        self.isEnabled = first.isEnabled
+        self.checkCollisions = first.checkCollisions
+        self.receiveShadows = first.receiveShadows
+        self.castShadows = first.castShadows
+        self.billboardMode = BILLBOARDMODE_NONE
+        self.freezeWorldMatrix = True
+        self.tags = first.tags
+        self.hasSkeleton = False
+        self.dataName = name
+        self.position = Vector((0, 0, 0))
+        self.rotation = Vector((0, 0, 0))
+        self.scaling = Vector((1, 1, 1))
+        self.matrix_world = Matrix.Identity(4)
+        self.instances = []
+        if hasattr(first, 'materialId'): self.materialId = first.materialId
+
+        self.positions  = array('f')
+        self.normals    = array('f')
+        self.tangents   = array('f')
+        self.uvs        = array('f')
+        self.uvs2       = array('f')
+        self.colors     = array('f')
+        self.indices    = array('I')
+        self.subMeshes  = []
+
+        # gather the sub-meshes of every member by material index, so each material of a multi-material is a single draw
+        materialIndices = []
+        for member in members:
+            for subMesh in member.subMeshes:
+                if subMesh.materialIndex not in materialIndices:
+                    materialIndices.append(subMesh.materialIndex)
+        materialIndices.sort()
+
+        for materialIndex in materialIndices:
+            verticesStart = len(self.positions) // 3
+            indexStart = len(self.indices)
+            for member in members:
+                for subMesh in member.subMeshes:
+                    if subMesh.materialIndex == materialIndex:
+                        self.append(member, subMesh)
+
+            self.subMeshes.append(SubMesh(materialIndex, verticesStart, indexStart, len(self.positions) // 3 - verticesStart, len(self.indices) - indexStart))
+
+        self.calcBoundingInfo()
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def append(self, member, subMesh):
+        matrix = member.matrix_world
+        normalMatrix = matrix.to_3x3().inverted_safe().transposed()
+        tangentMatrix = matrix.to_3x3()
+        mirrored = matrix.determinant() < 0
+
+        offset = len(self.positions) // 3 - subMesh.verticesStart
+        vStart = subMesh.verticesStart
+        vEnd = vStart + subMesh.verticesCount
+
+        for idx in range(vStart * 3, vEnd * 3, 3):
+            self.positions.extend(matrix @ Vector(member.positions[idx : idx + 3]))
+            self.normals.extend((normalMatrix @ Vector(member.normals[idx : idx + 3])).normalized())
+
+        if len(member.tangents) > 0:
+            for idx in range(vStart, vEnd):
+                # tangents were stored already in BJS order (x, z, y, w)
+                t = idx * 4
+                tangent = (tangentMatrix @ Vector((member.tangents[t], member.tangents[t + 2], member.tangents[t + 1]))).normalized()
+                sign = -member.tangents[t + 3] if mirrored else member.tangents[t + 3]
+                self.tangents.extend([tangent.x, tangent.z, tangent.y, sign])
+
+        if len(member.uvs) > 0:
+            self.uvs.extend(member.uvs[vStart * 2 : vEnd * 2])
+
+        if len(member.uvs2) > 0:
+            self.uvs2.extend(member.uvs2[vStart * 2 : vEnd * 2])
+
+        if len(member.colors) > 0:
+            self.colors.extend(member.colors[vStart * 4 : vEnd * 4])
+
+        iEnd = subMesh.indexStart + subMesh.indexCount
+        for idx in range(subMesh.indexStart, iEnd, 3):
+            # a negative scale flips the winding of the faces
+            if mirrored:
+                self.indices.extend([member.indices[idx] + offset, member.indices[idx + 2] + offset, member.indices[idx + 1] + offset])
+            else:
+                self.indices.extend([member.indices[idx] + offset, member.indices[idx + 1] + offset, member.indices[idx + 2] + offset])
+#===============================================================================
+class StaticBatcher:
+    def __init__(self, exporter, objects):
+        self.exporter = exporter
+        settings = exporter.settings
+        self.vertexCap = settings.batchVertexCap
+        self.maxExtent = settings.batchMaxExtent
+
+        # names other things refer to, so the mesh must remain on its own
+        self.referencedNames = set()
+        for object in objects:
+            if object.parent is not None:
+                self.referencedNames.add(object.parent.name)
+            for constraint in object.constraints:
+                if hasattr(constraint, 'target') and constraint.target is not None:
+                    self.referencedNames.add(constraint.target.name)
+
+        for sound in exporter.sounds:
+            if hasattr(sound, 'connectedMeshId'):
+                self.referencedNames.add(sound.connectedMeshId)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def isBatchable(self, mesh):
+        # Nodes are not an instance of Mesh
+        if not isinstance(mesh, Mesh): return False
+
+        return (mesh.freezeWorldMatrix and
+                not mesh.animationsPresent and
+                not mesh.hasSkeleton and
+                not hasattr(mesh, 'morphTargetManagerId') and
+                not hasattr(mesh, 'thinInstances') and
+                not hasattr(mesh, 'lockedTargetId') and
+                not hasattr(mesh, 'physicsImpostor') and
+                not mesh.customProps and
+                len(mesh.instances) == 0 and
+                mesh.billboardMode == BILLBOARDMODE_NONE and
+                mesh.name not in self.referencedNames)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # anything which would be lost or mixed by merging, must be the same for all members of a batch
+    @staticmethod
+    def getBatchKey(mesh):
+        return (mesh.materialId if hasattr(mesh, 'materialId') else None,
+                mesh.collectionName,
+                mesh.castShadows,
+                mesh.receiveShadows,
+                mesh.isVisible,
+                mesh.isEnabled,
+                mesh.isPickable,
+                mesh.checkCollisions,
+                mesh.tags,
+                len(mesh.tangents) > 0,
+                len(mesh.uvs) > 0,
+                len(mesh.uvs2) > 0,
+                len(mesh.colors) > 0)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    @staticmethod
+    def getDrawCalls(meshesAndNodes):
+        nDrawCalls = 0
+        for mesh in meshesAndNodes:
+            if hasattr(mesh, 'subMeshes'):
+                nDrawCalls += len(mesh.subMeshes)
+        return nDrawCalls
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def batch(self, meshesAndNodes):
+        Logger.log('========= Static batching of frozen meshes =========', 0)
+        drawCallsBefore = StaticBatcher.getDrawCalls(meshesAndNodes)
+
+        groups = {}
+        for mesh in meshesAndNodes:
+            if self.isBatchable(mesh):
+                key = StaticBatcher.getBatchKey(mesh)
+                if key not in groups:
+                    groups[key] = []
+                groups[key].append(BatchMember(mesh))
+
+        batched = set() # ids of merged meshes
+        batches = []
+        for members in groups.values():
+            for cluster in self.cluster(members):
+                # a cluster of 1 would just be the same mesh with a different name
+                if len(cluster) < 2: continue
+
+                name = self.exporter.nameSpace + '.StaticBatch#' + str(len(batches))
+                batches.append(StaticBatch(name, [member.mesh for member in cluster], self.exporter.scene))
+                for member in cluster:
+                    batched.add(id(member.mesh))
+
+        ret = [mesh for mesh in meshesAndNodes if id(mesh) not in batched] + batches
+
+        Logger.log('meshes merged:  ' + format_int(len(batched)) + ', into batches:  ' + format_int(len(batches)), 1)
+        Logger.log('draw calls before:  ' + format_int(drawCallsBefore) + ', after:  ' + format_int(StaticBatcher.getDrawCalls(ret)), 1)
+        return ret
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # recursive median split on the longest axis, until under the vertex cap & not larger than the max extent
+    def cluster(self, members):
+        nVertices = 0
+        lo = Vector(members[0].minimum)
+        hi = Vector(members[0].maximum)
+        for member in members:
+            nVertices += member.nVertices
+            for axis in range(3):
+                lo[axis] = min(lo[axis], member.minimum[axis])
+                hi[axis] = max(hi[axis], member.maximum[axis])
+
+        extent = hi - lo
+        longest = max(extent.x, extent.y, extent.z)
+        tooLarge = self.maxExtent > 0 and longest > self.maxExtent
+        if len(members) == 1 or (nVertices <= self.vertexCap and not tooLarge):
+            return [members]
+
+        axis = 0 if longest == extent.x else (1 if longest == extent.y else 2)
+        members = sorted(members, key = lambda member: member.center[axis])
+        half = len(members) // 2
+        return self.cluster(members[:half]) + self.cluster(members[half:])
+#===============================================================================
+# world space bounds of a candidate, used for clustering
+class BatchMember:
+    def __init__(self, mesh):
+        self.mesh = mesh
+        self.nVertices = len(mesh.positions) // 3
+        self.minimum, self.maximum = mesh.boundingInfo.transformed(mesh.matrix_world)
+        self.center = (self.minimum + self.maximum) / 2
@@ -0,0 +1,268 @@
+from .logging import *
+from .package_level import *
+
+from .materials.material import *
+from .materials.texture import AtlasTexture, CLAMP_ADDRESSMODE, EXPLICIT_MODE, U_OFFSET, V_OFFSET, U_SCALE, V_SCALE, U_ANG, V_ANG, W_ANG
+from .mesh import *
+
+import bpy
+from copy import copy
+from io import StringIO
+from os import path
+import numpy
+
+PADDING = 2 # pixels of each texture's edge repeated around it, so filtering does not pick up neighbors
+UV_TOLERANCE = 0.001
+
+#===============================================================================
+# Merges materials which only differ by their textures, when all are small & mapped inside 0 - 1.  Each texture slot of
+# the materials gets an atlas with the same layout, and the uvs of the meshes using them are moved into their rectangle.
+# Runs once all meshes are processed, before static batching, so the merged materials allow larger batches.
+class TextureAtlaser:
+    def __init__(self, exporter):
+        self.exporter = exporter
+        settings = exporter.settings
+        self.atlasSize = settings.atlasSize
+        self.maxTextureSize = min(settings.atlasMaxTextureSize, self.atlasSize - 2 * PADDING)
+        self.jsonDir = path.dirname(exporter.filepathMinusExtension)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def atlas(self, meshesAndNodes):
+        Logger.log('========= Texture atlasing of small textures =========', 0)
+        exporter = self.exporter
+
+        # materials of multi-materials share the uvs of their mesh with others, so are left alone
+        inMultiMaterial = set()
+        for multimaterial in exporter.multiMaterials:
+            for material in multimaterial.material_slots:
+                inMultiMaterial.add(material.name)
+
+        users = {} # meshes by material name
+        for mesh in meshesAndNodes:
+            if hasattr(mesh, 'materialId'):
+                users.setdefault(mesh.materialId, []).append(mesh)
+
+        groups = {}
+        for material in exporter.materials:
+            if material.name in inMultiMaterial or material.name not in users: continue
+
+            candidate = self.getCandidate(material, users[material.name])
+            if candidate is None: continue
+
+            groups.setdefault(TextureAtlaser.getSignature(material), []).append(candidate)
+
+        nMerged = 0
+        nFilesBefore = 0
+        nAtlases = 0
+        for candidates in groups.values():
+            if len(candidates) < 2: continue
+
+            # tallest first onto shelves, a new atlas when one fills
+            candidates.sort(key = lambda candidate: -candidate.height)
+            while len(candidates) > 1:
+                packer = ShelfPacker(self.atlasSize)
+                placed = []
+                remaining = []
+                for candidate in candidates:
+                    if packer.insert(candidate):
+                        placed.append(candidate)
+                    else:
+                        remaining.append(candidate)
+
+                if len(placed) < 2: break
+
+                self.build(placed, packer, users, nAtlases)
+                nMerged += len(placed)
+                nFilesBefore += sum([len(candidate.slots) for candidate in placed])
+                nAtlases += 1
+                candidates = remaining
+
+        Logger.log('materials merged:  ' + format_int(nMerged) + ', into atlased materials:  ' + format_int(nAtlases) + ', texture files replaced:  ' + format_int(nFilesBefore), 1)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # returns None when the material cannot be atlased
+    def getCandidate(self, material, meshes):
+        if len(material.textures) == 0: return None
+
+        # the same texture can be in the dictionary under multiple keys, e.g. a metal / roughness / ao texture
+        slots = []
+        sizes = []
+        for texture in material.textures.values():
+            if texture in slots: continue
+            if texture.fileNoPath is None or texture.inlineData is not None: return None
+            if texture.coordinatesMode != EXPLICIT_MODE: return None
+            if not (same_number(texture.uOffset, U_OFFSET) and same_number(texture.vOffset, V_OFFSET) and
+                    same_number(texture.uScale , U_SCALE ) and same_number(texture.vScale , V_SCALE ) and
+                    same_number(texture.uAng, U_ANG) and same_number(texture.vAng, V_ANG) and same_number(texture.wAng, W_ANG)):
+                return None
+
+            textureFile = path.join(self.jsonDir, texture.fileNoPath)
+            if not path.isfile(textureFile): return None
+
+            # baked images are gone by now, so the size is from the file written
+            width, height = TextureAtlaser.getImageSize(textureFile)
+            if width > self.maxTextureSize or height > self.maxTextureSize: return None
+            slots.append(texture)
+            sizes.append((width, height))
+
+        # wrapping textures are fine, as long as nothing is outside of the texture
+        uvSets = set([texture.coordinatesIndex for texture in slots])
+        for mesh in meshes:
+            for uvSet in uvSets:
+                uvs = mesh.uvs if uvSet == 0 else mesh.uvs2
+                if len(uvs) == 0: return None
+                if min(uvs) < -UV_TOLERANCE or max(uvs) > 1 + UV_TOLERANCE:
+                    Logger.log('not atlased, uvs outside of texture:  ' + material.name, 2)
+                    return None
+
+        return AtlasCandidate(material, slots, sizes, uvSets)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # the material as it would be written, except the name & which files the textures are
+    @staticmethod
+    def getSignature(material):
+        hold = []
+        for texture in material.textures.values():
+            hold.append((texture, texture.fileNoPath, texture.wrapU, texture.wrapV))
+            texture.fileNoPath = ''
+            texture.wrapU = CLAMP_ADDRESSMODE
+            texture.wrapV = CLAMP_ADDRESSMODE
+
+        holdName = material.name
+        material.name = ''
+        signature = StringIO()
+        try:
+            material.to_json_file(signature)
+        finally:
+            material.name = holdName
+            for texture, fileNoPath, wrapU, wrapV in hold:
+                texture.fileNoPath = fileNoPath
+                texture.wrapU = wrapU
+                texture.wrapV = wrapV
+
+        # keys sharing a texture must also match
+        keys = []
+        for key, texture in sorted(material.textures.items()):
+            keys.append((key, [other for other in material.textures.values()].index(texture)))
+
+        return signature.getvalue() + repr(keys)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def build(self, placed, packer, users, idx):
+        exporter = self.exporter
+        first = placed[0].material
+        name = exporter.nameSpace + '.Atlas#' + str(idx)
+        atlasHeight = packer.getHeight()
+        Logger.log('building atlas:  ' + name + ', ' + format_int(self.atlasSize) + ' x ' + format_int(atlasHeight) + ', from ' + format_int(len(placed)) + ' materials', 2)
+
+        merged = copy(first)
+        merged.name = name
+        merged.textures = {}
+
+        for slotIdx, template in enumerate(placed[0].slots):
+            pixels = numpy.zeros((atlasHeight, self.atlasSize, 4), dtype = numpy.float32)
+            for candidate in placed:
+                source = self.readPixels(candidate.slots[slotIdx])
+                source = TextureAtlaser.resize(source, candidate.width, candidate.height)
+                source = numpy.pad(source, ((PADDING, PADDING), (PADDING, PADDING), (0, 0)), mode = 'edge')
+                x, y = candidate.x, candidate.y
+                pixels[y : y + source.shape[0], x : x + source.shape[1]] = source
+
+            fileName = legal_js_identifier(name) + '_' + str(slotIdx) + '.png'
+            image = bpy.data.images.new(name = fileName, width = self.atlasSize, height = atlasHeight, alpha = True, float_buffer = False)
+            image.pixels.foreach_set(pixels.ravel())
+            image.filepath_raw = path.join(exporter.textureFullPathDir, fileName)
+            image.file_format = 'PNG'
+            image.save()
+
+            atlasTexture = AtlasTexture(image, template, exporter)
+            bpy.data.images.remove(image)
+            for key, texture in first.textures.items():
+                if texture is template:
+                    merged.textures[key] = atlasTexture
+
+        # moving the uvs into each rectangle, in pixel rows from the bottom, as Blender images are
+        for candidate in placed:
+            uScale = candidate.width  / self.atlasSize
+            vScale = candidate.height / atlasHeight
+            uOffset = (candidate.x + PADDING) / self.atlasSize
+            vOffset = (candidate.y + PADDING) / atlasHeight
+
+            for mesh in users[candidate.material.name]:
+                mesh.materialId = name
+                for uvSet in candidate.uvSets:
+                    uvs = mesh.uvs if uvSet == 0 else mesh.uvs2
+                    for i in range(0, len(uvs), 2):
+                        uvs[i    ] = uOffset + min(max(uvs[i    ], 0.0), 1.0) * uScale
+                        uvs[i + 1] = vOffset + min(max(uvs[i + 1], 0.0), 1.0) * vScale
+
+            exporter.materials.remove(candidate.material)
+
+        exporter.materials.append(merged)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    @staticmethod
+    def getImageSize(filepath):
+        image = bpy.data.images.load(filepath, check_existing = False)
+        try:
+            return tuple(image.size)
+        finally:
+            bpy.data.images.remove(image)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # from the file written for the texture, since baked images are gone by now
+    def readPixels(self, texture):
+        image = bpy.data.images.load(path.join(self.jsonDir, texture.fileNoPath), check_existing = False)
+        try:
+            width, height = image.size
+            pixels = numpy.empty(width * height * 4, dtype = numpy.float32)
+            image.pixels.foreach_get(pixels)
+        finally:
+            bpy.data.images.remove(image)
+
+        return pixels.reshape((height, width, 4))
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # nearest neighbor, only needed when the textures of a material are different sizes
+    @staticmethod
+    def resize(pixels, width, height):
+        if pixels.shape[0] == height and pixels.shape[1] == width: return pixels
+
+        rows = (numpy.arange(height) * pixels.shape[0]) // height
+        cols = (numpy.arange(width ) * pixels.shape[1]) // width
+        return pixels[rows][:, cols]
+#===============================================================================
+# a material, with the textures to atlas & where it is placed; the size is that of its largest texture
+class AtlasCandidate:
+    def __init__(self, material, slots, sizes, uvSets):
+        self.material = material
+        self.slots = slots
+        self.uvSets = uvSets
+        self.width  = max([size[0] for size in sizes])
+        self.height = max([size[1] for size in sizes])
+        self.x = 0
+        self.y = 0
+#===============================================================================
+class ShelfPacker:
+    def __init__(self, size):
+        self.size = size
+        self.shelves = [] # [y, height, next x]
+        self.top = 0
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # assigns x & y of the candidate, including its padding, returns whether it fit
+    def insert(self, candidate):
+        width  = candidate.width  + 2 * PADDING
+        height = candidate.height + 2 * PADDING
+
+        for shelf in self.shelves:
+            if height <= shelf[1] and shelf[2] + width <= self.size:
+                candidate.x, candidate.y = shelf[2], shelf[0]
+                shelf[2] += width
+                return True
+
+        if self.top + height > self.size or width > self.size: return False
+
+        self.shelves.append([self.top, height, width])
+        candidate.x, candidate.y = 0, self.top
+        self.top += height
+        return True
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # only as tall as used, rounded up to a power of 2
+    def getHeight(self):
+        height = 1
+        while height < self.top:
+            height *= 2
+        return height
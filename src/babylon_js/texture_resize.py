@@ -0,0 +1,211 @@
+from .logging import *
+from .package_level import *
+
+from .export_cache import *
+
+import bpy
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha1
+from os import cpu_count, path
+from shutil import copy
+import numpy
+
+# percentages of the exported size, written next to it as [name]-50.png, [name]-25.png, for a viewer to pick by device
+VARIANTS = (50, 25)
+
+# of the extensions Blender can both read & write
+FILE_FORMATS = {'png': 'PNG', 'jpg': 'JPEG', 'jpeg': 'JPEG', 'bmp': 'BMP', 'tga': 'TARGA', 'tif': 'TIFF', 'tiff': 'TIFF', 'webp': 'WEBP'}
+
+# bump when a change to resizing would make previously cached images wrong
+RESIZE_CACHE_VERSION = '1'
+
+#===============================================================================
+# Scales the texture files already in the texture directory down to the max size of the scene or their material, & writes
+# smaller variants.  Reading & writing images is only allowed on the main thread, so just the filtering is on the pool.
+class TextureResizer:
+    def __init__(self, exporter):
+        self.exporter = exporter
+        settings = exporter.settings
+        self.sceneMaxSize = settings.maxTextureSize
+        self.writeVariants = settings.writeTextureVariants
+        self.jsonDir = path.dirname(exporter.filepathMinusExtension)
+        self.nThreads = max(1, cpu_count() or 1)
+
+        self.cache = None
+        if settings.useBakeCache:
+            self.cache = ExportCache(path.join(exporter.getBakeCacheDir(), 'resized'), settings.bakeCacheMaxMB * 1024 * 1024, 'resize cache')
+
+        self.bytesBefore = 0
+        self.bytesAfter = 0
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def resize(self):
+        Logger.log('========= Resizing of textures =========', 0)
+
+        # textures of different materials can be the same file, which is done once at the smallest max size of them
+        jobs = {} # by file name
+        for material in self.exporter.materials:
+            maxSize = material.maxTextureSize if material.maxTextureSize > 0 else self.sceneMaxSize
+            for texture in material.textures.values():
+                if texture.fileNoPath is None or texture.inlineData is not None: continue
+
+                job = jobs.get(texture.fileNoPath)
+                if job is None:
+                    job = ResizeJob(texture.fileNoPath, maxSize)
+                    jobs[texture.fileNoPath] = job
+                elif maxSize > 0 and (job.maxSize == 0 or maxSize < job.maxSize):
+                    job.maxSize = maxSize
+
+                job.textures.append(texture)
+
+        # a bounded number in flight, so only that many images are in memory
+        pending = deque()
+        with ThreadPoolExecutor(max_workers = self.nThreads) as pool:
+            for job in jobs.values():
+                if not self.prepare(job): continue
+
+                pending.append((job, pool.submit(TextureResizer.filter, job.pixels, job.sizes)))
+                job.pixels = None
+                if len(pending) > self.nThreads * 2:
+                    self.finish(*pending.popleft())
+
+            while len(pending) > 0:
+                self.finish(*pending.popleft())
+
+        if self.cache is not None: self.cache.close()
+
+        Logger.log('texture memory before:  ' + format_f(self.bytesBefore / 1048576) + ' MB, after:  ' + format_f(self.bytesAfter / 1048576) + ' MB (uncompressed RGBA with mips)', 1)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # returns False when there is nothing to do, or it was done from the cache;  otherwise the pixels are read
+    def prepare(self, job):
+        filepath = path.join(self.jsonDir, job.fileName)
+        extension = job.fileName.rpartition('.')[2].lower()
+        if not path.isfile(filepath) or extension not in FILE_FORMATS:
+            Logger.log('not resizable:  ' + job.fileName, 1)
+            return False
+
+        job.fileFormat = FILE_FORMATS[extension]
+        image = bpy.data.images.load(filepath, check_existing = False)
+        try:
+            width, height = image.size
+            self.bytesBefore += TextureResizer.getMemory(width, height)
+
+            # the exported size, then each variant of it
+            scale = 1.0
+            if job.maxSize > 0 and max(width, height) > job.maxSize:
+                scale = job.maxSize / max(width, height)
+            job.sizes = [(max(1, round(width * scale)), max(1, round(height * scale)))]
+            if self.writeVariants:
+                for percent in VARIANTS:
+                    job.sizes.append((max(1, round(job.sizes[0][0] * percent / 100)), max(1, round(job.sizes[0][1] * percent / 100))))
+
+            self.bytesAfter += TextureResizer.getMemory(job.sizes[0][0], job.sizes[0][1])
+            job.scaled = scale != 1.0
+            if len(job.sizes) == 1 and not job.scaled: return False
+
+            # never write over the authored file, when the texture directory is where the source is
+            job.isSourceFile = any([texture.isSourceFile for texture in job.textures])
+            stem, dot, ext = job.fileName.rpartition('.')
+            job.outputs = [stem + ('-' + str(job.sizes[0][0]) if job.isSourceFile and job.scaled else '') + dot + ext]
+            for percent in VARIANTS[0 : len(job.sizes) - 1]:
+                job.outputs.append(stem + '-' + str(percent) + dot + ext)
+
+            with open(filepath, 'rb') as file_handler:
+                job.sourceHash = sha1(file_handler.read()).hexdigest()
+
+            if self.fromCache(job): return False
+
+            job.pixels = numpy.empty(width * height * 4, dtype = numpy.float32)
+            image.pixels.foreach_get(job.pixels)
+            job.pixels = job.pixels.reshape((height, width, 4))
+        finally:
+            bpy.data.images.remove(image)
+
+        return True
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def getCacheKey(self, job, idx):
+        width, height = job.sizes[idx]
+        return sha1((RESIZE_CACHE_VERSION + job.sourceHash + str(width) + 'x' + str(height) + job.fileFormat).encode()).hexdigest()
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # when every output is cached, copies them into place; the exported size is not an output when it did not change
+    def fromCache(self, job):
+        if self.cache is None: return False
+
+        firstIdx = 0 if job.scaled else 1
+        cachedFiles = []
+        for idx in range(firstIdx, len(job.sizes)):
+            cachedFile = self.cache.lookup(self.getCacheKey(job, idx))
+            if cachedFile is None: return False
+            cachedFiles.append((idx, cachedFile))
+
+        for idx, cachedFile in cachedFiles:
+            copy(cachedFile, path.join(self.jsonDir, job.outputs[idx]))
+
+        self.assignOutput(job)
+        Logger.log('resized from cache:  ' + job.fileName, 1)
+        return True
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # runs on the pool, returns the pixels of each size
+    @staticmethod
+    def filter(pixels, sizes):
+        results = []
+        for width, height in sizes:
+            pixels = TextureResizer.downscale(pixels, width, height)
+            results.append(pixels)
+        return results
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # box filtered halving while at least twice the size, then nearest for what remains
+    @staticmethod
+    def downscale(pixels, width, height):
+        while pixels.shape[0] >= height * 2 and pixels.shape[1] >= width * 2:
+            h = pixels.shape[0] // 2 * 2
+            w = pixels.shape[1] // 2 * 2
+            pixels = pixels[0:h, 0:w]
+            pixels = (pixels[0::2, 0::2] + pixels[1::2, 0::2] + pixels[0::2, 1::2] + pixels[1::2, 1::2]) * 0.25
+
+        if pixels.shape[0] != height or pixels.shape[1] != width:
+            rows = (numpy.arange(height) * pixels.shape[0]) // height
+            cols = (numpy.arange(width ) * pixels.shape[1]) // width
+            pixels = pixels[rows][:, cols]
+
+        return pixels
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def finish(self, job, future):
+        results = future.result()
+        for idx, pixels in enumerate(results):
+            if idx == 0 and not job.scaled: continue
+
+            height, width = pixels.shape[0:2]
+            filepath = path.join(self.jsonDir, job.outputs[idx])
+            image = bpy.data.images.new(name = path.basename(filepath), width = width, height = height, alpha = True, float_buffer = False)
+            try:
+                image.pixels.foreach_set(pixels.ravel())
+                image.filepath_raw = filepath
+                image.file_format = job.fileFormat
+                image.save()
+            finally:
+                bpy.data.images.remove(image)
+
+            if self.cache is not None:
+                self.cache.store(self.getCacheKey(job, idx), '.' + job.outputs[idx].rpartition('.')[2], lambda cacheFile: copy(filepath, cacheFile))
+
+        self.assignOutput(job)
+        Logger.log('resized:  ' + job.fileName + ' to ' + ', '.join([str(size[0]) + ' x ' + str(size[1]) for size in job.sizes]), 1)
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # textures point to the exported size, when it had to be written to a different name
+    def assignOutput(self, job):
+        if not job.scaled: return
+        for texture in job.textures:
+            texture.fileNoPath = job.outputs[0]
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # 4 bytes a pixel, plus a third for mips
+    @staticmethod
+    def getMemory(width, height):
+        return width * height * 4 * 4 / 3
+#===============================================================================
+class ResizeJob:
+    def __init__(self, fileName, maxSize):
+        self.fileName = fileName
+        self.maxSize = maxSize
+        self.textures = []
+        self.pixels = None
@@ -0,0 +1,444 @@
+from .package_level import get_title
+
+from .bounding import DEF_OCTREE_CAPACITY, DEF_OCTREE_MAX_DEPTH
+from .materials.env_textures.support import *
+
+import bpy
+
+SCOPE_ALL = 'ALL'
+SCOPE_SELECTED = 'SELECTED'
+SCOPE_VISIBLE = 'VISIBLE'
+
+# used in World constructor, defined in BABYLON.Scene; must be strings to be in EnumProperty
+FOGMODE_NONE = "0"
+FOGMODE_EXP = "1"
+FOGMODE_EXP2 = "2"
+FOGMODE_LINEAR = "3"
+
+ENV_SZ_1 = "128"
+ENV_SZ_2 = "256"
+ENV_SZ_3 = "512"
+#===============================================================================
+###      Skybox environment      ###
+bpy.types.World.environmentTextureSize = bpy.props.EnumProperty(
+    name='Texture Size',
+    description='This the size of the cube texture in px / face.  Only used for .hdr files.',
+    items = ((ENV_SZ_1, ENV_SZ_1, ''),
+             (ENV_SZ_2, ENV_SZ_2, ''),
+             (ENV_SZ_3, ENV_SZ_3, '')
+            ),
+    default = ENV_SZ_1
+)
+bpy.types.World.precomputeEnvironment = bpy.props.BoolProperty(
+    name='Pre-filter to .env',
+    description='Do the cube projection, irradiance & specular pre-filtering of the world environment texture at export,\nwriting a .env file, instead of each client doing it when loading the .hdr',
+    default = False
+)
+bpy.types.World.envTexRotationY = bpy.props.FloatProperty(
+    name='Y Rotation',
+    description='The degrees to rotate the environment texture / sky box',
+    default = 0, min = 0, max = 360
+)
+bpy.types.World.skyBox = bpy.props.BoolProperty(
+    name='Sky Box from Environment Tex',
+    description='When checked Create a sky box.  A background surface node with an Environment Texture input is also required.',
+    default = False
+)
+bpy.types.World.boxBlur = bpy.props.FloatProperty(
+    name='Box Blur',
+    description='How much blur should be applied to the sky box',
+    default = 0, min = 0, max = 1.0
+)
+
+###      Fog     ###
+bpy.types.World.fogMode = bpy.props.EnumProperty(
+    name='Mode',
+    description='Babylon JS fog mode',
+    items = ((FOGMODE_NONE  , 'None'               , 'No Fog'),
+             (FOGMODE_LINEAR, 'Linear'             , 'Linear Fog'),
+             (FOGMODE_EXP   , 'Exponential'        , 'Exponential Fog'),
+             (FOGMODE_EXP2  , 'Exponential Squared', 'Exponential Squared Fog')
+            ),
+    default = FOGMODE_NONE
+)
+bpy.types.World.fogDensity = bpy.props.FloatProperty(
+    name='Density',
+    description='How dense the fog should be',
+    default = 0.3, min = 0, max = 1.0
+)
+
+###     Max Decimal Precision     ###
+bpy.types.World.positionsPrecision = bpy.props.IntProperty(
+    name='Positions / Shape Keys:',
+    description='Max number of digits for positions / shape keys.  Reducing useful to reduce\nfile size when units of meshes already small, .e.g inches',
+    default = 4, min = 0, max = 8
+)
+bpy.types.World.normalsPrecision = bpy.props.IntProperty(
+    name='Normals:',
+    description='Max number of digits for normals',
+    default = 4, min = 1, max = 8
+)
+bpy.types.World.UVsPrecision = bpy.props.IntProperty(
+    name='UVs:',
+    description='Max number of digits for UVs',
+    default = 4, min = 1, max = 8
+)
+bpy.types.World.vColorsPrecision = bpy.props.IntProperty(
+    name='Vertex Colors:',
+    description='Number of digits for colors',
+    default = 3, min = 1, max = 8
+)
+bpy.types.World.mWeightsPrecision = bpy.props.IntProperty(
+    name='Matrix Weights:',
+    description='Max number of digits for armature weights',
+    default = 2, min = 1, max = 8
+)
+
+###     Textures / Materials     ###
+bpy.types.World.inlineTextures = bpy.props.BoolProperty(
+    name='inline',
+    description='Turn textures into encoded strings, for direct inclusion into source code.\nDoes not apply to environment texture.',
+    default = False
+)
+bpy.types.World.textureDir = bpy.props.StringProperty(
+    name='Sub-directory',
+    description='The path below the output directory to write texture files (any separators OS dependent)',
+    default = ''
+)
+bpy.types.World.usePBRMaterials = bpy.props.BoolProperty(
+    name='Use PBR Materials',
+    description="Export as a PBR materials, when checked",
+    default = True,
+)
+bpy.types.World.environmentIntensity = bpy.props.FloatProperty(
+    name='Environment Intensity',
+    description='This is the intensity of the environment to be applied to materials.\nNo meaning unless exporting PBR materials.',
+    default = 1.0, min = 0, max = 1.0
+)
+bpy.types.World.useBakeCache = bpy.props.BoolProperty(
+    name='Bake Cache',
+    description='Re-use images baked by a previous export, when the materials, mesh & bake settings of a mesh are unchanged.\nResized textures are also kept, by the hash of their source',
+    default = False
+)
+bpy.types.World.bakeCacheDir = bpy.props.StringProperty(
+    name='Cache Directory',
+    description='Where baked images are kept between exports.  // is relative to the .blend file',
+    default = '//bake_cache',
+    subtype = 'DIR_PATH'
+)
+bpy.types.World.bakeCacheMaxMB = bpy.props.IntProperty(
+    name='Max Size (MB)',
+    description='When the cache grows over this size, the least recently used images are removed',
+    default = 1024, min = 1
+)
+bpy.types.World.bakeWorkers = bpy.props.IntProperty(
+    name='Bake Workers',
+    description='When more than 0, bakes are done after all meshes are processed, split between this many background\nBlender processes baking on the CPU, using a saved copy of this file.  0 bakes each mesh in this session',
+    default = 0, min = 0, max = 64
+)
+bpy.types.World.maxTextureSize = bpy.props.IntProperty(
+    name='Max Texture Size',
+    description='Textures larger than this in either dimension are scaled down when exported, unless their material\nhas its own max.  0 is no limit.  Source files are never written over',
+    default = 0, min = 0, max = 16384
+)
+bpy.types.World.writeTextureVariants = bpy.props.BoolProperty(
+    name='Write 50% & 25% Variants',
+    description='Also write each texture at half & a quarter of its exported size, as [name]-50.[ext] & [name]-25.[ext],\nso a viewer can pick textures by device class',
+    default = False
+)
+bpy.types.World.useTextureAtlas = bpy.props.BoolProperty(
+    name='Texture Atlas',
+    description='Pack the textures of materials which only differ by their small textures into shared atlases,\nmoving the uvs of their meshes, so the materials can be merged.  Not done when in-lining textures',
+    default = False
+)
+bpy.types.World.atlasSize = bpy.props.IntProperty(
+    name='Atlas Size',
+    description='The width, & maximum height, of each atlas in pixels',
+    default = 2048, min = 256, max = 8192
+)
+bpy.types.World.atlasMaxTextureSize = bpy.props.IntProperty(
+    name='Max Texture Size',
+    description='Textures larger than this, in either dimension, are not put into an atlas',
+    default = 512, min = 16, max = 4096
+)
+###     Sound     ###
+bpy.types.World.attachedSound = bpy.props.StringProperty(
+    name='Sound',
+    description='',
+    default = ''
+)
+bpy.types.World.autoPlaySound = bpy.props.BoolProperty(
+    name='Auto play sound',
+    description='',
+    default = True
+)
+bpy.types.World.loopSound = bpy.props.BoolProperty(
+    name='Loop sound',
+    description='',
+    default = True
+)
+
+###     Animation     ###
+bpy.types.World.currentActionOnly = bpy.props.BoolProperty(
+    name='Only Currently Assigned Actions',
+    description="When true, only the currently assigned action is exported.",
+    default = True,
+)
+bpy.types.World.autoAnimate = bpy.props.BoolProperty(
+    name='Auto launch non-skeleton animations',
+    description='Start all animations, except for bones.',
+    default = False
+)
+bpy.types.World.ignoreIKBones = bpy.props.BoolProperty(
+    name='Ignore IK Bones',
+    description="Do not export bones with either '.ik' or 'ik.'(not case sensitive) in the name",
+    default = False,
+)
+
+bpy.types.World.writeCsvFile = bpy.props.BoolProperty(
+    name='Write .csv file',
+    description="Write mesh statistics into a spreadsheet file for analysis",
+    default = False,
+)
+
+###     Culling     ###
+bpy.types.World.writeBoundingInfo = bpy.props.BoolProperty(
+    name='Write Bounding Info',
+    description='Write the bounding box & sphere of each mesh & sub-mesh, computed from the exported positions',
+    default = False
+)
+bpy.types.World.writeSceneOctree = bpy.props.BoolProperty(
+    name='Write Scene Octree',
+    description='Write the blocks of a selection octree, with the meshes in each, into the scene metadata,\nso the client can build its octree without reading vertex data',
+    default = False
+)
+bpy.types.World.octreeCapacity = bpy.props.IntProperty(
+    name='Block Capacity',
+    description='The number of meshes a block can hold before it is split',
+    default = DEF_OCTREE_CAPACITY, min = 1
+)
+bpy.types.World.octreeMaxDepth = bpy.props.IntProperty(
+    name='Max Depth',
+    description='The number of times a block can be split',
+    default = DEF_OCTREE_MAX_DEPTH, min = 0, max = 8
+)
+bpy.types.World.cullShadowCasters = bpy.props.BoolProperty(
+    name='Shadow Casters in Range Only',
+    description='Limit the render list of each shadow generator to casters within the range of a point or spot light.\nAnimated lights & casters are never culled',
+    default = False
+)
+
+###     Static Batching     ###
+bpy.types.World.useStaticBatching = bpy.props.BoolProperty(
+    name='Static Batching',
+    description='Merge meshes with Freeze World Matrix set, & no animation, skeleton, shape keys, or instances,\nwhich share a material into combined meshes, baking their transforms into the vertices',
+    default = False
+)
+bpy.types.World.batchVertexCap = bpy.props.IntProperty(
+    name='Max Vertices',
+    description='The maximum number of vertices of a batch.  65535 keeps the indices of each batch 16 bit',
+    default = 65535, min = 1000
+)
+bpy.types.World.batchMaxExtent = bpy.props.FloatProperty(
+    name='Max Size',
+    description='The maximum size of a batch in any dimension, so frustum culling still works.  0 is no limit',
+    default = 50, min = 0
+)
+
+###    JSON Specific     ###
+bpy.types.World.incrementalExport = bpy.props.BoolProperty(
+    name='Incremental Export',
+    description='Keep what is exported in memory, so the next export of the same file, in this session, only makes again\nthe meshes & materials changed since.  A change to these settings, an armature, an image, or an undo exports everything',
+    default = False,
+)
+bpy.types.World.liveSyncPort = bpy.props.IntProperty(
+    name='Port',
+    description='Of the live sync server, on this machine only.  0 picks any free port',
+    default = 8765, min = 0, max = 65535
+)
+bpy.types.World.liveSyncOrigin = bpy.props.StringProperty(
+    name='Viewer Origin',
+    description='Of a viewer page served from elsewhere, like http://localhost:8080, which is allowed to read the scene.\nWhen blank, only a viewer served from the live sync server itself can',
+    default = ''
+)
+bpy.types.World.exportChunks = bpy.props.BoolProperty(
+    name='Chunk by Collection',
+    description='Write each top level collection, or collection given a chunk name, to its own file which can be appended\nseparately.  Shared materials & skeletons go to a common file.  A [filename].chunks.json manifest lists them',
+    default = False,
+)
+bpy.types.World.writeManifestFile = bpy.props.BoolProperty(
+    name='Write .manifest file',
+    description="Automatically create or update [filename].argil.manifest for this file",
+    default = True,
+)
+
+###    Log     ###
+bpy.types.World.logLevel = bpy.props.EnumProperty(
+    name='Log Level',
+    description='How much is written to the .log file',
+    items = (
+             ('QUIET', 'Quiet', 'Only warnings & errors'),
+             ('INFO' , 'Info' , 'What is exported, with its settings'),
+             ('DEBUG', 'Debug', 'Also detail, like each custom property & animation frame')
+            ),
+    default = 'INFO'
+)
+bpy.types.World.logConsoleLevel = bpy.props.EnumProperty(
+    name='Console',
+    description='What of the log is also printed to the console, which is slow inside Blender',
+    items = (
+             ('NONE'   , 'None'    , 'Nothing'),
+             ('ERROR'  , 'Errors'  , 'Only errors'),
+             ('WARNING', 'Warnings', 'Warnings & errors'),
+             ('INFO'   , 'Info'    , 'Everything but detail'),
+             ('DEBUG'  , 'Debug'   , 'Everything')
+            ),
+    default = 'WARNING'
+)
+bpy.types.World.logJsonLines = bpy.props.BoolProperty(
+    name='Write .jsonl log',
+    description='Also write the log as [filename].jsonl, one JSON object a line with time, level, category & message,\nfor pipelines to read',
+    default = False,
+)
+bpy.types.World.logThreaded = bpy.props.BoolProperty(
+    name='Write log on a thread',
+    description='Write the log from a background thread, rather than between processing',
+    default = False,
+)
+
+###    Preserve Z-up and right-handed coordinate     ###
+bpy.types.World.preserveZUpRight = bpy.props.BoolProperty(
+    name='Preserve Z-up right-handed coordinate (EXPERIMENTAL)',
+    description="By default, Y and Z are flipped by the exporter. This setting prevent that",
+    default = False,
+)
+#===============================================================================
+class BJS_PT_WorldPanel(bpy.types.Panel):
+    bl_label = get_title()
+    bl_space_type = 'PROPERTIES'
+    bl_region_type = 'WINDOW'
+    bl_context = 'world'
+
+    @classmethod
+    def poll(cls, context):
+        ob = context.world
+        return ob is not None and isinstance(ob, bpy.types.World)
+
+    def draw(self, context):
+        layout = self.layout
+
+        world = context.world
+
+        box = layout.box()
+        box.label(text='Sky Box / Environment Texture:')
+        box.prop(world, 'evtTexture')
+        box.prop(world, 'envTexRotationY')
+
+        row = box.row()
+        row.enabled = world.evtTexture == USE_BLENDER_FOR_ENV
+        row.prop(world, 'environmentTextureSize')
+        row.prop(world, 'precomputeEnvironment')
+
+        row = box.row()
+        row.prop(world, 'skyBox')
+        row.prop(world, 'boxBlur')
+
+        box = layout.box()
+        box.label(text='Fog:')
+        row = box.row()
+        row.prop(world, 'fogMode')
+        row.prop(world, 'fogDensity')
+
+        box = layout.box()
+        box.label(text='Max Decimal Precision:')
+        box.prop(world, 'positionsPrecision')
+        box.prop(world, 'normalsPrecision')
+        box.prop(world, 'UVsPrecision')
+        box.prop(world, 'vColorsPrecision')
+        box.prop(world, 'mWeightsPrecision')
+
+        box = layout.box()
+        box.label(text='Textures / Materials:')
+        box.prop(world, 'inlineTextures')
+        row = box.row()
+        row.enabled = not world.inlineTextures
+        row.prop(world, 'textureDir')
+        box.prop(world, 'usePBRMaterials')
+        row = box.row()
+        row.enabled = world.usePBRMaterials
+        row.prop(world, 'environmentIntensity')
+        row = box.row()
+        row.enabled = not world.inlineTextures
+        row.prop(world, 'maxTextureSize')
+        row.prop(world, 'writeTextureVariants')
+        box.prop(world, 'useBakeCache')
+        col = box.column()
+        col.enabled = world.useBakeCache
+        col.prop(world, 'bakeCacheDir')
+        col.prop(world, 'bakeCacheMaxMB')
+        box.prop(world, 'bakeWorkers')
+        box.prop(world, 'useTextureAtlas')
+        row = box.row()
+        row.enabled = world.useTextureAtlas
+        row.prop(world, 'atlasSize')
+        row.prop(world, 'atlasMaxTextureSize')
+
+        box = layout.box()
+        box.prop(world, 'attachedSound')
+        row = box.row()
+        row.prop(world, 'autoPlaySound')
+        row.prop(world, 'loopSound')
+
+        box = layout.box()
+        box.label(text='Culling:')
+        box.prop(world, 'writeBoundingInfo')
+        box.prop(world, 'writeSceneOctree')
+        row = box.row()
+        row.enabled = world.writeSceneOctree
+        row.prop(world, 'octreeCapacity')
+        row.prop(world, 'octreeMaxDepth')
+        box.prop(world, 'cullShadowCasters')
+
+        box = layout.box()
+        box.prop(world, 'useStaticBatching')
+        row = box.row()
+        row.enabled = world.useStaticBatching
+        row.prop(world, 'batchVertexCap')
+        row.prop(world, 'batchMaxExtent')
+
+        box = layout.box()
+        box.label(text='Animation:')
+        box.prop(world, 'currentActionOnly')
+        box.prop(world, 'autoAnimate')
+        box.prop(world, 'ignoreIKBones')
+
+        box = layout.box()
+        box.label(text='Log:')
+        row = box.row()
+        row.prop(world, 'logLevel')
+        row.prop(world, 'logConsoleLevel')
+        row = box.row()
+        row.prop(world, 'logJsonLines')
+        row.prop(world, 'logThreaded')
+
+        layout.prop(world, 'writeCsvFile')
+
+        layout.prop(world, 'incrementalExport')
+
+        # the server is only imported once it is needed, so is not running until then
+        from .live_sync import is_running, last_error
+        box = layout.box()
+        box.label(text='Live Sync:')
+        row = box.row()
+        row.enabled = not is_running()
+        row.prop(world, 'liveSyncPort')
+        row = box.row()
+        row.enabled = not is_running()
+        row.prop(world, 'liveSyncOrigin')
+        box.operator('bjs.live_sync', text = 'Stop Live Sync' if is_running() else 'Start Live Sync')
+        if last_error() is not None:
+            box.label(text='Last export failed:  ' + last_error())
+        layout.prop(world, 'exportChunks')
+        layout.prop(world, 'writeManifestFile')
+        layout.prop(world, 'preserveZUpRight')
+